@@ -69,6 +69,14 @@ else:
     print("WARNING: Phase 3 engine not available, using fallback mode")
 
 from fastapi.openapi.utils import get_openapi
+from fastapi.responses import Response
+from inference_executor import inference_executor, InferenceOverloaded
+
+try:
+    from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
 
 # Security setup - Use JWT authentication
 try:
@@ -137,13 +145,17 @@ def custom_openapi():
     # Apply security to all endpoints except health
     for path in openapi_schema["paths"]:
         for method in openapi_schema["paths"][path]:
-            if path not in ["/", "/health"]:
+            if path not in ["/", "/health", "/metrics"]:
                 openapi_schema["paths"][path][method]["security"] = [{"BearerAuth": []}]
     app.openapi_schema = openapi_schema
     return app.openapi_schema
 
 app.openapi = custom_openapi
 
+# ANN preselection for unscoped /match requests (top-K semantic candidates before re-ranking)
+ANN_PRESELECT_ENABLED = os.getenv("AGENT_ANN_PRESELECT", "true").lower() == "true"
+ANN_PRESELECT_CANDIDATES = int(os.getenv("AGENT_ANN_CANDIDATES", "300"))
+
 # Lazy-loaded Phase 3 engines (avoid blocking startup: SentenceTransformer load can take 60s+)
 phase3_engine = None
 advanced_matcher = None
@@ -184,12 +196,21 @@ def _startup_phase3_background():
     def _run():
         try:
             _ensure_phase3_engine()
+            # Build the ANN candidate index up front so the first /match does not pay for it
+            if ANN_PRESELECT_ENABLED and phase3_engine:
+                db = get_db_connection()
+                if db is not None:
+                    phase3_engine.refresh_candidate_index(db, full=True)
         except Exception as e:
             logger.error(f"Background Phase 3 init error: {e}")
     t = threading.Thread(target=_run, daemon=True)
     t.start()
     logger.info("Agent started; Phase 3 engine will load in background.")
 
+@app.on_event("shutdown")
+def _shutdown_inference_executor():
+    inference_executor.shutdown()
+
 class MatchRequest(BaseModel):
     job_id: str
     candidate_ids: Optional[List[str]] = None
@@ -233,14 +254,16 @@ def read_root():
     return {
         "service": "BHIV AI Agent",
         "version": "3.0.0",
-        "endpoints": 6,
+        "endpoints": 8,
         "available_endpoints": {
             "root": "GET / - Service information",
             "health": "GET /health - Service health check", 
+            "metrics": "GET /metrics - Prometheus metrics",
             "test_db": "GET /test-db - Database connectivity test",
             "match": "POST /match - AI-powered candidate matching",
             "batch_match": "POST /batch-match - Batch AI matching for multiple jobs",
-            "analyze": "GET /analyze/{candidate_id} - Detailed candidate analysis"
+            "analyze": "GET /analyze/{candidate_id} - Detailed candidate analysis",
+            "embeddings_sync": "POST /embeddings/sync - Refresh candidate embedding store"
         }
     }
 
@@ -250,9 +273,16 @@ def health_check():
         "status": "healthy",
         "service": "BHIV AI Agent",
         "version": "3.0.0",
+        "inference": inference_executor.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/metrics", tags=["Core API Endpoints"], summary="Prometheus Metrics")
+def metrics():
+    if not PROMETHEUS_AVAILABLE:
+        raise HTTPException(status_code=503, detail="prometheus_client not installed")
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/test-db", tags=["System Diagnostics"], summary="Database Connectivity Test")
 def test_database(auth = Depends(auth_dependency)):
     db = None
@@ -274,9 +304,8 @@ def test_database(auth = Depends(auth_dependency)):
         logger.error(f"Database test failed: {e}")
         return {"status": "failed", "error": str(e)}
 
-@app.post("/match", tags=["AI Matching Engine"], summary="AI-Powered Candidate Matching")
-async def match_candidates(request: MatchRequest, auth = Depends(auth_dependency)):
-    """Phase 3 AI-powered candidate matching"""
+def _run_match(request: MatchRequest) -> dict:
+    """Phase 3 AI-powered candidate matching (blocking; runs on the inference pool)"""
     start_time = datetime.now()
     logger.info(f"Starting Phase 3 match for job_id: {request.job_id}")
     db = None
@@ -329,7 +358,17 @@ async def match_candidates(request: MatchRequest, auth = Depends(auth_dependency
         job_requirements = job_doc.get('requirements', '')
         logger.info(f"Processing job: {job_title}")
         
+        job_data_dict = {
+            'id': request.job_id,
+            'title': job_title,
+            'description': job_desc,
+            'requirements': job_requirements,
+            'location': job_location,
+            'experience_level': job_level
+        }
+        
         # Get candidates: scope to candidate_ids when provided (e.g. recruiter applicants)
+        pool_size = None
         if request.candidate_ids:
             object_ids = []
             for cid in request.candidate_ids:
@@ -340,6 +379,19 @@ async def match_candidates(request: MatchRequest, auth = Depends(auth_dependency
             query = {"_id": {"$in": object_ids}} if object_ids else {}
         else:
             query = {}
+            # Unscoped match over the whole pool: preselect the top semantic
+            # candidates from the ANN index, then re-rank them fully below
+            if ANN_PRESELECT_ENABLED:
+                _ensure_phase3_engine()
+                if phase3_engine:
+                    try:
+                        shortlist = phase3_engine.shortlist_candidate_ids(db, job_data_dict, ANN_PRESELECT_CANDIDATES)
+                        if shortlist is not None:
+                            pool_size = len(phase3_engine.candidate_index)
+                            query = {"_id": {"$in": [ObjectId(cid) for cid in shortlist]}}
+                            logger.info(f"ANN preselected {len(shortlist)} of {pool_size} candidates")
+                    except Exception as e:
+                        logger.warning(f"ANN preselection failed, scoring full pool: {e}")
         candidates_cursor = db.candidates.find(query).sort('created_at', -1)
         candidates = list(candidates_cursor)
         logger.info(f"Found {len(candidates)} candidates for Phase 3 matching")
@@ -362,15 +414,6 @@ async def match_candidates(request: MatchRequest, auth = Depends(auth_dependency
         _ensure_phase3_engine()
         logger.info("Using Phase 3 Production AI semantic matching")
         
-        job_data_dict = {
-            'id': request.job_id,
-            'title': job_title,
-            'description': job_desc,
-            'requirements': job_requirements,
-            'location': job_location,
-            'experience_level': job_level
-        }
-        
         # Convert candidates to dict format (MongoDB documents)
         candidates_dict = []
         for cand in candidates:
@@ -495,7 +538,7 @@ async def match_candidates(request: MatchRequest, auth = Depends(auth_dependency
             "job_id": request.job_id,
             "matches": top_candidates,
             "top_candidates": top_candidates,
-            "total_candidates": len(candidates),
+            "total_candidates": pool_size or len(candidates),
             "algorithm_version": "3.0.0-phase3-production",
             "processing_time": f"{round(processing_time, 3)}s",
             "ai_analysis": "Real AI semantic matching via Agent Service",
@@ -518,6 +561,22 @@ async def match_candidates(request: MatchRequest, auth = Depends(auth_dependency
             "status": "error"
         }
 
+def _overloaded(e: InferenceOverloaded) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Matching service busy, retry shortly",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+@app.post("/match", tags=["AI Matching Engine"], summary="AI-Powered Candidate Matching")
+async def match_candidates(request: MatchRequest, auth = Depends(auth_dependency)):
+    """Phase 3 AI-powered candidate matching"""
+    try:
+        return await inference_executor.run("match", _run_match, request)
+    except InferenceOverloaded as e:
+        logger.warning(f"Rejecting match for job_id {request.job_id}: inference queue full")
+        raise _overloaded(e)
+
 class BatchMatchRequest(BaseModel):
     job_ids: List[str]
 
@@ -531,6 +590,13 @@ async def batch_match_jobs(request: BatchMatchRequest, auth = Depends(auth_depen
     if len(request.job_ids) > 10:
         raise HTTPException(status_code=400, detail="Maximum 10 jobs can be processed in batch")
     
+    try:
+        return await inference_executor.run("batch_match", _run_batch_match, request)
+    except InferenceOverloaded as e:
+        raise _overloaded(e)
+
+def _run_batch_match(request: BatchMatchRequest) -> dict:
+    """Batch matching body (blocking; runs on the inference pool)"""
     db = None
     try:
         db = get_db_connection()
@@ -672,6 +738,57 @@ async def batch_match_jobs(request: BatchMatchRequest, auth = Depends(auth_depen
             "agent_status": "error"
         }
 
+class EmbeddingSyncRequest(BaseModel):
+    candidate_ids: Optional[List[str]] = None
+
+@app.post("/embeddings/sync", tags=["AI Matching Engine"], summary="Refresh Candidate Embeddings")
+async def sync_candidate_embeddings(request: EmbeddingSyncRequest, auth = Depends(auth_dependency)):
+    """Encode new/changed candidates into the embedding store (called by the gateway on candidate writes)"""
+    try:
+        return await inference_executor.run("embeddings_sync", _run_embedding_sync, request)
+    except InferenceOverloaded as e:
+        raise _overloaded(e)
+
+def _run_embedding_sync(request: EmbeddingSyncRequest) -> dict:
+    _ensure_phase3_engine()
+    if not phase3_engine:
+        return {"status": "unavailable", "candidates": 0, "encoded": 0, "reused": 0}
+    
+    db = get_db_connection()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    
+    query = {}
+    if request.candidate_ids:
+        object_ids = []
+        for cid in request.candidate_ids:
+            try:
+                object_ids.append(ObjectId(cid))
+            except Exception:
+                pass
+        query = {"_id": {"$in": object_ids}}
+    projection = {'technical_skills': 1, 'seniority_level': 1, 'education_level': 1}
+    
+    totals = {"candidates": 0, "encoded": 0, "reused": 0}
+    batch = []
+    for cand in db.candidates.find(query, projection):
+        batch.append({
+            'id': str(cand.get('_id')),
+            'technical_skills': cand.get('technical_skills', ''),
+            'seniority_level': cand.get('seniority_level', ''),
+            'education_level': cand.get('education_level', '')
+        })
+        if len(batch) >= 500:
+            for key, value in phase3_engine.index_candidates(batch).items():
+                totals[key] += value
+            batch = []
+    if batch:
+        for key, value in phase3_engine.index_candidates(batch).items():
+            totals[key] += value
+    
+    store_stats = phase3_engine.embedding_store.stats() if phase3_engine.embedding_store else {}
+    return {"status": "success", **totals, "store": store_stats}
+
 @app.get("/analyze/{candidate_id}", tags=["Candidate Analysis"], summary="Detailed Candidate Analysis")
 def analyze_candidate(candidate_id: str, auth = Depends(auth_dependency)): 
     """Detailed candidate analysis"""
@@ -0,0 +1,133 @@
+"""
+Inference Executor for Agent Service
+Runs blocking matching work (pymongo cursors, SentenceTransformer.encode) on a
+bounded worker pool so the event loop keeps serving /health and other requests.
+
+Admission control: at most AGENT_INFERENCE_WORKERS tasks run at once and at most
+AGENT_INFERENCE_QUEUE_SIZE more may wait; beyond that requests are rejected
+immediately (HTTP 503 + Retry-After) instead of piling up behind one encode.
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+INFERENCE_WORKERS = int(os.getenv("AGENT_INFERENCE_WORKERS", "2"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("AGENT_INFERENCE_QUEUE_SIZE", "16"))
+INFERENCE_RETRY_AFTER = int(os.getenv("AGENT_INFERENCE_RETRY_AFTER", "5"))
+
+if PROMETHEUS_AVAILABLE:
+    INFERENCE_QUEUE_DEPTH = Gauge('agent_inference_queue_depth', 'Inference tasks waiting for a worker')
+    INFERENCE_IN_FLIGHT = Gauge('agent_inference_in_flight', 'Inference tasks currently running')
+    INFERENCE_REJECTED = Counter('agent_inference_rejected_total', 'Inference tasks rejected by admission control', ['task'])
+    INFERENCE_WAIT = Histogram('agent_inference_queue_wait_seconds', 'Time spent queued before a worker picked the task up', ['task'])
+    INFERENCE_DURATION = Histogram('agent_inference_duration_seconds', 'Inference task run time', ['task'],
+                                   buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120))
+
+
+class InferenceOverloaded(Exception):
+    """Raised when the inference queue is full"""
+
+    def __init__(self, retry_after: int = INFERENCE_RETRY_AFTER):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """Bounded thread pool with admission control for CPU-bound matching work.
+
+    Threads share the process-wide Phase3SemanticEngine; torch releases the GIL
+    inside encode, so workers overlap model forward passes and Mongo I/O.
+    """
+
+    def __init__(self, max_workers: int = INFERENCE_WORKERS, max_queue: int = INFERENCE_QUEUE_SIZE):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-inference")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self.rejected = 0
+        self.completed = 0
+
+    def _admit(self, task: str):
+        with self._lock:
+            if self._queued + self._running >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                if PROMETHEUS_AVAILABLE:
+                    INFERENCE_REJECTED.labels(task=task).inc()
+                raise InferenceOverloaded()
+            self._queued += 1
+            self._update_gauges()
+
+    def _update_gauges(self):
+        if PROMETHEUS_AVAILABLE:
+            INFERENCE_QUEUE_DEPTH.set(self._queued)
+            INFERENCE_IN_FLIGHT.set(self._running)
+
+    def _wrap(self, task: str, fn: Callable, args: tuple, kwargs: dict, submitted_at: float):
+        started_at = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._update_gauges()
+        if PROMETHEUS_AVAILABLE:
+            INFERENCE_WAIT.labels(task=task).observe(started_at - submitted_at)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.completed += 1
+                self._update_gauges()
+            if PROMETHEUS_AVAILABLE:
+                INFERENCE_DURATION.labels(task=task).observe(time.perf_counter() - started_at)
+
+    def _release_unstarted(self, future: Future):
+        # A task cancelled while queued (client gone, timeout) never reaches
+        # _wrap, so its queue slot is given back here
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+                self._update_gauges()
+
+    async def run(self, task: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool and await the result"""
+        self._admit(task)
+        try:
+            future = self._executor.submit(self._wrap, task, fn, args, kwargs, time.perf_counter())
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+                self._update_gauges()
+            raise
+        future.add_done_callback(self._release_unstarted)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+inference_executor = InferenceExecutor()
@@ -10,11 +10,15 @@ from .phase3_engine import (
     LearningEngine,
     SemanticJobMatcher
 )
+from .embedding_store import CandidateEmbeddingStore
+from .ann_index import CandidateANNIndex
 
 __all__ = [
     'Phase3SemanticEngine',
     'AdvancedSemanticMatcher', 
     'BatchMatcher',
     'LearningEngine',
-    'SemanticJobMatcher'
+    'SemanticJobMatcher',
+    'CandidateEmbeddingStore',
+    'CandidateANNIndex'
 ]
@@ -0,0 +1,246 @@
+"""
+Approximate Nearest-Neighbour Candidate Index
+Preselects the top semantic candidates for a job before full adaptive re-ranking.
+
+Vectors are the L2-normalised candidate profile embeddings from the embedding
+store, so inner product == cosine similarity.
+
+Backends:
+    hnsw - hnswlib HNSW graph (optional dependency: pip install hnswlib)
+    ivf  - in-process NumPy inverted-file index (k-means coarse quantiser);
+           small pools are searched exactly with one matrix multiply
+"""
+import os
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSWLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ANN_BACKEND = os.getenv("AGENT_ANN_BACKEND", "auto").lower()
+ANN_EXACT_THRESHOLD = int(os.getenv("AGENT_ANN_EXACT_THRESHOLD", "20000"))
+ANN_NPROBE = int(os.getenv("AGENT_ANN_NPROBE", "8"))
+
+
+class IVFIndex:
+    """NumPy inverted-file index with exact search below ANN_EXACT_THRESHOLD"""
+
+    def __init__(self, dimension: int, exact_threshold: int = ANN_EXACT_THRESHOLD, nprobe: int = ANN_NPROBE):
+        self.dimension = dimension
+        self.exact_threshold = exact_threshold
+        self.nprobe = nprobe
+        # Rows live in a geometrically grown buffer; _vectors is the filled view
+        self._buffer = np.zeros((0, dimension), dtype=np.float32)
+        self._vectors = self._buffer
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._trained_size = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    def upsert(self, ids: List[str], vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        new_ids, new_vectors = [], []
+        for candidate_id, vector in zip(ids, vectors):
+            row = self._rows.get(candidate_id)
+            if row is None:
+                new_ids.append(candidate_id)
+                new_vectors.append(vector)
+            else:
+                self._vectors[row] = vector
+                if self._centroids is not None:
+                    self._assignments[row] = self._nearest_centroid(vector[None, :])[0]
+        if new_ids:
+            start = len(self._ids)
+            self._append_rows(np.stack(new_vectors))
+            self._ids.extend(new_ids)
+            for offset, candidate_id in enumerate(new_ids):
+                self._rows[candidate_id] = start + offset
+            if self._centroids is not None:
+                self._assignments = np.concatenate(
+                    [self._assignments, self._nearest_centroid(np.stack(new_vectors))])
+        self._maybe_train()
+
+    def remove(self, ids: List[str]):
+        rows = sorted((self._rows[cid] for cid in ids if cid in self._rows), reverse=True)
+        if not rows:
+            return
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[rows] = False
+        self._buffer = self._vectors[keep]
+        self._vectors = self._buffer
+        if self._centroids is not None:
+            self._assignments = self._assignments[keep]
+        self._ids = [cid for cid, kept in zip(self._ids, keep) if kept]
+        self._rows = {cid: row for row, cid in enumerate(self._ids)}
+
+    def _append_rows(self, rows: np.ndarray):
+        size, needed = len(self._vectors), len(self._vectors) + len(rows)
+        if needed > len(self._buffer):
+            buffer = np.empty((max(needed, 2 * len(self._buffer), 1024), self._buffer.shape[1]), dtype=np.float32)
+            buffer[:size] = self._vectors
+            self._buffer = buffer
+        self._buffer[size:needed] = rows
+        self._vectors = self._buffer[:needed]
+
+    def _nearest_centroid(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _maybe_train(self):
+        size = len(self._ids)
+        if size < self.exact_threshold:
+            return
+        if self._centroids is not None and size < 2 * self._trained_size:
+            return
+        self._train()
+
+    def _train(self, iterations: int = 10):
+        """Spherical k-means over (a sample of) the indexed vectors"""
+        size = len(self._ids)
+        nlist = max(1, int(np.sqrt(size)))
+        rng = np.random.default_rng(42)
+        sample = self._vectors[rng.choice(size, size=min(size, nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = sample[assignments == cluster]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[cluster] = centroid / (np.linalg.norm(centroid) or 1.0)
+        self._centroids = centroids
+        self._assignments = self._nearest_centroid(self._vectors)
+        self._trained_size = size
+        logger.info(f"IVF candidate index trained: {size} vectors, {nlist} lists")
+
+    def search(self, query: np.ndarray, k: int) -> List[str]:
+        if not self._ids:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if self._centroids is None or len(self._ids) < self.exact_threshold:
+            rows = np.arange(len(self._ids))
+        else:
+            probes = np.argsort(-(self._centroids @ query))[:self.nprobe]
+            rows = np.nonzero(np.isin(self._assignments, probes))[0]
+            if len(rows) < k:
+                rows = np.arange(len(self._ids))
+        scores = self._vectors[rows] @ query
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self._ids[rows[i]] for i in top]
+
+
+class HNSWIndex:
+    """hnswlib-backed HNSW graph over candidate vectors"""
+
+    def __init__(self, dimension: int, capacity: int = 10000, m: int = 16, ef_construction: int = 200):
+        self.dimension = dimension
+        self._index = hnswlib.Index(space='ip', dim=dimension)
+        self._index.init_index(max_elements=capacity, ef_construction=ef_construction, M=m,
+                               allow_replace_deleted=True)
+        self._labels: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._next_label = 0
+
+    def __len__(self):
+        return len(self._labels)
+
+    def ids(self) -> List[str]:
+        return list(self._labels)
+
+    def upsert(self, ids: List[str], vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        # Deleted labels still occupy slots in the graph
+        needed = self._next_label + len(ids)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+        labels = []
+        for candidate_id in ids:
+            label = self._labels.get(candidate_id)
+            if label is None:
+                label = self._next_label
+                self._next_label += 1
+                self._labels[candidate_id] = label
+                self._ids[label] = candidate_id
+            labels.append(label)
+        self._index.add_items(vectors, np.asarray(labels))
+
+    def remove(self, ids: List[str]):
+        for candidate_id in ids:
+            label = self._labels.pop(candidate_id, None)
+            if label is not None:
+                self._ids.pop(label, None)
+                self._index.mark_deleted(label)
+
+    def search(self, query: np.ndarray, k: int) -> List[str]:
+        k = min(k, len(self._labels))
+        if k <= 0:
+            return []
+        self._index.set_ef(max(k, 64))
+        labels, _ = self._index.knn_query(np.asarray(query, dtype=np.float32).reshape(1, -1), k=k)
+        return [self._ids[int(label)] for label in labels[0] if int(label) in self._ids]
+
+
+class CandidateANNIndex:
+    """Thread-safe candidate index with a pluggable backend (AGENT_ANN_BACKEND)"""
+
+    def __init__(self, dimension: int, backend: str = ANN_BACKEND):
+        use_hnsw = backend == 'hnsw' or (backend == 'auto' and HNSWLIB_AVAILABLE)
+        if use_hnsw and not HNSWLIB_AVAILABLE:
+            logger.warning("hnswlib not installed, falling back to NumPy IVF candidate index")
+            use_hnsw = False
+        self._backend = HNSWIndex(dimension) if use_hnsw else IVFIndex(dimension)
+        self._lock = threading.RLock()
+        self.last_synced_at = None
+        self.last_full_sync_at = None
+
+    @property
+    def backend_name(self) -> str:
+        return 'hnsw' if isinstance(self._backend, HNSWIndex) else 'ivf'
+
+    def __len__(self):
+        return len(self._backend)
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return self._backend.ids()
+
+    def upsert(self, ids: List[str], vectors: np.ndarray):
+        if not ids:
+            return
+        with self._lock:
+            self._backend.upsert(list(ids), vectors)
+
+    def remove(self, ids: List[str]):
+        if not ids:
+            return
+        with self._lock:
+            self._backend.remove(list(ids))
+
+    def search(self, query: np.ndarray, k: int) -> List[str]:
+        with self._lock:
+            return self._backend.search(query, k)
+
+    def stats(self) -> dict:
+        return {
+            'backend': self.backend_name,
+            'size': len(self),
+            'last_synced_at': self.last_synced_at.isoformat() if self.last_synced_at else None,
+            'last_full_sync_at': self.last_full_sync_at.isoformat() if self.last_full_sync_at else None,
+        }
@@ -0,0 +1,332 @@
+"""
+Candidate Embedding Store
+Persists candidate profile/skills embeddings so matching does not re-encode
+unchanged candidates on every request.
+
+Entries are keyed by candidate id and invalidated by a content hash of the
+fields that feed the embeddings (technical_skills, seniority_level,
+education_level). Vectors are stored L2-normalised as float32, so cosine
+similarity against a normalised job vector is a plain dot product.
+
+Backends:
+    mongo  - `candidate_embeddings` collection (default, shared by all replicas)
+    npy    - local memory-mapped .npy matrices plus a JSON row index
+    memory - in-process only (no persistence)
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_STORE_BACKEND = os.getenv("AGENT_EMBEDDING_STORE", "mongo").lower()
+EMBEDDING_COLLECTION = os.getenv("AGENT_EMBEDDING_COLLECTION", "candidate_embeddings")
+EMBEDDING_STORE_PATH = os.getenv("AGENT_EMBEDDING_STORE_PATH", "/tmp/bhiv_candidate_embeddings")
+EMBEDDING_CACHE_SIZE = int(os.getenv("AGENT_EMBEDDING_CACHE_SIZE", "50000"))
+
+HASH_FIELDS = ('technical_skills', 'seniority_level', 'education_level')
+
+
+def candidate_content_hash(candidate: dict) -> str:
+    """Hash of the candidate fields that feed the stored embeddings"""
+    payload = "\x1f".join(str(candidate.get(field) or '') for field in HASH_FIELDS)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def candidate_profile_text(candidate: dict) -> str:
+    """Text encoded for the semantic-similarity component"""
+    return f"{candidate.get('technical_skills', '')} {candidate.get('seniority_level', '')} {candidate.get('education_level', '')}"
+
+
+def candidate_skills_text(candidate: dict) -> str:
+    """Text encoded for the skills-match component"""
+    return (candidate.get('technical_skills') or '').lower()
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise rows; all-zero rows stay zero"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class MongoEmbeddingBackend:
+    """Stores embeddings as float32 bytes in a MongoDB collection"""
+
+    def __init__(self, get_db: Callable, model_name: str, collection_name: str = EMBEDDING_COLLECTION):
+        self.get_db = get_db
+        self.model_name = model_name
+        self.collection_name = collection_name
+
+    def _collection(self):
+        return self.get_db()[self.collection_name]
+
+    def load(self, candidate_ids: List[str]) -> Dict[str, dict]:
+        if not candidate_ids:
+            return {}
+        entries = {}
+        cursor = self._collection().find(
+            {'_id': {'$in': candidate_ids}, 'model': self.model_name},
+            {'content_hash': 1, 'profile': 1, 'skills': 1}
+        )
+        for doc in cursor:
+            entries[doc['_id']] = {
+                'content_hash': doc.get('content_hash'),
+                'profile': np.frombuffer(doc['profile'], dtype='<f4'),
+                'skills': np.frombuffer(doc['skills'], dtype='<f4'),
+            }
+        return entries
+
+    def save(self, entries: Dict[str, dict]):
+        if not entries:
+            return
+        from bson.binary import Binary
+        from pymongo import UpdateOne
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'_id': candidate_id},
+                {'$set': {
+                    'content_hash': entry['content_hash'],
+                    'model': self.model_name,
+                    'dimension': int(entry['profile'].shape[0]),
+                    'profile': Binary(entry['profile'].astype('<f4').tobytes()),
+                    'skills': Binary(entry['skills'].astype('<f4').tobytes()),
+                    'updated_at': now,
+                }},
+                upsert=True
+            )
+            for candidate_id, entry in entries.items()
+        ]
+        self._collection().bulk_write(operations, ordered=False)
+
+    def delete(self, candidate_ids: List[str]):
+        if candidate_ids:
+            self._collection().delete_many({'_id': {'$in': candidate_ids}})
+
+
+class NpyEmbeddingBackend:
+    """Stores embeddings in local memory-mapped .npy matrices.
+
+    Intended for a single agent process per volume; rows are appended and a
+    JSON index maps candidate id -> [row, content_hash].
+    """
+
+    def __init__(self, path: str, dimension: int, model_name: str):
+        self.path = path
+        self.dimension = dimension
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._index: Dict[str, list] = {}
+        self._size = 0
+        self._profile = None
+        self._skills = None
+        self._open()
+
+    def _file(self, suffix: str) -> str:
+        return f"{self.path}.{suffix}"
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        index_file = self._file('index.json')
+        if os.path.exists(index_file) and os.path.exists(self._file('profile.npy')):
+            with open(index_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('model') == self.model_name and meta.get('dimension') == self.dimension:
+                self._index = meta.get('rows', {})
+                self._size = int(meta.get('size', len(self._index)))
+                self._profile = np.load(self._file('profile.npy'), mmap_mode='r+')
+                self._skills = np.load(self._file('skills.npy'), mmap_mode='r+')
+                return
+            logger.warning("Embedding store files belong to a different model; rebuilding")
+        self._index = {}
+        self._size = 0
+        self._allocate(1024)
+
+    def _allocate(self, capacity: int):
+        old_profile, old_skills = self._profile, self._skills
+        profile = np.lib.format.open_memmap(
+            self._file('profile.tmp.npy'), mode='w+', dtype=np.float32, shape=(capacity, self.dimension))
+        skills = np.lib.format.open_memmap(
+            self._file('skills.tmp.npy'), mode='w+', dtype=np.float32, shape=(capacity, self.dimension))
+        if old_profile is not None and self._size:
+            profile[:self._size] = old_profile[:self._size]
+            skills[:self._size] = old_skills[:self._size]
+        profile.flush()
+        skills.flush()
+        del old_profile, old_skills, profile, skills
+        os.replace(self._file('profile.tmp.npy'), self._file('profile.npy'))
+        os.replace(self._file('skills.tmp.npy'), self._file('skills.npy'))
+        self._profile = np.load(self._file('profile.npy'), mmap_mode='r+')
+        self._skills = np.load(self._file('skills.npy'), mmap_mode='r+')
+
+    def _write_index(self):
+        tmp_file = self._file('index.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'model': self.model_name,
+                'dimension': self.dimension,
+                'size': self._size,
+                'rows': self._index,
+            }, f)
+        os.replace(tmp_file, self._file('index.json'))
+
+    def load(self, candidate_ids: List[str]) -> Dict[str, dict]:
+        entries = {}
+        with self._lock:
+            for candidate_id in candidate_ids:
+                row = self._index.get(candidate_id)
+                if row is None:
+                    continue
+                position, content_hash = row
+                entries[candidate_id] = {
+                    'content_hash': content_hash,
+                    'profile': np.array(self._profile[position]),
+                    'skills': np.array(self._skills[position]),
+                }
+        return entries
+
+    def save(self, entries: Dict[str, dict]):
+        if not entries:
+            return
+        with self._lock:
+            new_rows = sum(1 for candidate_id in entries if candidate_id not in self._index)
+            capacity = self._profile.shape[0]
+            if self._size + new_rows > capacity:
+                while capacity < self._size + new_rows:
+                    capacity *= 2
+                self._allocate(capacity)
+            for candidate_id, entry in entries.items():
+                row = self._index.get(candidate_id)
+                position = row[0] if row else self._size
+                if not row:
+                    self._size += 1
+                self._profile[position] = entry['profile']
+                self._skills[position] = entry['skills']
+                self._index[candidate_id] = [position, entry['content_hash']]
+            self._profile.flush()
+            self._skills.flush()
+            self._write_index()
+
+    def delete(self, candidate_ids: List[str]):
+        with self._lock:
+            removed = [cid for cid in candidate_ids if self._index.pop(cid, None) is not None]
+            if removed:
+                self._write_index()
+
+
+class CandidateEmbeddingStore:
+    """Content-hash validated embedding cache with an in-process LRU in front of a backend"""
+
+    def __init__(self, backend=None, cache_size: int = EMBEDDING_CACHE_SIZE):
+        self.backend = backend
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, candidate_id: str, entry: dict):
+        self._cache[candidate_id] = entry
+        self._cache.move_to_end(candidate_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def lookup(self, candidates: Iterable[dict]) -> Dict[str, dict]:
+        """Return fresh entries (matching content hash) keyed by candidate id"""
+        wanted = {}
+        for candidate in candidates:
+            candidate_id = str(candidate.get('id') or '')
+            if candidate_id:
+                wanted[candidate_id] = candidate_content_hash(candidate)
+
+        found = {}
+        backend_ids = []
+        with self._lock:
+            for candidate_id, content_hash in wanted.items():
+                entry = self._cache.get(candidate_id)
+                if entry is not None and entry['content_hash'] == content_hash:
+                    self._cache.move_to_end(candidate_id)
+                    found[candidate_id] = entry
+                else:
+                    backend_ids.append(candidate_id)
+
+        if backend_ids and self.backend is not None:
+            try:
+                loaded = self.backend.load(backend_ids)
+            except Exception as e:
+                logger.warning(f"Embedding store read failed, re-encoding: {e}")
+                loaded = {}
+            with self._lock:
+                for candidate_id, entry in loaded.items():
+                    if entry.get('content_hash') == wanted.get(candidate_id):
+                        self._remember(candidate_id, entry)
+                        found[candidate_id] = entry
+
+        self.hits += len(found)
+        self.misses += len(wanted) - len(found)
+        return found
+
+    def store(self, entries: Dict[str, dict]):
+        """Persist freshly encoded entries"""
+        if not entries:
+            return
+        with self._lock:
+            for candidate_id, entry in entries.items():
+                self._remember(candidate_id, entry)
+        if self.backend is not None:
+            try:
+                self.backend.save(entries)
+            except Exception as e:
+                logger.warning(f"Embedding store write failed: {e}")
+
+    def invalidate(self, candidate_ids: Iterable[str]):
+        """Drop cached entries for the given candidates"""
+        candidate_ids = [str(cid) for cid in candidate_ids]
+        with self._lock:
+            for candidate_id in candidate_ids:
+                self._cache.pop(candidate_id, None)
+        if self.backend is not None:
+            try:
+                self.backend.delete(candidate_ids)
+            except Exception as e:
+                logger.warning(f"Embedding store delete failed: {e}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__ if self.backend is not None else 'memory',
+            'cached_entries': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def create_embedding_store(model_name: str, dimension: int,
+                           get_db: Optional[Callable] = None) -> CandidateEmbeddingStore:
+    """Build the store for the configured backend (AGENT_EMBEDDING_STORE)"""
+    backend = None
+    try:
+        if EMBEDDING_STORE_BACKEND == 'mongo' and get_db is not None:
+            backend = MongoEmbeddingBackend(get_db, model_name)
+        elif EMBEDDING_STORE_BACKEND == 'npy':
+            backend = NpyEmbeddingBackend(EMBEDDING_STORE_PATH, dimension, model_name)
+    except Exception as e:
+        logger.error(f"Failed to initialize {EMBEDDING_STORE_BACKEND} embedding store, using memory only: {e}")
+        backend = None
+    logger.info(f"Candidate embedding store backend: {type(backend).__name__ if backend else 'memory'}")
+    return CandidateEmbeddingStore(backend)
@@ -0,0 +1,293 @@
+"""
+Sentence Encoder Backends
+PyTorch SentenceTransformer or an int8-quantized ONNX export run by onnxruntime
+
+The agent runs on CPU-only instances where encoding dominates cost. With
+AGENT_ENCODER_BACKEND=onnx (or auto, when onnxruntime is installed) the model
+is exported once to ONNX and, with AGENT_ONNX_QUANTIZE, quantized to int8 with
+dynamic quantization. The export is cached under AGENT_ONNX_CACHE_DIR, so
+later starts load only the tokenizer and the ONNX graph, without torch.
+
+Right after export the ONNX encoder is checked against the fp32 PyTorch model
+on PARITY_TEXTS. The lowest cosine similarity is stored next to the export,
+and an export below AGENT_ONNX_MIN_COSINE is never used. Any failure (missing
+packages, export error, parity failure) falls back to the PyTorch path.
+
+Both backends expose the SentenceTransformer surface the engine relies on:
+encode(texts, batch_size=..., convert_to_numpy=..., show_progress_bar=...)
+and get_sentence_embedding_dimension().
+"""
+import os
+import json
+import time
+import shutil
+import inspect
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+ENCODER_BACKEND = os.getenv("AGENT_ENCODER_BACKEND", "auto").lower()  # torch | onnx | auto
+ONNX_CACHE_DIR = os.getenv(
+    "AGENT_ONNX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "bhiv-agent", "onnx"))
+ONNX_QUANTIZE = os.getenv("AGENT_ONNX_QUANTIZE", "true").lower() == "true"
+ONNX_MIN_COSINE = float(os.getenv("AGENT_ONNX_MIN_COSINE", "0.98"))
+ONNX_THREADS = int(os.getenv("AGENT_ONNX_THREADS", "0"))  # 0 = onnxruntime default
+ONNX_OPSET = 14
+
+CONFIG_FILE = "encoder_config.json"
+MODEL_FILE = "model.onnx"
+
+# Representative inputs for the parity check (job text, skills, locations)
+PARITY_TEXTS = [
+    "Senior Backend Engineer - Python, FastAPI, MongoDB, AWS. 5+ years building distributed systems.",
+    "python django rest api postgresql docker kubernetes",
+    "Data Analyst with SQL, Power BI and Excel; experience in retail analytics",
+    "Mumbai, Maharashtra",
+    "Remote (India)",
+    "Machine learning engineer: PyTorch, NLP, transformers, model deployment on CPU",
+    "React, TypeScript, Redux, Tailwind CSS frontend developer",
+    "HR generalist - onboarding, payroll, employee relations, compliance",
+    "Bengaluru",
+    "java spring boot microservices kafka",
+    "Entry level customer support executive, fluent English and Hindi, night shifts",
+    "DevOps: Terraform, Jenkins, GitHub Actions, Prometheus, Grafana, Linux administration",
+]
+
+
+def _pool(hidden: np.ndarray, attention_mask: np.ndarray, mode: str) -> np.ndarray:
+    if mode == "cls":
+        return hidden[:, 0]
+    mask = attention_mask[..., None].astype(hidden.dtype)
+    return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def cosine_drift(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity between two embedding matrices"""
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    numerator = (reference * candidate).sum(axis=1)
+    denominator = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    return numerator / np.clip(denominator, 1e-12, None)
+
+
+class OnnxSentenceEncoder:
+    """SentenceTransformer-compatible encoder over an exported ONNX transformer"""
+
+    def __init__(self, export_dir: str, threads: int = ONNX_THREADS):
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(export_dir, CONFIG_FILE), encoding="utf-8") as f:
+            self.config: Dict[str, Any] = json.load(f)
+        self.export_dir = export_dir
+        self.backend = "onnx-int8" if self.config.get("quantized") else "onnx"
+        self.tokenizer = Tokenizer.from_file(os.path.join(export_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"], pad_token=self.config["pad_token"])
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            os.path.join(export_dir, MODEL_FILE), options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self.config["dimension"])
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.asarray([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.asarray([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.asarray([e.type_ids for e in encodings], dtype=np.int64)
+        hidden = self.session.run(None, feeds)[0]
+        return _pool(hidden, attention_mask, self.config["pooling"])
+
+    def encode(self, sentences: Union[str, Sequence[str]], batch_size: int = 32, convert_to_numpy: bool = True,
+               show_progress_bar: bool = False, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """Encode like SentenceTransformer.encode (numpy output; extra kwargs are ignored)"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        # Length-sorted batches keep padding (and wasted FLOPs) down, as SentenceTransformer does
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        vectors = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(texts), max(1, batch_size)):
+            rows = order[start:start + batch_size]
+            vectors[rows] = self._encode_batch([texts[i] for i in rows])
+        if self.config.get("normalize") or normalize_embeddings:
+            vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors[0] if single else vectors
+
+
+def onnx_export_dir(model_name: str, quantize: bool = ONNX_QUANTIZE, cache_dir: str = ONNX_CACHE_DIR) -> str:
+    safe_name = model_name.replace("/", "__")
+    return os.path.join(cache_dir, safe_name, "int8" if quantize else "fp32")
+
+
+def _pooling_mode(model) -> str:
+    for module in model:
+        config = getattr(module, "get_config_dict", lambda: {})()
+        if config.get("pooling_mode_cls_token"):
+            return "cls"
+    return "mean"
+
+
+def export_onnx(model, export_dir: str, quantize: bool = ONNX_QUANTIZE, opset: int = ONNX_OPSET,
+                parity: bool = True) -> str:
+    """
+    Export a SentenceTransformer's transformer to ONNX (optionally int8 dynamic-quantized)
+
+    Pooling and normalization are re-implemented in numpy by OnnxSentenceEncoder;
+    the graph only produces token embeddings. Written to a temporary directory
+    and renamed into place so concurrent workers never load a partial export;
+    the parity result is recorded in the staged config before the rename.
+
+    Args:
+        model: Loaded SentenceTransformer (Transformer module first)
+        export_dir: Destination directory
+        quantize: Apply onnxruntime dynamic int8 weight quantization
+        opset: ONNX opset
+        parity: Record min_cosine against `model` (check_parity) in the config
+
+    Returns:
+        export_dir
+    """
+    import torch
+
+    transformer = model[0]
+    hf_model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+
+    class _TokenEmbeddings(torch.nn.Module):
+        def __init__(self, inner, with_token_types: bool):
+            super().__init__()
+            self.inner = inner
+            self.with_token_types = with_token_types
+
+        def forward(self, input_ids, attention_mask, token_type_ids=None):
+            kwargs = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if self.with_token_types:
+                kwargs["token_type_ids"] = token_type_ids
+            return self.inner(**kwargs).last_hidden_state
+
+    sample = tokenizer(["export sample text", "a"], padding=True, return_tensors="pt")
+    names = ["input_ids", "attention_mask"] + (["token_type_ids"] if "token_type_ids" in sample else [])
+    wrapper = _TokenEmbeddings(hf_model, "token_type_ids" in names)
+
+    parent = os.path.dirname(export_dir)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".export-", dir=parent)
+    try:
+        fp32_path = os.path.join(staging, "model.fp32.onnx")
+        export_kwargs = {}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            export_kwargs["dynamo"] = False  # TorchScript exporter; the dynamo one needs onnxscript
+        with torch.no_grad():
+            torch.onnx.export(
+                wrapper, tuple(sample[name] for name in names), fp32_path,
+                input_names=names, output_names=["token_embeddings"],
+                dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in names},
+                              "token_embeddings": {0: "batch", 1: "sequence"}},
+                opset_version=opset, do_constant_folding=True, **export_kwargs)
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(fp32_path, os.path.join(staging, MODEL_FILE), weight_type=QuantType.QInt8)
+            os.remove(fp32_path)
+        else:
+            os.replace(fp32_path, os.path.join(staging, MODEL_FILE))
+        tokenizer.save_pretrained(staging)
+        normalize = any(type(module).__name__ == "Normalize" for module in model)
+        with open(os.path.join(staging, CONFIG_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "dimension": model.get_sentence_embedding_dimension(),
+                "max_seq_length": int(model.max_seq_length or tokenizer.model_max_length),
+                "pooling": _pooling_mode(model),
+                "normalize": normalize,
+                "pad_token": tokenizer.pad_token,
+                "pad_token_id": tokenizer.pad_token_id,
+                "quantized": quantize,
+                "opset": opset,
+                "exported_at": time.time(),
+            }, f, indent=2)
+        if parity:
+            staged = OnnxSentenceEncoder(staging)
+            check_parity(model, staged)
+            with open(os.path.join(staging, CONFIG_FILE), "w", encoding="utf-8") as f:
+                json.dump(staged.config, f, indent=2)
+        if os.path.isdir(export_dir):
+            shutil.rmtree(export_dir)
+        os.rename(staging, export_dir)
+    finally:
+        if os.path.isdir(staging):
+            shutil.rmtree(staging, ignore_errors=True)
+    return export_dir
+
+
+def check_parity(reference, encoder: OnnxSentenceEncoder, texts: Sequence[str] = PARITY_TEXTS) -> float:
+    """Lowest cosine similarity between reference and ONNX embeddings; set as encoder.config["min_cosine"]"""
+    expected = reference.encode(list(texts), convert_to_numpy=True, show_progress_bar=False)
+    actual = encoder.encode(list(texts))
+    min_cosine = float(cosine_drift(expected, actual).min())
+    encoder.config["min_cosine"] = min_cosine
+    return min_cosine
+
+
+def load_torch_encoder(model_name: str):
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name)
+    model.backend = "torch"
+    return model
+
+
+def load_sentence_encoder(model_name: str, backend: Optional[str] = None, export_dir: Optional[str] = None):
+    """
+    Load the configured encoder backend, falling back to PyTorch
+
+    Args:
+        model_name: SentenceTransformer model id
+        backend: "torch", "onnx" or "auto" (defaults to AGENT_ENCODER_BACKEND)
+        export_dir: ONNX export location (defaults to the per-model cache dir)
+
+    Returns:
+        An object with encode() and get_sentence_embedding_dimension(); its
+        `backend` attribute names the path in use
+    """
+    backend = (backend or ENCODER_BACKEND).lower()
+    if backend == "torch":
+        return load_torch_encoder(model_name)
+    if not ONNXRUNTIME_AVAILABLE:
+        if backend == "onnx":
+            logger.warning("AGENT_ENCODER_BACKEND=onnx but onnxruntime is not installed; using PyTorch")
+        return load_torch_encoder(model_name)
+
+    export_dir = export_dir or onnx_export_dir(model_name)
+    reference = None
+    try:
+        if not os.path.exists(os.path.join(export_dir, CONFIG_FILE)):
+            started = time.perf_counter()
+            reference = load_torch_encoder(model_name)
+            export_onnx(reference, export_dir)
+            logger.info(f"Exported {model_name} to ONNX in {time.perf_counter() - started:.1f}s: {export_dir}")
+        encoder = OnnxSentenceEncoder(export_dir)
+        min_cosine = encoder.config.get("min_cosine")
+        if min_cosine is None or min_cosine < ONNX_MIN_COSINE:
+            raise ValueError(f"ONNX parity {min_cosine} below AGENT_ONNX_MIN_COSINE={ONNX_MIN_COSINE}")
+        logger.info(f"Using {encoder.backend} sentence encoder (min cosine vs fp32: {min_cosine:.4f})")
+        return encoder
+    except Exception as e:
+        logger.warning(f"ONNX encoder unavailable, using PyTorch: {e}")
+        return reference if reference is not None else load_torch_encoder(model_name)
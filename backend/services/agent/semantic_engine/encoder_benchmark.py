@@ -0,0 +1,103 @@
+"""
+Sentence Encoder CPU Benchmark
+Throughput and parity of the PyTorch, ONNX fp32 and ONNX int8 encoder backends
+
+Usage (from services/agent):
+    python -m semantic_engine.encoder_benchmark --texts 512 --batch-sizes 1 8 32 64 --threads 4
+
+Exports go to a temporary directory unless --export-dir is given, so the
+benchmark never touches the agent's AGENT_ONNX_CACHE_DIR.
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+from typing import Dict, List
+
+from .encoder_backends import (
+    PARITY_TEXTS,
+    OnnxSentenceEncoder,
+    cosine_drift,
+    export_onnx,
+    load_torch_encoder,
+)
+
+SKILLS = ["python", "java", "react", "sql", "aws", "docker", "kubernetes", "fastapi", "mongodb", "excel",
+          "power bi", "machine learning", "nlp", "terraform", "linux", "payroll", "recruitment", "sales"]
+ROLES = ["backend engineer", "data analyst", "frontend developer", "hr generalist", "devops engineer",
+         "ml engineer", "support executive", "product manager"]
+
+
+def sample_texts(count: int, seed: int = 7) -> List[str]:
+    """Synthetic job/candidate texts with a realistic length spread"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        skills = ", ".join(rng.sample(SKILLS, rng.randint(2, 10)))
+        texts.append(f"{rng.choice(ROLES)} with {rng.randint(0, 12)} years experience: {skills}")
+    return texts
+
+
+def throughput(model, texts: List[str], batch_size: int, repeats: int) -> float:
+    model.encode(texts[:batch_size], batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+    return len(texts) * repeats / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0, help="torch/onnxruntime intra-op threads (0 = default)")
+    parser.add_argument("--export-dir", default=None)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    import torch
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+
+    texts = sample_texts(args.texts)
+    reference = load_torch_encoder(args.model)
+    root = args.export_dir or tempfile.mkdtemp(prefix="encoder-bench-")
+    backends = {"torch": reference}
+    for name, quantize in (("onnx-fp32", False), ("onnx-int8", True)):
+        export_dir = export_onnx(reference, os.path.join(root, name), quantize=quantize, parity=False)
+        started = time.perf_counter()
+        backends[name] = OnnxSentenceEncoder(export_dir, threads=args.threads)
+        backends[name].load_seconds = time.perf_counter() - started
+
+    expected = reference.encode(PARITY_TEXTS + texts[:64], convert_to_numpy=True, show_progress_bar=False)
+    results: Dict[str, Dict] = {}
+    for name, model in backends.items():
+        cosines = cosine_drift(expected, model.encode(PARITY_TEXTS + texts[:64], convert_to_numpy=True))
+        results[name] = {
+            "min_cosine": round(float(cosines.min()), 5),
+            "mean_cosine": round(float(cosines.mean()), 5),
+            "texts_per_second": {bs: round(throughput(model, texts, bs, args.repeats), 1)
+                                 for bs in args.batch_sizes},
+        }
+        if hasattr(model, "load_seconds"):
+            results[name]["load_seconds"] = round(model.load_seconds, 3)
+            size = os.path.getsize(os.path.join(model.export_dir, "model.onnx"))
+            results[name]["model_mb"] = round(size / 1e6, 1)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.model}: {len(texts)} texts x {args.repeats}, threads={args.threads or 'default'}")
+    header = "".join(f"{f'bs={bs}':>10}" for bs in args.batch_sizes)
+    print(f"{'backend':<11}{'min cos':>9}{header}")
+    for name, result in results.items():
+        row = "".join(f"{result['texts_per_second'][bs]:>10}" for bs in args.batch_sizes)
+        print(f"{name:<11}{result['min_cosine']:>9}{row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Micro-batching Encoder
+Coalesces small concurrent encode requests into one batched model.encode call.
+
+Callers (inference worker threads) block on encode(); a dispatcher thread takes
+the first pending request, keeps collecting for up to max_wait_ms or until
+max_batch_size texts are queued, runs a single forward pass and fans the rows
+back out. Requests that already fill a batch skip the queue.
+"""
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+MICROBATCH_ENABLED = os.getenv("AGENT_ENCODE_MICROBATCH", "true").lower() == "true"
+MICROBATCH_MAX_SIZE = int(os.getenv("AGENT_ENCODE_MICROBATCH_SIZE", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("AGENT_ENCODE_MICROBATCH_WAIT_MS", "5"))
+
+if PROMETHEUS_AVAILABLE:
+    ENCODE_BATCH_SIZE = Histogram(
+        'agent_encode_batch_size', 'Texts per model.encode call', ['path'],
+        buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+    )
+    ENCODE_BATCH_REQUESTS = Histogram(
+        'agent_encode_batch_requests', 'Caller requests merged into one model.encode call',
+        buckets=(1, 2, 3, 4, 6, 8, 12, 16, 32)
+    )
+
+
+class MicroBatchEncoder:
+    """Thread-safe front for a SentenceTransformer-like model"""
+
+    def __init__(self, model, max_batch_size: int = MICROBATCH_MAX_SIZE,
+                 max_wait_ms: float = MICROBATCH_MAX_WAIT_MS):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = threading.Thread(target=self._dispatch_loop, name="encode-microbatch", daemon=True)
+        self._thread.start()
+        self.batches = 0
+        self.requests = 0
+
+    def _model_encode(self, texts: List[str], path: str) -> np.ndarray:
+        if PROMETHEUS_AVAILABLE:
+            ENCODE_BATCH_SIZE.labels(path=path).observe(len(texts))
+        return self.model.encode(
+            texts,
+            batch_size=self.max_batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts, sharing a forward pass with concurrent callers when possible"""
+        self.requests += 1
+        if len(texts) >= self.max_batch_size:
+            return self._model_encode(texts, 'direct')
+        future: Future = Future()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def _collect(self) -> list:
+        pending = [self._queue.get()]
+        size = len(pending[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    def _dispatch_loop(self):
+        while True:
+            pending = self._collect()
+            texts = [text for item_texts, _ in pending for text in item_texts]
+            try:
+                vectors = self._model_encode(texts, 'batched')
+            except Exception as e:
+                logger.error(f"Batched encode failed: {e}")
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            if PROMETHEUS_AVAILABLE:
+                ENCODE_BATCH_REQUESTS.observe(len(pending))
+            offset = 0
+            for item_texts, future in pending:
+                future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
@@ -6,18 +6,35 @@ Migrated from PostgreSQL/SQLAlchemy to MongoDB
 import os
 import asyncio
 import logging
+import threading
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 # MongoDB imports (migrated from SQLAlchemy)
 from pymongo import MongoClient
 
+from .embedding_store import (
+    create_embedding_store,
+    candidate_profile_text,
+    candidate_skills_text,
+    candidate_content_hash,
+    normalize_rows,
+)
+from .ann_index import CandidateANNIndex
+from .micro_batcher import MicroBatchEncoder, MICROBATCH_ENABLED
+from .encoder_backends import load_sentence_encoder
+
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = 'all-MiniLM-L6-v2'
+ENCODE_BATCH_SIZE = int(os.getenv("AGENT_ENCODE_BATCH_SIZE", "64"))
+ANN_REFRESH_SECONDS = float(os.getenv("AGENT_ANN_REFRESH_SECONDS", "30"))
+ANN_FULL_SYNC_SECONDS = float(os.getenv("AGENT_ANN_FULL_SYNC_SECONDS", "900"))
+
 class Phase3SemanticEngine:
     """Production Phase 3 Semantic Engine with advanced AI capabilities (Singleton Pattern)"""
     
@@ -35,9 +52,15 @@ class Phase3SemanticEngine:
             return
             
         self.model = None
+        self.encoder = None
+        self.embedding_store = None
+        self.candidate_index = None
         self.company_preferences = defaultdict(dict)
         self.cache = {}
         self.executor = ThreadPoolExecutor(max_workers=4)
+        self._index_refresh_lock = threading.Lock()
+        self._location_lock = threading.Lock()
+        self._index_refresh_thread = None
         self._initialize()
         Phase3SemanticEngine._initialized = True
     
@@ -59,8 +82,19 @@ class Phase3SemanticEngine:
                 os.environ["HF_TOKEN"] = hf_token
                 logger.info("HF_TOKEN set in environment for v4 compatibility")
             
-            # Load model without deprecated use_auth_token parameter
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            # Load model without deprecated use_auth_token parameter (ONNX int8 or PyTorch, see encoder_backends)
+            self.model = load_sentence_encoder(MODEL_NAME)
+            logger.info(f"Sentence encoder backend: {self.model.backend}")
+            if MICROBATCH_ENABLED:
+                self.encoder = MicroBatchEncoder(self.model)
+            # Key stored vectors by backend too: int8 ONNX and fp32 PyTorch vectors
+            # are not interchangeable, so a backend switch re-embeds candidates
+            self.embedding_store = create_embedding_store(
+                f"{MODEL_NAME}@{self.model.backend}",
+                self.model.get_sentence_embedding_dimension(),
+                get_db=self._get_store_db
+            )
+            self.candidate_index = CandidateANNIndex(self.model.get_sentence_embedding_dimension())
             self._load_company_preferences()
             logger.info("Phase 3 Semantic Engine initialized successfully")
         except Exception as e:
@@ -77,6 +111,180 @@ class Phase3SemanticEngine:
         db_name = os.getenv("MONGODB_DB_NAME", "bhiv_hr")
         return client[db_name]
     
+    def _get_store_db(self):
+        """Database for the embedding store (shared agent client when available)"""
+        try:
+            from database import get_mongo_db
+            return get_mongo_db()
+        except ImportError:
+            if not hasattr(self, '_store_db'):
+                self._store_db = self._get_db_connection()
+            return self._store_db
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in one batch and return L2-normalised float32 vectors"""
+        if not texts:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        if self.encoder is not None:
+            # Concurrent requests share forward passes through the micro-batcher
+            vectors = self.encoder.encode(texts)
+        else:
+            vectors = self.model.encode(
+                texts,
+                batch_size=ENCODE_BATCH_SIZE,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        return normalize_rows(vectors)
+    
+    def get_candidate_embeddings(self, candidates: list) -> tuple:
+        """Return (profile, skills) matrices aligned with candidates.
+        
+        Vectors come from the embedding store when the candidate's content hash
+        is unchanged; only misses are encoded (in one batch) and written back.
+        """
+        dimension = self.model.get_sentence_embedding_dimension()
+        profiles = np.zeros((len(candidates), dimension), dtype=np.float32)
+        skills = np.zeros((len(candidates), dimension), dtype=np.float32)
+        
+        cached = self.embedding_store.lookup(candidates) if self.embedding_store else {}
+        missing = []
+        for i, candidate in enumerate(candidates):
+            entry = cached.get(str(candidate.get('id') or ''))
+            if entry is not None:
+                profiles[i] = entry['profile']
+                skills[i] = entry['skills']
+            else:
+                missing.append(i)
+        
+        if missing:
+            missing_candidates = [candidates[i] for i in missing]
+            profile_vectors = self.encode([candidate_profile_text(c) for c in missing_candidates])
+            skill_rows = [j for j, c in enumerate(missing_candidates) if candidate_skills_text(c)]
+            skill_vectors = self.encode([candidate_skills_text(missing_candidates[j]) for j in skill_rows])
+            
+            missing_skills = np.zeros((len(missing), dimension), dtype=np.float32)
+            if skill_rows:
+                missing_skills[skill_rows] = skill_vectors
+            profiles[missing] = profile_vectors
+            skills[missing] = missing_skills
+            
+            new_entries = {}
+            for j, candidate in enumerate(missing_candidates):
+                candidate_id = str(candidate.get('id') or '')
+                if candidate_id:
+                    new_entries[candidate_id] = {
+                        'content_hash': candidate_content_hash(candidate),
+                        'profile': profile_vectors[j],
+                        'skills': missing_skills[j],
+                    }
+            if self.embedding_store:
+                self.embedding_store.store(new_entries)
+        
+        return profiles, skills
+    
+    def index_candidates(self, candidates: list) -> dict:
+        """Warm the embedding store (and ANN index) for freshly written candidates"""
+        before = self.embedding_store.misses if self.embedding_store else 0
+        profiles, _ = self.get_candidate_embeddings(candidates)
+        if self.candidate_index is not None:
+            ids = [str(c.get('id')) for c in candidates]
+            self.candidate_index.upsert(ids, profiles)
+        encoded = (self.embedding_store.misses - before) if self.embedding_store else len(candidates)
+        return {'candidates': len(candidates), 'encoded': encoded, 'reused': len(candidates) - encoded}
+    
+    def refresh_candidate_index(self, db, full: bool = False, chunk_size: int = 1000) -> dict:
+        """Bring the ANN index up to date with the candidates collection.
+        
+        Incremental refreshes pick up candidates created/updated since the last
+        sync; a periodic full sync also drops deleted candidates.
+        """
+        with self._index_refresh_lock:
+            return self._refresh_candidate_index(db, full, chunk_size)
+    
+    def _refresh_candidate_index(self, db, full: bool, chunk_size: int) -> dict:
+        index = self.candidate_index
+        now = datetime.utcnow()
+        if index.last_full_sync_at is None or (now - index.last_full_sync_at).total_seconds() >= ANN_FULL_SYNC_SECONDS:
+            full = True
+        
+        query = {}
+        if not full and index.last_synced_at is not None:
+            # Small overlap so writes racing the previous sync are not missed
+            since = index.last_synced_at - timedelta(seconds=5)
+            query = {'$or': [{'created_at': {'$gte': since}}, {'updated_at': {'$gte': since}}]}
+        projection = {'technical_skills': 1, 'seniority_level': 1, 'education_level': 1}
+        
+        seen = set()
+        synced = 0
+        batch = []
+        for cand in db.candidates.find(query, projection):
+            candidate_id = str(cand.get('_id'))
+            seen.add(candidate_id)
+            batch.append({
+                'id': candidate_id,
+                'technical_skills': cand.get('technical_skills', ''),
+                'seniority_level': cand.get('seniority_level', ''),
+                'education_level': cand.get('education_level', '')
+            })
+            if len(batch) >= chunk_size:
+                self.index_candidates(batch)
+                synced += len(batch)
+                batch = []
+        if batch:
+            self.index_candidates(batch)
+            synced += len(batch)
+        
+        removed = 0
+        if full:
+            stale = [candidate_id for candidate_id in index.ids() if candidate_id not in seen]
+            index.remove(stale)
+            removed = len(stale)
+            index.last_full_sync_at = now
+        index.last_synced_at = now
+        if synced or removed:
+            logger.info(f"Candidate ANN index refreshed ({'full' if full else 'incremental'}): "
+                        f"{synced} upserted, {removed} removed, size {len(index)}")
+        return {'full': full, 'upserted': synced, 'removed': removed, 'size': len(index)}
+    
+    def _schedule_index_refresh(self, db):
+        """Refresh the ANN index on a background thread; requests keep using the current index"""
+        if self._index_refresh_lock.locked() or (self._index_refresh_thread and self._index_refresh_thread.is_alive()):
+            return
+        
+        def _run():
+            if not self._index_refresh_lock.acquire(blocking=False):
+                return
+            try:
+                self._refresh_candidate_index(db, False, 1000)
+            except Exception as e:
+                logger.warning(f"Candidate ANN index refresh failed: {e}")
+            finally:
+                self._index_refresh_lock.release()
+        
+        self._index_refresh_thread = threading.Thread(target=_run, name="ann-index-refresh", daemon=True)
+        self._index_refresh_thread.start()
+    
+    def shortlist_candidate_ids(self, db, job_data: dict, k: int) -> Optional[List[str]]:
+        """Top-k semantic candidate ids for a job from the ANN index.
+        
+        Returns None when the pool is small enough to score exhaustively, or
+        while the index has not finished its first sync. A stale index is
+        refreshed in the background and served as is meanwhile.
+        """
+        if self.candidate_index is None:
+            return None
+        last = self.candidate_index.last_synced_at
+        if last is None or (datetime.utcnow() - last).total_seconds() >= ANN_REFRESH_SECONDS:
+            self._schedule_index_refresh(db)
+        if last is None:
+            # Still building (startup full sync): score the full pool meanwhile
+            return None
+        if len(self.candidate_index) <= k:
+            return None
+        job_vector = self.encode([self._job_text(job_data)])[0]
+        return self.candidate_index.search(job_vector, k)
+    
     def _load_company_preferences(self):
         """Load company scoring preferences from feedback data"""
         try:
@@ -167,9 +375,7 @@ class Phase3SemanticEngine:
         """Calculate adaptive score with company-specific weights"""
         try:
             # Get company-specific weights
-            weights = {'semantic': 0.40, 'experience': 0.30, 'skills': 0.20, 'location': 0.10}
-            if client_id and client_id in self.company_preferences:
-                weights.update(self.company_preferences[client_id].get('scoring_weights', {}))
+            weights = self._scoring_weights(client_id)
             
             # Calculate individual scores
             semantic_score = self._calculate_semantic_similarity(job_data, candidate_data)
@@ -217,30 +423,32 @@ class Phase3SemanticEngine:
     
     def _calculate_semantic_similarity(self, job_data: dict, candidate_data: dict) -> float:
         """Calculate semantic similarity using sentence transformers"""
-        job_text = f"{job_data.get('title', '')} {job_data.get('description', '')} {job_data.get('requirements', '')}"
-        candidate_text = f"{candidate_data.get('technical_skills', '')} {candidate_data.get('seniority_level', '')} {candidate_data.get('education_level', '')}"
-        
-        job_embedding = self.model.encode([job_text])
-        candidate_embedding = self.model.encode([candidate_text])
+        job_embedding = self.encode([self._job_text(job_data)])
+        candidate_embedding, _ = self.get_candidate_embeddings([candidate_data])
         
         similarity = cosine_similarity(job_embedding, candidate_embedding)[0][0]
         return float(similarity)
     
-    def _calculate_experience_score(self, job_level: str, candidate_years: int, candidate_level: str) -> float:
-        """Calculate experience matching score"""
+    @staticmethod
+    def _job_text(job_data: dict) -> str:
+        return f"{job_data.get('title', '')} {job_data.get('description', '')} {job_data.get('requirements', '')}"
+    
+    @staticmethod
+    def _required_experience_range(job_level: str) -> Optional[tuple]:
         level_mapping = {
             'entry': (0, 2), 'junior': (1, 3), 'mid': (2, 5),
             'senior': (4, 8), 'lead': (6, 15), 'principal': (8, 20)
         }
         
         job_level_lower = job_level.lower()
-        required_range = None
-        
         for level, years_range in level_mapping.items():
             if level in job_level_lower:
-                required_range = years_range
-                break
-        
+                return years_range
+        return None
+    
+    def _calculate_experience_score(self, job_level: str, candidate_years: int, candidate_level: str) -> float:
+        """Calculate experience matching score"""
+        required_range = self._required_experience_range(job_level)
         if not required_range:
             return 0.5
         
@@ -348,15 +556,181 @@ class Phase3SemanticEngine:
             logger.error(f"Error calculating cultural fit: {e}")
             return 0.5
     
+    def _scoring_weights(self, client_id: Optional[str]) -> dict:
+        weights = {'semantic': 0.40, 'experience': 0.30, 'skills': 0.20, 'location': 0.10}
+        if client_id and client_id in self.company_preferences:
+            weights.update(self.company_preferences[client_id].get('scoring_weights', {}))
+        return weights
+    
+    def _location_vectors(self, locations: List[str]) -> Dict[str, np.ndarray]:
+        """Embeddings for lowercased location strings (low cardinality, cached in-process)"""
+        # Shared by inference worker threads: read and fill under the lock, encode outside it
+        with self._location_lock:
+            cache = self.cache.setdefault('location_vectors', {})
+            vectors = {loc: cache[loc] for loc in dict.fromkeys(locations) if loc in cache}
+        missing = [loc for loc in dict.fromkeys(locations) if loc not in vectors]
+        if missing:
+            encoded = dict(zip(missing, self.encode(missing)))
+            vectors.update(encoded)
+            with self._location_lock:
+                if len(cache) + len(encoded) > 10000:
+                    cache.clear()
+                cache.update(encoded)
+        return {loc: vectors[loc] for loc in locations}
+    
+    def _batch_location_scores(self, job_location: str, candidates: list) -> np.ndarray:
+        """Vectorized _calculate_location_score over a candidate pool"""
+        scores = np.full(len(candidates), 0.5, dtype=np.float32)
+        if not job_location:
+            return scores
+        job_loc_lower = job_location.lower()
+        candidate_locs = [(c.get('location') or '').lower() for c in candidates]
+        present = [i for i, loc in enumerate(candidate_locs) if loc]
+        if not present:
+            return scores
+        if 'remote' in job_loc_lower:
+            scores[present] = 1.0
+            return scores
+        
+        to_encode = [i for i in present if candidate_locs[i] != job_loc_lower]
+        scores[present] = 1.0
+        if to_encode:
+            vectors = self._location_vectors([job_loc_lower] + [candidate_locs[i] for i in to_encode])
+            job_vector = vectors[job_loc_lower]
+            matrix = np.stack([vectors[candidate_locs[i]] for i in to_encode])
+            scores[to_encode] = matrix @ job_vector
+        return scores
+    
+    @staticmethod
+    def _batch_experience_scores(job_level: str, candidates: list) -> np.ndarray:
+        """Vectorized _calculate_experience_score over a candidate pool"""
+        required_range = Phase3SemanticEngine._required_experience_range(job_level)
+        if not required_range:
+            return np.full(len(candidates), 0.5, dtype=np.float32)
+        
+        years = np.zeros(len(candidates), dtype=np.float32)
+        for i, candidate in enumerate(candidates):
+            try:
+                years[i] = float(candidate.get('experience_years') or 0)
+            except (TypeError, ValueError):
+                years[i] = 0.0
+        
+        min_years, max_years = required_range
+        below = np.maximum(0.3, 1.0 - (min_years - years) * 0.2)
+        above = np.maximum(0.7, 1.0 - (years - max_years) * 0.1)
+        return np.where(years < min_years, below, np.where(years > max_years, above, 1.0)).astype(np.float32)
+    
+    def _batch_cultural_fit(self, candidates: list, client_id: Optional[str]) -> np.ndarray:
+        """Vectorized _calculate_cultural_fit: one aggregation for the whole pool"""
+        scores = np.full(len(candidates), 0.5, dtype=np.float32)
+        if not client_id or not candidates:
+            return scores
+        
+        try:
+            db = self._get_store_db()
+            candidate_ids = [c.get('id') for c in candidates]
+            pipeline = [
+                {'$match': {'candidate_id': {'$in': candidate_ids}}},
+                {
+                    '$lookup': {
+                        'from': 'jobs',
+                        'localField': 'job_id',
+                        'foreignField': '_id',
+                        'as': 'job'
+                    }
+                },
+                {'$unwind': '$job'},
+                {'$match': {'job.client_id': client_id}},
+                {
+                    '$group': {
+                        '_id': '$candidate_id',
+                        'avg_score': {
+                            '$avg': {
+                                '$divide': [
+                                    {
+                                        '$add': [
+                                            {'$ifNull': ['$integrity', 0]},
+                                            {'$ifNull': ['$honesty', 0]},
+                                            {'$ifNull': ['$discipline', 0]},
+                                            {'$ifNull': ['$hard_work', 0]},
+                                            {'$ifNull': ['$gratitude', 0]}
+                                        ]
+                                    },
+                                    5.0
+                                ]
+                            }
+                        }
+                    }
+                }
+            ]
+            fit_by_candidate = {
+                row['_id']: float(row['avg_score']) / 5.0
+                for row in db.feedback.aggregate(pipeline)
+                if row.get('avg_score')
+            }
+            for i, candidate_id in enumerate(candidate_ids):
+                if candidate_id in fit_by_candidate:
+                    scores[i] = fit_by_candidate[candidate_id]
+        except Exception as e:
+            logger.error(f"Error calculating batch cultural fit: {e}")
+        return scores
+    
+    def score_batch(self, job_data: dict, candidates: list,
+                    client_id: Optional[str] = None) -> List[dict]:
+        """Score a whole candidate pool at once.
+        
+        Equivalent to calling calculate_adaptive_score per candidate, but the job
+        text is encoded once, candidate vectors come from the embedding store
+        (misses encoded in one batch) and every component is a NumPy array.
+        """
+        if not candidates:
+            return []
+        weights = self._scoring_weights(client_id)
+        
+        job_requirements = job_data.get('requirements', '') or ''
+        job_vector = self.encode([self._job_text(job_data)])[0]
+        profiles, skills = self.get_candidate_embeddings(candidates)
+        
+        semantic = profiles @ job_vector
+        if job_requirements:
+            skills_match = skills @ self.encode([job_requirements.lower()])[0]
+        else:
+            skills_match = np.zeros(len(candidates), dtype=np.float32)
+        experience = self._batch_experience_scores(job_data.get('experience_level', '') or '', candidates)
+        location = self._batch_location_scores(job_data.get('location', '') or '', candidates)
+        cultural_fit = self._batch_cultural_fit(candidates, client_id)
+        
+        totals = (
+            semantic * weights['semantic'] +
+            experience * weights['experience'] +
+            skills_match * weights['skills'] +
+            location * weights['location'] +
+            cultural_fit * 0.1
+        )
+        
+        return [
+            {
+                'total_score': float(totals[i]),
+                'breakdown': {
+                    'semantic_similarity': float(semantic[i]),
+                    'experience_match': float(experience[i]),
+                    'skills_match': float(skills_match[i]),
+                    'location_match': float(location[i]),
+                    'cultural_fit': float(cultural_fit[i])
+                },
+                'weights_used': weights,
+                'algorithm_version': '3.0.0-phase3-production'
+            }
+            for i in range(len(candidates))
+        ]
+    
     def match_candidates(self, job_data: dict, candidates: list) -> list:
         """Match candidates to job with Phase 3 features"""
         try:
             client_id = job_data.get('client_id')
             scored_candidates = []
             
-            for candidate in candidates:
-                score_data = self.calculate_adaptive_score(job_data, candidate, client_id)
-                
+            for candidate, score_data in zip(candidates, self.score_batch(job_data, candidates, client_id)):
                 scored_candidates.append({
                     'candidate_id': candidate.get('id'),
                     'total_score': score_data['total_score'],
@@ -381,19 +755,24 @@ class Phase3SemanticEngine:
         
         try:
             results = {}
-            chunk_size = 50
+            loop = asyncio.get_event_loop()
             
             for job in jobs:
                 job_id = job.get('id')
                 client_id = job.get('client_id')
-                job_results = []
-                
-                # Process candidates in chunks
-                for i in range(0, len(candidates), chunk_size):
-                    chunk = candidates[i:i + chunk_size]
-                    chunk_results = await self._process_chunk_async(job, chunk, client_id)
-                    job_results.extend(chunk_results)
                 
+                # Whole pool scored in one vectorized pass, off the event loop
+                scores = await loop.run_in_executor(
+                    self.executor, self.score_batch, job, candidates, client_id
+                )
+                job_results = [
+                    {
+                        'candidate_id': candidate.get('id'),
+                        'total_score': score_data['total_score'],
+                        'score_breakdown': score_data['breakdown']
+                    }
+                    for candidate, score_data in zip(candidates, scores)
+                ]
                 job_results.sort(key=lambda x: x['total_score'], reverse=True)
                 
                 results[job_id] = {
@@ -413,35 +792,6 @@ class Phase3SemanticEngine:
             logger.error(f"Error in enhanced batch processing: {e}")
             raise
     
-    async def _process_chunk_async(self, job: dict, candidates_chunk: list, client_id: Optional[str]) -> list:
-        """Process candidate chunk asynchronously"""
-        loop = asyncio.get_event_loop()
-        
-        tasks = []
-        for candidate in candidates_chunk:
-            task = loop.run_in_executor(
-                None, 
-                self.calculate_adaptive_score, 
-                job, 
-                candidate,
-                client_id
-            )
-            tasks.append((candidate.get('id'), task))
-        
-        results = []
-        for candidate_id, task in tasks:
-            try:
-                score_data = await task
-                results.append({
-                    'candidate_id': candidate_id,
-                    'total_score': score_data['total_score'],
-                    'score_breakdown': score_data['breakdown']
-                })
-            except Exception as e:
-                logger.error(f"Error processing candidate {candidate_id}: {e}")
-        
-        return results
-    
     def get_company_preferences(self, client_id: str) -> dict:
         """Get scoring preferences for a specific company"""
         return self.company_preferences.get(client_id, {})
@@ -0,0 +1,172 @@
+"""
+Bulk Candidate Ingestion for Gateway Service
+Set-based write path behind /v1/candidates/bulk
+
+A batch costs a fixed number of round trips instead of four per row: one $in
+query (per BULK_INGEST_PREFETCH_CHUNK emails) finds candidates that already
+exist, one unordered insert_many writes the new ones, and one unordered
+bulk_write upserts the job_applications links. Concurrent uploads of the same
+email or link are resolved by the unique indexes on candidates.email and
+job_applications(job_id, candidate_id): a duplicate-key error on a row means
+another writer got there first, so that row is reported as existing and still
+linked to the job.
+"""
+import os
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+BULK_INGEST_PREFETCH_CHUNK = int(os.getenv("BULK_INGEST_PREFETCH_CHUNK", "1000"))
+
+DUPLICATE_KEY = 11000
+
+
+def candidate_document(row: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Map an uploaded row (portal/extractor field names) onto a candidates document"""
+    experience = row.get("experience_years", 0)
+    return {
+        "name": row.get("name", "Unknown"),
+        "email": row.get("email", ""),
+        "phone": row.get("phone", ""),
+        "location": row.get("location", ""),
+        "experience_years": max(0, int(experience) if str(experience).isdigit() else 0),
+        "technical_skills": row.get("technical_skills", ""),
+        "seniority_level": row.get("designation", row.get("seniority_level", "")),
+        "education_level": row.get("education_level", ""),
+        "resume_path": row.get("cv_url", row.get("resume_path", "")),
+        "status": row.get("status", "applied"),
+        "created_at": now,
+    }
+
+
+@dataclass
+class BulkIngestResult:
+    """Outcome of one bulk upload; rows holds one entry per uploaded row, in order"""
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    inserted: List[Dict[str, Any]] = field(default_factory=list)
+    applications_linked: int = 0
+
+    @property
+    def inserted_ids(self) -> List[str]:
+        return [str(doc["_id"]) for doc in self.inserted]
+
+    @property
+    def errors(self) -> List[str]:
+        """Legacy "Candidate N: ..." messages for rows that were not inserted"""
+        return [f"Candidate {r['row']}: {r['error']}" for r in self.rows if r.get("error")]
+
+
+async def _existing_ids(db, emails: List[str]) -> Dict[str, str]:
+    found: Dict[str, str] = {}
+    for start in range(0, len(emails), BULK_INGEST_PREFETCH_CHUNK):
+        chunk = emails[start:start + BULK_INGEST_PREFETCH_CHUNK]
+        cursor = db.candidates.find({"email": {"$in": chunk}}, {"_id": 1, "email": 1})
+        async for doc in cursor:
+            found[doc["email"]] = str(doc["_id"])
+    return found
+
+
+async def ingest_candidates(db, rows: List[Dict[str, Any]], job_id: Optional[str] = None,
+                            now: Optional[datetime] = None) -> BulkIngestResult:
+    """
+    Insert new candidates and link every known candidate to job_id
+
+    Args:
+        db: Motor database
+        rows: Uploaded candidate rows
+        job_id: Job to link candidates to (already validated by the caller)
+        now: Timestamp for created_at / applied_date
+
+    Returns:
+        BulkIngestResult; row status is "inserted", "exists", "duplicate" (same
+        email earlier in the batch) or "invalid"
+    """
+    now = now or datetime.now(timezone.utc)
+    result = BulkIngestResult()
+    first_row: Dict[str, int] = {}
+    for i, row in enumerate(rows):
+        raw_email = row.get("email") if isinstance(row, dict) else None
+        email = raw_email.strip() if isinstance(raw_email, str) else ""
+        entry: Dict[str, Any] = {"row": i + 1, "email": email, "candidate_id": None}
+        if raw_email is not None and not isinstance(raw_email, str):
+            entry.update(status="invalid", error="Email must be a string")
+        elif not email:
+            entry.update(status="invalid", error="Email is required")
+        elif email in first_row:
+            entry.update(status="duplicate", error=f"Email {email} duplicated in batch (row {first_row[email] + 1})")
+        else:
+            first_row[email] = i
+        result.rows.append(entry)
+
+    existing = await _existing_ids(db, list(first_row)) if first_row else {}
+    pending: List[int] = []
+    documents: List[Dict[str, Any]] = []
+    for email, i in first_row.items():
+        if email in existing:
+            result.rows[i].update(status="exists", candidate_id=existing[email],
+                                  error=f"Email {email} already exists")
+        else:
+            document = candidate_document(rows[i], now)
+            document["email"] = email
+            pending.append(i)
+            documents.append(document)
+
+    if documents:
+        failed: Dict[int, Dict[str, Any]] = {}
+        try:
+            await db.candidates.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: err for err in e.details.get("writeErrors", [])}
+        raced: List[str] = []
+        for position, (i, document) in enumerate(zip(pending, documents)):
+            email = result.rows[i]["email"]
+            err = failed.get(position)
+            if err is None:
+                result.rows[i].update(status="inserted", candidate_id=str(document["_id"]))
+                result.inserted.append(document)
+            elif err.get("code") == DUPLICATE_KEY:
+                raced.append(email)
+                result.rows[i].update(status="exists", error=f"Email {email} already exists")
+            else:
+                result.rows[i].update(status="invalid", error=str(err.get("errmsg", "insert failed"))[:100])
+        if raced:
+            raced_ids = await _existing_ids(db, raced)
+            for i in pending:
+                if result.rows[i]["email"] in raced_ids and result.rows[i]["status"] == "exists":
+                    result.rows[i]["candidate_id"] = raced_ids[result.rows[i]["email"]]
+
+    if job_id:
+        result.applications_linked = await _link_applications(db, job_id, result.rows, now)
+    return result
+
+
+async def _link_applications(db, job_id: str, rows: List[Dict[str, Any]], now: datetime) -> int:
+    candidate_ids = list(dict.fromkeys(r["candidate_id"] for r in rows
+                                       if r.get("candidate_id") and r["status"] in ("inserted", "exists")))
+    if not candidate_ids:
+        return 0
+    requests = [
+        UpdateOne(
+            {"job_id": job_id, "candidate_id": candidate_id},
+            {"$setOnInsert": {"job_id": job_id, "candidate_id": candidate_id,
+                              "status": "applied", "applied_date": now}},
+            upsert=True,
+        )
+        for candidate_id in candidate_ids
+    ]
+    try:
+        write = await db.job_applications.bulk_write(requests, ordered=False)
+        return write.upserted_count
+    except BulkWriteError as e:
+        # Duplicate keys mean a concurrent upload linked the same candidate first
+        other = [err for err in e.details.get("writeErrors", []) if err.get("code") != DUPLICATE_KEY]
+        if other:
+            logger.warning(f"Bulk application link failed for {len(other)} candidates on job {job_id}: "
+                           f"{other[0].get('errmsg')}")
+        return e.details.get("nUpserted", 0)
@@ -0,0 +1,161 @@
+"""
+Candidate Search for Gateway Service
+Text-indexed, relevance-ranked free-text search behind /v1/candidates/search
+
+Free text goes through the `candidate_search_text` Mongo text index (name,
+email, technical_skills; see create_mongodb_indexes.py) and results are ordered
+by textScore. Text search matches whole (stemmed) words; when it finds nothing
+(on any page, not only the first), or the index is missing, the legacy case-insensitive substring match is used
+so partial words still hit. Recruiter searches are already scoped to their own
+applicants by _id, so they keep the substring match over that small set.
+
+Unranked results are ordered by _id and return a keyset cursor
+(app/pagination.py) for the next page; passing it back skips the text index so
+the ordering stays the same across pages. Relevance-ranked pages use offsets.
+
+Totals are exact by default (count_documents capped at
+CANDIDATE_SEARCH_COUNT_CAP and run alongside the page query). In "estimate"
+mode the page is fetched with one extra row to detect a next page, and an
+unfiltered search uses estimated_document_count.
+"""
+import os
+import re
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pymongo.errors import OperationFailure
+
+from app.pagination import ASCENDING, fetch_page
+
+try:
+    from prometheus_client import Counter
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_TEXT_INDEX_NAME = "candidate_search_text"
+CANDIDATE_TEXT_INDEX_WEIGHTS = {"name": 10, "email": 5, "technical_skills": 3}
+CANDIDATE_SEARCH_COUNT_MODE = os.getenv("CANDIDATE_SEARCH_COUNT_MODE", "exact").lower()
+CANDIDATE_SEARCH_COUNT_CAP = int(os.getenv("CANDIDATE_SEARCH_COUNT_CAP", "10000"))
+CANDIDATE_SEARCH_REGEX_FALLBACK = os.getenv("CANDIDATE_SEARCH_REGEX_FALLBACK", "true").lower() == "true"
+TEXT_INDEX_RECHECK_SECONDS = 600
+
+if PROMETHEUS_AVAILABLE:
+    candidate_search_requests = Counter(
+        'gateway_candidate_search_total', 'Candidate searches by strategy', ['strategy'])
+
+
+def regex_text_clause(q_text: str, fields: Sequence[str]) -> Dict[str, Any]:
+    """Case-insensitive substring match of q_text over `fields`"""
+    pattern = re.escape(q_text)
+    return {"$or": [{field: {"$regex": pattern, "$options": "i"}} for field in fields]}
+
+
+class CandidateSearch:
+    """Runs one candidate search page with ranking and a configurable total"""
+
+    def __init__(self):
+        self._text_index_missing_until = 0.0
+
+    async def search(
+        self,
+        db,
+        filters: Dict[str, Any],
+        q_text: str,
+        regex_fields: Sequence[str],
+        limit: int,
+        offset: int,
+        use_text_index: bool = True,
+        count_mode: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], int, Dict[str, Any]]:
+        """
+        Search candidates
+
+        Args:
+            db: Motor database
+            filters: Structured filters (scope, skills, location, experience, ...)
+            q_text: Free text ("" for none)
+            regex_fields: Fields for the substring fallback
+            limit: Page size
+            offset: Rows to skip
+            use_text_index: Try the text index first (False = substring match only)
+            count_mode: "exact" or "estimate" (default CANDIDATE_SEARCH_COUNT_MODE)
+            cursor: Keyset cursor from a previous unranked page (offset is then ignored)
+
+        Returns:
+            (documents, total, meta) where meta has "strategy", "total_is_estimate"
+            and "next_cursor"
+
+        Raises:
+            InvalidCursor: Bad cursor token
+        """
+        count_mode = (count_mode or CANDIDATE_SEARCH_COUNT_MODE).lower()
+        if q_text and use_text_index and not cursor and time.monotonic() >= self._text_index_missing_until:
+            text_query = {**filters, "$text": {"$search": q_text}}
+            try:
+                docs, total, estimated, _ = await self._page(db, text_query, limit, offset, count_mode, ranked=True)
+                # Pick the strategy the same way on every page: an empty page past
+                # the first only stays "text" if the text query matches at all
+                if docs or not CANDIDATE_SEARCH_REGEX_FALLBACK or (offset and await self._has_text_hits(db, text_query)):
+                    return docs, total, self._meta("text", estimated, None)
+            except OperationFailure as e:
+                if "text index" not in str(e).lower():
+                    raise
+                self._text_index_missing_until = time.monotonic() + TEXT_INDEX_RECHECK_SECONDS
+                logger.warning(f"Candidate text index missing, using substring search: {e}")
+
+        query = dict(filters)
+        strategy = "filter"
+        if q_text:
+            query.update(regex_text_clause(q_text, regex_fields))
+            strategy = "regex"
+        docs, total, estimated, next_cursor = await self._page(
+            db, query, limit, offset, count_mode, ranked=False, cursor=cursor)
+        return docs, total, self._meta(strategy, estimated, next_cursor)
+
+    @staticmethod
+    async def _has_text_hits(db, text_query: Dict[str, Any]) -> bool:
+        return bool(await db.candidates.find(text_query, {"_id": 1}).limit(1).to_list(length=1))
+
+    @staticmethod
+    def _meta(strategy: str, estimated: bool, next_cursor: Optional[str]) -> Dict[str, Any]:
+        if PROMETHEUS_AVAILABLE:
+            candidate_search_requests.labels(strategy=strategy).inc()
+        return {"strategy": strategy, "total_is_estimate": estimated, "next_cursor": next_cursor}
+
+    @staticmethod
+    async def _page(db, query: Dict[str, Any], limit: int, offset: int, count_mode: str, ranked: bool,
+                    cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int, bool, Optional[str]]:
+        if cursor:
+            offset = 0
+        if ranked:
+            async def page():
+                docs = await db.candidates.find(query, {"score": {"$meta": "textScore"}}).sort(
+                    [("score", {"$meta": "textScore"}), ("_id", 1)]
+                ).skip(offset).limit(limit + 1).to_list(length=limit + 1)
+                return docs[:limit], None, len(docs) > limit
+        else:
+            async def page():
+                docs, next_cursor = await fetch_page(
+                    db.candidates, query, "_id", ASCENDING, limit, cursor=cursor, offset=offset)
+                return docs, next_cursor, next_cursor is not None
+
+        if count_mode == "estimate":
+            if not query:
+                (docs, next_cursor, _), total = await asyncio.gather(
+                    page(), db.candidates.estimated_document_count())
+                return docs, total, True, next_cursor
+            docs, next_cursor, has_more = await page()
+            return docs, offset + len(docs) + (1 if has_more else 0), has_more, next_cursor
+
+        (docs, next_cursor, _), total = await asyncio.gather(
+            page(), db.candidates.count_documents(query, limit=CANDIDATE_SEARCH_COUNT_CAP))
+        return docs, total, total >= CANDIDATE_SEARCH_COUNT_CAP, next_cursor
+
+
+candidate_search = CandidateSearch()
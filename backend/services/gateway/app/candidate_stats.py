@@ -0,0 +1,152 @@
+"""
+Candidate Statistics Service for Gateway Service
+Cached snapshot behind /v1/candidates/stats (HR dashboard)
+
+The dashboard counts are independent, so they run concurrently. Whole-collection
+totals (candidates, feedback) come from estimated_document_count, which reads
+collection metadata instead of scanning; set CANDIDATE_STATS_EXACT_TOTALS=true
+to count exactly. The snapshot is cached for CANDIDATE_STATS_TTL_SECONDS,
+concurrent misses share one computation, and writes that change a number call
+invalidate().
+"""
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, Optional
+
+try:
+    from prometheus_client import Counter, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_STATS_TTL_SECONDS = float(os.getenv("CANDIDATE_STATS_TTL_SECONDS", "30"))
+CANDIDATE_STATS_EXACT_TOTALS = os.getenv("CANDIDATE_STATS_EXACT_TOTALS", "false").lower() == "true"
+
+if PROMETHEUS_AVAILABLE:
+    candidate_stats_seconds = Histogram(
+        'gateway_candidate_stats_seconds', 'Time to serve /v1/candidates/stats', ['source'],
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+    )
+    candidate_stats_invalidations = Counter(
+        'gateway_candidate_stats_invalidations_total', 'Candidate stats snapshot invalidations', ['reason'])
+
+
+class CandidateStatsService:
+    """TTL-cached, concurrently computed HR dashboard statistics"""
+
+    def __init__(self, ttl_seconds: float = CANDIDATE_STATS_TTL_SECONDS, exact_totals: bool = CANDIDATE_STATS_EXACT_TOTALS):
+        self.ttl_seconds = ttl_seconds
+        self.exact_totals = exact_totals
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._inflight: Optional[asyncio.Future] = None
+
+    def invalidate(self, reason: str = "write"):
+        """Drop the cached snapshot; the next request recomputes it"""
+        self._snapshot = None
+        self._generation += 1
+        if PROMETHEUS_AVAILABLE:
+            candidate_stats_invalidations.labels(reason=reason).inc()
+
+    async def get(self, db) -> Dict[str, Any]:
+        """
+        Current statistics snapshot
+
+        Args:
+            db: Motor database
+
+        Returns:
+            Statistics dict (plus "cache_hit")
+        """
+        started = time.perf_counter()
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._expires_at:
+            self._observe("cache", started)
+            return {**snapshot, "cache_hit": True}
+
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._refresh(db))
+        inflight = self._inflight
+        try:
+            snapshot = await asyncio.shield(inflight)
+        finally:
+            if self._inflight is inflight and inflight.done():
+                self._inflight = None
+        self._observe("compute", started)
+        return {**snapshot, "cache_hit": False}
+
+    async def _refresh(self, db) -> Dict[str, Any]:
+        generation = self._generation
+        snapshot = await self.compute(db)
+        # A write that landed while computing may not be reflected; don't cache it
+        if generation == self._generation:
+            self._snapshot = snapshot
+            self._expires_at = time.monotonic() + self.ttl_seconds
+        return snapshot
+
+    async def compute(self, db) -> Dict[str, Any]:
+        """Run every dashboard count concurrently"""
+        now = datetime.now(timezone.utc)
+        seven_days_ago = now - timedelta(days=7)
+        if self.exact_totals:
+            total_candidates_query = db.candidates.count_documents({})
+            total_feedback_query = db.feedback.count_documents({})
+        else:
+            total_candidates_query = db.candidates.estimated_document_count()
+            total_feedback_query = db.feedback.estimated_document_count()
+
+        (total_candidates, active_jobs, recent_matches, pending_interviews,
+         new_candidates_this_week, total_feedback) = await asyncio.gather(
+            total_candidates_query,
+            db.jobs.count_documents({"status": "active"}),
+            db.matching_cache.count_documents({"created_at": {"$gte": seven_days_ago}}),
+            db.interviews.count_documents({
+                "status": {"$in": ["scheduled", "pending"]},
+                "interview_date": {"$gte": now}
+            }),
+            db.candidates.count_documents({"created_at": {"$gte": seven_days_ago}}),
+            total_feedback_query,
+            return_exceptions=True,
+        )
+        # Totals and active jobs are required; the remaining counts degrade to fallbacks
+        for required in (total_candidates, active_jobs):
+            if isinstance(required, BaseException):
+                raise required
+        if isinstance(recent_matches, BaseException):
+            # Fallback: estimate based on candidates and jobs
+            recent_matches = min(total_candidates * active_jobs // 10, 50) if total_candidates > 0 and active_jobs > 0 else 0
+        if isinstance(pending_interviews, BaseException):
+            pending_interviews = 0
+        if isinstance(new_candidates_this_week, BaseException):
+            new_candidates_this_week = 0
+        if isinstance(total_feedback, BaseException):
+            total_feedback = 0
+
+        return {
+            "total_candidates": total_candidates,
+            "active_jobs": active_jobs,
+            "recent_matches": recent_matches,
+            "pending_interviews": pending_interviews,
+            "new_candidates_this_week": new_candidates_this_week,
+            "total_feedback_submissions": total_feedback,
+            "statistics_generated_at": now.isoformat(),
+            "data_source": "mongodb_atlas",
+            "dashboard_ready": True
+        }
+
+    @staticmethod
+    def _observe(source: str, started: float):
+        elapsed = time.perf_counter() - started
+        if PROMETHEUS_AVAILABLE:
+            candidate_stats_seconds.labels(source=source).observe(elapsed)
+        if elapsed > 1.0:
+            logger.warning(f"/v1/candidates/stats took {elapsed:.2f}s ({source})")
+
+
+candidate_stats = CandidateStatsService()
@@ -8,6 +8,8 @@ from typing import Optional
 import os
 import logging
 
+from app.mongo_profiler import mongo_profiler, MONGO_PROFILER_ENABLED
+
 logger = logging.getLogger(__name__)
 
 # Global MongoDB client and database instances
@@ -38,6 +40,8 @@ def get_mongo_client() -> AsyncIOMotorClient:
                 minPoolSize=2,
                 connectTimeoutMS=10000,
                 socketTimeoutMS=20000,
+                # Per-route command metrics and slow-query capture (app/mongo_profiler.py)
+                event_listeners=[mongo_profiler.listener] if MONGO_PROFILER_ENABLED else [],
             )
             logger.info("MongoDB client (async) initialized")
         except Exception as e:
@@ -0,0 +1,235 @@
+"""
+Conditional Requests for Gateway Service
+ETag / If-None-Match (304) support for job and candidate reads
+
+The React and Streamlit frontends poll job listings, job details and candidate
+profiles. Most of those responses have not changed since the previous poll,
+but each poll still ran the query and re-serialized up to 100 full job
+descriptions. @conditional.route(...) computes a weak validator *before* the
+handler runs and answers a matching If-None-Match with an empty 304.
+
+Validators come from:
+
+- a collection-level version counter (collection_versions in Mongo), bumped
+  by the gateway's write paths and read through a short per-process cache
+  (ETAG_VERSION_CACHE_SECONDS), so all workers agree on it;
+- for single-document reads, the document's own `version` / `updated_at` /
+  `created_at`, fetched with a projection on those fields only;
+- the handler's normalized arguments and the caller's auth scope, so one
+  caller's validator never matches another's view;
+- a time bucket of ETAG_MAX_STALENESS_SECONDS. Writes made by other services
+  do not bump the counter, and the bucket caps how long they can go unseen.
+
+Routes with per-resource access rules pass `authorize`, which runs before a
+304 is sent, so a caller without access gets the handler's 403 instead of
+learning that the resource exists or still matches. Single-document routes
+do not honour `If-None-Match: *` for the same reason.
+
+The decorator sits outside @single_flight.route, so a coalesced response is
+never turned into a 304 meant for a different caller.
+"""
+import os
+import time
+import hashlib
+import inspect
+import functools
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import Request, Response
+
+from app.single_flight import cacheable, request_key
+
+try:
+    from prometheus_client import Counter
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ETAG_ENABLED = os.getenv("ETAG_ENABLED", "true").lower() == "true"
+ETAG_VERSION_CACHE_SECONDS = float(os.getenv("ETAG_VERSION_CACHE_SECONDS", "1"))
+ETAG_MAX_STALENESS_SECONDS = int(os.getenv("ETAG_MAX_STALENESS_SECONDS", "300"))
+
+if PROMETHEUS_AVAILABLE:
+    etag_responses = Counter('gateway_etag_responses_total', 'Conditional GET responses', ['route', 'outcome'])
+
+_VERSION_FIELDS = {"_id": 0, "version": 1, "updated_at": 1, "created_at": 1}
+
+
+class CollectionVersions:
+    """Mongo-backed per-collection change counters with a short local cache"""
+
+    def __init__(self, collection: str = "collection_versions", cache_seconds: float = ETAG_VERSION_CACHE_SECONDS):
+        self.collection = collection
+        self.cache_seconds = cache_seconds
+        self._cache: Dict[str, Tuple[float, int]] = {}
+
+    async def get(self, db, name: str) -> int:
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        doc = await db[self.collection].find_one({"_id": name})
+        version = int(doc.get("version", 0)) if doc else 0
+        self._cache[name] = (time.monotonic() + self.cache_seconds, version)
+        return version
+
+    async def bump(self, db, name: str):
+        """
+        Record a write to `name`; never raises (a lost bump only delays revalidation)
+
+        Args:
+            db: Motor database
+            name: Collection that changed
+        """
+        try:
+            await db[self.collection].update_one({"_id": name}, {"$inc": {"version": 1}}, upsert=True)
+            self._cache.pop(name, None)
+        except Exception as e:
+            logger.warning(f"Collection version bump failed for {name}: {e}")
+
+
+collection_versions = CollectionVersions()
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str, allow_wildcard: bool = True) -> bool:
+    """Weak comparison of an If-None-Match header against our validator"""
+    if not if_none_match:
+        return False
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            if allow_wildcard:
+                return True
+            continue
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+async def document_version(db, collection: str, doc_id: str) -> Optional[Tuple[Any, ...]]:
+    """Version markers of one document (None if it does not exist)"""
+    query = {"_id": ObjectId(doc_id)} if ObjectId.is_valid(doc_id) else {"id": doc_id}
+    doc = await db[collection].find_one(query, _VERSION_FIELDS)
+    if doc is None:
+        return None
+    return (doc.get("version"), doc.get("updated_at"), doc.get("created_at"))
+
+
+class ConditionalResponses:
+    """Decorator factory adding ETag / If-None-Match handling to GET routes"""
+
+    def __init__(self, get_db: Optional[Callable[[], Awaitable[Any]]] = None,
+                 versions: CollectionVersions = collection_versions, enabled: bool = ETAG_ENABLED,
+                 max_staleness_seconds: int = ETAG_MAX_STALENESS_SECONDS):
+        self._get_db = get_db
+        self.versions = versions
+        self.enabled = enabled
+        self.max_staleness_seconds = max_staleness_seconds
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    async def _db(self):
+        if self._get_db is None:
+            from app.database import get_mongo_db
+            self._get_db = get_mongo_db
+        return await self._get_db()
+
+    def _count(self, route: str, outcome: str):
+        counters = self._counters.setdefault(route, {"not_modified": 0, "full": 0})
+        counters[outcome] += 1
+        if PROMETHEUS_AVAILABLE:
+            etag_responses.labels(route=route, outcome=outcome).inc()
+
+    async def validator(self, name: str, collection: str, kwargs: Dict[str, Any],
+                        doc_param: Optional[str] = None, scope_param: str = "auth") -> Optional[str]:
+        """
+        ETag for a handler call, or None when no validator can be derived
+
+        Args:
+            name: Route name
+            collection: Collection whose version the response depends on
+            kwargs: Handler arguments (path, query and auth)
+            doc_param: Argument holding the document id, for single-document reads
+            scope_param: Argument holding the auth context
+
+        Returns:
+            Weak ETag string
+        """
+        db = await self._db()
+        parts: Tuple[Any, ...] = (name, request_key(kwargs, scope_param), await self.versions.get(db, collection))
+        if doc_param is not None:
+            marker = await document_version(db, collection, str(kwargs.get(doc_param) or ""))
+            if marker is None:
+                return None
+            parts += marker
+        if self.max_staleness_seconds > 0:
+            parts += (int(time.time() // self.max_staleness_seconds),)
+        return make_etag(*parts)
+
+    def route(self, name: str, collection: str, doc_param: Optional[str] = None, scope_param: str = "auth",
+              authorize: Optional[Callable[..., Awaitable[None]]] = None):
+        """
+        Decorator for FastAPI GET handlers returning JSON-able dicts
+
+        Adds the Request/Response parameters it needs to the exposed signature,
+        answers a matching If-None-Match with 304 before calling the handler,
+        and otherwise sets ETag and Cache-Control on the handler's response.
+        Soft-error bodies ({"error": ...}) are sent without a validator.
+        `authorize`, called with the handler's arguments, must raise (e.g.
+        HTTPException 403) for callers who may not read the resource; it runs
+        before any 304.
+        """
+        def decorator(handler: Callable[..., Awaitable[Any]]):
+            signature = inspect.signature(handler)
+            extra = [
+                inspect.Parameter("etag_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+                inspect.Parameter("etag_response", inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+            ]
+
+            @functools.wraps(handler)
+            async def wrapper(**kwargs):
+                request: Request = kwargs.pop("etag_request")
+                response: Response = kwargs.pop("etag_response")
+                if not self.enabled:
+                    return await handler(**kwargs)
+                try:
+                    etag = await self.validator(name, collection, kwargs, doc_param, scope_param)
+                except Exception as e:
+                    logger.debug(f"ETag validator unavailable for {name}: {e}")
+                    etag = None
+                if etag and etag_matches(request.headers.get("if-none-match"), etag,
+                                         allow_wildcard=doc_param is None):
+                    if authorize is not None:
+                        await authorize(**kwargs)
+                    self._count(name, "not_modified")
+                    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+                result = await handler(**kwargs)
+                self._count(name, "full")
+                if etag and not isinstance(result, Response) and cacheable(result):
+                    response.headers["ETag"] = etag
+                    response.headers["Cache-Control"] = "private, no-cache"
+                return result
+
+            wrapper.__signature__ = signature.replace(parameters=list(signature.parameters.values()) + extra)
+            return wrapper
+        return decorator
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_staleness_seconds": self.max_staleness_seconds,
+            "routes": {route: dict(counters) for route, counters in self._counters.items()},
+        }
+
+
+conditional = ConditionalResponses()
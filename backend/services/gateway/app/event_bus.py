@@ -0,0 +1,268 @@
+"""
+Event Bus for Gateway Service
+Channel pub/sub behind the client/recruiter connection-event SSE streams
+
+Subscribers (one bounded queue per open SSE stream) always live in the worker
+that holds the connection. What differs is how a published event reaches
+them:
+
+- memory (default): delivered straight to this worker's subscribers. Only
+  correct with a single gateway worker.
+- redis: published to Redis pub/sub (REDIS_URL); every worker listens on the
+  channel pattern and fans events out to its own subscribers.
+- mongo: inserted into the gateway_events collection (TTL-expired) and picked
+  up by every worker through a change stream (needs a replica set).
+
+With a shared transport a worker also receives its own events through the
+listener, so publish() never delivers locally unless the transport is down.
+A slow SSE consumer never blocks publishers: when its queue is full the
+oldest pending event is dropped and counted.
+"""
+import os
+import json
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+try:
+    from prometheus_client import Counter, Gauge
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUS_BACKEND = os.getenv("EVENT_BUS_BACKEND", "memory").lower()
+EVENT_BUS_QUEUE_SIZE = int(os.getenv("EVENT_BUS_QUEUE_SIZE", "32"))
+EVENT_BUS_RETENTION_SECONDS = int(os.getenv("EVENT_BUS_RETENTION_SECONDS", "3600"))
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+if PROMETHEUS_AVAILABLE:
+    event_bus_events = Counter(
+        'gateway_event_bus_events_total', 'Connection events by stage', ['stage'])
+    event_bus_subscribers = Gauge('gateway_event_bus_subscribers', 'Open SSE event subscriptions')
+    event_bus_max_queue_fill = Gauge(
+        'gateway_event_bus_max_queue_fill', 'Fullest subscriber queue (0-1) at last delivery')
+
+
+def _count(stage: str, n: int = 1):
+    if PROMETHEUS_AVAILABLE and n:
+        event_bus_events.labels(stage=stage).inc(n)
+
+
+class Subscription:
+    """One SSE stream's bounded event queue"""
+
+    def __init__(self, channel: str, maxsize: int = EVENT_BUS_QUEUE_SIZE):
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """Enqueue without blocking; returns False if an older event had to be dropped"""
+        dropped = False
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            dropped = True
+        self.queue.put_nowait(event)
+        return not dropped
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+
+class RedisEventTransport:
+    """Redis pub/sub fan-out across gateway workers"""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "gateway:events:"):
+        self.prefix = prefix
+        self._client = aioredis.from_url(url, socket_connect_timeout=1.0)
+
+    async def publish(self, channel: str, event: Dict[str, Any]):
+        await self._client.publish(self.prefix + channel, json.dumps(event, default=str))
+
+    async def listen(self, deliver: Callable[[str, Dict[str, Any]], None]):
+        pubsub = self._client.pubsub()
+        await pubsub.psubscribe(self.prefix + "*")
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "pmessage":
+                    continue
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                deliver(channel[len(self.prefix):], json.loads(message["data"]))
+        finally:
+            await pubsub.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class MongoEventTransport:
+    """Mongo change-stream fan-out across gateway workers"""
+
+    name = "mongo"
+
+    def __init__(self, get_db: Callable[[], Awaitable[Any]], collection: str = "gateway_events"):
+        self.get_db = get_db
+        self.collection = collection
+        self._indexed = False
+
+    async def _events(self):
+        db = await self.get_db()
+        if not self._indexed:
+            await db[self.collection].create_index(
+                "created_at", expireAfterSeconds=EVENT_BUS_RETENTION_SECONDS, name="created_at_ttl")
+            self._indexed = True
+        return db[self.collection]
+
+    async def publish(self, channel: str, event: Dict[str, Any]):
+        events = await self._events()
+        await events.insert_one({"channel": channel, "event": event, "created_at": datetime.now(timezone.utc)})
+
+    async def listen(self, deliver: Callable[[str, Dict[str, Any]], None]):
+        events = await self._events()
+        async with events.watch([{"$match": {"operationType": "insert"}}]) as stream:
+            async for change in stream:
+                doc = change["fullDocument"]
+                deliver(doc["channel"], doc["event"])
+
+    async def aclose(self):
+        pass
+
+
+class EventBus:
+    """Per-worker subscriber registry plus an optional cross-worker transport"""
+
+    def __init__(self, transport=None, queue_size: int = EVENT_BUS_QUEUE_SIZE, retry_seconds: float = 2.0):
+        self.transport = transport
+        self.queue_size = queue_size
+        self.retry_seconds = retry_seconds
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.transport_errors = 0
+
+    @property
+    def backend(self) -> str:
+        return self.transport.name if self.transport is not None else "memory"
+
+    def subscribe(self, channel: str) -> Subscription:
+        """Open a subscription on a channel (e.g. 'client:123' or 'recruiter:456')"""
+        subscription = Subscription(channel, self.queue_size)
+        self._subscribers.setdefault(channel, set()).add(subscription)
+        self._gauge_subscribers()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.channel]
+        self._gauge_subscribers()
+
+    def _gauge_subscribers(self):
+        if PROMETHEUS_AVAILABLE:
+            event_bus_subscribers.set(sum(len(s) for s in self._subscribers.values()))
+
+    async def publish(self, channel: str, event: Dict[str, Any]):
+        """Publish an event to every subscriber of `channel` on every worker"""
+        self.published += 1
+        _count("published")
+        if self.transport is None:
+            self.deliver(channel, event)
+            return
+        try:
+            await self.transport.publish(channel, event)
+        except Exception as e:
+            self.transport_errors += 1
+            logger.warning(f"Event bus {self.backend} publish failed, delivering locally only: {e}")
+            self.deliver(channel, event)
+
+    def deliver(self, channel: str, event: Dict[str, Any]):
+        """Fan an event out to this worker's subscribers without blocking"""
+        subscribers = self._subscribers.get(channel)
+        if not subscribers:
+            return
+        fill = 0.0
+        for subscription in list(subscribers):
+            if subscription.offer(event):
+                self.delivered += 1
+                _count("delivered")
+            else:
+                self.dropped += 1
+                _count("dropped")
+            fill = max(fill, subscription.queue.qsize() / subscription.queue.maxsize)
+        if PROMETHEUS_AVAILABLE:
+            event_bus_max_queue_fill.set(fill)
+
+    async def _listen_forever(self):
+        while True:
+            try:
+                await self.transport.listen(self.deliver)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.transport_errors += 1
+                logger.warning(f"Event bus {self.backend} listener failed, retrying: {e}")
+            await asyncio.sleep(self.retry_seconds)
+
+    def start(self):
+        if self.transport is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen_forever())
+
+    async def aclose(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self.transport is not None:
+            await self.transport.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        queues = [s for subs in self._subscribers.values() for s in subs]
+        return {
+            "backend": self.backend,
+            "channels": len(self._subscribers),
+            "subscribers": len(queues),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "max_queue_depth": max((s.queue.qsize() for s in queues), default=0),
+            "transport_errors": self.transport_errors,
+        }
+
+
+def create_event_bus(get_db: Optional[Callable[[], Awaitable[Any]]] = None) -> EventBus:
+    """Build the event bus from EVENT_BUS_BACKEND / REDIS_URL"""
+    transport = None
+    if EVENT_BUS_BACKEND == "redis":
+        if REDIS_AVAILABLE and REDIS_URL:
+            transport = RedisEventTransport(REDIS_URL)
+        else:
+            logger.warning("EVENT_BUS_BACKEND=redis but redis package or REDIS_URL missing; using in-process bus")
+    elif EVENT_BUS_BACKEND == "mongo":
+        if get_db is None:
+            from app.database import get_mongo_db as get_db
+        transport = MongoEventTransport(get_db)
+    return EventBus(transport)
+
+
+event_bus = create_event_bus()
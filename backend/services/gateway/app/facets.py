@@ -0,0 +1,319 @@
+"""
+Facet Dictionaries for Gateway Service
+Distinct skills / locations with document frequencies, maintained in process
+
+Each FacetDictionary remembers which values every source document contributed,
+so creating, editing or closing a job (or editing a candidate) adjusts document
+frequencies by difference instead of rescanning the collection. Values are
+matched on their separator-free lowercase form ("C/C++" -> "cc"), the same rule
+the autocomplete endpoints always used: a sorted key array answers prefix
+queries and a trigram map answers substring queries.
+
+facet_service holds the dictionaries behind /v1/jobs/skills/autocomplete,
+/v1/jobs/locations/autocomplete (active jobs only) and the candidate skill
+facets. It is loaded at startup, kept current by the write paths and reloaded
+every FACETS_REFRESH_SECONDS to absorb writes from other workers or services.
+"""
+import os
+import re
+import bisect
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from bson import ObjectId
+
+logger = logging.getLogger(__name__)
+
+FACETS_ENABLED = os.getenv("FACETS_ENABLED", "true").lower() == "true"
+FACETS_REFRESH_SECONDS = float(os.getenv("FACETS_REFRESH_SECONDS", "900"))
+
+
+def compact_key(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "", (value or "").lower())
+
+
+def _trigrams(key: str) -> Set[str]:
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+def extract_skills_from_requirements(requirements: str) -> Set[str]:
+    """Extract skill-like tokens from job requirements string (comma/space separated)."""
+    if not requirements or not isinstance(requirements, str):
+        return set()
+    seen = set()
+    for part in re.split(r"[,/\n;|]+", requirements):
+        for token in part.split():
+            token = token.strip()
+            if len(token) >= 2 and re.match(r"^[A-Za-z0-9.+_-]+$", token):
+                seen.add(token)
+    return seen
+
+
+def extract_candidate_skills(technical_skills: Any) -> Set[str]:
+    """Skills listed in a candidate's comma-separated technical_skills field"""
+    if isinstance(technical_skills, list):
+        parts = [str(p) for p in technical_skills]
+    elif isinstance(technical_skills, str):
+        parts = re.split(r"[,;\n|]+", technical_skills)
+    else:
+        return set()
+    return {p.strip() for p in parts if len(p.strip()) >= 2 and len(p.strip()) <= 60}
+
+
+def extract_location(location: Any) -> Set[str]:
+    if isinstance(location, str) and location.strip():
+        return {location.strip()}
+    return set()
+
+
+class FacetDictionary:
+    """Distinct values with document frequencies and a prefix/substring index"""
+
+    def __init__(self, name: str, extract: Callable[[Dict[str, Any]], Set[str]]):
+        self.name = name
+        self.extract = extract
+        self._doc_values: Dict[str, FrozenSet[str]] = {}
+        self._df: Dict[str, int] = {}            # value key (lowercase) -> document frequency
+        self._labels: Dict[str, str] = {}        # value key -> display label (first spelling seen)
+        self._compact: Dict[str, str] = {}       # value key -> compact match key
+        self._sorted: List[Tuple[str, str]] = []  # (compact key, value key), sorted
+        self._grams: Dict[str, Set[str]] = {}    # trigram -> value keys
+        # Documents written while a load's scan is in flight, re-applied after replace_all
+        self._pending: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._df)
+
+    @property
+    def documents(self) -> int:
+        return len(self._doc_values)
+
+    # ---- maintenance ----------------------------------------------------
+
+    def set_document(self, doc_id: Any, doc: Optional[Dict[str, Any]]):
+        """Record the values of one source document (None removes it)"""
+        doc_id = str(doc_id)
+        # One label per value key: case variants ("Python, python") count once
+        labels: Dict[str, str] = {}
+        for label in sorted(self.extract(doc) if doc else set()):
+            if compact_key(label):
+                labels.setdefault(label.lower(), label)
+        with self._lock:
+            old = self._doc_values.pop(doc_id, frozenset())
+            new = frozenset(labels)
+            for key in old - new:
+                self._decrement(key)
+            for key, label in labels.items():
+                if key not in old:
+                    self._increment(label)
+            if new:
+                self._doc_values[doc_id] = new
+            if self._pending is not None:
+                self._pending[doc_id] = doc
+
+    def begin_load(self):
+        """Start recording writes so a following replace_all() does not drop them"""
+        with self._lock:
+            if self._pending is None:
+                self._pending = {}
+
+    def abort_load(self):
+        with self._lock:
+            self._pending = None
+
+    def replace_all(self, docs: Iterable[Tuple[Any, Dict[str, Any]]]):
+        with self._lock:
+            pending, self._pending = self._pending or {}, None
+            self._doc_values, self._df, self._labels, self._compact = {}, {}, {}, {}
+            self._sorted, self._grams = [], {}
+            for doc_id, doc in docs:
+                self.set_document(doc_id, doc)
+            for doc_id, doc in pending.items():
+                self.set_document(doc_id, doc)
+
+    def _increment(self, label: str):
+        key = label.lower()
+        if key in self._df:
+            self._df[key] += 1
+            return
+        compact = compact_key(label)
+        self._df[key] = 1
+        self._labels[key] = label
+        self._compact[key] = compact
+        bisect.insort(self._sorted, (compact, key))
+        for gram in _trigrams(compact):
+            self._grams.setdefault(gram, set()).add(key)
+
+    def _decrement(self, key: str):
+        self._df[key] -= 1
+        if self._df[key] > 0:
+            return
+        compact = self._compact.pop(key)
+        del self._df[key], self._labels[key]
+        i = bisect.bisect_left(self._sorted, (compact, key))
+        if i < len(self._sorted) and self._sorted[i] == (compact, key):
+            del self._sorted[i]
+        for gram in _trigrams(compact):
+            keys = self._grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+
+    # ---- lookup ---------------------------------------------------------
+
+    def search(self, query: str, limit: int = 15) -> List[Tuple[str, int]]:
+        """
+        Values whose compact form contains the query's compact form
+
+        Args:
+            query: Raw user query
+            limit: Maximum values
+
+        Returns:
+            (label, document frequency) pairs: prefix matches first, then other
+            substring matches, each by frequency then label
+        """
+        q = compact_key(query)
+        if not q:
+            return []
+        with self._lock:
+            prefix: List[str] = []
+            i = bisect.bisect_left(self._sorted, (q, ""))
+            while i < len(self._sorted) and self._sorted[i][0].startswith(q):
+                prefix.append(self._sorted[i][1])
+                i += 1
+            results = self._ranked(prefix)
+            if len(results) < limit:
+                seen = set(prefix)
+                results += self._ranked(k for k in self._substring_keys(q) if k not in seen)
+            return [(self._labels[k], self._df[k]) for k in results[:limit]]
+
+    def _substring_keys(self, q: str) -> Iterable[str]:
+        if len(q) < 3:
+            return [key for key, compact in self._compact.items() if q in compact]
+        grams = sorted(_trigrams(q), key=lambda g: len(self._grams.get(g, ())))
+        keys = set(self._grams.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not keys:
+                break
+            keys &= self._grams.get(gram, set())
+        return [key for key in keys if q in self._compact[key]]
+
+    def _ranked(self, keys: Iterable[str]) -> List[str]:
+        return sorted(keys, key=lambda k: (-self._df[k], self._labels[k].lower()))
+
+    def top(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """Most frequent values"""
+        with self._lock:
+            keys = sorted(self._df, key=lambda k: (-self._df[k], self._labels[k].lower()))[:limit]
+            return [(self._labels[k], self._df[k]) for k in keys]
+
+    def stats(self) -> Dict[str, int]:
+        return {"values": len(self), "documents": self.documents}
+
+
+class FacetService:
+    """Job skill/location and candidate skill dictionaries"""
+
+    JOB_PROJECTION = {"requirements": 1, "location": 1, "status": 1}
+    CANDIDATE_PROJECTION = {"technical_skills": 1}
+
+    def __init__(self):
+        self.job_skills = FacetDictionary(
+            "job_skills", lambda job: extract_skills_from_requirements(job.get("requirements") or ""))
+        self.job_locations = FacetDictionary("job_locations", lambda job: extract_location(job.get("location")))
+        self.candidate_skills = FacetDictionary(
+            "candidate_skills", lambda candidate: extract_candidate_skills(candidate.get("technical_skills")))
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._load_lock: Optional[asyncio.Lock] = None
+        self.loaded = False
+
+    def update_job(self, job: Dict[str, Any]):
+        """Apply a created/updated/closed job (only active jobs contribute)"""
+        active = job if job.get("status") == "active" else None
+        self.job_skills.set_document(job["_id"], active)
+        self.job_locations.set_document(job["_id"], active)
+
+    def update_candidate(self, candidate: Dict[str, Any]):
+        self.candidate_skills.set_document(candidate["_id"], candidate)
+
+    def scoped_candidate_skills(self, candidates: Iterable[Dict[str, Any]]) -> FacetDictionary:
+        """Candidate skill dictionary over a subset (e.g. one recruiter's applicants)"""
+        scoped = FacetDictionary("candidate_skills", self.candidate_skills.extract)
+        scoped.replace_all((c["_id"], c) for c in candidates)
+        return scoped
+
+    async def refresh_candidate(self, db, candidate_id: str):
+        candidate = await db.candidates.find_one(_id_query(candidate_id), self.CANDIDATE_PROJECTION)
+        self.candidate_skills.set_document(candidate_id, candidate)
+
+    async def load(self, db):
+        dictionaries = (self.job_skills, self.job_locations, self.candidate_skills)
+        for dictionary in dictionaries:
+            dictionary.begin_load()
+        try:
+            jobs = await db.jobs.find({"status": "active"}, self.JOB_PROJECTION).to_list(length=None)
+            candidates = await db.candidates.find(
+                {"technical_skills": {"$nin": [None, ""]}}, self.CANDIDATE_PROJECTION).to_list(length=None)
+        except BaseException:
+            for dictionary in dictionaries:
+                dictionary.abort_load()
+            raise
+        self.job_skills.replace_all((job["_id"], job) for job in jobs)
+        self.job_locations.replace_all((job["_id"], job) for job in jobs)
+        self.candidate_skills.replace_all((c["_id"], c) for c in candidates)
+        self.loaded = True
+        logger.info(f"Facet dictionaries loaded: {self.stats()}")
+
+    async def ensure_loaded(self, db):
+        """Load once for callers that arrive before the background load finishes"""
+        if self.loaded:
+            return
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if not self.loaded:
+                await self.load(db)
+
+    async def _refresh_loop(self, get_db: Callable[[], Awaitable[Any]], interval: float):
+        while True:
+            try:
+                await self.load(await get_db())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Facet dictionary load failed: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, get_db: Callable[[], Awaitable[Any]], interval: float = FACETS_REFRESH_SECONDS):
+        if not FACETS_ENABLED or self._refresh_task is not None:
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop(get_db, interval))
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "job_skills": self.job_skills.stats(),
+            "job_locations": self.job_locations.stats(),
+            "candidate_skills": self.candidate_skills.stats(),
+        }
+
+
+def _id_query(doc_id: str) -> Dict[str, Any]:
+    return {"_id": ObjectId(doc_id)} if ObjectId.is_valid(doc_id) else {"_id": doc_id}
+
+
+facet_service = FacetService()
@@ -0,0 +1,276 @@
+"""
+Shared Upstream HTTP Clients for Gateway Service
+Application-scoped, pooled httpx clients for agent and LangGraph calls
+
+Each upstream gets one AsyncClient (keep-alive pool, HTTP/2 when the `h2`
+package is installed and the upstream speaks TLS), its own connection limits
+and a circuit breaker. While a breaker is open, calls fail fast with
+CircuitOpenError instead of waiting out the full timeout, so callers drop
+straight into their fallback paths.
+"""
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_HTTP2_ENABLED = os.getenv("UPSTREAM_HTTP2", "true").lower() == "true"
+
+if PROMETHEUS_AVAILABLE:
+    upstream_request_seconds = Histogram(
+        'gateway_upstream_request_seconds', 'Upstream request latency', ['upstream', 'outcome'],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+    )
+    upstream_in_flight = Gauge('gateway_upstream_in_flight', 'Upstream requests in flight', ['upstream'])
+    upstream_pool_saturation = Gauge(
+        'gateway_upstream_pool_saturation', 'In-flight requests / max connections', ['upstream'])
+    upstream_circuit_state = Gauge(
+        'gateway_upstream_circuit_open', 'Circuit breaker state (0 closed, 0.5 half-open, 1 open)', ['upstream'])
+    upstream_rejected = Counter(
+        'gateway_upstream_rejected_total', 'Upstream calls short-circuited by an open breaker', ['upstream'])
+
+
+class CircuitOpenError(Exception):
+    """Raised when an upstream's circuit breaker is open"""
+
+    def __init__(self, upstream: str, retry_in: float):
+        super().__init__(f"{upstream} circuit open, retry in {retry_in:.0f}s")
+        self.upstream = upstream
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_token = 0
+
+    def admit(self) -> Tuple[bool, int]:
+        """
+        Decide whether a call may go out
+
+        Returns:
+            (allowed, probe token); the token is non-zero only for the caller
+            holding the half-open probe, which must hand it to release_probe()
+        """
+        if self.state == self.CLOSED:
+            return True, 0
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            self._probe_token += 1
+            return True, self._probe_token
+        return False, 0
+
+    def allow_request(self) -> bool:
+        return self.admit()[0]
+
+    def retry_in(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def release_probe(self, token: int):
+        # Only the current probe's holder may free the slot for the next probe
+        if token and token == self._probe_token:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    @property
+    def gauge_value(self) -> float:
+        return {self.CLOSED: 0.0, self.HALF_OPEN: 0.5, self.OPEN: 1.0}[self.state]
+
+
+class Upstream:
+    """Configuration, pooled client and breaker for one upstream service"""
+
+    def __init__(self, name: str, base_url: str, timeout: float, max_connections: int,
+                 max_keepalive: int, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.base_url = (base_url or "").rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.client: Optional[httpx.AsyncClient] = None
+        self.in_flight = 0
+
+    def get_client(self) -> httpx.AsyncClient:
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=30.0,
+                ),
+                http2=UPSTREAM_HTTP2_ENABLED and HTTP2_AVAILABLE,
+            )
+        return self.client
+
+
+class UpstreamClientRegistry:
+    """Registry of pooled upstream clients, closed on application shutdown"""
+
+    def __init__(self):
+        self._upstreams: Dict[str, Upstream] = {}
+
+    def register(self, name: str, base_url: str, timeout: float = 30.0, max_connections: int = 20,
+                 max_keepalive: int = 10, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self._upstreams[name] = Upstream(
+            name, base_url, timeout, max_connections, max_keepalive, failure_threshold, reset_timeout)
+
+    def upstream(self, name: str) -> Upstream:
+        if name not in self._upstreams:
+            raise KeyError(f"Unknown upstream: {name}")
+        return self._upstreams[name]
+
+    async def request(self, name: str, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request to a registered upstream
+
+        Args:
+            name: Upstream name ("agent", "langgraph")
+            method: HTTP method
+            path: Path relative to the upstream base URL
+            **kwargs: Passed to httpx.AsyncClient.request (json, params, headers, timeout, ...)
+
+        Returns:
+            httpx.Response (5xx responses count as breaker failures but are returned)
+
+        Raises:
+            CircuitOpenError: The upstream's breaker is open
+            httpx.HTTPError: Transport errors and timeouts (any exception is
+                recorded as a breaker failure; cancellation only for the probe)
+        """
+        upstream = self.upstream(name)
+        breaker = upstream.breaker
+        allowed, probe = breaker.admit()
+        if not allowed:
+            if PROMETHEUS_AVAILABLE:
+                upstream_rejected.labels(upstream=name).inc()
+            raise CircuitOpenError(name, breaker.retry_in())
+
+        upstream.in_flight += 1
+        self._update_pool_metrics(upstream)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await upstream.get_client().request(method, path, **kwargs)
+            outcome = str(response.status_code)
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return response
+        except asyncio.CancelledError:
+            # A caller going away says nothing about the upstream; only an
+            # abandoned half-open probe reopens the breaker
+            outcome = "cancelled"
+            if probe:
+                breaker.record_failure()
+            raise
+        except Exception as e:
+            outcome = type(e).__name__
+            breaker.record_failure()
+            raise
+        finally:
+            breaker.release_probe(probe)
+            upstream.in_flight -= 1
+            if PROMETHEUS_AVAILABLE:
+                upstream_request_seconds.labels(upstream=name, outcome=outcome).observe(time.perf_counter() - started)
+            self._update_pool_metrics(upstream)
+            if breaker.state == CircuitBreaker.OPEN and outcome != "200":
+                logger.warning(f"Upstream {name} circuit open after {breaker.failures} failures ({outcome})")
+
+    @staticmethod
+    def _update_pool_metrics(upstream: Upstream):
+        if PROMETHEUS_AVAILABLE:
+            upstream_in_flight.labels(upstream=upstream.name).set(upstream.in_flight)
+            upstream_pool_saturation.labels(upstream=upstream.name).set(upstream.in_flight / upstream.max_connections)
+            upstream_circuit_state.labels(upstream=upstream.name).set(upstream.breaker.gauge_value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "base_url": upstream.base_url,
+                "in_flight": upstream.in_flight,
+                "max_connections": upstream.max_connections,
+                "circuit": upstream.breaker.state,
+                "consecutive_failures": upstream.breaker.failures,
+                "http2": UPSTREAM_HTTP2_ENABLED and HTTP2_AVAILABLE,
+            }
+            for name, upstream in self._upstreams.items()
+        }
+
+    async def aclose(self):
+        for upstream in self._upstreams.values():
+            if upstream.client is not None:
+                await upstream.client.aclose()
+                upstream.client = None
+
+
+upstream_clients = UpstreamClientRegistry()
+upstream_clients.register(
+    "agent",
+    os.getenv("AGENT_SERVICE_URL", ""),
+    timeout=float(os.getenv("AGENT_MATCH_TIMEOUT", "90")),
+    max_connections=int(os.getenv("AGENT_HTTP_MAX_CONNECTIONS", "20")),
+    max_keepalive=int(os.getenv("AGENT_HTTP_MAX_KEEPALIVE", "10")),
+    failure_threshold=int(os.getenv("AGENT_CIRCUIT_FAILURES", "5")),
+    reset_timeout=float(os.getenv("AGENT_CIRCUIT_RESET_SECONDS", "30")),
+)
+# Background /embeddings/sync calls get their own breaker so slow syncs
+# cannot open the breaker that guards live /match traffic
+upstream_clients.register(
+    "agent_sync",
+    os.getenv("AGENT_SERVICE_URL", ""),
+    timeout=30.0,
+    max_connections=int(os.getenv("AGENT_SYNC_HTTP_MAX_CONNECTIONS", "5")),
+    max_keepalive=int(os.getenv("AGENT_SYNC_HTTP_MAX_KEEPALIVE", "2")),
+    failure_threshold=int(os.getenv("AGENT_CIRCUIT_FAILURES", "5")),
+    reset_timeout=float(os.getenv("AGENT_CIRCUIT_RESET_SECONDS", "30")),
+)
+upstream_clients.register(
+    "langgraph",
+    os.getenv("LANGGRAPH_SERVICE_URL", "http://localhost:9001"),
+    timeout=30.0,
+    max_connections=int(os.getenv("LANGGRAPH_HTTP_MAX_CONNECTIONS", "20")),
+    max_keepalive=int(os.getenv("LANGGRAPH_HTTP_MAX_KEEPALIVE", "10")),
+    failure_threshold=int(os.getenv("LANGGRAPH_CIRCUIT_FAILURES", "5")),
+    reset_timeout=float(os.getenv("LANGGRAPH_CIRCUIT_RESET_SECONDS", "30")),
+)
@@ -0,0 +1,285 @@
+"""
+Job Autocomplete Index for Gateway Service
+In-process prefix / trigram index over active job titles and departments
+
+/v1/jobs/autocomplete answers from memory instead of running an unanchored
+regex over the jobs collection on every keystroke. Each active job contributes
+its title/department tokens to a sorted token array (prefix lookups by
+bisection) and the trigrams of its separator-free title/department to a
+trigram map (infix matches such as "gineer" -> "Engineer"). Candidates are then
+verified the same way the old fuzzy regex matched: query tokens appear in
+order in one field with only separators between them.
+
+The index is loaded at startup, updated in place when the gateway creates a
+job, and reloaded every JOB_AUTOCOMPLETE_REFRESH_SECONDS to pick up writes
+made by other workers or services (the gateway has no job edit/close route;
+status changes made elsewhere arrive with the next reload). Until the first load completes,
+search() returns None and callers use the Mongo query.
+"""
+import os
+import re
+import bisect
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+
+logger = logging.getLogger(__name__)
+
+JOB_AUTOCOMPLETE_INDEX_ENABLED = os.getenv("JOB_AUTOCOMPLETE_INDEX_ENABLED", "true").lower() == "true"
+JOB_AUTOCOMPLETE_REFRESH_SECONDS = float(os.getenv("JOB_AUTOCOMPLETE_REFRESH_SECONDS", "300"))
+
+_PROJECTION = {"title": 1, "department": 1, "location": 1, "status": 1, "created_at": 1}
+
+
+def normalize_autocomplete_query(raw: Optional[str]) -> str:
+    """Normalize user query for autocomplete matching.
+    - Removes/normalizes special characters (/, \\, -, etc.) into spaces
+    - Keeps only letters/numbers/spaces for fuzzy matching
+    """
+    if raw is None:
+        return ""
+    s = str(raw).strip()
+    if not s:
+        return ""
+    # Convert common separators/symbols into spaces, then strip any remaining non-alphanumerics.
+    s = re.sub(r"[\\/]+", " ", s)
+    s = re.sub(r"[^A-Za-z0-9]+", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s[:50]
+
+
+def fuzzy_regex_from_query(norm: str) -> Optional[str]:
+    """Build a fuzzy regex that matches tokens with any non-word separators between them.
+    Example: 'AR VR Engineer' -> 'AR[\\s\\W_]*VR[\\s\\W_]*Engineer'
+    """
+    tokens = [t for t in (norm or "").split(" ") if t]
+    if not tokens:
+        return None
+    return r"[\s\W_]*".join(re.escape(t) for t in tokens)[:200]
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", (text or "").lower())
+
+
+def _compact(text: str) -> str:
+    return "".join(_tokens(text))
+
+
+def _trigrams(compact: str) -> Set[str]:
+    return {compact[i:i + 3] for i in range(len(compact) - 2)}
+
+
+def _sort_key(created_at: Any) -> float:
+    if isinstance(created_at, datetime):
+        return created_at.timestamp()
+    return 0.0
+
+
+class _Entry:
+    __slots__ = ("job_id", "title", "department", "location", "created", "tokens", "fields", "grams")
+
+    def __init__(self, job: Dict[str, Any]):
+        self.job_id = str(job["_id"])
+        self.title = job.get("title") or ""
+        self.department = job.get("department") or ""
+        self.location = job.get("location") or ""
+        self.created = _sort_key(job.get("created_at"))
+        self.tokens = set(_tokens(self.title)) | set(_tokens(self.department))
+        self.fields = (_compact(self.title), _compact(self.department))
+        self.grams = _trigrams(self.fields[0]) | _trigrams(self.fields[1])
+
+    def suggestion(self) -> Dict[str, str]:
+        return {"id": self.job_id, "title": self.title, "department": self.department, "location": self.location}
+
+
+class JobAutocompleteIndex:
+    """Thread-safe prefix/trigram index of active jobs"""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._token_jobs: Dict[str, Set[str]] = {}
+        self._sorted_tokens: List[str] = []
+        self._gram_jobs: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        # Writes applied while a load's find() is in flight, re-applied after replace_all
+        self._pending: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.loaded = False
+
+    # ---- maintenance ----------------------------------------------------
+
+    def upsert(self, job: Dict[str, Any]):
+        """Index an active job, or drop it when its status is no longer active"""
+        job_id = str(job["_id"])
+        with self._lock:
+            self._remove(job_id)
+            if job.get("status") == "active":
+                self._add(_Entry(job))
+            if self._pending is not None:
+                self._pending[job_id] = job
+
+    def remove(self, job_id: Any):
+        with self._lock:
+            self._remove(str(job_id))
+            if self._pending is not None:
+                self._pending[str(job_id)] = None
+
+    def begin_load(self):
+        """Start recording writes so a following replace_all() does not drop them"""
+        with self._lock:
+            if self._pending is None:
+                self._pending = {}
+
+    def abort_load(self):
+        with self._lock:
+            self._pending = None
+
+    def replace_all(self, jobs: Iterable[Dict[str, Any]]):
+        entries = [_Entry(job) for job in jobs if job.get("status") == "active"]
+        with self._lock:
+            pending, self._pending = self._pending or {}, None
+            self._entries, self._token_jobs, self._sorted_tokens, self._gram_jobs = {}, {}, [], {}
+            for entry in entries:
+                self._add(entry, keep_sorted=False)
+            self._sorted_tokens = sorted(self._token_jobs)
+            for job_id, job in pending.items():
+                self._remove(job_id)
+                if job is not None and job.get("status") == "active":
+                    self._add(_Entry(job))
+            self.loaded = True
+
+    def _add(self, entry: _Entry, keep_sorted: bool = True):
+        self._entries[entry.job_id] = entry
+        for token in entry.tokens:
+            jobs = self._token_jobs.get(token)
+            if jobs is None:
+                jobs = self._token_jobs[token] = set()
+                if keep_sorted:
+                    bisect.insort(self._sorted_tokens, token)
+            jobs.add(entry.job_id)
+        for gram in entry.grams:
+            self._gram_jobs.setdefault(gram, set()).add(entry.job_id)
+
+    def _remove(self, job_id: str):
+        entry = self._entries.pop(job_id, None)
+        if entry is None:
+            return
+        for token in entry.tokens:
+            jobs = self._token_jobs.get(token)
+            if jobs is not None:
+                jobs.discard(job_id)
+                if not jobs:
+                    del self._token_jobs[token]
+                    i = bisect.bisect_left(self._sorted_tokens, token)
+                    if i < len(self._sorted_tokens) and self._sorted_tokens[i] == token:
+                        del self._sorted_tokens[i]
+        for gram in entry.grams:
+            jobs = self._gram_jobs.get(gram)
+            if jobs is not None:
+                jobs.discard(job_id)
+                if not jobs:
+                    del self._gram_jobs[gram]
+
+    # ---- lookup ---------------------------------------------------------
+
+    def _prefix_jobs(self, prefix: str) -> Set[str]:
+        jobs: Set[str] = set()
+        i = bisect.bisect_left(self._sorted_tokens, prefix)
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(prefix):
+            jobs |= self._token_jobs[self._sorted_tokens[i]]
+            i += 1
+        return jobs
+
+    def _infix_jobs(self, compact: str) -> Iterable[str]:
+        if len(compact) < 3:
+            return self._entries.keys()
+        grams = sorted(_trigrams(compact), key=lambda g: len(self._gram_jobs.get(g, ())))
+        jobs = set(self._gram_jobs.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not jobs:
+                break
+            jobs &= self._gram_jobs.get(gram, set())
+        return jobs
+
+    def search(self, query: str, limit: int = 10) -> Optional[List[Dict[str, str]]]:
+        """
+        Suggestions for a raw autocomplete query
+
+        Args:
+            query: User input (normalized here)
+            limit: Maximum suggestions
+
+        Returns:
+            Suggestions (token-prefix matches first, then infix matches; newest
+            first within each group), or None if the index is not loaded
+        """
+        if not self.loaded:
+            return None
+        tokens = _tokens(normalize_autocomplete_query(query))
+        if not tokens:
+            return []
+        compact = "".join(tokens)
+        with self._lock:
+            prefix_hits = self._prefix_jobs(tokens[0])
+            for token in tokens[1:]:
+                if not prefix_hits:
+                    break
+                prefix_hits &= self._prefix_jobs(token)
+            ranked = self._verified(prefix_hits, compact)
+            if len(ranked) < limit:
+                seen = {entry.job_id for entry in ranked}
+                ranked += self._verified((j for j in self._infix_jobs(compact) if j not in seen), compact)
+            return [entry.suggestion() for entry in ranked[:limit]]
+
+    def _verified(self, job_ids: Iterable[str], compact: str) -> List[_Entry]:
+        matches = [self._entries[j] for j in job_ids
+                   if compact in self._entries[j].fields[0] or compact in self._entries[j].fields[1]]
+        matches.sort(key=lambda entry: entry.created, reverse=True)
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"loaded": self.loaded, "jobs": len(self._entries), "tokens": len(self._sorted_tokens)}
+
+    # ---- loading --------------------------------------------------------
+
+    async def load(self, db):
+        self.begin_load()
+        try:
+            jobs = await db.jobs.find({"status": "active"}, _PROJECTION).to_list(length=None)
+        except BaseException:
+            self.abort_load()
+            raise
+        self.replace_all(jobs)
+        logger.info(f"Job autocomplete index loaded: {len(self._entries)} active jobs")
+
+    async def _refresh_loop(self, get_db: Callable[[], Awaitable[Any]], interval: float):
+        while True:
+            try:
+                await self.load(await get_db())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job autocomplete index load failed: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, get_db: Callable[[], Awaitable[Any]], interval: float = JOB_AUTOCOMPLETE_REFRESH_SECONDS):
+        if not JOB_AUTOCOMPLETE_INDEX_ENABLED or self._refresh_task is not None:
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop(get_db, interval))
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+job_autocomplete = JobAutocompleteIndex()
@@ -0,0 +1,194 @@
+"""
+Listing Layer for Gateway Service
+Paginate-then-join listings for feedback, interviews and offers
+
+The old listings ran $lookup into candidates and jobs for every document in
+the collection, pulled whole joined documents just to read name/title, and
+returned everything. Here a listing filters and paginates first (keyset
+cursor, see app/pagination.py) and only then attaches candidate names and job
+titles to the page:
+
+- "resolver" (default): NameResolver looks the page's ids up with one $in
+  query per collection, projected to the one field, and caches id -> name for
+  NAME_CACHE_TTL_SECONDS, so repeat pages usually need no join at all.
+- "lookup": a single aggregation whose $lookup stages use sub-pipelines that
+  match by _id and project only the name/title field.
+
+LISTING_JOIN_STRATEGY selects between them.
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+
+from app.pagination import apply_cursor, encode_cursor, sort_spec
+
+logger = logging.getLogger(__name__)
+
+LISTING_JOIN_STRATEGY = os.getenv("LISTING_JOIN_STRATEGY", "resolver").lower()
+NAME_CACHE_TTL_SECONDS = float(os.getenv("NAME_CACHE_TTL_SECONDS", "300"))
+NAME_CACHE_MAX_ENTRIES = int(os.getenv("NAME_CACHE_MAX_ENTRIES", "20000"))
+
+
+class NameResolver:
+    """Batched, TTL/LRU-cached id -> display field lookups for one collection"""
+
+    def __init__(self, collection: str, field_name: str, ttl_seconds: float = NAME_CACHE_TTL_SECONDS,
+                 max_entries: int = NAME_CACHE_MAX_ENTRIES):
+        self.collection = collection
+        self.field_name = field_name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve(self, db, ids: Iterable[Any]) -> Dict[str, Optional[str]]:
+        """
+        Display values for ids (unknown ids map to None)
+
+        Args:
+            db: Motor database
+            ids: ObjectIds or their string forms
+
+        Returns:
+            {id string: value}
+        """
+        now = time.monotonic()
+        found: Dict[str, Optional[str]] = {}
+        missing: List[str] = []
+        for key in dict.fromkeys(str(i) for i in ids if i):
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                self._cache.move_to_end(key)
+                found[key] = cached[1]
+            else:
+                missing.append(key)
+        self.hits += len(found)
+        self.misses += len(missing)
+        object_ids = [ObjectId(key) for key in missing if ObjectId.is_valid(key)]
+        if object_ids:
+            cursor = db[self.collection].find({"_id": {"$in": object_ids}}, {self.field_name: 1})
+            async for doc in cursor:
+                found[str(doc["_id"])] = doc.get(self.field_name)
+        for key in missing:
+            found.setdefault(key, None)
+            self._cache[key] = (now + self.ttl_seconds, found[key])
+            self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return found
+
+    def invalidate(self, doc_id: Any):
+        self._cache.pop(str(doc_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+candidate_names = NameResolver("candidates", "name")
+job_titles = NameResolver("jobs", "title")
+
+
+@dataclass
+class ListingSpec:
+    """A listable collection, its order and the names to attach to each row"""
+    collection: str
+    sort_field: str
+    direction: int = -1
+    # output field -> (id field on the row, resolver)
+    names: Dict[str, Tuple[str, NameResolver]] = field(default_factory=lambda: {
+        "candidate_name": ("candidate_id", candidate_names),
+        "job_title": ("job_id", job_titles),
+    })
+
+
+FEEDBACK_LISTING = ListingSpec("feedback", "created_at")
+INTERVIEW_LISTING = ListingSpec("interviews", "interview_date")
+OFFER_LISTING = ListingSpec("offers", "created_at")
+
+
+def _lookup_stage(spec_field: str, resolver: NameResolver, out: str) -> Dict[str, Any]:
+    to_object_id = {"$convert": {"input": f"$${spec_field}", "to": "objectId", "onError": None, "onNull": None}}
+    return {"$lookup": {
+        "from": resolver.collection,
+        "let": {spec_field: f"${spec_field}"},
+        "pipeline": [
+            {"$match": {"$expr": {"$eq": ["$_id", to_object_id]}}},
+            {"$project": {"_id": 0, resolver.field_name: 1}},
+        ],
+        "as": f"_{out}",
+    }}
+
+
+def joined_page_pipeline(spec: ListingSpec, match: Dict[str, Any], limit: Optional[int],
+                         offset: int = 0) -> List[Dict[str, Any]]:
+    """Aggregation that pages first, then joins names through projected sub-pipelines"""
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": match},
+        {"$sort": dict(sort_spec(spec.sort_field, spec.direction))},
+    ]
+    if offset:
+        pipeline.append({"$skip": offset})
+    if limit is not None:
+        pipeline.append({"$limit": limit})
+    for out, (id_field, resolver) in spec.names.items():
+        pipeline.append(_lookup_stage(id_field, resolver, out))
+        pipeline.append({"$set": {out: {"$first": f"$_{out}.{resolver.field_name}"}}})
+        pipeline.append({"$unset": f"_{out}"})
+    return pipeline
+
+
+async def list_page(db, spec: ListingSpec, match: Dict[str, Any], limit: Optional[int], cursor: Optional[str] = None,
+                    offset: int = 0, strategy: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of a listing with names attached
+
+    Args:
+        db: Motor database
+        spec: Collection, ordering and name joins
+        match: Listing filter (applied before paging and joining)
+        limit: Page size (None returns every matching row, with no next cursor)
+        cursor: Keyset cursor from the previous page
+        offset: Rows to skip when no cursor is given
+        strategy: "resolver" or "lookup" (defaults to LISTING_JOIN_STRATEGY)
+
+    Returns:
+        (documents, next cursor or None on the last page)
+
+    Raises:
+        InvalidCursor: Bad cursor token
+    """
+    strategy = strategy or LISTING_JOIN_STRATEGY
+    query = apply_cursor(match, cursor, spec.sort_field, spec.direction)
+    skip = 0 if cursor else offset
+    collection = db[spec.collection]
+    fetch = None if limit is None else limit + 1
+    if strategy == "lookup":
+        pipeline = joined_page_pipeline(spec, query, fetch, skip)
+        docs = await collection.aggregate(pipeline).to_list(length=fetch)
+    else:
+        find = collection.find(query).sort(sort_spec(spec.sort_field, spec.direction))
+        if skip:
+            find = find.skip(skip)
+        if fetch is not None:
+            find = find.limit(fetch)
+        docs = await find.to_list(length=fetch)
+    next_cursor = None
+    if limit is not None and len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], spec.sort_field, spec.direction)
+    if strategy != "lookup":
+        joins = list(spec.names.items())
+        resolved = await asyncio.gather(*(
+            resolver.resolve(db, [doc.get(id_field) for doc in docs]) for _, (id_field, resolver) in joins
+        ))
+        for (out, (id_field, _)), names in zip(joins, resolved):
+            for doc in docs:
+                doc[out] = names.get(str(doc.get(id_field))) if doc.get(id_field) else None
+    return docs, next_cursor
@@ -16,53 +16,59 @@ import re
 import string
 import random
 import jwt
-import bcrypt
-from collections import defaultdict
 # MongoDB imports (migrated from SQLAlchemy/PostgreSQL)
 from app.database import get_mongo_db, get_mongo_client
 from app.db_helpers import find_one_by_field, find_many, count_documents, insert_one, update_one, delete_one, convert_objectid_to_str
+from app.match_cache import match_cache, MATCH_CACHE_ENABLED
+from app.http_clients import upstream_clients
+from app.rate_limiter import rate_limiter
+from app.event_bus import event_bus
+from app.pipeline_counters import pipeline_counters
+from app.candidate_stats import candidate_stats
+from app.candidate_search import candidate_search
+from app.pagination import fetch_page, InvalidCursor, DESCENDING
+from app.job_autocomplete import job_autocomplete, normalize_autocomplete_query, fuzzy_regex_from_query
+from app.facets import facet_service, extract_skills_from_requirements
+from app.bulk_ingest import ingest_candidates
+from app.parse_jobs import parse_jobs, ParseQueueFull, PARSE_MAX_FILES_PER_JOB
+from app.listing import list_page, candidate_names, FEEDBACK_LISTING, INTERVIEW_LISTING, OFFER_LISTING
+from app.report_export import job_report_rows, csv_chunks, ndjson_chunks, encode_stream, JOB_REPORT_COLUMNS
+from app.password_hashing import password_hasher, PasswordHashBusy
+from app.single_flight import single_flight
+from app.etag import conditional, collection_versions
+from app.mongo_profiler import mongo_profiler
 from bson import ObjectId
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 from pydantic import BaseModel, field_validator, Field, model_validator
 import time
 import asyncio
 import logging
 import traceback
-import psutil
 
 logger = logging.getLogger(__name__)
 
-# In-memory SSE channels for connection events (client and recruiter notified simultaneously)
-_connection_event_queues: Dict[str, List[asyncio.Queue]] = {}
-_connection_event_lock = asyncio.Lock()
+# Strong references to fire-and-forget tasks so they are not collected mid-flight
+_background_tasks: Set[asyncio.Task] = set()
 
+def _schedule_candidate_embedding_sync(candidate_ids: List[str]) -> None:
+    """Ask the agent to (re)encode embeddings for freshly written candidates (fire-and-forget)."""
+    agent_url = os.getenv("AGENT_SERVICE_URL")
+    if not candidate_ids or not agent_url or os.getenv("AGENT_EMBEDDING_SYNC", "true").lower() != "true":
+        return
 
-async def _push_connection_event(channel: str, event: Dict[str, Any]) -> None:
-    """Push an event to all subscribers of a channel (e.g. 'client:123' or 'recruiter:456')."""
-    async with _connection_event_lock:
-        queues = list(_connection_event_queues.get(channel, []))
-    for q in queues:
+    async def _sync():
         try:
-            q.put_nowait(event)
-        except asyncio.QueueFull:
-            pass
-
-
-async def _subscribe_connection_events(channel: str) -> asyncio.Queue:
-    """Subscribe to connection events for a channel. Returns a queue that will receive events."""
-    q: asyncio.Queue = asyncio.Queue(maxsize=32)
-    async with _connection_event_lock:
-        _connection_event_queues.setdefault(channel, []).append(q)
-    return q
-
-
-def _unsubscribe_connection_events(channel: str, q: asyncio.Queue) -> None:
-    async def _remove():
-        async with _connection_event_lock:
-            lst = _connection_event_queues.get(channel, [])
-            if q in lst:
-                lst.remove(q)
-    asyncio.create_task(_remove())
+            await upstream_clients.request(
+                "agent_sync", "POST", "/embeddings/sync",
+                json={"candidate_ids": [str(cid) for cid in candidate_ids]},
+                headers={"Authorization": f"Bearer {os.getenv('API_KEY_SECRET')}"},
+                timeout=30.0
+            )
+        except Exception as e:
+            logger.debug(f"Candidate embedding sync skipped: {e}")
+    task = asyncio.create_task(_sync())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
 
 
 # Import configuration
@@ -93,6 +99,7 @@ try:
         get_recruiter_auth as jwt_get_recruiter_auth,
         require_role as jwt_require_role,
         get_optional_auth as jwt_get_optional_auth,
+        verified_tokens as jwt_verified_tokens,
     )
 except ImportError:
     # Fallback if monitoring module is not available
@@ -123,6 +130,7 @@ except ImportError:
             get_recruiter_auth as jwt_get_recruiter_auth,
             require_role as jwt_require_role,
             get_optional_auth as jwt_get_optional_auth,
+            verified_tokens as jwt_verified_tokens,
         )
     except ImportError:
         jwt_get_auth = None
@@ -132,6 +140,7 @@ except ImportError:
         jwt_get_recruiter_auth = None
         jwt_require_role = None
         jwt_get_optional_auth = None
+        jwt_verified_tokens = None
 
 # Use security scheme from jwt_auth.py (with auto_error=False) if available
 # Otherwise create a fallback with auto_error=False to allow credentials to be None
@@ -215,6 +224,43 @@ except ImportError as e:
     print(f"WARNING: RL routes not available: {e}")
     pass  # RL routes optional
 
+@app.on_event("startup")
+async def _start_rate_limiter():
+    """Start the background CPU sampler used for load-based rate limits."""
+    rate_limiter.start()
+
+@app.on_event("startup")
+async def _start_pipeline_counter_reconciliation():
+    """Rebuild dashboard pipeline counters now and periodically."""
+    pipeline_counters.start_reconciliation(get_mongo_db)
+
+@app.on_event("startup")
+async def _start_job_autocomplete_index():
+    """Load the job autocomplete index and keep it refreshed."""
+    job_autocomplete.start(get_mongo_db)
+
+@app.on_event("startup")
+async def _start_facet_dictionaries():
+    """Load the skill/location facet dictionaries and keep them refreshed."""
+    facet_service.start(get_mongo_db)
+
+@app.on_event("startup")
+async def _start_event_bus():
+    """Start listening for connection events published by other gateway workers."""
+    event_bus.start()
+
+@app.on_event("shutdown")
+async def _close_upstream_clients():
+    """Close pooled agent/LangGraph connections."""
+    await upstream_clients.aclose()
+    await rate_limiter.aclose()
+    await pipeline_counters.stop()
+    await job_autocomplete.stop()
+    await facet_service.stop()
+    await parse_jobs.aclose()
+    await event_bus.aclose()
+    await password_hasher.aclose()
+
 # Add monitoring endpoints
 @app.get("/metrics", tags=["Monitoring"])
 async def get_prometheus_metrics():
@@ -232,12 +278,19 @@ async def metrics_dashboard():
     return {
         "performance_summary": monitor.get_performance_summary(24),
         "business_metrics": monitor.get_business_metrics(),
-        "system_metrics": monitor.collect_system_metrics()
+        "system_metrics": monitor.collect_system_metrics(),
+        "upstreams": upstream_clients.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "resume_parser": parse_jobs.stats(),
+        "event_bus": event_bus.stats(),
+        "jwt_cache": jwt_verified_tokens.stats() if jwt_verified_tokens is not None else {"enabled": False},
+        "password_hashing": password_hasher.stats(),
+        "single_flight": single_flight.stats(),
+        "etag": conditional.stats(),
+        "mongo_profiler": mongo_profiler.stats()
     }
 
-# Enhanced Granular Rate Limiting
-
-rate_limit_storage = defaultdict(list)
+# Enhanced Granular Rate Limiting (token buckets, see app/rate_limiter.py)
 
 # Granular rate limits by endpoint and user tier
 RATE_LIMITS = {
@@ -257,52 +310,45 @@ RATE_LIMITS = {
     }
 }
 
-def get_dynamic_rate_limit(endpoint: str, user_tier: str = "default") -> int:
-    """Dynamic rate limiting based on system load"""
-    cpu_usage = psutil.cpu_percent()
-    base_limit = RATE_LIMITS[user_tier].get(endpoint, RATE_LIMITS[user_tier]["default"])
-    
-    if cpu_usage > 80:
-        return int(base_limit * 0.5)  # Reduce by 50% during high load
-    elif cpu_usage < 30:
-        return int(base_limit * 1.5)  # Increase by 50% during low load
-    return base_limit
-
 async def rate_limit_middleware(request: Request, call_next):
-    client_ip = request.client.host
-    current_time = time.time()
+    client_ip = request.client.host if request.client else "unknown"
     endpoint_path = request.url.path
     
     # Determine user tier (simplified - in production, get from JWT/database)
     user_tier = "premium" if "enterprise" in request.headers.get("user-agent", "").lower() else "default"
+    base_limit = RATE_LIMITS[user_tier].get(endpoint_path, RATE_LIMITS[user_tier]["default"])
     
-    # Get dynamic rate limit for this endpoint
-    rate_limit = get_dynamic_rate_limit(endpoint_path, user_tier)
-    
-    # Clean old requests (older than 1 minute)
-    key = f"{client_ip}:{endpoint_path}"
-    rate_limit_storage[key] = [
-        req_time for req_time in rate_limit_storage[key] 
-        if current_time - req_time < 60
-    ]
-    
-    # Check granular rate limit
-    if len(rate_limit_storage[key]) >= rate_limit:
-        raise HTTPException(
-            status_code=429, 
-            detail=f"Rate limit exceeded for {endpoint_path}. Limit: {rate_limit}/min"
+    decision = await rate_limiter.check(f"{client_ip}:{endpoint_path}", base_limit)
+    if not decision.allowed:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": f"Rate limit exceeded for {endpoint_path}. Limit: {decision.limit}/min"},
+            headers={
+                "Retry-After": str(max(1, int(decision.retry_after + 0.999))),
+                "X-RateLimit-Limit": str(decision.limit),
+                "X-RateLimit-Remaining": "0",
+            },
         )
     
-    # Record this request
-    rate_limit_storage[key].append(current_time)
-    
     response = await call_next(request)
-    response.headers["X-RateLimit-Limit"] = str(rate_limit)
-    response.headers["X-RateLimit-Remaining"] = str(rate_limit - len(rate_limit_storage[key]))
+    response.headers["X-RateLimit-Limit"] = str(decision.limit)
+    response.headers["X-RateLimit-Remaining"] = str(decision.remaining)
     return response
 
 app.middleware("http")(rate_limit_middleware)
 
+async def mongo_profiler_middleware(request: Request, call_next):
+    """Charge Mongo commands to the route being served (see app/mongo_profiler.py)"""
+    if not mongo_profiler.enabled:
+        return await call_next(request)
+    with mongo_profiler.track_request(request.scope) as usage:
+        response = await call_next(request)
+    if usage.commands:
+        response.headers["Server-Timing"] = f'mongo;dur={usage.seconds * 1000:.1f};desc="{usage.commands} commands"'
+    return response
+
+app.middleware("http")(mongo_profiler_middleware)
+
 class JobCreate(BaseModel):
     title: str
     department: str  # Required: e.g., "Engineering", "Marketing", "Sales"
@@ -608,6 +654,23 @@ def health_check(response: Response):
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
+@app.get("/v1/diagnostics/mongo", tags=["Monitoring"])
+async def mongo_diagnostics(explain: bool = False, top: int = 10, api_key: str = Depends(get_api_key)):
+    """Mongo time per route, most expensive query shapes, slow-query log and index suggestions.
+    explain=true first captures queryPlanner plans for the top shapes (runs explain against the database)."""
+    top = max(1, min(top, 100))
+    explained = 0
+    if explain:
+        explained = await mongo_profiler.explain_top(await get_mongo_db(), top)
+    return {
+        "summary": mongo_profiler.stats(),
+        "routes": mongo_profiler.route_stats(),
+        "top_shapes": mongo_profiler.top_shapes(top),
+        "slow_queries": mongo_profiler.slow_queries(),
+        "index_suggestions": mongo_profiler.index_suggestions(),
+        "explained": explained,
+    }
+
 @app.get("/v1/test-candidates", tags=["Core API Endpoints"])
 async def test_candidates_db(api_key: str = Depends(get_api_key)):
     """Database Connectivity Test - MongoDB Atlas"""
@@ -701,6 +764,13 @@ async def create_job(job: JobCreate, auth: dict = Depends(get_auth)):
         
         result = await db.jobs.insert_one(document)
         job_id = str(result.inserted_id)
+        match_cache.invalidate_job(job_id, reason="job")
+        pipeline_counters.schedule_job_refresh(job_id, get_mongo_db)
+        candidate_stats.invalidate(reason="job")
+        job_autocomplete.upsert(document)
+        facet_service.update_job(document)
+        single_flight.invalidate("jobs.")
+        await collection_versions.bump(db, "jobs")
         
         return {
             "message": "Job created successfully",
@@ -763,14 +833,18 @@ def _job_salary_from_doc(doc: Dict[str, Any]) -> tuple:
 
 
 @app.get("/v1/jobs", tags=["Job Management"])
+@conditional.route("jobs.list", "jobs")
+@single_flight.route("jobs.list")
 async def list_jobs(
     search: Optional[str] = None,
     skills: Optional[str] = None,
     location: Optional[str] = None,
     experience: Optional[str] = None,
     job_type: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ):
-    """List Active Jobs with optional search and filters (Public Endpoint)."""
+    """List Active Jobs with optional search and filters (Public Endpoint). Newest first; pass next_cursor back as cursor for the next page."""
     try:
         db = await get_mongo_db()
         query = {"status": "active"}
@@ -790,8 +864,8 @@ async def list_jobs(
             query["experience_level"] = {"$regex": re.escape(experience.strip())[:50], "$options": "i"}
         if job_type and job_type.strip():
             query["job_type"] = {"$regex": re.escape(job_type.strip())[:50], "$options": "i"}
-        cursor = db.jobs.find(query).sort("created_at", -1).limit(100)
-        jobs_list = await cursor.to_list(length=100)
+        jobs_list, next_cursor = await fetch_page(
+            db.jobs, query, "created_at", DESCENDING, max(1, min(limit, 500)), cursor=cursor)
         jobs = []
         for doc in jobs_list:
             salary_min, salary_max = _job_salary_from_doc(doc)
@@ -809,48 +883,30 @@ async def list_jobs(
                 "salary_max": salary_max,
                 "created_at": doc.get("created_at").isoformat() if doc.get("created_at") else None
             })
-        return {"jobs": jobs, "count": len(jobs)}
+        return {"jobs": jobs, "count": len(jobs), "next_cursor": next_cursor}
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         return {"jobs": [], "count": 0, "error": str(e)}
 
 
 @app.get("/v1/jobs/autocomplete", tags=["Job Management"])
+@single_flight.route("jobs.autocomplete")
 async def jobs_autocomplete(q: Optional[str] = None, limit: int = 10):
-    """Search-as-you-type: return job suggestions by title or department (public for candidate job search)."""
-    def _normalize_autocomplete_query(raw: str) -> str:
-        """Normalize user query for autocomplete matching.
-        - Removes/normalizes special characters (/, \\, -, etc.) into spaces
-        - Keeps only letters/numbers/spaces for fuzzy matching
-        """
-        if raw is None:
-            return ""
-        s = str(raw).strip()
-        if not s:
-            return ""
-        # Convert common separators/symbols into spaces, then strip any remaining non-alphanumerics.
-        s = re.sub(r"[\\/]+", " ", s)
-        s = re.sub(r"[^A-Za-z0-9]+", " ", s)
-        s = re.sub(r"\s+", " ", s).strip()
-        return s[:50]
-
-    def _fuzzy_regex_from_query(norm: str) -> Optional[str]:
-        """Build a fuzzy regex that matches tokens with any non-word separators between them.
-        Example: 'AR VR Engineer' -> 'AR[\\s\\W_]*VR[\\s\\W_]*Engineer'
-        """
-        tokens = [t for t in (norm or "").split(" ") if t]
-        if not tokens:
-            return None
-        return r"[\s\W_]*".join(re.escape(t) for t in tokens)[:200]
-
+    """Search-as-you-type: return job suggestions by title or department (public for candidate job search).
+    Served from the in-process index (app/job_autocomplete.py); Mongo is only queried until it has loaded."""
     if not q or not str(q).strip():
         return {"suggestions": []}
-    q_norm = _normalize_autocomplete_query(q)
+    q_norm = normalize_autocomplete_query(q)
     if not q_norm:
         return {"suggestions": []}
     limit = max(1, min(limit, 20))
+    suggestions = job_autocomplete.search(q_norm, limit)
+    if suggestions is not None:
+        return {"suggestions": suggestions}
     try:
         db = await get_mongo_db()
-        regex_pat = _fuzzy_regex_from_query(q_norm) or re.escape(q_norm)
+        regex_pat = fuzzy_regex_from_query(q_norm) or re.escape(q_norm)
         regex = {"$regex": regex_pat, "$options": "i"}
         cursor = db.jobs.find({
             "status": "active",
@@ -870,22 +926,14 @@ async def jobs_autocomplete(q: Optional[str] = None, limit: int = 10):
         return {"suggestions": [], "error": str(e)}
 
 
-def _extract_skills_from_requirements(requirements: str) -> set:
-    """Extract skill-like tokens from job requirements string (comma/space separated)."""
-    if not requirements or not isinstance(requirements, str):
-        return set()
-    seen = set()
-    for part in re.split(r"[,/\n;|]+", requirements):
-        for token in part.split():
-            token = token.strip()
-            if len(token) >= 2 and re.match(r"^[A-Za-z0-9.+_-]+$", token):
-                seen.add(token)
-    return seen
+def _facet_suggestions(values) -> dict:
+    return {"suggestions": [{"id": label, "label": label, "count": count} for label, count in values]}
 
 
 @app.get("/v1/jobs/skills/autocomplete", tags=["Job Management"])
 async def job_skills_autocomplete(q: Optional[str] = None, limit: int = 15):
-    """Search-as-you-type: return skill suggestions from active jobs' requirements (public for candidate browse jobs)."""
+    """Search-as-you-type: return skill suggestions from active jobs' requirements (public for candidate browse jobs).
+    Served from the in-process facet dictionary (app/facets.py); Mongo is only scanned until it has loaded."""
     if not q or not str(q).strip():
         return {"suggestions": []}
     q = str(q).strip()[:50]
@@ -896,6 +944,8 @@ async def job_skills_autocomplete(q: Optional[str] = None, limit: int = 15):
     if not q_norm:
         return {"suggestions": []}
     limit = max(1, min(limit, 25))
+    if facet_service.loaded:
+        return _facet_suggestions(facet_service.job_skills.search(q_norm, limit))
     try:
         db = await get_mongo_db()
         cursor = db.jobs.find({"status": "active"}, {"requirements": 1})
@@ -903,7 +953,7 @@ async def job_skills_autocomplete(q: Optional[str] = None, limit: int = 15):
         all_skills = set()
         for doc in jobs_list:
             req = doc.get("requirements") or ""
-            all_skills.update(_extract_skills_from_requirements(req))
+            all_skills.update(extract_skills_from_requirements(req))
         def _norm_token(s: str) -> str:
             return re.sub(r"[^a-z0-9]+", "", (s or "").lower())
 
@@ -919,7 +969,8 @@ async def job_skills_autocomplete(q: Optional[str] = None, limit: int = 15):
 
 @app.get("/v1/jobs/locations/autocomplete", tags=["Job Management"])
 async def job_locations_autocomplete(q: Optional[str] = None, limit: int = 15):
-    """Search-as-you-type: return location suggestions from active jobs (public for candidate browse jobs)."""
+    """Search-as-you-type: return location suggestions from active jobs (public for candidate browse jobs).
+    Served from the in-process facet dictionary (app/facets.py); Mongo is only queried until it has loaded."""
     if not q or not str(q).strip():
         return {"suggestions": []}
     q = str(q).strip()[:50]
@@ -929,6 +980,8 @@ async def job_locations_autocomplete(q: Optional[str] = None, limit: int = 15):
     if not q_norm:
         return {"suggestions": []}
     limit = max(1, min(limit, 25))
+    if facet_service.loaded:
+        return _facet_suggestions(facet_service.job_locations.search(q_norm, limit))
     try:
         db = await get_mongo_db()
         regex_pat = r"[\s\W_]*".join(re.escape(t) for t in q_norm.split(" ") if t)[:200]
@@ -946,7 +999,19 @@ async def job_locations_autocomplete(q: Optional[str] = None, limit: int = 15):
         return {"suggestions": [], "error": str(e)}
 
 
+async def _authorize_job_read(job_id: str, auth: Optional[dict] = None):
+    """Client data isolation: own jobs + connected recruiter's jobs when connected (raises 403)."""
+    if auth and auth.get("type") == "jwt_token" and auth.get("role") == "client":
+        db = await get_mongo_db()
+        client_id = str(auth.get("user_id", ""))
+        job_ids = await _client_job_ids_for_dashboard(db, client_id)
+        if job_id not in job_ids:
+            raise HTTPException(status_code=403, detail="You can only view your own jobs")
+
+
 @app.get("/v1/jobs/{job_id}", tags=["Job Management"])
+@conditional.route("jobs.detail", "jobs", doc_param="job_id", authorize=_authorize_job_read)
+@single_flight.route("jobs.detail")
 async def get_job_by_id(job_id: str, auth: Optional[dict] = Depends(get_optional_auth)):
     """Get a single job by ID (MongoDB ObjectId string or legacy id). Client JWT: only own jobs."""
     if not job_id:
@@ -959,12 +1024,7 @@ async def get_job_by_id(job_id: str, auth: Optional[dict] = Depends(get_optional
             doc = await db.jobs.find_one({"id": job_id})
         if not doc:
             raise HTTPException(status_code=404, detail="Job not found")
-        # Client data isolation: own jobs + connected recruiter's jobs when connected
-        if auth and auth.get("type") == "jwt_token" and auth.get("role") == "client":
-            client_id = str(auth.get("user_id", ""))
-            job_ids = await _client_job_ids_for_dashboard(db, client_id)
-            if job_id not in job_ids:
-                raise HTTPException(status_code=403, detail="You can only view your own jobs")
+        await _authorize_job_read(job_id, auth)
         salary_min, salary_max = _job_salary_from_doc(doc)
         return {
             "id": str(doc["_id"]),
@@ -1016,18 +1076,21 @@ async def shortlist_candidate_for_job(job_id: str, body: ShortlistRequest, auth=
                 "created_at": now,
                 "updated_at": now,
             })
+        match_cache.invalidate_job(job_id, reason="application")
+        pipeline_counters.schedule_job_refresh(job_id, get_mongo_db)
         return {"message": "Candidate shortlisted", "job_id": job_id, "candidate_id": body.candidate_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Candidate Management (5 endpoints)
 @app.get("/v1/candidates", tags=["Candidate Management"])
-async def get_all_candidates(limit: int = 50, offset: int = 0, auth=Depends(get_auth)):
-    """Get All Candidates with Pagination"""
+async def get_all_candidates(limit: int = 50, offset: int = 0, cursor: Optional[str] = None, auth=Depends(get_auth)):
+    """Get All Candidates with Pagination (limit/offset, or cursor = next_cursor from the previous page)"""
     try:
         db = await get_mongo_db()
-        cursor = db.candidates.find({}).sort("created_at", -1).skip(offset).limit(limit)
-        candidates_list = await cursor.to_list(length=limit)
+        limit = max(1, min(limit, 2000))
+        candidates_list, next_cursor = await fetch_page(
+            db.candidates, {}, "created_at", DESCENDING, limit, cursor=cursor, offset=max(0, offset))
         
         candidates = []
         for doc in candidates_list:
@@ -1051,8 +1114,11 @@ async def get_all_candidates(limit: int = 50, offset: int = 0, auth=Depends(get_
             "total": total_count,
             "limit": limit,
             "offset": offset,
-            "count": len(candidates)
+            "count": len(candidates),
+            "next_cursor": next_cursor
         }
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         return {"candidates": [], "total": 0, "error": str(e)}
 
@@ -1073,60 +1139,8 @@ async def get_candidate_stats(auth=Depends(get_auth)):
     """
     try:
         db = await get_mongo_db()
-        
-        # Get total candidates count
-        total_candidates = await db.candidates.count_documents({})
-        
-        # Get active jobs count
-        active_jobs = await db.jobs.count_documents({"status": "active"})
-        
-        # Get recent matches count (from matching_cache collection if exists)
-        try:
-            seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
-            recent_matches = await db.matching_cache.count_documents({
-                "created_at": {"$gte": seven_days_ago}
-            })
-        except:
-            # Fallback: estimate based on candidates and jobs
-            recent_matches = min(total_candidates * active_jobs // 10, 50) if total_candidates > 0 and active_jobs > 0 else 0
-        
-        # Get pending interviews count
-        try:
-            now = datetime.now(timezone.utc)
-            pending_interviews = await db.interviews.count_documents({
-                "status": {"$in": ["scheduled", "pending"]},
-                "interview_date": {"$gte": now}
-            })
-        except:
-            # Fallback if interviews collection doesn't exist
-            pending_interviews = 0
-        
-        # Additional dynamic statistics
-        try:
-            # Get new candidates this week
-            new_candidates_this_week = await db.candidates.count_documents({
-                "created_at": {"$gte": seven_days_ago}
-            })
-        except:
-            new_candidates_this_week = 0
-        
-        try:
-            # Get feedback submissions count
-            total_feedback = await db.feedback.count_documents({})
-        except:
-            total_feedback = 0
-        
-        return {
-            "total_candidates": total_candidates,
-            "active_jobs": active_jobs,
-            "recent_matches": recent_matches,
-            "pending_interviews": pending_interviews,
-            "new_candidates_this_week": new_candidates_this_week,
-            "total_feedback_submissions": total_feedback,
-            "statistics_generated_at": datetime.now(timezone.utc).isoformat(),
-            "data_source": "mongodb_atlas",
-            "dashboard_ready": True
-        }
+        # Counts run concurrently and are cached briefly (app/candidate_stats.py)
+        return await candidate_stats.get(db)
     except Exception as e:
         return {
             "total_candidates": 0,
@@ -1291,6 +1305,38 @@ async def candidates_autocomplete(q: Optional[str] = None, limit: int = 10, auth
         return {"suggestions": [], "has_applicants": None, "error": str(e)}
 
 
+@app.get("/v1/candidates/facets/skills", tags=["Candidate Management"])
+async def candidate_skill_facets(q: Optional[str] = None, limit: int = 20, auth=Depends(get_auth)):
+    """Candidate skill facets with document counts: matches for q, or the most common skills.
+    Recruiters only see skills of applicants to their jobs (data isolation)."""
+    limit = max(1, min(limit, 50))
+    try:
+        is_recruiter = auth.get("type") == "jwt_token" and auth.get("role") == "recruiter"
+        if is_recruiter:
+            db = await get_mongo_db()
+            recruiter_id = str(auth.get("user_id", ""))
+            candidate_ids = await _recruiter_applicant_ids(db, recruiter_id) if recruiter_id else []
+            object_ids = [ObjectId(cid) for cid in candidate_ids if ObjectId.is_valid(cid)]
+            if not object_ids:
+                return {"facets": [], "has_applicants": False}
+            docs = await db.candidates.find(
+                {"_id": {"$in": object_ids}}, {"technical_skills": 1}).to_list(length=len(object_ids))
+            dictionary = facet_service.scoped_candidate_skills(docs)
+        elif facet_service.loaded:
+            dictionary = facet_service.candidate_skills
+        else:
+            db = await get_mongo_db()
+            await facet_service.ensure_loaded(db)
+            dictionary = facet_service.candidate_skills
+        values = dictionary.search(q, limit) if q and str(q).strip() else dictionary.top(limit)
+        return {
+            "facets": [{"skill": label, "count": count} for label, count in values],
+            "has_applicants": True if is_recruiter else None,
+        }
+    except Exception as e:
+        return {"facets": [], "has_applicants": None, "error": str(e)}
+
+
 @app.get("/v1/candidates/search", tags=["Candidate Management"])
 async def search_candidates(
     search: Optional[str] = None,
@@ -1305,9 +1351,13 @@ async def search_candidates(
     status: Optional[str] = None,
     limit: Optional[int] = 50,
     offset: Optional[int] = 0,
+    count: Optional[str] = None,
+    cursor: Optional[str] = None,
     auth=Depends(get_auth)
 ):
-    """Search & Filter Candidates. For recruiters: only applicants to their jobs (optionally job_id). Supports limit/offset for pagination."""
+    """Search & Filter Candidates. For recruiters: only applicants to their jobs (optionally job_id). Supports limit/offset or
+    cursor (next_cursor from the previous page) for pagination.
+    Free text is relevance-ranked via the candidate text index; count=estimate skips the exact total."""
     q_text = (search or query or "").strip()[:100]
     if skills:
         if len(skills) > 200:
@@ -1331,6 +1381,8 @@ async def search_candidates(
         raise HTTPException(status_code=400, detail="Seniority filter too long (max 100 characters).")
     if status and len(status) > 100:
         raise HTTPException(status_code=400, detail="Status filter too long (max 100 characters).")
+    if count is not None and count not in ("exact", "estimate"):
+        raise HTTPException(status_code=400, detail="count must be 'exact' or 'estimate'.")
 
     try:
         db = await get_mongo_db()
@@ -1347,18 +1399,6 @@ async def search_candidates(
                 mongo_query["_id"] = {"$in": [ObjectId(cid) for cid in candidate_ids_scope]}
             except Exception:
                 return {"candidates": [], "filters": {"skills": skills, "location": location, "experience_min": experience_min}, "count": 0, "total": 0}
-        if q_text:
-            if is_recruiter:
-                mongo_query["$or"] = [
-                    {"name": {"$regex": re.escape(q_text), "$options": "i"}},
-                    {"email": {"$regex": re.escape(q_text), "$options": "i"}},
-                ]
-            else:
-                mongo_query["$or"] = [
-                    {"name": {"$regex": re.escape(q_text), "$options": "i"}},
-                    {"email": {"$regex": re.escape(q_text), "$options": "i"}},
-                    {"technical_skills": {"$regex": re.escape(q_text), "$options": "i"}},
-                ]
         if skills:
             mongo_query["technical_skills"] = {"$regex": skills, "$options": "i"}
         if location:
@@ -1391,9 +1431,19 @@ async def search_candidates(
 
         limit = max(1, min(limit or 50, 2000))
         offset = max(0, offset or 0)
-        total = await db.candidates.count_documents(mongo_query)
-        cursor = db.candidates.find(mongo_query).sort("_id", 1).skip(offset).limit(limit)
-        candidates_list = await cursor.to_list(length=limit)
+        # Recruiters are scoped to their applicants by _id and match name/email only,
+        # so a substring match over that small set stays cheap
+        candidates_list, total, search_meta = await candidate_search.search(
+            db,
+            mongo_query,
+            q_text,
+            ["name", "email"] if is_recruiter else ["name", "email", "technical_skills"],
+            limit,
+            offset,
+            use_text_index=not is_recruiter,
+            count_mode=count,
+            cursor=cursor,
+        )
 
         candidates = []
         for doc in candidates_list:
@@ -1407,7 +1457,8 @@ async def search_candidates(
                 "experience_years": doc.get("experience_years"),
                 "seniority_level": doc.get("seniority_level"),
                 "education_level": doc.get("education_level"),
-                "status": doc.get("status")
+                "status": doc.get("status"),
+                "relevance_score": doc.get("score")
             })
 
         return {
@@ -1415,9 +1466,14 @@ async def search_candidates(
             "filters": {"skills": skills, "location": location, "experience_min": experience_min, "job_id": job_id},
             "count": len(candidates),
             "total": total,
+            "total_is_estimate": search_meta["total_is_estimate"],
+            "search_strategy": search_meta["strategy"],
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": search_meta["next_cursor"]
         }
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         return {
             "candidates": [],
@@ -1458,6 +1514,7 @@ async def get_candidates_by_job(job_id: str, auth=Depends(get_auth)):
         return {"candidates": [], "job_id": job_id, "count": 0, "error": str(e)}
 
 @app.get("/v1/candidates/{candidate_id}", tags=["Candidate Management"])
+@conditional.route("candidates.detail", "candidates", doc_param="candidate_id")
 async def get_candidate_by_id(candidate_id: str, auth=Depends(get_auth)):
     """Get Specific Candidate by ID"""
     try:
@@ -1492,324 +1549,95 @@ async def get_candidate_by_id(candidate_id: str, auth=Depends(get_auth)):
         return {"error": str(e), "candidate_id": candidate_id}
 
 
-def _normalize_header(h: str) -> str:
-    """Map common header names to canonical field names for candidate rows."""
-    h = (h or "").strip().lower().replace(" ", "_")
-    if h in ("name", "full_name", "candidate_name"):
-        return "name"
-    if h in ("email", "e-mail", "email_address"):
-        return "email"
-    if h in ("cv_url", "resume_url", "resume", "cv", "resume_path"):
-        return "cv_url"
-    if h in ("phone", "phone_number", "mobile", "contact"):
-        return "phone"
-    if h in ("experience_years", "experience", "years_of_experience", "exp"):
-        return "experience_years"
-    if h in ("status", "application_status"):
-        return "status"
-    if h in ("location", "city", "address"):
-        return "location"
-    if h in ("skills", "technical_skills", "tech_skills"):
-        return "technical_skills"
-    if h in ("designation", "title", "seniority_level", "level"):
-        return "designation"
-    if h in ("education", "education_level", "qualification"):
-        return "education_level"
-    return h
-
-
-# Regexes for resume-style PDF extraction
-_EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
-_PHONE_RE = re.compile(r"[\+]?[(]?[0-9]{2,4}[)]?[-\s\./0-9]{7,}")
-_YEARS_EXP_RE = re.compile(r"(\d+)\s*[\+\-]?\s*(?:years?\s*(?:of\s*)?(?:experience|exp\.?|yoe)|y\.?o\.?e\.?|yrs?)", re.I)
-_EDUCATION_LEVEL_RE = re.compile(
-    r"\b(ph\.?d|doctorate|m\.?tech|m\.?e\.?|m\.?s\.?c\.?|m\.?ca|mba|m\.?a\.?|m\.?com|b\.?tech|b\.?e\.?|b\.?s\.?c\.?|b\.?ca|b\.?a\.?|b\.?com|bachelor|masters?|master|graduate|post\s*graduate|pg|ug|b\.?arch)\b",
-    re.I,
-)
+_MAX_PDF_BYTES = 50 * 1024 * 1024
 
-# Common tech/skill keywords for skills extraction
-_SKILL_KEYWORDS = re.compile(
-    r"\b(python|java|javascript|typescript|react|node\.?js|angular|vue|sql|mongodb|aws|docker|kubernetes|"
-    r"html|css|php|ruby|go\b|golang|c\+\+|c\b|r\b|scala|kotlin|swift|machine\s*learning|ml\b|ai\b|"
-    r"data\s*science|tableau|power\s*bi|excel|git|jenkins|agile|rest\s*api|graphql)\b",
-    re.I,
-)
 
-# Common Indian cities and location hints (expanded; optional RESUME_KEYWORDS_URL can add more)
-_LOCATION_HINTS = re.compile(
-    r"\b(mumbai|pune|bangalore|bengaluru|delhi|ncr|noida|gurgaon|gurugram|hyderabad|chennai|kolkata|"
-    r"ahmedabad|indore|jaipur|kochi|chandigarh|nagpur|nashik|thane|remote|india|in\b|"
-    r"bhubaneswar|coimbatore|mysore|mangalore|trivandrum|surat|vadodara|raipur|bhopal|lucknow|dehradun)\b",
-    re.I,
-)
+async def _read_pdf_upload(file: UploadFile) -> bytes:
+    if not file.filename or not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="File must be a PDF")
+    content = await file.read()
+    if len(content) > _MAX_PDF_BYTES:
+        raise HTTPException(status_code=400, detail="PDF must be under 50MB")
+    return content
 
-# Optional keywords loaded from URL (env RESUME_KEYWORDS_URL) for skills/locations not in hardcoded lists
-_EXTRA_SKILLS: List[str] = []
-_EXTRA_LOCATIONS: List[str] = []
-_KEYWORDS_FETCHED = False
 
+def _auth_owner(auth: dict) -> str:
+    """Stable identity of the caller, used to scope parse jobs to their submitter."""
+    if auth.get("type") == "jwt_token":
+        return f"{auth.get('role')}:{auth.get('user_id')}"
+    for key in ("client_id", "candidate_id"):
+        if auth.get(key):
+            return f"{key}:{auth[key]}"
+    return str(auth.get("type", "anonymous"))
 
-def _fetch_optional_keywords() -> None:
-    """Fetch optional skills/locations from JSON URL (env RESUME_KEYWORDS_URL). Run once, then use cache.
-    Expected JSON: {"skills": ["word1", "word2", ...], "locations": ["city1", ...]}.
-    Any skill/location phrase in the resume text that appears in these lists will be detected."""
-    global _EXTRA_SKILLS, _EXTRA_LOCATIONS, _KEYWORDS_FETCHED
-    if _KEYWORDS_FETCHED:
-        return
-    _KEYWORDS_FETCHED = True
-    url = os.environ.get("RESUME_KEYWORDS_URL", "").strip()
-    if not url:
-        return
+
+@app.post("/v1/candidates/parse-pdf", tags=["Candidate Management"])
+async def parse_pdf_candidates(file: UploadFile = File(...), auth=Depends(get_auth)):
+    """Parse PDF: single resume → one row (name/email/phone); table-like PDF → multiple rows.
+    Parsing runs in the resume worker pool (app/parse_jobs.py); use /v1/candidates/parse-jobs for several files."""
+    content = await _read_pdf_upload(file)
     try:
-        import httpx
-        with httpx.Client(timeout=10.0) as client:
-            r = client.get(url)
-            if r.status_code != 200:
-                return
-            data = r.json()
-        if isinstance(data.get("skills"), list):
-            _EXTRA_SKILLS[:] = [str(s).strip() for s in data["skills"] if s and len(str(s).strip()) <= 80]
-        if isinstance(data.get("locations"), list):
-            _EXTRA_LOCATIONS[:] = [str(l).strip() for l in data["locations"] if l and len(str(l).strip()) <= 80]
-    except Exception:
-        pass
+        result = await parse_jobs.parse(content)
+        return {"rows": result["rows"], "count": result["count"]}
+    except ParseQueueFull:
+        raise HTTPException(status_code=503, detail="Resume parser is busy, retry shortly", headers={"Retry-After": "5"})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to parse PDF: {str(e)[:200]}")
 
 
-def _extract_one_resume_from_text(full_text: str) -> Dict[str, str]:
-    """Extract a single candidate row from resume-style free text (one person per PDF)."""
-    _fetch_optional_keywords()
-    lines = [ln.strip() for ln in full_text.splitlines() if ln.strip()]
-    row = {
-        "name": "", "email": "", "phone": "", "location": "",
-        "technical_skills": "", "experience_years": "", "designation": "", "education_level": "",
-        "status": "applied"
+@app.post("/v1/candidates/parse-jobs", tags=["Candidate Management"], status_code=202)
+async def submit_parse_job(files: List[UploadFile] = File(...), auth=Depends(get_auth)):
+    """Queue one or more resume PDFs for parsing; returns a job id immediately.
+    Poll /v1/candidates/parse-jobs/{job_id} or stream /v1/candidates/parse-jobs/{job_id}/events for results."""
+    if not files:
+        raise HTTPException(status_code=400, detail="At least one PDF is required")
+    if len(files) > PARSE_MAX_FILES_PER_JOB:
+        raise HTTPException(status_code=400, detail=f"At most {PARSE_MAX_FILES_PER_JOB} files per parse job")
+    uploads = [(file.filename, await _read_pdf_upload(file)) for file in files]
+    try:
+        db = await get_mongo_db()
+        job = await parse_jobs.submit(db, uploads, owner=_auth_owner(auth))
+    except ParseQueueFull:
+        raise HTTPException(status_code=503, detail="Resume parser is busy, retry shortly", headers={"Retry-After": "5"})
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "total_files": len(uploads),
+        "status_url": f"/v1/candidates/parse-jobs/{job.job_id}",
+        "events_url": f"/v1/candidates/parse-jobs/{job.job_id}/events",
     }
 
-    emails = _EMAIL_RE.findall(full_text)
-    if emails:
-        row["email"] = emails[0].strip()
-    phones = _PHONE_RE.findall(full_text)
-    if phones:
-        candidate_phone = phones[0].strip()
-        if len(candidate_phone) >= 7 and len(candidate_phone) <= 20:
-            row["phone"] = candidate_phone
-
-    name_candidates = []
-    for ln in lines[:15]:
-        if not ln or len(ln) > 80:
-            continue
-        if _EMAIL_RE.search(ln) or _PHONE_RE.search(ln):
-            break
-        if "@" in ln or ln.isdigit() or re.match(r"^[\d\s\-+().]+$", ln):
-            continue
-        if re.match(r"^(https?://|www\.)", ln, re.I):
-            continue
-        name_candidates.append(ln)
-    if name_candidates:
-        row["name"] = name_candidates[0][:100].strip() if name_candidates[0] else ""
-        if len(name_candidates) > 1 and not row["name"]:
-            row["name"] = name_candidates[1][:100].strip()
-
-    if not row["name"] and row["email"]:
-        for ln in lines:
-            if row["email"] in ln:
-                before = ln.split(row["email"])[0].strip()
-                if before and len(before) < 60 and "@" not in before:
-                    row["name"] = before[:100]
-                break
-    if not row["name"]:
-        row["name"] = "Candidate"
-
-    # --- Location: lines with city/location hints or "location:" / "address:"
-    for ln in lines:
-        ln_lower = ln.lower()
-        if "location" in ln_lower or "address" in ln_lower or "based in" in ln_lower or "city" in ln_lower:
-            val = re.sub(r"^(location|address|based in|city)\s*[:\-]\s*", "", ln_lower, flags=re.I).strip()
-            if val and len(val) < 80 and not _EMAIL_RE.search(val):
-                row["location"] = val[:80].strip()
-                break
-    if not row["location"]:
-        loc_m = _LOCATION_HINTS.search(full_text)
-        if loc_m:
-            row["location"] = loc_m.group(0).strip()
-    # Optional locations from RESUME_KEYWORDS_URL
-    if not row["location"] and _EXTRA_LOCATIONS:
-        for loc in _EXTRA_LOCATIONS:
-            if loc.lower() in full_text.lower():
-                row["location"] = loc
-                break
-
-    # --- Experience years: "X years experience" / "X+ years" / "X YOE"
-    years_m = _YEARS_EXP_RE.search(full_text)
-    if years_m:
-        row["experience_years"] = years_m.group(1).strip()
-    else:
-        year_range = re.search(r"(\d+)\s*-\s*(\d+)\s*(?:years?|yrs?)", full_text, re.I)
-        if year_range:
-            try:
-                a, b = int(year_range.group(1)), int(year_range.group(2))
-                row["experience_years"] = str(max(a, b) - min(a, b)) if b != a else year_range.group(1)
-            except ValueError:
-                pass
 
-    # --- Technical skills: "Skills:" section (split by comma/semicolon/pipe so we capture any phrase) or keywords
-    in_skills = False
-    skill_tokens = []
-    for ln in lines:
-        ln_lower = ln.lower()
-        if re.match(r"^(technical\s*)?skills?|technologies?|expertise\s*[:\-]", ln_lower):
-            in_skills = True
-            rest = re.sub(r"^(technical\s*)?skills?|technologies?|expertise\s*[:\-]\s*", "", ln_lower, flags=re.I).strip()
-            if rest:
-                for part in re.split(r"[,;|\t]|\s+and\s+", rest):
-                    t = part.strip()
-                    if 2 <= len(t) <= 80 and not t.isdigit() and not _EMAIL_RE.search(t):
-                        skill_tokens.append(t)
-            continue
-        if in_skills:
-            if ln_lower.startswith(("experience", "education", "project", "work ", "employment")):
-                break
-            if ln and len(ln) < 120:
-                for part in re.split(r"[,;|\t]|\s+and\s+", ln_lower):
-                    t = part.strip()
-                    if 2 <= len(t) <= 80 and not t.isdigit() and not _EMAIL_RE.search(t):
-                        skill_tokens.append(t)
-            if len(skill_tokens) >= 30:
-                break
-    # Also catch "Proficient in X, Y, Z" or "Skills: X, Y, Z" anywhere in text (any words, not just hardcoded)
-    for pat in [
-        r"(?:proficient in|skills?|technologies?|expertise)\s*[:\-]\s*([^\n]{10,300})",
-        r"(?:key\s*skills?|core\s*skills?)\s*[:\-]\s*([^\n]{10,300})",
-    ]:
-        for m in re.finditer(pat, full_text, re.I):
-            chunk = m.group(1)
-            for part in re.split(r"[,;|\t]|\s+and\s+", chunk):
-                t = part.strip()
-                if 2 <= len(t) <= 80 and not t.isdigit() and not _EMAIL_RE.search(t):
-                    skill_tokens.append(t)
-    if skill_tokens:
-        row["technical_skills"] = ", ".join(dict.fromkeys(skill_tokens))[:500]
-    if not row["technical_skills"]:
-        skills_found = _SKILL_KEYWORDS.findall(full_text)
-        if skills_found:
-            row["technical_skills"] = ", ".join(dict.fromkeys(skills_found))[:500]
-    # Merge extra skills from optional RESUME_KEYWORDS_URL that appear in text
-    if _EXTRA_SKILLS and row["technical_skills"]:
-        existing = {t.strip().lower() for t in row["technical_skills"].split(",")}
-        for s in _EXTRA_SKILLS:
-            if s.lower() in full_text.lower() and s.strip().lower() not in existing:
-                row["technical_skills"] = (row["technical_skills"].strip() + ", " + s.strip()).strip()[:500]
-                existing.add(s.strip().lower())
-    elif _EXTRA_SKILLS:
-        found = [s for s in _EXTRA_SKILLS if s.lower() in full_text.lower()]
-        if found:
-            row["technical_skills"] = ", ".join(found)[:500]
-
-    # --- Designation / title: first line after "experience" or common title keywords
-    title_keywords = re.compile(
-        r"\b(software\s*engineer|developer|engineer|analyst|manager|lead|architect|consultant|"
-        r"intern|associate|senior|junior|full\s*stack|front\s*end|back\s*end|data\s*scientist)\b",
-        re.I,
-    )
-    for i, ln in enumerate(lines):
-        ln_lower = ln.lower()
-        if "experience" in ln_lower or "work experience" in ln_lower or "employment" in ln_lower:
-            for j in range(i + 1, min(i + 4, len(lines))):
-                cand = lines[j].strip()
-                if cand and len(cand) < 80 and title_keywords.search(cand) and not _EMAIL_RE.search(cand):
-                    row["designation"] = cand[:80]
-                    break
-            if row["designation"]:
-                break
-    if not row["designation"]:
-        m = title_keywords.search(full_text)
-        if m:
-            row["designation"] = m.group(0).strip()
-    # Fallback: first line after Experience that looks like a job title (any phrase, not just hardcoded keywords)
-    if not row["designation"]:
-        date_like = re.compile(r"^(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)?\.?\s*\d{4}\s*[-–—]\s*(present|current|\d{4})", re.I)
-        for i, ln in enumerate(lines):
-            ln_lower = ln.lower()
-            if "experience" in ln_lower or "work experience" in ln_lower or "employment" in ln_lower:
-                for j in range(i + 1, min(i + 5, len(lines))):
-                    cand = lines[j].strip()
-                    if not cand or len(cand) < 5 or len(cand) > 80:
-                        continue
-                    if "@" in cand or _EMAIL_RE.search(cand) or date_like.match(cand):
-                        continue
-                    if re.match(r"^\d{4}\s*[-–—]", cand):
-                        continue
-                    row["designation"] = cand[:80]
-                    break
-                break
-
-    # --- Education level: B.Tech, M.Tech, MBA, Bachelor, etc.
-    edu_m = _EDUCATION_LEVEL_RE.search(full_text)
-    if edu_m:
-        row["education_level"] = edu_m.group(0).strip()
-
-    return row
-
-
-def _parse_pdf_as_table(lines: List[str]) -> List[Dict[str, Any]]:
-    """Parse PDF text as table (CSV-like: header row + data rows by comma/tab)."""
-    rows = []
-    headers = []
-    for i, line in enumerate(lines):
-        line = (line or "").strip()
-        if not line:
-            continue
-        parts = re.split(r"[\t,]+", line, maxsplit=14)
-        parts = [p.strip() for p in parts]
-        if i == 0 and len(parts) >= 2:
-            headers = [_normalize_header(p) for p in parts]
-            continue
-        if len(parts) >= 2:
-            row = {}
-            for j, val in enumerate(parts):
-                key = headers[j] if j < len(headers) else f"col_{j}"
-                row[key] = val
-            has_email = row.get("email") or any(_EMAIL_RE.search(str(v)) for v in row.values() if v)
-            if has_email:
-                rows.append(row)
-    return rows
+@app.get("/v1/candidates/parse-jobs/{job_id}", tags=["Candidate Management"])
+async def get_parse_job(job_id: str, auth=Depends(get_auth)):
+    """Parse job status and per-file results (rows are included for finished files)."""
+    db = await get_mongo_db()
+    job = await parse_jobs.get(db, job_id, owner=_auth_owner(auth))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Parse job not found")
+    return job
 
 
-@app.post("/v1/candidates/parse-pdf", tags=["Candidate Management"])
-async def parse_pdf_candidates(file: UploadFile = File(...), auth=Depends(get_auth)):
-    """Parse PDF: single resume → one row (name/email/phone); table-like PDF → multiple rows."""
-    if not file.filename or not file.filename.lower().endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="File must be a PDF")
-    try:
-        import PyPDF2
-        content = await file.read()
-        if len(content) > 50 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="PDF must be under 50MB")
-        reader = PyPDF2.PdfReader(io.BytesIO(content))
-        lines = []
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                lines.extend(text.splitlines())
-        full_text = "\n".join((ln or "").strip() for ln in lines if (ln or "").strip())
-        if not full_text.strip():
-            return {"rows": [], "count": 0}
-
-        table_rows = _parse_pdf_as_table(lines)
-        rows_with_email = sum(1 for r in table_rows if r.get("email") or any(_EMAIL_RE.search(str(v)) for v in r.values() if v))
-        if len(table_rows) >= 2 and rows_with_email >= 2:
-            for r in table_rows:
-                if not r.get("email"):
-                    for v in r.values():
-                        if v and _EMAIL_RE.search(str(v)):
-                            r["email"] = _EMAIL_RE.search(str(v)).group(0)
-                            break
-            return {"rows": table_rows, "count": len(table_rows)}
-
-        row = _extract_one_resume_from_text(full_text)
-        return {"rows": [row], "count": 1}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to parse PDF: {str(e)[:200]}")
+async def _parse_job_event_stream(job_id: str, owner: str):
+    async for event in parse_jobs.events(job_id, owner, heartbeat=_SSE_HEARTBEAT_INTERVAL):
+        if event is None:
+            yield ": heartbeat\n\n"
+        else:
+            yield f"data: {json.dumps(event, default=str)}\n\n"
+
+
+@app.get("/v1/candidates/parse-jobs/{job_id}/events", tags=["Candidate Management"])
+async def parse_job_events(job_id: str, auth=Depends(get_auth)):
+    """SSE stream of a parse job: one "file" event per finished file, then a final "job" event."""
+    owner = _auth_owner(auth)
+    db = await get_mongo_db()
+    if await parse_jobs.get(db, job_id, owner=owner) is None:
+        raise HTTPException(status_code=404, detail="Parse job not found")
+    return StreamingResponse(
+        _parse_job_event_stream(job_id, owner),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/v1/candidates/check-duplicates", tags=["Candidate Management"])
@@ -1845,8 +1673,6 @@ async def bulk_upload_candidates(candidates: CandidateBulk, auth=Depends(get_aut
     """Bulk Upload Candidates (recruiter JWT or API key). Inserts into candidates and, when job_id is provided, creates job_applications so dashboard stats stay in sync."""
     try:
         db = await get_mongo_db()
-        inserted_count = 0
-        errors = []
         job_id_str = (candidates.job_id or "").strip()
         # Validate job exists when job_id is provided (so we can link applicants for dashboard)
         if job_id_str:
@@ -1856,72 +1682,30 @@ async def bulk_upload_candidates(candidates: CandidateBulk, auth=Depends(get_aut
                 job_doc = await db.jobs.find_one({"id": job_id_str})
             if not job_doc:
                 raise HTTPException(status_code=400, detail="Invalid or unknown job_id for bulk upload")
-        now = datetime.now(timezone.utc)
-
-        for i, candidate in enumerate(candidates.candidates):
-            try:
-                email = candidate.get("email", "")
-                if not email:
-                    errors.append(f"Candidate {i+1}: Email is required")
-                    continue
-
-                # Check email uniqueness
-                existing = await db.candidates.find_one({"email": email})
-                if existing:
-                    # Still link existing candidate to this job for dashboard applicant count
-                    if job_id_str:
-                        candidate_id_str = str(existing["_id"])
-                        app_existing = await db.job_applications.find_one({"job_id": job_id_str, "candidate_id": candidate_id_str})
-                        if not app_existing:
-                            await db.job_applications.insert_one({
-                                "job_id": job_id_str,
-                                "candidate_id": candidate_id_str,
-                                "status": "applied",
-                                "applied_date": now
-                            })
-                    errors.append(f"Candidate {i+1}: Email {email} already exists")
-                    continue
-
-                # Insert candidate
-                document = {
-                    "name": candidate.get("name", "Unknown"),
-                    "email": email,
-                    "phone": candidate.get("phone", ""),
-                    "location": candidate.get("location", ""),
-                    "experience_years": max(0, int(candidate.get("experience_years", 0)) if str(candidate.get("experience_years", 0)).isdigit() else 0),
-                    "technical_skills": candidate.get("technical_skills", ""),
-                    "seniority_level": candidate.get("designation", candidate.get("seniority_level", "")),
-                    "education_level": candidate.get("education_level", ""),
-                    "resume_path": candidate.get("cv_url", candidate.get("resume_path", "")),
-                    "status": candidate.get("status", "applied"),
-                    "created_at": now
-                }
-                result = await db.candidates.insert_one(document)
-                inserted_count += 1
-
-                # Link to job so recruiter dashboard "Total Applicants" and per-job counts stay in sync
-                if job_id_str and result.inserted_id:
-                    candidate_id_str = str(result.inserted_id)
-                    app_existing = await db.job_applications.find_one({"job_id": job_id_str, "candidate_id": candidate_id_str})
-                    if not app_existing:
-                        await db.job_applications.insert_one({
-                            "job_id": job_id_str,
-                            "candidate_id": candidate_id_str,
-                            "status": "applied",
-                            "applied_date": now
-                        })
-            except HTTPException:
-                raise
-            except Exception as e:
-                errors.append(f"Candidate {i+1}: {str(e)[:100]}")
-                continue
-
+        ingest = await ingest_candidates(db, candidates.candidates, job_id=job_id_str or None)
+        inserted_ids = ingest.inserted_ids
+        inserted_count = len(inserted_ids)
+        errors = ingest.errors
+        for document in ingest.inserted:
+            facet_service.update_candidate(document)
+
+        _schedule_candidate_embedding_sync(inserted_ids)
+        if inserted_ids:
+            match_cache.invalidate_all(reason="candidate")
+            candidate_stats.invalidate(reason="candidate")
+            await collection_versions.bump(db, "candidates")
+        elif job_id_str:
+            match_cache.invalidate_job(job_id_str, reason="application")
+        if job_id_str:
+            pipeline_counters.schedule_job_refresh(job_id_str, get_mongo_db)
         return {
             "message": "Bulk upload completed",
             "candidates_received": len(candidates.candidates),
             "candidates_inserted": inserted_count,
             "errors": errors[:5] if errors else [],
             "total_errors": len(errors),
+            "applications_linked": ingest.applications_linked,
+            "results": ingest.rows,
             "status": "success" if inserted_count > 0 else "failed"
         }
     except HTTPException:
@@ -1984,58 +1768,62 @@ async def get_top_matches(job_id: str, limit: int = 10, auth = Depends(get_auth)
             "agent_status": "scoped"
         }
 
+    cache_key = match_cache.make_key(job_id, candidate_ids_scope)
+    agent_result = match_cache.get(cache_key) if MATCH_CACHE_ENABLED else None
+    cache_hit = agent_result is not None
+
     try:
-        import httpx
-        agent_url = os.getenv("AGENT_SERVICE_URL")
-        agent_timeout = float(os.getenv("AGENT_MATCH_TIMEOUT", "90"))
-        payload = {"job_id": job_id, "candidate_ids": candidate_ids_scope if candidate_ids_scope else []}
-        async with httpx.AsyncClient(timeout=agent_timeout) as client:
-            response = await client.post(
-                f"{agent_url}/match",
+        if agent_result is None:
+            payload = {"job_id": job_id, "candidate_ids": candidate_ids_scope if candidate_ids_scope else []}
+            response = await upstream_clients.request(
+                "agent", "POST", "/match",
                 json=payload,
                 headers={
                     "Content-Type": "application/json",
                     "Authorization": f"Bearer {os.getenv('API_KEY_SECRET')}"
                 }
             )
-            if response.status_code == 200:
-                agent_result = response.json()
-                raw_candidates = agent_result.get("top_candidates", [])
-                scope_set = set(candidate_ids_scope) if candidate_ids_scope else None
-                if scope_set is not None:
-                    raw_candidates = [c for c in raw_candidates if str(c.get("candidate_id") or "") in scope_set]
-                    raw_candidates.sort(key=lambda c: (c.get("score") or 0), reverse=True)
-                    cap = min(limit, len(scope_set))
-                    raw_candidates = raw_candidates[:cap]
-                else:
-                    raw_candidates = raw_candidates[:limit]
-                matches = []
-                for candidate in raw_candidates:
-                    matches.append({
-                        "candidate_id": candidate.get("candidate_id"),
-                        "name": candidate.get("name"),
-                        "email": candidate.get("email"),
-                        "score": candidate.get("score"),
-                        "skills_match": ", ".join(candidate.get("skills_match", [])),
-                        "experience_match": candidate.get("experience_match"),
-                        "location_match": candidate.get("location_match"),
-                        "reasoning": candidate.get("reasoning"),
-                        "recommendation_strength": "Strong Match" if candidate.get("score", 0) > 80 else "Good Match"
-                    })
-                return {
-                    "matches": matches,
-                    "top_candidates": matches,
-                    "job_id": job_id,
-                    "limit": limit,
-                    "total_candidates": len(matches),
-                    "algorithm_version": agent_result.get("algorithm_version", "2.0.0-phase2-ai"),
-                    "processing_time": f"{agent_result.get('processing_time', 0)}s",
-                    "ai_analysis": "Real AI semantic matching via Agent Service" + (" (scoped to recruiter applicants)" if scope_set else ""),
-                    "agent_status": "connected"
-                }
-            else:
-                # 503 (engine loading), 5xx, or other non-200: use fallback matching
+            if response.status_code != 200:
+                # 503 (engine loading or busy), 5xx, or other non-200: use fallback matching
                 return await fallback_matching(job_id, limit, candidate_ids_scope=candidate_ids_scope)
+            agent_result = response.json()
+            if MATCH_CACHE_ENABLED and agent_result.get("status") == "success":
+                match_cache.set(cache_key, agent_result)
+
+        raw_candidates = agent_result.get("top_candidates", [])
+        scope_set = set(candidate_ids_scope) if candidate_ids_scope else None
+        if scope_set is not None:
+            raw_candidates = [c for c in raw_candidates if str(c.get("candidate_id") or "") in scope_set]
+            raw_candidates.sort(key=lambda c: (c.get("score") or 0), reverse=True)
+            cap = min(limit, len(scope_set))
+            raw_candidates = raw_candidates[:cap]
+        else:
+            raw_candidates = raw_candidates[:limit]
+        matches = []
+        for candidate in raw_candidates:
+            matches.append({
+                "candidate_id": candidate.get("candidate_id"),
+                "name": candidate.get("name"),
+                "email": candidate.get("email"),
+                "score": candidate.get("score"),
+                "skills_match": ", ".join(candidate.get("skills_match", [])),
+                "experience_match": candidate.get("experience_match"),
+                "location_match": candidate.get("location_match"),
+                "reasoning": candidate.get("reasoning"),
+                "recommendation_strength": "Strong Match" if candidate.get("score", 0) > 80 else "Good Match"
+            })
+        return {
+            "matches": matches,
+            "top_candidates": matches,
+            "job_id": job_id,
+            "limit": limit,
+            "total_candidates": len(matches),
+            "algorithm_version": agent_result.get("algorithm_version", "2.0.0-phase2-ai"),
+            "processing_time": f"{agent_result.get('processing_time', 0)}s",
+            "ai_analysis": "Real AI semantic matching via Agent Service" + (" (scoped to recruiter applicants)" if scope_set else ""),
+            "agent_status": "connected",
+            "cache_hit": cache_hit
+        }
     except Exception as e:
         log_error("agent_service_error", str(e), {"job_id": job_id})
         return await fallback_matching(job_id, limit, candidate_ids_scope=candidate_ids_scope)
@@ -2242,62 +2030,58 @@ async def batch_match_jobs(
         raise HTTPException(status_code=400, detail="Maximum 10 jobs can be processed in batch")
     
     try:
-        import httpx
-        agent_url = os.getenv("AGENT_SERVICE_URL")
-        
         # Call agent service for batch AI matching
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{agent_url}/batch-match",
-                json={"job_ids": job_id_list},
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {os.getenv('API_KEY_SECRET')}"
-                }
-            )
+        response = await upstream_clients.request(
+            "agent", "POST", "/batch-match",
+            json={"job_ids": job_id_list},
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {os.getenv('API_KEY_SECRET')}"
+            },
+            timeout=120.0
+        )
+        if response.status_code == 200:
+            agent_result = response.json()
             
-            if response.status_code == 200:
-                agent_result = response.json()
-                
-                # Transform agent batch response to detailed format
-                enhanced_batch_results = {}
-                for job_id_str, job_result in agent_result.get("batch_results", {}).items():
-                    matches = []
-                    for candidate in job_result.get("matches", []):
-                        matches.append({
-                            "candidate_id": candidate.get("candidate_id"),
-                            "name": candidate.get("name"),
-                            "email": candidate.get("email"),
-                            "score": candidate.get("score"),
-                            "skills_match": ", ".join(candidate.get("skills_match", [])),
-                            "experience_match": candidate.get("experience_match"),
-                            "location_match": candidate.get("location_match"),
-                            "reasoning": candidate.get("reasoning"),
-                            "recommendation_strength": "Strong Match" if candidate.get("score", 0) > 80 else "Good Match"
-                        })
-                    
-                    enhanced_batch_results[job_id_str] = {
-                        "job_id": job_result.get("job_id"),
-                        "matches": matches,
-                        "top_candidates": matches,
-                        "total_candidates": len(matches),
-                        "algorithm": job_result.get("algorithm", "phase3-ai"),
-                        "processing_time": job_result.get("processing_time", "0.5s"),
-                        "ai_analysis": "Real AI semantic matching via Agent Service"
-                    }
+            # Transform agent batch response to detailed format
+            enhanced_batch_results = {}
+            for job_id_str, job_result in agent_result.get("batch_results", {}).items():
+                matches = []
+                for candidate in job_result.get("matches", []):
+                    matches.append({
+                        "candidate_id": candidate.get("candidate_id"),
+                        "name": candidate.get("name"),
+                        "email": candidate.get("email"),
+                        "score": candidate.get("score"),
+                        "skills_match": ", ".join(candidate.get("skills_match", [])),
+                        "experience_match": candidate.get("experience_match"),
+                        "location_match": candidate.get("location_match"),
+                        "reasoning": candidate.get("reasoning"),
+                        "recommendation_strength": "Strong Match" if candidate.get("score", 0) > 80 else "Good Match"
+                    })
                 
-                return {
-                    "batch_results": enhanced_batch_results,
-                    "total_jobs_processed": agent_result.get("total_jobs_processed", len(job_ids)),
-                    "total_candidates_analyzed": agent_result.get("total_candidates_analyzed", 0),
-                    "algorithm_version": agent_result.get("algorithm_version", "3.0.0-phase3-production-batch"),
-                    "status": "success",
-                    "agent_status": "connected"
+                enhanced_batch_results[job_id_str] = {
+                    "job_id": job_result.get("job_id"),
+                    "matches": matches,
+                    "top_candidates": matches,
+                    "total_candidates": len(matches),
+                    "algorithm": job_result.get("algorithm", "phase3-ai"),
+                    "processing_time": job_result.get("processing_time", "0.5s"),
+                    "ai_analysis": "Real AI semantic matching via Agent Service"
                 }
-            else:
-                # Fallback to database batch matching
-                return await batch_fallback_matching(job_id_list)
-                
+            
+            return {
+                "batch_results": enhanced_batch_results,
+                "total_jobs_processed": agent_result.get("total_jobs_processed", len(job_ids)),
+                "total_candidates_analyzed": agent_result.get("total_candidates_analyzed", 0),
+                "algorithm_version": agent_result.get("algorithm_version", "3.0.0-phase3-production-batch"),
+                "status": "success",
+                "agent_status": "connected"
+            }
+        else:
+            # Fallback to database batch matching
+            return await batch_fallback_matching(job_id_list)
+            
     except Exception as e:
         log_error("batch_matching_error", str(e), {"job_ids": job_id_list})
         # Fallback to database batch matching
@@ -2335,6 +2119,8 @@ async def submit_feedback(feedback: FeedbackSubmission, auth = Depends(get_auth)
             document["experience_level"] = feedback.experience_level
         result = await db.feedback.insert_one(document)
         feedback_id = str(result.inserted_id)
+        pipeline_counters.schedule_job_refresh(feedback.job_id, get_mongo_db)
+        candidate_stats.invalidate(reason="feedback")
         
         return {
             "message": "Feedback submitted successfully",
@@ -2359,9 +2145,29 @@ async def submit_feedback(feedback: FeedbackSubmission, auth = Depends(get_auth)
             "job_id": feedback.job_id
         }
 
+
+def _listing_rows(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Stringify ids on listing documents (ids may be stored as ObjectId or str)."""
+    for doc in docs:
+        doc["id"] = str(doc["_id"])
+        for key in ("candidate_id", "job_id"):
+            if doc.get(key) is not None:
+                doc[key] = str(doc[key])
+    return docs
+
+
+def _listing_limit(limit: Optional[int], cursor: Optional[str]) -> Optional[int]:
+    """Page size for listings that return every row unless limit or cursor is passed."""
+    if limit is None and not cursor:
+        return None
+    return max(1, min(limit or 50, 500))
+
+
 @app.get("/v1/feedback", tags=["Assessment & Workflow"])
-async def get_all_feedback(candidate_id: Optional[str] = None, auth = Depends(get_auth)):
-    """Get All Feedback Records (supports filtering by candidate_id)"""
+async def get_all_feedback(candidate_id: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None,
+                           auth = Depends(get_auth)):
+    """Get All Feedback Records (supports filtering by candidate_id). Newest first; all by default, pass limit,
+    then next_cursor as cursor, to page. Names are attached after paging (app/listing.py)."""
     try:
         db = await get_mongo_db()
         
@@ -2375,42 +2181,9 @@ async def get_all_feedback(candidate_id: Optional[str] = None, auth = Depends(ge
                     raise HTTPException(status_code=403, detail="You can only view your own feedback")
             match_filter["candidate_id"] = candidate_id
         
-        # Use aggregation pipeline for JOIN-like behavior
-        pipeline = [
-            {"$match": match_filter} if match_filter else {"$match": {}},
-            {"$lookup": {
-                "from": "candidates",
-                "localField": "candidate_id",
-                "foreignField": "_id",
-                "as": "candidate"
-            }},
-            {"$lookup": {
-                "from": "jobs",
-                "localField": "job_id",
-                "foreignField": "_id",
-                "as": "job"
-            }},
-            {"$sort": {"created_at": -1}},
-            {"$project": {
-                "id": {"$toString": "$_id"},
-                "candidate_id": {"$toString": "$candidate_id"},
-                "job_id": {"$toString": "$job_id"},
-                "integrity": 1,
-                "honesty": 1,
-                "discipline": 1,
-                "hard_work": 1,
-                "gratitude": 1,
-                "average_score": 1,
-                "comments": 1,
-                "experience_level": 1,
-                "created_at": 1,
-                "candidate_name": {"$arrayElemAt": ["$candidate.name", 0]},
-                "job_title": {"$arrayElemAt": ["$job.title", 0]}
-            }}
-        ]
-        
-        cursor = db.feedback.aggregate(pipeline)
-        feedback_list = await cursor.to_list(length=None)
+        feedback_list, next_cursor = await list_page(
+            db, FEEDBACK_LISTING, match_filter, _listing_limit(limit, cursor), cursor=cursor)
+        _listing_rows(feedback_list)
         
         feedback_records = []
         for doc in feedback_list:
@@ -2444,15 +2217,19 @@ async def get_all_feedback(candidate_id: Optional[str] = None, auth = Depends(ge
                 "interviewer_name": None  # Frontend expects this (optional)
             })
         
-        return {"feedback": feedback_records, "count": len(feedback_records)}
+        return {"feedback": feedback_records, "count": len(feedback_records), "next_cursor": next_cursor}
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         return {"feedback": [], "count": 0, "error": str(e)}
 
 
 
 @app.get("/v1/interviews", tags=["Assessment & Workflow"])
-async def get_interviews(candidate_id: Optional[str] = None, auth = Depends(get_auth)):
-    """Get All Interviews (supports filtering by candidate_id). Recruiter: only interviews for their jobs."""
+async def get_interviews(candidate_id: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None,
+                         auth = Depends(get_auth)):
+    """Get All Interviews (supports filtering by candidate_id). Recruiter: only interviews for their jobs.
+    Latest interview date first; all by default, pass limit, then next_cursor as cursor, to page."""
     try:
         db = await get_mongo_db()
         
@@ -2469,8 +2246,8 @@ async def get_interviews(candidate_id: Optional[str] = None, auth = Depends(get_
         if auth.get("type") == "jwt_token" and auth.get("role") == "recruiter":
             recruiter_id = str(auth.get("user_id", ""))
             if recruiter_id:
-                cursor = db.jobs.find({"status": "active", "recruiter_id": recruiter_id}, {"_id": 1})
-                jobs_list = await cursor.to_list(length=500)
+                jobs_cursor = db.jobs.find({"status": "active", "recruiter_id": recruiter_id}, {"_id": 1})
+                jobs_list = await jobs_cursor.to_list(length=500)
                 job_ids = [str(doc["_id"]) for doc in jobs_list]
                 match_filter["job_id"] = {"$in": job_ids} if job_ids else {"$in": []}
         # Client: only interviews for own jobs (data isolation)
@@ -2479,52 +2256,9 @@ async def get_interviews(candidate_id: Optional[str] = None, auth = Depends(get_
             job_ids = await _client_job_ids_for_dashboard(db, client_id)
             match_filter["job_id"] = {"$in": job_ids} if job_ids else {"$in": []}
         
-        pipeline = [
-            {"$match": match_filter} if match_filter else {"$match": {}},
-            {"$addFields": {
-                "candidate_id_obj": {"$cond": [
-                    {"$and": [{"$ne": ["$candidate_id", None]}, {"$ne": ["$candidate_id", ""]}]},
-                    {"$toObjectId": "$candidate_id"},
-                    None
-                ]},
-                "job_id_obj": {"$cond": [
-                    {"$and": [{"$ne": ["$job_id", None]}, {"$ne": ["$job_id", ""]}]},
-                    {"$toObjectId": "$job_id"},
-                    None
-                ]}
-            }},
-            {"$lookup": {
-                "from": "candidates",
-                "localField": "candidate_id_obj",
-                "foreignField": "_id",
-                "as": "candidate"
-            }},
-            {"$lookup": {
-                "from": "jobs",
-                "localField": "job_id_obj",
-                "foreignField": "_id",
-                "as": "job"
-            }},
-            {"$sort": {"interview_date": -1}},
-            {"$project": {
-                "id": {"$toString": "$_id"},
-                "candidate_id": {"$toString": "$candidate_id"},
-                "job_id": {"$toString": "$job_id"},
-                "interview_date": 1,
-                "interviewer": 1,
-                "status": 1,
-                "interview_type": 1,
-                "meeting_link": 1,
-                "meeting_address": 1,
-                "meeting_phone": 1,
-                "notes": 1,
-                "candidate_name": {"$arrayElemAt": ["$candidate.name", 0]},
-                "job_title": {"$arrayElemAt": ["$job.title", 0]}
-            }}
-        ]
-        
-        cursor = db.interviews.aggregate(pipeline)
-        interviews_list = await cursor.to_list(length=None)
+        interviews_list, next_cursor = await list_page(
+            db, INTERVIEW_LISTING, match_filter, _listing_limit(limit, cursor), cursor=cursor)
+        _listing_rows(interviews_list)
         
         interviews = []
         for doc in interviews_list:
@@ -2554,7 +2288,9 @@ async def get_interviews(candidate_id: Optional[str] = None, auth = Depends(get_
                 "notes": doc.get("notes")
             })
         
-        return {"interviews": interviews, "count": len(interviews)}
+        return {"interviews": interviews, "count": len(interviews), "next_cursor": next_cursor}
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         return {"interviews": [], "count": 0, "error": str(e)}
 
@@ -2604,6 +2340,8 @@ async def schedule_interview(interview: InterviewSchedule, auth=Depends(get_auth
             document["meeting_phone"] = interview.meeting_phone
         result = await db.interviews.insert_one(document)
         interview_id = str(result.inserted_id)
+        pipeline_counters.schedule_job_refresh(interview.job_id, get_mongo_db)
+        candidate_stats.invalidate(reason="interview")
         
         return {
             "message": "Interview scheduled successfully",
@@ -2633,6 +2371,7 @@ async def create_job_offer(offer: JobOffer, api_key: str = Depends(get_api_key))
         }
         result = await db.offers.insert_one(document)
         offer_id = str(result.inserted_id)
+        pipeline_counters.schedule_job_refresh(offer.job_id, get_mongo_db)
         
         return {
             "message": "Job offer created successfully",
@@ -2654,8 +2393,10 @@ async def create_job_offer(offer: JobOffer, api_key: str = Depends(get_api_key))
         }
 
 @app.get("/v1/offers", tags=["Assessment & Workflow"])
-async def get_all_offers(candidate_id: Optional[str] = None, auth = Depends(get_auth)):
-    """Get All Job Offers (supports filtering by candidate_id)"""
+async def get_all_offers(candidate_id: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None,
+                         auth = Depends(get_auth)):
+    """Get All Job Offers (supports filtering by candidate_id). Newest first; all by default, pass limit,
+    then next_cursor as cursor, to page."""
     try:
         db = await get_mongo_db()
         
@@ -2672,8 +2413,8 @@ async def get_all_offers(candidate_id: Optional[str] = None, auth = Depends(get_
         if auth.get("type") == "jwt_token" and auth.get("role") == "recruiter":
             recruiter_id = str(auth.get("user_id", ""))
             if recruiter_id:
-                cursor = db.jobs.find({"status": "active", "recruiter_id": recruiter_id}, {"_id": 1})
-                jobs_list = await cursor.to_list(length=500)
+                jobs_cursor = db.jobs.find({"status": "active", "recruiter_id": recruiter_id}, {"_id": 1})
+                jobs_list = await jobs_cursor.to_list(length=500)
                 job_ids = [str(doc["_id"]) for doc in jobs_list]
                 match_filter["job_id"] = {"$in": job_ids} if job_ids else {"$in": []}
         # Client: only offers for own jobs (data isolation)
@@ -2682,37 +2423,9 @@ async def get_all_offers(candidate_id: Optional[str] = None, auth = Depends(get_
             job_ids = await _client_job_ids_for_dashboard(db, client_id)
             match_filter["job_id"] = {"$in": job_ids} if job_ids else {"$in": []}
         
-        pipeline = [
-            {"$match": match_filter} if match_filter else {"$match": {}},
-            {"$lookup": {
-                "from": "candidates",
-                "localField": "candidate_id",
-                "foreignField": "_id",
-                "as": "candidate"
-            }},
-            {"$lookup": {
-                "from": "jobs",
-                "localField": "job_id",
-                "foreignField": "_id",
-                "as": "job"
-            }},
-            {"$sort": {"created_at": -1}},
-            {"$project": {
-                "id": {"$toString": "$_id"},
-                "candidate_id": {"$toString": "$candidate_id"},
-                "job_id": {"$toString": "$job_id"},
-                "salary": 1,
-                "start_date": 1,
-                "terms": 1,
-                "status": 1,
-                "created_at": 1,
-                "candidate_name": {"$arrayElemAt": ["$candidate.name", 0]},
-                "job_title": {"$arrayElemAt": ["$job.title", 0]}
-            }}
-        ]
-        
-        cursor = db.offers.aggregate(pipeline)
-        offers_list = await cursor.to_list(length=None)
+        offers_list, next_cursor = await list_page(
+            db, OFFER_LISTING, match_filter, _listing_limit(limit, cursor), cursor=cursor)
+        _listing_rows(offers_list)
         
         offers = []
         for doc in offers_list:
@@ -2734,7 +2447,9 @@ async def get_all_offers(candidate_id: Optional[str] = None, auth = Depends(get_
                 "company": None  # Frontend expects this (can be added from job lookup if needed)
             })
         
-        return {"offers": offers, "count": len(offers)}
+        return {"offers": offers, "count": len(offers), "next_cursor": next_cursor}
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         return {"offers": [], "count": 0, "error": str(e)}
 
@@ -2786,16 +2501,41 @@ async def get_database_schema(api_key: str = Depends(get_api_key)):
             "checked_at": datetime.now(timezone.utc).isoformat()
         }
 
+async def _job_report_response(job_id: str, fmt: str, gzip: bool) -> StreamingResponse:
+    db = await get_mongo_db()
+    job_doc = None
+    if ObjectId.is_valid(job_id):
+        job_doc = await db.jobs.find_one({"_id": ObjectId(job_id)}, {"_id": 1})
+    if job_doc is None:
+        job_doc = await db.jobs.find_one({"id": job_id}, {"_id": 1})
+    if job_doc is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    rows = job_report_rows(db, job_id)
+    if fmt == "csv":
+        chunks, media_type = csv_chunks(rows, JOB_REPORT_COLUMNS), "text/csv"
+    else:
+        chunks, media_type = ndjson_chunks(rows), "application/x-ndjson"
+    filename = f"job_{job_id}_report.{fmt}"
+    if gzip:
+        filename, media_type = filename + ".gz", "application/gzip"
+    return StreamingResponse(
+        encode_stream(chunks, gzip=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+    )
+
+
 @app.get("/v1/reports/job/{job_id}/export.csv", tags=["Analytics & Statistics"])
-async def export_job_report(job_id: str, api_key: str = Depends(get_api_key)):  # Changed from int to str for MongoDB ObjectId
-    """Export Job Report"""
-    return {
-        "message": "Job report export",
-        "job_id": job_id,
-        "format": "CSV",
-        "download_url": f"/downloads/job_{job_id}_report.csv",
-        "generated_at": datetime.now(timezone.utc).isoformat()
-    }
+async def export_job_report(job_id: str, gzip: bool = False, api_key: str = Depends(get_api_key)):  # Changed from int to str for MongoDB ObjectId
+    """Export Job Report: one CSV row per application, joined with candidate, interviews, feedback and offers.
+    Streamed from Mongo cursors (app/report_export.py); gzip=true returns a .csv.gz attachment."""
+    return await _job_report_response(job_id, "csv", gzip)
+
+
+@app.get("/v1/reports/job/{job_id}/export.ndjson", tags=["Analytics & Statistics"])
+async def export_job_report_ndjson(job_id: str, gzip: bool = False, api_key: str = Depends(get_api_key)):
+    """Export Job Report as newline-delimited JSON (same rows as export.csv)."""
+    return await _job_report_response(job_id, "ndjson", gzip)
 
 # Client Portal API (2 endpoints)
 @app.post("/v1/client/register", tags=["Client Portal API"])
@@ -2836,7 +2576,7 @@ async def client_register(client_data: ClientRegister):
         connection_id = str(ObjectId())
 
         # Hash password
-        password_hash = bcrypt.hashpw(client_data.password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        password_hash = await password_hasher.hash(client_data.password)
 
         # Insert client (normalize client_id to string for consistent lookups)
         company_name_safe = str(client_data.company_name or "").strip()
@@ -2871,13 +2611,39 @@ async def client_register(client_data: ClientRegister):
         )
     except HTTPException as e:
         raise e
+    except PasswordHashBusy:
+        raise _password_hashing_busy()
     except Exception as e:
         logger.exception("client_register failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+def _password_hashing_busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Authentication is busy, please retry shortly",
+                         headers={"Retry-After": "1"})
+
+
+async def _timed_login(portal: str, login):
+    """Run a login coroutine, recording its latency and outcome"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await login
+        outcome = "success" if result.get("success") else "failure"
+        return result
+    except HTTPException as e:
+        outcome = "busy" if e.status_code == 503 else "error"
+        raise
+    finally:
+        password_hasher.observe_login(portal, outcome, time.perf_counter() - started)
+
+
 @app.post("/v1/client/login", tags=["Client Portal API"])
 async def client_login(login_data: ClientLogin):
     """Client Authentication with Database Integration - Supports both client_id and email"""
+    return await _timed_login("client", _client_login(login_data))
+
+
+async def _client_login(login_data: ClientLogin):
     try:
         db = await get_mongo_db()
         
@@ -2907,7 +2673,7 @@ async def client_login(login_data: ClientLogin):
         
         # Verify password
         if client.get("password_hash"):
-            if not bcrypt.checkpw(login_data.password.encode('utf-8'), client.get("password_hash").encode('utf-8')):
+            if not await password_hasher.verify(login_data.password, client.get("password_hash")):
                 # Increment failed attempts
                 new_attempts = (client.get("failed_login_attempts") or 0) + 1
                 locked_until = None
@@ -2942,16 +2708,17 @@ async def client_login(login_data: ClientLogin):
         }
         access_token = jwt.encode(token_payload, jwt_secret, algorithm="HS256")
         
-        # Reset failed attempts and update last login
+        # Reset failed attempts and update last login (upgrading the hash if BCRYPT_ROUNDS changed)
         # Use the actual client_id from the found client (works for both client_id and email login)
-        await db.clients.update_one(
-            {"client_id": client.get("client_id")},
-            {"$set": {
-                "failed_login_attempts": 0,
-                "locked_until": None,
-                "last_login": datetime.now(timezone.utc)
-            }}
-        )
+        login_update = {
+            "failed_login_attempts": 0,
+            "locked_until": None,
+            "last_login": datetime.now(timezone.utc)
+        }
+        upgraded_hash = await password_hasher.rehash_if_needed(login_data.password, client.get("password_hash"))
+        if upgraded_hash:
+            login_update["password_hash"] = upgraded_hash
+        await db.clients.update_one({"client_id": client.get("client_id")}, {"$set": login_update})
         
         return {
             "success": True,
@@ -2964,6 +2731,8 @@ async def client_login(login_data: ClientLogin):
             "permissions": ["view_jobs", "create_jobs", "view_candidates", "schedule_interviews"]
         }
             
+    except PasswordHashBusy:
+        raise _password_hashing_busy()
     except Exception as e:
         return {
             "success": False,
@@ -3061,31 +2830,29 @@ _SSE_HEARTBEAT_INTERVAL = 25.0
 
 
 async def _client_connection_event_stream(client_id: str):
-    channel = f"client:{client_id}"
-    q = await _subscribe_connection_events(channel)
+    subscription = event_bus.subscribe(f"client:{client_id}")
     try:
         while True:
             try:
-                event = await asyncio.wait_for(q.get(), timeout=_SSE_HEARTBEAT_INTERVAL)
+                event = await asyncio.wait_for(subscription.get(), timeout=_SSE_HEARTBEAT_INTERVAL)
                 yield f"data: {json.dumps(event)}\n\n"
             except asyncio.TimeoutError:
                 yield ": heartbeat\n\n"
     finally:
-        _unsubscribe_connection_events(channel, q)
+        event_bus.unsubscribe(subscription)
 
 
 async def _recruiter_connection_event_stream(recruiter_id: str):
-    channel = f"recruiter:{recruiter_id}"
-    q = await _subscribe_connection_events(channel)
+    subscription = event_bus.subscribe(f"recruiter:{recruiter_id}")
     try:
         while True:
             try:
-                event = await asyncio.wait_for(q.get(), timeout=_SSE_HEARTBEAT_INTERVAL)
+                event = await asyncio.wait_for(subscription.get(), timeout=_SSE_HEARTBEAT_INTERVAL)
                 yield f"data: {json.dumps(event)}\n\n"
             except asyncio.TimeoutError:
                 yield ": heartbeat\n\n"
     finally:
-        _unsubscribe_connection_events(channel, q)
+        event_bus.unsubscribe(subscription)
 
 
 @app.get("/v1/client/connection-events", tags=["Client Portal API"])
@@ -3159,9 +2926,10 @@ async def recruiter_confirm_connection(body: ConfirmConnectionBody, auth=Depends
         new_count = await db.client_connected_recruiter.count_documents({"client_id": client_id_str})
         if old_client_id and old_client_id != client_id_str:
             old_count = await db.client_connected_recruiter.count_documents({"client_id": old_client_id})
-            await _push_connection_event(f"client:{old_client_id}", {"event": "disconnected", "connected_count": old_count})
-        await _push_connection_event(f"client:{client_id_str}", {"event": "connected", "connected_count": new_count})
-        await _push_connection_event(f"recruiter:{recruiter_id}", {"event": "connected", "company_name": company_name})
+            await event_bus.publish(f"client:{old_client_id}", {"event": "disconnected", "connected_count": old_count})
+        await event_bus.publish(f"client:{client_id_str}", {"event": "connected", "connected_count": new_count})
+        await event_bus.publish(f"recruiter:{recruiter_id}", {"event": "connected", "company_name": company_name})
+        pipeline_counters.schedule_recruiter_refresh(recruiter_id, get_mongo_db)
         return {"client_id": client.get("client_id"), "company_name": company_name}
     except HTTPException:
         raise
@@ -3186,8 +2954,9 @@ async def recruiter_disconnect(auth=Depends(get_auth)):
             await db.client_connected_recruiter.delete_many({"recruiter_id": recruiter_id})
             if client_id:
                 new_count = await db.client_connected_recruiter.count_documents({"client_id": client_id})
-                await _push_connection_event(f"client:{client_id}", {"event": "disconnected", "connected_count": new_count})
-            await _push_connection_event(f"recruiter:{recruiter_id}", {"event": "disconnected"})
+                await event_bus.publish(f"client:{client_id}", {"event": "disconnected", "connected_count": new_count})
+            await event_bus.publish(f"recruiter:{recruiter_id}", {"event": "disconnected"})
+            pipeline_counters.schedule_recruiter_refresh(recruiter_id, get_mongo_db)
         return {}
     except Exception as e:
         logger.exception("recruiter_disconnect failed: %s", e)
@@ -3218,6 +2987,7 @@ async def get_recruiter_current_connection(auth=Depends(get_auth)):
         if not client:
             # Connection exists but client not found - cleanup
             await db.client_connected_recruiter.delete_many({"recruiter_id": recruiter_id})
+            pipeline_counters.schedule_recruiter_refresh(recruiter_id, get_mongo_db)
             return {"connection_id": None, "company_name": None}
         
         connection_id = client.get("connection_id", "")
@@ -3286,7 +3056,8 @@ async def connection_health_check(auth=Depends(get_auth)):
             if not client:
                 # Client deleted - remove connection and notify recruiter
                 await db.client_connected_recruiter.delete_many({"recruiter_id": recruiter_id})
-                await _push_connection_event(f"recruiter:{recruiter_id}", {"event": "disconnected"})
+                pipeline_counters.schedule_recruiter_refresh(recruiter_id, get_mongo_db)
+                await event_bus.publish(f"recruiter:{recruiter_id}", {"event": "disconnected"})
                 return {"healthy": False, "reason": "client_deleted", "disconnected": True}
             
             return {"healthy": True, "connected": True, "client_id": client_id}
@@ -3370,6 +3141,19 @@ async def get_client_stats(auth=Depends(get_auth)):
         }
     try:
         db = await get_mongo_db()
+        # Single read of the materialized counters (app/pipeline_counters.py)
+        counters = await pipeline_counters.get_owner_counters(db, "client", client_id)
+        if counters is not None:
+            totals = counters["all"]
+            return {
+                "active_jobs": counters["active"]["jobs"],
+                "total_applications": totals["applications"],
+                "shortlisted": totals["shortlisted"],
+                "interviews_scheduled": totals["interviews_scheduled"] or totals["interviews"],
+                "offers_made": totals["offers"],
+                "hired": totals["offers_accepted"] + totals["offers_hired"],
+            }
+        # Counters not built yet (first reconciliation pending): count live
         # Active jobs: client's jobs + connected recruiter's jobs when connected
         active_job_ids = await _client_job_ids_for_dashboard(db, client_id)
         active_jobs = len(active_job_ids)
@@ -3989,7 +3773,7 @@ async def candidate_register(candidate_data: CandidateRegister):
             return {"success": False, "error": "Email already registered"}
         
         # Hash password
-        password_hash = bcrypt.hashpw(candidate_data.password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        password_hash = await password_hasher.hash(candidate_data.password)
         
         # Get role from request (for recruiters) or default to candidate
         user_role = candidate_data.role or "candidate"
@@ -4013,18 +3797,29 @@ async def candidate_register(candidate_data: CandidateRegister):
         }
         result = await db.candidates.insert_one(document)
         candidate_id = str(result.inserted_id)
+        _schedule_candidate_embedding_sync([candidate_id])
+        match_cache.invalidate_all(reason="candidate")
+        candidate_stats.invalidate(reason="candidate")
+        facet_service.update_candidate(document)
+        await collection_versions.bump(db, "candidates")
         
         return {
             "success": True,
             "message": "Registration successful",
             "candidate_id": candidate_id
         }
+    except PasswordHashBusy:
+        raise _password_hashing_busy()
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 @app.post("/v1/candidate/login", tags=["Candidate Portal"])
 async def candidate_login(login_data: CandidateLogin):
     """Candidate Login"""
+    return await _timed_login("candidate", _candidate_login(login_data))
+
+
+async def _candidate_login(login_data: CandidateLogin):
     try:
         db = await get_mongo_db()
         
@@ -4036,8 +3831,11 @@ async def candidate_login(login_data: CandidateLogin):
         
         # Verify password hash
         if candidate.get("password_hash"):
-            if not bcrypt.checkpw(login_data.password.encode('utf-8'), candidate.get("password_hash").encode('utf-8')):
+            if not await password_hasher.verify(login_data.password, candidate.get("password_hash")):
                 return {"success": False, "error": "Invalid credentials"}
+            upgraded_hash = await password_hasher.rehash_if_needed(login_data.password, candidate.get("password_hash"))
+            if upgraded_hash:
+                await db.candidates.update_one({"_id": candidate["_id"]}, {"$set": {"password_hash": upgraded_hash}})
         # If no password hash exists, accept any password (for existing test data)
         
         # Generate JWT token
@@ -4079,38 +3877,46 @@ async def candidate_login(login_data: CandidateLogin):
                 "status": candidate.get("status")
             }
         }
+    except PasswordHashBusy:
+        raise _password_hashing_busy()
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+async def _authorize_candidate_profile_read(candidate_id: str, auth: dict):
+    """Verify the candidate_id matches the authenticated user (if using a candidate token); raises 403."""
+    auth_info = auth
+    # Support both old format (candidate_token) and new format (jwt_token with role)
+    if auth_info.get("type") in ["candidate_token", "jwt_token"]:
+        # Get candidate_id from token - try both old and new formats
+        token_candidate_id = None
+        if auth_info.get("type") == "candidate_token":
+            # Old format
+            token_candidate_id = str(auth_info.get("candidate_id", ""))
+        elif auth_info.get("type") == "jwt_token" and auth_info.get("role") == "candidate":
+            # New format from jwt_auth.py
+            token_candidate_id = str(auth_info.get("user_id", ""))
+        
+        # Compare as strings to handle ObjectId vs string differences
+        if token_candidate_id and token_candidate_id != str(candidate_id):
+            # Also try ObjectId comparison
+            try:
+                if ObjectId(token_candidate_id) != ObjectId(candidate_id):
+                    raise HTTPException(status_code=403, detail="You can only view your own profile")
+            except:
+                # If ObjectId conversion fails, use string comparison
+                if token_candidate_id != str(candidate_id):
+                    raise HTTPException(status_code=403, detail="You can only view your own profile")
+
+
 @app.get("/v1/candidate/profile/{candidate_id}", tags=["Candidate Portal"])
+@conditional.route("candidates.profile", "candidates", doc_param="candidate_id",
+                   authorize=_authorize_candidate_profile_read)
 async def get_candidate_profile(candidate_id: str, auth = Depends(get_auth)):
     """Get Candidate Profile (JWT authenticated)"""
     try:
         db = await get_mongo_db()
         
-        # Verify the candidate_id matches the authenticated user (if using JWT token)
-        auth_info = auth
-        # Support both old format (candidate_token) and new format (jwt_token with role)
-        if auth_info.get("type") in ["candidate_token", "jwt_token"]:
-            # Get candidate_id from token - try both old and new formats
-            token_candidate_id = None
-            if auth_info.get("type") == "candidate_token":
-                # Old format
-                token_candidate_id = str(auth_info.get("candidate_id", ""))
-            elif auth_info.get("type") == "jwt_token" and auth_info.get("role") == "candidate":
-                # New format from jwt_auth.py
-                token_candidate_id = str(auth_info.get("user_id", ""))
-            
-            # Compare as strings to handle ObjectId vs string differences
-            if token_candidate_id and token_candidate_id != str(candidate_id):
-                # Also try ObjectId comparison
-                try:
-                    if ObjectId(token_candidate_id) != ObjectId(candidate_id):
-                        raise HTTPException(status_code=403, detail="You can only view your own profile")
-                except:
-                    # If ObjectId conversion fails, use string comparison
-                    if token_candidate_id != str(candidate_id):
-                        raise HTTPException(status_code=403, detail="You can only view your own profile")
+        await _authorize_candidate_profile_read(candidate_id, auth)
         
         # Try to convert to ObjectId if valid, otherwise search by string id
         try:
@@ -4188,6 +3994,14 @@ async def update_candidate_profile(candidate_id: str, profile_data: CandidatePro
                 {"id": candidate_id},
                 {"$set": update_fields}
             )
+        if {"technical_skills", "seniority_level", "education_level"} & update_fields.keys():
+            _schedule_candidate_embedding_sync([candidate_id])
+        if "technical_skills" in update_fields:
+            await facet_service.refresh_candidate(db, candidate_id)
+        if "name" in update_fields:
+            candidate_names.invalidate(candidate_id)
+        match_cache.invalidate_all(reason="candidate")
+        await collection_versions.bump(db, "candidates")
         
         return {"success": True, "message": "Profile updated successfully"}
     except Exception as e:
@@ -4240,6 +4054,8 @@ async def apply_for_job(application: JobApplication, auth = Depends(get_auth)):
         }
         result = await db.job_applications.insert_one(document)
         application_id = str(result.inserted_id)
+        match_cache.invalidate_job(job_id_str, reason="application")
+        pipeline_counters.schedule_job_refresh(job_id_str, get_mongo_db)
         
         print(f"Application inserted successfully - application_id: {application_id}")
         
@@ -4382,6 +4198,20 @@ async def get_recruiter_stats(auth=Depends(get_auth)):
                 "hired": 0,
                 "assessments_completed": 0
             }
+        # Single read of the materialized counters (app/pipeline_counters.py)
+        counters = await pipeline_counters.get_owner_counters(db, "recruiter", recruiter_id)
+        if counters is not None:
+            active = counters["active"]
+            return {
+                "total_jobs": active["jobs"],
+                "total_applicants": active["applications"],
+                "shortlisted": active["shortlisted"],
+                "interviewed": active["interviews"],
+                "offers_sent": active["offers"],
+                "hired": active["offers_accepted"],
+                "assessments_completed": active["assessments"]
+            }
+        # Counters not built yet (first reconciliation pending): count live
         # Jobs posted by this recruiter (active only) – all counts below use these job_ids for isolation
         cursor = db.jobs.find({"status": "active", "recruiter_id": recruiter_id}, {"_id": 1})
         jobs_list = await cursor.to_list(length=500)
@@ -4433,43 +4263,50 @@ async def get_recruiter_stats(auth=Depends(get_auth)):
         }
 
 @app.get("/v1/candidate/applications/{candidate_id}", tags=["Candidate Portal"])
-async def get_candidate_applications(candidate_id: str, auth = Depends(get_auth)):
-    """Get Candidate Applications"""
+async def get_candidate_applications(candidate_id: str, limit: Optional[int] = None, cursor: Optional[str] = None, auth = Depends(get_auth)):
+    """Get Candidate Applications (all by default; pass limit, then next_cursor as cursor, to page)"""
     try:
         db = await get_mongo_db()
         
-        # Try multiple query strategies to find applications
         applications_list = []
+        next_cursor = None
         
-        # Strategy 1: Direct string match
-        try:
-            cursor = db.job_applications.find({"candidate_id": candidate_id}).sort("applied_date", -1)
-            applications_list = await cursor.to_list(length=None)
-            print(f"Found {len(applications_list)} applications with string match for candidate_id: {candidate_id}")
-        except Exception as e:
-            print(f"String match error: {e}")
-        
-        # Strategy 2: Try ObjectId conversion and match
-        if not applications_list:
+        if limit is not None or cursor:
+            # Keyset-paged listing, newest first
+            applications_list, next_cursor = await fetch_page(
+                db.job_applications, {"candidate_id": candidate_id}, "applied_date", DESCENDING,
+                max(1, min(limit or 50, 500)), cursor=cursor)
+        else:
+            # Try multiple query strategies to find applications
+            # Strategy 1: Direct string match
             try:
-                candidate_object_id = ObjectId(candidate_id)
-                # Try matching with ObjectId as string
-                cursor = db.job_applications.find({"candidate_id": str(candidate_object_id)}).sort("applied_date", -1)
-                applications_list = await cursor.to_list(length=None)
-                print(f"Found {len(applications_list)} applications with ObjectId string match")
+                app_cursor = db.job_applications.find({"candidate_id": candidate_id}).sort("applied_date", -1)
+                applications_list = await app_cursor.to_list(length=None)
+                print(f"Found {len(applications_list)} applications with string match for candidate_id: {candidate_id}")
             except Exception as e:
-                print(f"ObjectId match error: {e}")
-        
-        # Strategy 3: Try all variations (for debugging)
-        if not applications_list:
-            # Get all applications and filter manually (fallback)
-            all_apps = await db.job_applications.find({}).to_list(length=100)
-            print(f"Total applications in DB: {len(all_apps)}")
-            for app in all_apps:
-                app_candidate_id = str(app.get("candidate_id", ""))
-                if app_candidate_id == candidate_id or app_candidate_id == str(candidate_id):
-                    applications_list.append(app)
-            print(f"Found {len(applications_list)} applications with manual filter")
+                print(f"String match error: {e}")
+            
+            # Strategy 2: Try ObjectId conversion and match
+            if not applications_list:
+                try:
+                    candidate_object_id = ObjectId(candidate_id)
+                    # Try matching with ObjectId as string
+                    app_cursor = db.job_applications.find({"candidate_id": str(candidate_object_id)}).sort("applied_date", -1)
+                    applications_list = await app_cursor.to_list(length=None)
+                    print(f"Found {len(applications_list)} applications with ObjectId string match")
+                except Exception as e:
+                    print(f"ObjectId match error: {e}")
+            
+            # Strategy 3: Try all variations (for debugging)
+            if not applications_list:
+                # Get all applications and filter manually (fallback)
+                all_apps = await db.job_applications.find({}).to_list(length=100)
+                print(f"Total applications in DB: {len(all_apps)}")
+                for app in all_apps:
+                    app_candidate_id = str(app.get("candidate_id", ""))
+                    if app_candidate_id == candidate_id or app_candidate_id == str(candidate_id):
+                        applications_list.append(app)
+                print(f"Found {len(applications_list)} applications with manual filter")
         
         applications = []
         for doc in applications_list:
@@ -4494,6 +4331,8 @@ async def get_candidate_applications(candidate_id: str, auth = Depends(get_auth)
                 "updated_at": doc.get("applied_date").isoformat() if doc.get("applied_date") else None
             })
         
-        return {"applications": applications, "count": len(applications)}
+        return {"applications": applications, "count": len(applications), "next_cursor": next_cursor}
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         return {"applications": [], "count": 0, "error": str(e)}
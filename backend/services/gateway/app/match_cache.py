@@ -0,0 +1,118 @@
+"""
+Match Result Cache for Gateway Service
+TTL + LRU cache of agent /match results for /v1/match/{job_id}/top
+
+Entries are keyed by job id, a hash of the candidate scope (recruiter applicant
+ids, or "all") and the matching algorithm version. Writes that can change a
+ranking (jobs, candidates, applications) invalidate through the helpers below.
+The cache is per worker process; MATCH_CACHE_TTL_SECONDS bounds staleness
+across workers.
+"""
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from prometheus_client import Counter, Gauge
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+MATCH_CACHE_ENABLED = os.getenv("MATCH_CACHE_ENABLED", "true").lower() == "true"
+MATCH_CACHE_TTL_SECONDS = float(os.getenv("MATCH_CACHE_TTL_SECONDS", "120"))
+MATCH_CACHE_MAX_ENTRIES = int(os.getenv("MATCH_CACHE_MAX_ENTRIES", "512"))
+MATCH_ALGORITHM_VERSION = os.getenv("MATCH_ALGORITHM_VERSION", "3.0.0-phase3-production")
+
+if PROMETHEUS_AVAILABLE:
+    match_cache_requests = Counter('gateway_match_cache_requests_total', 'Match cache lookups', ['result'])
+    match_cache_invalidations = Counter('gateway_match_cache_invalidations_total', 'Match cache invalidations', ['reason'])
+    match_cache_entries = Gauge('gateway_match_cache_entries', 'Entries held in the match cache')
+
+CacheKey = Tuple[str, str, str]
+
+
+class MatchResultCache:
+    """Thread-safe TTL + LRU cache for agent match results"""
+
+    def __init__(self, max_entries: int = MATCH_CACHE_MAX_ENTRIES, ttl_seconds: float = MATCH_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(job_id: str, candidate_ids_scope: Optional[List[str]],
+                 algorithm_version: str = MATCH_ALGORITHM_VERSION) -> CacheKey:
+        """
+        Build the cache key for a match request
+
+        Args:
+            job_id: Job being matched
+            candidate_ids_scope: Candidate ids the match is restricted to (None = all candidates)
+            algorithm_version: Matching algorithm version
+
+        Returns:
+            (job_id, scope hash, algorithm version)
+        """
+        if candidate_ids_scope is None:
+            scope = "all"
+        else:
+            joined = ",".join(sorted(str(cid) for cid in candidate_ids_scope))
+            scope = hashlib.sha1(joined.encode("utf-8")).hexdigest()
+        return (str(job_id), scope, algorithm_version)
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] < time.monotonic():
+                del self._entries[key]
+                item = None
+            if item is not None:
+                self._entries.move_to_end(key)
+        if PROMETHEUS_AVAILABLE:
+            match_cache_requests.labels(result="hit" if item else "miss").inc()
+        return item[1] if item else None
+
+    def set(self, key: CacheKey, value: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        if PROMETHEUS_AVAILABLE:
+            match_cache_entries.set(size)
+
+    def invalidate_job(self, job_id: str, reason: str = "job"):
+        """Drop every cached result for one job"""
+        job_id = str(job_id)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == job_id]:
+                del self._entries[key]
+            size = len(self._entries)
+        if PROMETHEUS_AVAILABLE:
+            match_cache_invalidations.labels(reason=reason).inc()
+            match_cache_entries.set(size)
+
+    def invalidate_all(self, reason: str = "candidate"):
+        """Drop every cached result (candidate pool changed)"""
+        with self._lock:
+            self._entries.clear()
+        if PROMETHEUS_AVAILABLE:
+            match_cache_invalidations.labels(reason=reason).inc()
+            match_cache_entries.set(0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": MATCH_CACHE_ENABLED,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+match_cache = MatchResultCache()
@@ -0,0 +1,441 @@
+"""
+Mongo Profiler for Gateway Service
+Per-route Mongo command instrumentation and slow-query capture
+
+A pymongo CommandListener (registered on the Motor client in app/database.py)
+sees every command the gateway sends. The HTTP middleware in main.py opens a
+RequestUsage for each request and keeps it in a context variable. Motor copies
+the context into its executor threads, so each command is charged to the
+route template (/v1/jobs/{job_id}, not the raw path) being served:
+
+- per route: commands, time in Mongo, documents returned, round trips per request
+- per query shape: commands with every literal value replaced by "?", so
+  {"status": "active", "created_at": {"$lt": <date>}} and its siblings
+  aggregate into one row and no candidate data is retained in reports
+- a ring buffer of the last MONGO_SLOW_QUERY_BUFFER commands slower than
+  MONGO_SLOW_QUERY_MS
+
+explain_top() runs queryPlanner explains for the most expensive shapes.
+index_suggestions() turns slow or collection-scanning shapes into
+equality/sort/range index key patterns, which create_mongodb_indexes.py can
+apply with --from-profile.
+"""
+import os
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from pymongo import monitoring
+
+try:
+    from prometheus_client import Counter, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MONGO_PROFILER_ENABLED = os.getenv("MONGO_PROFILER_ENABLED", "true").lower() == "true"
+MONGO_SLOW_QUERY_MS = float(os.getenv("MONGO_SLOW_QUERY_MS", "100"))
+MONGO_SLOW_QUERY_BUFFER = int(os.getenv("MONGO_SLOW_QUERY_BUFFER", "200"))
+MONGO_PROFILER_MAX_SHAPES = int(os.getenv("MONGO_PROFILER_MAX_SHAPES", "500"))
+
+if PROMETHEUS_AVAILABLE:
+    mongo_command_seconds = Histogram(
+        'gateway_mongo_command_seconds', 'Mongo command duration', ['route', 'command'],
+        buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+    mongo_documents_returned = Counter(
+        'gateway_mongo_documents_returned_total', 'Documents returned by Mongo cursors', ['route'])
+    mongo_commands_per_request = Histogram(
+        'gateway_mongo_commands_per_request', 'Mongo round trips per HTTP request', ['route'],
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100))
+    mongo_slow_queries = Counter(
+        'gateway_mongo_slow_queries_total', 'Mongo commands slower than MONGO_SLOW_QUERY_MS', ['route', 'command'])
+
+# Handshake, auth and session housekeeping; not attributable to application queries
+IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "buildInfo", "buildinfo", "saslStart", "saslContinue",
+    "authenticate", "endSessions", "killCursors", "explain", "getLastError",
+}
+
+# Command fields that describe a query's shape (values are redacted)
+SHAPE_FIELDS = {
+    "find": ("filter", "sort", "projection"),
+    "aggregate": ("pipeline",),
+    "count": ("query",),
+    "distinct": ("key", "query"),
+    "findAndModify": ("query", "sort"),
+    "update": ("updates",),
+    "delete": ("deletes",),
+}
+
+# Command fields re-sent when explaining a shape
+EXPLAIN_FIELDS = {
+    "find": ("find", "filter", "sort", "projection", "limit", "skip", "hint"),
+    "aggregate": ("aggregate", "pipeline", "cursor", "hint"),
+    "count": ("count", "query", "hint"),
+}
+
+# Keys whose values are index directions / inclusion flags rather than data
+_DIRECTION_KEYS = {"sort", "projection", "$sort", "$project"}
+_RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$regex", "$exists", "$not"}
+
+
+class RequestUsage:
+    """Mongo usage accumulated by one HTTP request"""
+
+    __slots__ = ("scope", "commands", "seconds", "documents")
+
+    def __init__(self, scope: Optional[Dict[str, Any]] = None):
+        self.scope = scope if scope is not None else {}
+        self.commands = 0
+        self.seconds = 0.0
+        self.documents = 0
+
+    @property
+    def route(self) -> str:
+        # Resolved lazily: the router fills scope["route"] after the middleware starts
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+
+_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar("mongo_request_usage", default=None)
+
+
+def redact(value: Any, keep_directions: bool = False) -> Any:
+    """Replace literal values with "?" while keeping field names and operators"""
+    if isinstance(value, dict):
+        return {
+            key: redact(item, keep_directions or key in _DIRECTION_KEYS)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [redact(item, keep_directions) for item in value]
+        return "?"
+    if keep_directions and isinstance(value, (int, float)) and not isinstance(value, bool) and value in (-1, 0, 1):
+        return value
+    return "?"
+
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    """Redacted shape of a command (first element only for bulk update/delete)"""
+    shape: Dict[str, Any] = {}
+    for field in SHAPE_FIELDS.get(command_name, ()):
+        if field not in command:
+            continue
+        value = command[field]
+        if field in ("updates", "deletes") and isinstance(value, list):
+            value = value[:1]
+        shape[field] = redact(value, keep_directions=field in _DIRECTION_KEYS)
+    return shape
+
+
+def _documents_in(reply: Dict[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return len(batch) if isinstance(batch, list) else 0
+    if reply.get("value") is not None:  # findAndModify
+        return 1
+    return 0
+
+
+def _find_key(document: Any, key: str) -> Optional[Any]:
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        values = document.values()
+    elif isinstance(document, list):
+        values = document
+    else:
+        return None
+    for value in values:
+        found = _find_key(value, key)
+        if found is not None:
+            return found
+    return None
+
+
+def summarize_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Stage names and indexes of an explain's winning plan (no literal values)"""
+    plan = _find_key(explain, "winningPlan") or {}
+    plan = plan.get("queryPlan", plan)
+    stages: List[str] = []
+    indexes: List[str] = []
+    node = plan
+    while isinstance(node, dict) and node:
+        if node.get("stage"):
+            stages.append(node["stage"])
+        if node.get("indexName"):
+            indexes.append(node["indexName"])
+        node = node.get("inputStage") or (node.get("inputStages") or [None])[0]
+    return {"stages": stages, "indexes": indexes, "collscan": "COLLSCAN" in stages}
+
+
+def suggest_index(shape: Dict[str, Any]) -> List[Tuple[str, int]]:
+    """Equality, then sort, then range fields (ESR) for a find/count/aggregate shape"""
+    match = shape.get("filter") or shape.get("query") or {}
+    sort = shape.get("sort") or {}
+    for stage in shape.get("pipeline") or []:
+        if "$match" in stage and not match:
+            match = stage["$match"]
+        elif "$sort" in stage and not sort:
+            sort = stage["$sort"]
+    if not isinstance(match, dict):
+        return []
+    equality, ranges = [], []
+    for field, condition in match.items():
+        if field.startswith("$") or field == "_id":
+            continue
+        if isinstance(condition, dict) and any(op in _RANGE_OPERATORS for op in condition):
+            ranges.append(field)
+        else:
+            equality.append(field)
+    keys: List[Tuple[str, int]] = [(field, 1) for field in equality]
+    for field, direction in (sort.items() if isinstance(sort, dict) else ()):
+        if field not in equality and isinstance(direction, int) and direction in (1, -1):
+            keys.append((field, direction))
+    keys += [(field, 1) for field in ranges if field not in dict(keys)]
+    return keys
+
+
+class _CommandListener(monitoring.CommandListener):
+    def __init__(self, profiler: "MongoProfiler"):
+        self.profiler = profiler
+
+    def started(self, event):
+        self.profiler._started(event)
+
+    def succeeded(self, event):
+        self.profiler._finished(event, event.reply)
+
+    def failed(self, event):
+        self.profiler._finished(event, None)
+
+
+class MongoProfiler:
+    """Aggregates command events by route and by redacted query shape"""
+
+    def __init__(self, slow_ms: float = MONGO_SLOW_QUERY_MS, buffer_size: int = MONGO_SLOW_QUERY_BUFFER,
+                 max_shapes: int = MONGO_PROFILER_MAX_SHAPES, enabled: bool = MONGO_PROFILER_ENABLED):
+        self.slow_ms = slow_ms
+        self.max_shapes = max_shapes
+        self.enabled = enabled
+        self.listener = _CommandListener(self)
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[Any, int], Tuple[Optional[RequestUsage], str, str, str, Dict[str, Any]]] = {}
+        self.routes: Dict[str, Dict[str, Any]] = {}
+        self.shapes: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self.slow: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+
+    @contextmanager
+    def track_request(self, scope: Optional[Dict[str, Any]] = None) -> Iterator[RequestUsage]:
+        """Attribute Mongo commands issued inside the block to this request"""
+        usage = RequestUsage(scope)
+        token = _request_usage.set(usage)
+        try:
+            yield usage
+        finally:
+            _request_usage.reset(token)
+            if usage.commands:
+                route = usage.route
+                with self._lock:
+                    self._route_entry(route)["requests"] += 1
+                if PROMETHEUS_AVAILABLE:
+                    mongo_commands_per_request.labels(route=route).observe(usage.commands)
+
+    def _route_entry(self, route: str) -> Dict[str, Any]:
+        return self.routes.setdefault(route, {"requests": 0, "commands": 0, "seconds": 0.0, "documents": 0})
+
+    def _started(self, event):
+        if not self.enabled or event.command_name in IGNORED_COMMANDS:
+            return
+        command = event.command
+        # getMore carries the cursor id under its own name and the collection separately
+        collection = command.get("collection") if event.command_name == "getMore" else command.get(event.command_name)
+        shape = query_shape(event.command_name, command)
+        shape_key = json.dumps(shape, sort_keys=True, default=str)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                _request_usage.get(), event.command_name, str(collection), shape_key, command)
+
+    def _finished(self, event, reply: Optional[Dict[str, Any]]):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        usage, command_name, collection, shape_key, command = pending
+        seconds = event.duration_micros / 1e6
+        documents = _documents_in(reply) if reply else 0
+        route = usage.route if usage is not None else "background"
+        with self._lock:
+            if usage is not None:
+                usage.commands += 1
+                usage.seconds += seconds
+                usage.documents += documents
+            entry = self._route_entry(route)
+            entry["commands"] += 1
+            entry["seconds"] += seconds
+            entry["documents"] += documents
+            self._record_shape(route, command_name, collection, shape_key, command, seconds, documents, reply is None)
+            slow = seconds * 1000 >= self.slow_ms
+            if slow:
+                self.slow.append({
+                    "at": time.time(),
+                    "route": route,
+                    "command": command_name,
+                    "collection": collection,
+                    "shape": json.loads(shape_key),
+                    "duration_ms": round(seconds * 1000, 2),
+                    "documents": documents,
+                    "failed": reply is None,
+                })
+        if PROMETHEUS_AVAILABLE:
+            mongo_command_seconds.labels(route=route, command=command_name).observe(seconds)
+            if documents:
+                mongo_documents_returned.labels(route=route).inc(documents)
+            if slow:
+                mongo_slow_queries.labels(route=route, command=command_name).inc()
+
+    def _record_shape(self, route: str, command_name: str, collection: str, shape_key: str,
+                      command: Dict[str, Any], seconds: float, documents: int, failed: bool):
+        key = (collection, command_name, shape_key)
+        entry = self.shapes.get(key)
+        if entry is None:
+            entry = self.shapes[key] = {
+                "count": 0, "seconds": 0.0, "max_seconds": 0.0, "documents": 0, "failures": 0,
+                "routes": set(), "plan": None,
+            }
+            while len(self.shapes) > self.max_shapes:
+                self.shapes.popitem(last=False)
+        self.shapes.move_to_end(key)
+        entry["count"] += 1
+        entry["seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+        entry["documents"] += documents
+        entry["failures"] += int(failed)
+        entry["routes"].add(route)
+        # Last explainable read, trimmed to the fields explain_top() re-sends; never
+        # reported. Writes (insert/update documents, password hashes) are not kept
+        fields = EXPLAIN_FIELDS.get(command_name)
+        if fields is not None:
+            entry["_command"] = {field: command[field] for field in fields if field in command}
+
+    def top_shapes(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Query shapes by total time spent, most expensive first"""
+        with self._lock:
+            items = sorted(self.shapes.items(), key=lambda item: item[1]["seconds"], reverse=True)[:limit]
+            return [{
+                "collection": collection,
+                "command": command_name,
+                "shape": json.loads(shape_key),
+                "count": entry["count"],
+                "total_ms": round(entry["seconds"] * 1000, 2),
+                "avg_ms": round(entry["seconds"] * 1000 / entry["count"], 2),
+                "max_ms": round(entry["max_seconds"] * 1000, 2),
+                "documents": entry["documents"],
+                "failures": entry["failures"],
+                "routes": sorted(entry["routes"]),
+                "plan": entry["plan"],
+            } for (collection, command_name, shape_key), entry in items]
+
+    async def explain_top(self, db, limit: int = 5) -> int:
+        """
+        Capture queryPlanner explains for the most expensive explainable shapes
+
+        Args:
+            db: Motor database the commands ran against
+            limit: Number of shapes to explain
+
+        Returns:
+            Number of plans captured
+        """
+        with self._lock:
+            candidates = [
+                (key, entry["_command"]) for key, entry in
+                sorted(self.shapes.items(), key=lambda item: item[1]["seconds"], reverse=True)
+                if key[1] in EXPLAIN_FIELDS and entry.get("_command") is not None
+            ][:limit]
+        captured = 0
+        for key, command in candidates:
+            explainable = {field: command[field] for field in EXPLAIN_FIELDS[key[1]] if field in command}
+            if key[1] == "aggregate":
+                explainable.setdefault("cursor", {})
+            try:
+                plan = summarize_plan(await db.command({"explain": explainable, "verbosity": "queryPlanner"}))
+            except Exception as e:
+                logger.info(f"Explain failed for {key[0]}.{key[1]}: {e}")
+                continue
+            with self._lock:
+                if key in self.shapes:
+                    self.shapes[key]["plan"] = plan
+                    captured += 1
+        return captured
+
+    def index_suggestions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Index key patterns for shapes that scanned the collection or ran slow on average"""
+        suggestions: Dict[Tuple[str, Tuple[Tuple[str, int], ...]], Dict[str, Any]] = {}
+        for shape in self.top_shapes(self.max_shapes):
+            plan = shape["plan"] or {}
+            if plan.get("collscan") is not True and shape["avg_ms"] < self.slow_ms:
+                continue
+            if plan and not plan.get("collscan") and plan.get("indexes"):
+                continue
+            keys = suggest_index(shape["shape"])
+            if not keys:
+                continue
+            name = "profiler_" + "_".join(f"{field}_{direction}" for field, direction in keys).replace(".", "_")
+            existing = suggestions.get((shape["collection"], tuple(keys)))
+            if existing is None:
+                suggestions[(shape["collection"], tuple(keys))] = {
+                    "collection": shape["collection"],
+                    "keys": [[field, direction] for field, direction in keys],
+                    "name": name[:120],
+                    "total_ms": shape["total_ms"],
+                    "count": shape["count"],
+                    "routes": shape["routes"],
+                    "collscan": plan.get("collscan"),
+                }
+            else:
+                existing["total_ms"] = round(existing["total_ms"] + shape["total_ms"], 2)
+                existing["count"] += shape["count"]
+                existing["routes"] = sorted(set(existing["routes"]) | set(shape["routes"]))
+        return sorted(suggestions.values(), key=lambda s: s["total_ms"], reverse=True)[:limit]
+
+    def route_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                route: {
+                    "requests": entry["requests"],
+                    "commands": entry["commands"],
+                    "total_ms": round(entry["seconds"] * 1000, 2),
+                    "documents": entry["documents"],
+                    "commands_per_request": round(entry["commands"] / entry["requests"], 2)
+                    if entry["requests"] else None,
+                }
+                for route, entry in sorted(self.routes.items(), key=lambda item: item[1]["seconds"], reverse=True)
+            }
+
+    def slow_queries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(reversed(self.slow))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "slow_query_ms": self.slow_ms,
+                "routes": len(self.routes),
+                "shapes": len(self.shapes),
+                "commands": sum(entry["commands"] for entry in self.routes.values()),
+                "slow_queries_buffered": len(self.slow),
+            }
+
+
+mongo_profiler = MongoProfiler()
@@ -0,0 +1,140 @@
+"""
+Keyset Pagination for Gateway Service
+Opaque (sort_key, _id) cursor tokens for list endpoints
+
+A page is fetched with `sort_field <op> last_value OR (sort_field == last_value
+AND _id <op> last_id)` instead of skip(offset), so every page costs the same
+no matter how deep it is, and rows inserted while a client is paging never
+shift or duplicate the rows it has not seen yet. _id breaks ties, which keeps
+the order total. Missing/null sort values sort lowest in Mongo; the filter
+accounts for them so those rows are not dropped.
+
+Tokens are urlsafe base64 of extended JSON (datetimes and ObjectIds survive
+the round trip) and carry the sort field and direction they were issued for.
+"""
+import base64
+import binascii
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import json_util
+
+ASCENDING = 1
+DESCENDING = -1
+
+
+class InvalidCursor(ValueError):
+    """Raised for malformed cursors or cursors issued for a different ordering"""
+
+
+def encode_cursor(doc: Dict[str, Any], sort_field: str, direction: int) -> str:
+    """
+    Cursor pointing just after `doc`
+
+    Args:
+        doc: Last document of the current page (must include sort_field and _id)
+        sort_field: Field the listing is ordered by
+        direction: ASCENDING or DESCENDING
+
+    Returns:
+        Opaque cursor token
+    """
+    payload = {"f": sort_field, "d": direction, "v": doc.get(sort_field), "id": doc["_id"]}
+    raw = json_util.dumps(payload, json_options=json_util.CANONICAL_JSON_OPTIONS).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort_field: str, direction: int) -> Tuple[Any, Any]:
+    """
+    Decode a cursor issued by encode_cursor()
+
+    Returns:
+        (last sort value, last _id)
+
+    Raises:
+        InvalidCursor: Malformed token or one issued for another ordering
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json_util.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+    if not isinstance(payload, dict) or "id" not in payload:
+        raise InvalidCursor("Invalid cursor")
+    if payload.get("f") != sort_field or payload.get("d") != direction:
+        raise InvalidCursor("Cursor was issued for a different ordering")
+    return payload.get("v"), payload["id"]
+
+
+def keyset_filter(sort_field: str, direction: int, last_value: Any, last_id: Any) -> Dict[str, Any]:
+    """Mongo filter selecting rows strictly after (last_value, last_id) in the listing order"""
+    op = "$gt" if direction == ASCENDING else "$lt"
+    if sort_field == "_id":
+        return {"_id": {op: last_id}}
+    if last_value is None:
+        if direction == ASCENDING:
+            # nulls come first; next are the remaining nulls, then every non-null value
+            return {"$or": [{sort_field: {"$ne": None}}, {sort_field: None, "_id": {op: last_id}}]}
+        return {sort_field: None, "_id": {op: last_id}}
+    clauses = [{sort_field: {op: last_value}}, {sort_field: last_value, "_id": {op: last_id}}]
+    if direction == DESCENDING:
+        # nulls come last in descending order
+        clauses.append({sort_field: None})
+    return {"$or": clauses}
+
+
+def sort_spec(sort_field: str, direction: int) -> List[Tuple[str, int]]:
+    if sort_field == "_id":
+        return [("_id", direction)]
+    return [(sort_field, direction), ("_id", direction)]
+
+
+def apply_cursor(query: Dict[str, Any], cursor: Optional[str], sort_field: str, direction: int) -> Dict[str, Any]:
+    """`query` restricted to rows after `cursor` (unchanged when cursor is empty)"""
+    if not cursor:
+        return query
+    last_value, last_id = decode_cursor(cursor, sort_field, direction)
+    after = keyset_filter(sort_field, direction, last_value, last_id)
+    if not query:
+        return after
+    return {"$and": [query, after]}
+
+
+async def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    sort_field: str,
+    direction: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of a listing in keyset order
+
+    Args:
+        collection: Motor collection
+        query: Listing filter
+        sort_field: Field to order by (_id breaks ties)
+        direction: ASCENDING or DESCENDING
+        limit: Page size
+        cursor: Token from the previous page (keyset mode)
+        offset: Rows to skip when no cursor is given (legacy offset mode)
+        projection: Optional inclusion projection (must keep sort_field)
+
+    Returns:
+        (documents, next cursor or None on the last page)
+
+    Raises:
+        InvalidCursor: Bad cursor token
+    """
+    query = apply_cursor(query, cursor, sort_field, direction)
+    find = collection.find(query, projection).sort(sort_spec(sort_field, direction))
+    if not cursor and offset:
+        find = find.skip(offset)
+    docs = await find.limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_field, direction)
+    return docs, next_cursor
@@ -0,0 +1,350 @@
+"""
+Resume Parse Jobs for Gateway Service
+Bounded worker-process pool and job tracking for PDF resume parsing
+
+PDF text extraction and the resume heuristics (app/resume_parser.py) are CPU
+bound; run inside the request handler they stall the event loop for every
+other request. ParseJobQueue hands each file to a ProcessPoolExecutor with
+PARSE_WORKERS processes. A submission (one or more files) becomes a parse job
+whose per-file results are persisted to the parse_jobs collection as they
+complete, so they can be polled, fetched later or from another gateway worker,
+or streamed to the submitter. At most PARSE_MAX_PENDING_FILES files may be
+queued or running at once; beyond that submit() raises ParseQueueFull.
+
+A worker that dies (OOM, segfault on a malformed PDF) breaks the whole pool;
+the pool is then replaced and the files it was running are retried once.
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.resume_parser import parse_resume_pdf
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(2, os.cpu_count() or 1))))
+PARSE_MAX_PENDING_FILES = int(os.getenv("PARSE_MAX_PENDING_FILES", "64"))
+PARSE_MAX_FILES_PER_JOB = int(os.getenv("PARSE_MAX_FILES_PER_JOB", "20"))
+PARSE_JOB_RETENTION_SECONDS = float(os.getenv("PARSE_JOB_RETENTION_SECONDS", "3600"))
+THROUGHPUT_WINDOW_SECONDS = 60.0
+
+if PROMETHEUS_AVAILABLE:
+    resume_parse_seconds = Histogram(
+        'gateway_resume_parse_seconds', 'Worker time to parse one resume PDF', ['outcome'],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    )
+    resume_pages_parsed = Counter('gateway_resume_pages_parsed_total', 'PDF pages parsed by resume workers')
+    resume_parse_queue_depth = Gauge('gateway_resume_parse_queue_depth', 'Resume files queued or being parsed')
+
+
+class ParseQueueFull(Exception):
+    """Raised when accepting a submission would exceed PARSE_MAX_PENDING_FILES"""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ParseJob:
+    """One submission: per-file status and results, plus live subscribers"""
+
+    def __init__(self, owner: str, filenames: List[str]):
+        self.job_id = uuid.uuid4().hex
+        self.owner = owner
+        self.created_at = _utcnow()
+        self.completed_at: Optional[datetime] = None
+        self.files: List[Dict[str, Any]] = [
+            {"index": i, "filename": name, "status": "queued"} for i, name in enumerate(filenames)
+        ]
+        self.subscribers: List[asyncio.Queue] = []
+
+    @property
+    def status(self) -> str:
+        states = {f["status"] for f in self.files}
+        if states & {"queued", "running"}:
+            return "running" if states - {"queued"} else "queued"
+        return "failed" if states == {"failed"} else "completed"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "files": self.files,
+            "completed_files": sum(1 for f in self.files if f["status"] in ("done", "failed")),
+            "total_files": len(self.files),
+            "created_at": self.created_at.isoformat(),
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+        }
+
+
+class ParseJobQueue:
+    """Runs resume parsing in a bounded process pool and tracks parse jobs"""
+
+    def __init__(self, parse_fn: Callable[[bytes], Dict[str, Any]] = parse_resume_pdf,
+                 max_workers: int = PARSE_WORKERS, max_pending: int = PARSE_MAX_PENDING_FILES,
+                 executor: Optional[Executor] = None):
+        self.parse_fn = parse_fn
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending
+        self._executor = executor
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, ParseJob] = {}
+        self._tasks: set = set()
+        self.pending = 0
+        self.running = 0
+        self.files_parsed = 0
+        self.files_failed = 0
+        self.pages_parsed = 0
+        self._recent: Deque[Tuple[float, int]] = deque()  # (completed monotonic time, pages)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _reset_executor(self, broken: Executor):
+        # Several files fail on the same broken pool; only the first replaces it
+        if self._executor is not broken:
+            return
+        logger.warning("Resume parse worker pool broke; starting a new one")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def _set_pending(self, delta: int):
+        self.pending += delta
+        if PROMETHEUS_AVAILABLE:
+            resume_parse_queue_depth.set(self.pending)
+
+    # ---- parsing --------------------------------------------------------
+
+    async def parse(self, content: bytes) -> Dict[str, Any]:
+        """
+        Parse one PDF in the worker pool
+
+        Args:
+            content: Raw PDF bytes
+
+        Returns:
+            parse_fn result ({"rows", "count", "pages"})
+
+        Raises:
+            ParseQueueFull: If the pool already has max_pending files
+        """
+        if self.pending >= self.max_pending:
+            raise ParseQueueFull(f"{self.pending} resume files already queued")
+        self._set_pending(1)
+        try:
+            return await self._run(content)
+        finally:
+            self._set_pending(-1)
+
+    async def _run(self, content: bytes, on_start: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+        # Hold one of max_workers slots so a file only counts as running once a
+        # worker is free to take it
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        async with self._slots:
+            if on_start is not None:
+                on_start()
+            return await self._execute(content)
+
+    async def _execute(self, content: bytes) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            for attempt in range(2):
+                executor = self.executor
+                try:
+                    result = await loop.run_in_executor(executor, self.parse_fn, content)
+                    break
+                except BrokenProcessPool:
+                    self._reset_executor(executor)
+                    if attempt:
+                        raise
+            outcome = "ok"
+            self._record(int(result.get("pages") or 0))
+            return result
+        except Exception:
+            self.files_failed += 1
+            raise
+        finally:
+            if PROMETHEUS_AVAILABLE:
+                resume_parse_seconds.labels(outcome=outcome).observe(time.perf_counter() - started)
+
+    def _record(self, pages: int):
+        self.files_parsed += 1
+        self.pages_parsed += pages
+        now = time.monotonic()
+        self._recent.append((now, pages))
+        while self._recent and now - self._recent[0][0] > THROUGHPUT_WINDOW_SECONDS:
+            self._recent.popleft()
+        if PROMETHEUS_AVAILABLE:
+            resume_pages_parsed.inc(pages)
+
+    # ---- jobs -----------------------------------------------------------
+
+    async def submit(self, db, files: List[Tuple[str, bytes]], owner: str) -> ParseJob:
+        """
+        Queue a multi-file parse job and return immediately
+
+        Args:
+            db: Motor database (results are persisted to parse_jobs)
+            files: (filename, PDF bytes) pairs
+            owner: Submitter identity; only they can read the job
+
+        Returns:
+            The queued ParseJob
+        """
+        if self.pending + len(files) > self.max_pending:
+            raise ParseQueueFull(f"{self.pending} resume files already queued")
+        self._expire()
+        job = ParseJob(owner, [name for name, _ in files])
+        await db.parse_jobs.insert_one({"_id": job.job_id, "owner": owner, **self._persisted(job)})
+        self._jobs[job.job_id] = job
+        self._set_pending(len(files))
+        for index, (_, content) in enumerate(files):
+            task = asyncio.create_task(self._process(db, job, index, content))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _process(self, db, job: ParseJob, index: int, content: bytes):
+        entry = job.files[index]
+        started = False
+
+        def mark_running():
+            nonlocal started
+            started = True
+            entry["status"] = "running"
+            self.running += 1
+
+        try:
+            result = await self._run(content, on_start=mark_running)
+            entry.update(status="done", rows=result.get("rows", []), count=result.get("count", 0),
+                         pages=result.get("pages", 0))
+        except BrokenProcessPool:
+            entry.update(status="failed", error="Failed to parse PDF: parser worker crashed")
+        except Exception as e:
+            entry.update(status="failed", error=f"Failed to parse PDF: {str(e)[:200]}")
+        finally:
+            if started:
+                self.running -= 1
+            self._set_pending(-1)
+        if job.status in ("completed", "failed"):
+            job.completed_at = _utcnow()
+        self._publish(job, {"event": "file", "file": entry})
+        try:
+            await db.parse_jobs.update_one({"_id": job.job_id}, {"$set": self._persisted(job)})
+        except Exception as e:
+            logger.warning(f"Failed to persist parse job {job.job_id}: {e}")
+        if job.completed_at is not None:
+            self._publish(job, {"event": "job", "job": job.to_dict()})
+
+    @staticmethod
+    def _persisted(job: ParseJob) -> Dict[str, Any]:
+        doc = job.to_dict()
+        doc.pop("job_id")
+        doc["created_at"], doc["completed_at"] = job.created_at, job.completed_at
+        return doc
+
+    async def get(self, db, job_id: str, owner: str) -> Optional[Dict[str, Any]]:
+        """Job status/results for its owner (from memory, else from parse_jobs)"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict() if job.owner == owner else None
+        doc = await db.parse_jobs.find_one({"_id": job_id, "owner": owner})
+        if doc is None:
+            return None
+        doc["job_id"] = doc.pop("_id")
+        doc.pop("owner", None)
+        for key in ("created_at", "completed_at"):
+            if isinstance(doc.get(key), datetime):
+                doc[key] = doc[key].isoformat()
+        return doc
+
+    def _publish(self, job: ParseJob, event: Dict[str, Any]):
+        for q in list(job.subscribers):
+            try:
+                q.put_nowait(event)
+            except asyncio.QueueFull:
+                pass
+
+    async def events(self, job_id: str, owner: str, heartbeat: float = 25.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield file results as they complete, then the final job; None is a heartbeat
+
+        Files finished before the subscription are replayed first. Jobs not held
+        by this gateway worker yield nothing (callers poll get() instead).
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return
+        q: asyncio.Queue = asyncio.Queue(maxsize=len(job.files) + 1)
+        job.subscribers.append(q)
+        # Snapshot before the first yield: later completions arrive through q
+        finished = [dict(entry) for entry in job.files if entry["status"] in ("done", "failed")]
+        completed = job.to_dict() if job.completed_at is not None else None
+        try:
+            for entry in finished:
+                yield {"event": "file", "file": entry}
+            if completed is not None:
+                yield {"event": "job", "job": completed}
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(q.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event["event"] == "job":
+                    return
+        finally:
+            job.subscribers.remove(q)
+
+    def _expire(self):
+        cutoff = _utcnow().timestamp() - PARSE_JOB_RETENTION_SECONDS
+        for job_id in [j for j, job in self._jobs.items()
+                       if job.completed_at is not None and job.completed_at.timestamp() < cutoff]:
+            del self._jobs[job_id]
+
+    # ---- lifecycle / monitoring ----------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        window_pages = sum(pages for t, pages in self._recent if now - t <= THROUGHPUT_WINDOW_SECONDS)
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.pending,
+            "running": self.running,
+            "files_parsed": self.files_parsed,
+            "files_failed": self.files_failed,
+            "pages_parsed": self.pages_parsed,
+            "pages_per_second": round(window_pages / THROUGHPUT_WINDOW_SECONDS, 3),
+            "jobs_tracked": len(self._jobs),
+        }
+
+    async def aclose(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+parse_jobs = ParseJobQueue()
@@ -0,0 +1,191 @@
+"""
+Password Hashing for Gateway Service
+bcrypt hashing and verification off the event loop
+
+A bcrypt call burns 100-300 ms of CPU. Run inside an async handler it stalls
+every other request on the worker, which is what happened during login storms
+at shift start. PasswordHasher runs hashpw/checkpw in a small thread pool
+(bcrypt releases the GIL while hashing) and caps the number of operations
+running or waiting. Past PASSWORD_HASH_MAX_PENDING it sheds load with
+PasswordHashBusy (the endpoints answer 503 + Retry-After) instead of queueing
+without bound.
+
+BCRYPT_ROUNDS sets the cost for new hashes. A stored hash with a different
+cost still verifies, and rehash_if_needed() hands back an upgraded hash for
+the caller to persist right after a successful login.
+"""
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import bcrypt
+
+try:
+    from prometheus_client import Counter, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0)
+
+if PROMETHEUS_AVAILABLE:
+    password_hash_seconds = Histogram(
+        'gateway_password_hash_seconds', 'bcrypt operation time in the worker pool', ['operation'],
+        buckets=LATENCY_BUCKETS)
+    password_hash_wait_seconds = Histogram(
+        'gateway_password_hash_wait_seconds', 'Time spent waiting for a free hashing worker', ['operation'],
+        buckets=LATENCY_BUCKETS)
+    password_hash_rejected = Counter(
+        'gateway_password_hash_rejected_total', 'Hashing requests shed because the pool was saturated')
+    login_duration_seconds = Histogram(
+        'gateway_login_duration_seconds', 'End-to-end login latency', ['portal', 'outcome'],
+        buckets=LATENCY_BUCKETS)
+
+
+class PasswordHashBusy(Exception):
+    """Raised when too many hashing operations are already running or queued"""
+
+
+def hash_cost(password_hash: str) -> Optional[int]:
+    """Cost factor of a modular-crypt bcrypt hash ($2b$12$...), None if unparsable"""
+    parts = (password_hash or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def _check(password: str, password_hash: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    except ValueError as e:
+        # Malformed stored hash: treat as a failed verification, not a server error
+        logger.warning(f"Unverifiable password hash: {e}")
+        return False
+
+
+class PasswordHasher:
+    """Bounded worker pool for bcrypt hash/verify"""
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = PASSWORD_HASH_WORKERS,
+                 max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.rounds = rounds
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self.completed = {"hash": 0, "verify": 0}
+        self.busy_seconds = {"hash": 0.0, "verify": 0.0}
+        self.rehashed = 0
+        self.rejected = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, operation: str, fn, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            if PROMETHEUS_AVAILABLE:
+                password_hash_rejected.inc()
+            raise PasswordHashBusy(f"{self._pending} password operations already pending")
+        self._pending += 1
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, started - submitted, time.perf_counter() - started
+
+        try:
+            result, waited, elapsed = await asyncio.get_running_loop().run_in_executor(self._pool(), timed)
+        finally:
+            self._pending -= 1
+        self._observe(operation, waited, elapsed)
+        return result
+
+    def _observe(self, operation: str, waited: float, elapsed: float):
+        self.completed[operation] += 1
+        self.busy_seconds[operation] += elapsed
+        if PROMETHEUS_AVAILABLE:
+            password_hash_wait_seconds.labels(operation=operation).observe(waited)
+            password_hash_seconds.labels(operation=operation).observe(elapsed)
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password at the configured cost
+
+        Raises:
+            PasswordHashBusy: Pool saturated
+        """
+        return await self._run("hash", _hash, password, self.rounds)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """
+        Check a password against a stored bcrypt hash
+
+        Raises:
+            PasswordHashBusy: Pool saturated
+        """
+        return await self._run("verify", _check, password, password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        cost = hash_cost(password_hash)
+        return cost is not None and cost != self.rounds
+
+    async def rehash_if_needed(self, password: str, password_hash: str) -> Optional[str]:
+        """
+        New hash at the configured cost for a just-verified password, or None
+
+        Never raises: an upgrade that cannot run now is retried on the next login.
+        """
+        if not self.needs_rehash(password_hash):
+            return None
+        try:
+            upgraded = await self.hash(password)
+        except Exception as e:
+            logger.info(f"Password rehash deferred: {e}")
+            return None
+        self.rehashed += 1
+        return upgraded
+
+    def observe_login(self, portal: str, outcome: str, seconds: float):
+        if PROMETHEUS_AVAILABLE:
+            login_duration_seconds.labels(portal=portal, outcome=outcome).observe(seconds)
+
+    async def aclose(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "hashed": self.completed["hash"],
+            "verified": self.completed["verify"],
+            "rehashed": self.rehashed,
+            "rejected": self.rejected,
+            "avg_hash_ms": round(1000 * self.busy_seconds["hash"] / self.completed["hash"], 1)
+            if self.completed["hash"] else None,
+            "avg_verify_ms": round(1000 * self.busy_seconds["verify"] / self.completed["verify"], 1)
+            if self.completed["verify"] else None,
+        }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,380 @@
+"""
+Pipeline Counters for Gateway Service
+Materialized per-client / per-recruiter dashboard counters
+
+Two collections back the dashboards:
+
+- job_pipeline_counters: one document per job with its application, interview,
+  offer and feedback counts, the owners it rolls up into and whether it is active.
+- pipeline_counters: one document per owner ("client:<id>", "recruiter:<id>")
+  holding the sums over all of the owner's jobs ("all") and over its active
+  jobs ("active").
+
+A write to a job's pipeline schedules refresh_job(), which recounts that single
+job (equality match on job_id), swaps the per-job document atomically and
+applies the difference to every owner with one $inc each. A job rolls up into
+its recruiter, its client and the client its recruiter is connected to, so
+connection changes refresh the recruiter's jobs. reconcile() rebuilds
+everything from grouped aggregations and runs periodically to absorb writes
+made outside the gateway.
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+
+try:
+    from prometheus_client import Counter, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_COUNTERS_ENABLED = os.getenv("PIPELINE_COUNTERS_ENABLED", "true").lower() == "true"
+PIPELINE_COUNTERS_RECONCILE_SECONDS = float(os.getenv("PIPELINE_COUNTERS_RECONCILE_SECONDS", "900"))
+
+JOB_COUNTERS_COLLECTION = "job_pipeline_counters"
+OWNER_COUNTERS_COLLECTION = "pipeline_counters"
+META_ID = "__meta__"
+
+COUNTER_FIELDS = (
+    "jobs", "applications", "shortlisted", "interviews", "interviews_scheduled",
+    "offers", "offers_accepted", "offers_hired", "assessments",
+)
+INTERVIEW_SCHEDULED_STATUSES = ["scheduled", "pending"]
+
+if PROMETHEUS_AVAILABLE:
+    pipeline_counter_refreshes = Counter(
+        'gateway_pipeline_counter_refreshes_total', 'Pipeline counter refreshes', ['kind', 'outcome'])
+    pipeline_counter_reconcile_seconds = Histogram(
+        'gateway_pipeline_counter_reconcile_seconds', 'Full pipeline counter reconciliation time',
+        buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+    )
+
+
+def owner_key(kind: str, owner_id: Any) -> str:
+    return f"{kind}:{str(owner_id).strip()}"
+
+
+def empty_counts() -> Dict[str, int]:
+    return {field: 0 for field in COUNTER_FIELDS}
+
+
+def _job_query(job_id: str) -> Dict[str, Any]:
+    if ObjectId.is_valid(job_id):
+        return {"_id": ObjectId(job_id)}
+    return {"_id": job_id}
+
+
+def job_owners(job: Dict[str, Any], recruiter_clients: Dict[str, str]) -> List[str]:
+    """
+    Owner keys a job rolls up into
+
+    Args:
+        job: Job document (client_id / recruiter_id)
+        recruiter_clients: recruiter_id -> connected client_id
+
+    Returns:
+        Sorted owner keys (recruiter, own client, recruiter's connected client)
+    """
+    owners = set()
+    recruiter_id = str(job.get("recruiter_id") or "").strip()
+    client_id = str(job.get("client_id") or "").strip()
+    if recruiter_id:
+        owners.add(owner_key("recruiter", recruiter_id))
+        if recruiter_clients.get(recruiter_id):
+            owners.add(owner_key("client", recruiter_clients[recruiter_id]))
+    if client_id:
+        owners.add(owner_key("client", client_id))
+    return sorted(owners)
+
+
+def owner_deltas(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """$inc documents per owner that turn the contribution of `old` into that of `new`"""
+    deltas: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for doc, sign in ((old, -1), (new, 1)):
+        if not doc:
+            continue
+        scopes = ("all", "active") if doc.get("active") else ("all",)
+        for owner in doc.get("owners", []):
+            for scope in scopes:
+                for field, value in doc.get("counts", {}).items():
+                    path = f"{scope}.{field}"
+                    deltas[owner][path] = deltas[owner].get(path, 0) + sign * value
+    return {
+        owner: {path: value for path, value in inc.items() if value}
+        for owner, inc in deltas.items()
+        if any(inc.values())
+    }
+
+
+class PipelineCounters:
+    """Maintains and serves the materialized dashboard counters"""
+
+    def __init__(self):
+        self._pending_jobs: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self.last_reconciled_at: Optional[datetime] = None
+
+    # ---- counting -------------------------------------------------------
+
+    @staticmethod
+    async def count_job(db, job_id: str) -> Dict[str, int]:
+        """Counters for a single job (every query is an equality match on job_id)"""
+        (applications, shortlisted, interviews, interviews_scheduled,
+         offers, offers_accepted, offers_hired, assessments) = await asyncio.gather(
+            db.job_applications.count_documents({"job_id": job_id}),
+            db.job_applications.count_documents({"job_id": job_id, "status": "shortlisted"}),
+            db.interviews.count_documents({"job_id": job_id}),
+            db.interviews.count_documents({"job_id": job_id, "status": {"$in": INTERVIEW_SCHEDULED_STATUSES}}),
+            db.offers.count_documents({"job_id": job_id}),
+            db.offers.count_documents({"job_id": job_id, "status": "accepted"}),
+            db.offers.count_documents({"job_id": job_id, "status": "hired"}),
+            db.feedback.count_documents({"job_id": job_id}),
+        )
+        return {
+            "jobs": 1,
+            "applications": applications,
+            "shortlisted": shortlisted,
+            "interviews": interviews,
+            "interviews_scheduled": interviews_scheduled,
+            "offers": offers,
+            "offers_accepted": offers_accepted,
+            "offers_hired": offers_hired,
+            "assessments": assessments,
+        }
+
+    @staticmethod
+    async def _recruiter_clients(db, recruiter_ids: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        query: Dict[str, Any] = {}
+        if recruiter_ids is not None:
+            query["recruiter_id"] = {"$in": list(recruiter_ids)}
+        mapping = {}
+        async for doc in db.client_connected_recruiter.find(query, {"recruiter_id": 1, "client_id": 1}):
+            if doc.get("recruiter_id") and doc.get("client_id"):
+                mapping[str(doc["recruiter_id"])] = str(doc["client_id"])
+        return mapping
+
+    # ---- incremental updates -------------------------------------------
+
+    async def refresh_job(self, db, job_id: str):
+        """Recount one job and push the difference to its owners"""
+        job_id = str(job_id)
+        job = await db.jobs.find_one(_job_query(job_id), {"status": 1, "client_id": 1, "recruiter_id": 1})
+        if job is None:
+            old = await db[JOB_COUNTERS_COLLECTION].find_one_and_delete({"_id": job_id})
+            new = None
+        else:
+            recruiter_id = str(job.get("recruiter_id") or "").strip()
+            recruiter_clients = await self._recruiter_clients(db, [recruiter_id]) if recruiter_id else {}
+            new = {
+                "owners": job_owners(job, recruiter_clients),
+                "active": job.get("status") == "active",
+                "counts": await self.count_job(db, job_id),
+            }
+            old = await db[JOB_COUNTERS_COLLECTION].find_one_and_update(
+                {"_id": job_id},
+                {"$set": {**new, "updated_at": datetime.now(timezone.utc)}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        await self._apply_deltas(db, owner_deltas(old, new))
+
+    @staticmethod
+    async def _apply_deltas(db, deltas: Dict[str, Dict[str, int]]):
+        if not deltas:
+            return
+        now = datetime.now(timezone.utc)
+        operations = []
+        for owner, inc in deltas.items():
+            kind, _, owner_id = owner.partition(":")
+            operations.append(UpdateOne(
+                {"_id": owner},
+                {"$inc": inc, "$set": {"kind": kind, "owner_id": owner_id, "updated_at": now}},
+                upsert=True,
+            ))
+        await db[OWNER_COUNTERS_COLLECTION].bulk_write(operations, ordered=False)
+
+    async def refresh_recruiter_jobs(self, db, recruiter_id: str):
+        """Re-home every job of a recruiter after its client connection changed"""
+        cursor = db.jobs.find({"recruiter_id": str(recruiter_id)}, {"_id": 1})
+        async for job in cursor:
+            await self.refresh_job(db, str(job["_id"]))
+
+    def schedule_job_refresh(self, job_id: Any, get_db: Callable[[], Awaitable[Any]]):
+        """Fire-and-forget refresh; repeated writes to a job before it runs coalesce into one"""
+        if not PIPELINE_COUNTERS_ENABLED or not job_id:
+            return
+        job_id = str(job_id)
+        if job_id in self._pending_jobs:
+            return
+        self._pending_jobs.add(job_id)
+
+        async def _refresh():
+            self._pending_jobs.discard(job_id)
+            await self.refresh_job(await get_db(), job_id)
+        self._spawn(_refresh(), "job")
+
+    def schedule_recruiter_refresh(self, recruiter_id: Any, get_db: Callable[[], Awaitable[Any]]):
+        if not PIPELINE_COUNTERS_ENABLED or not recruiter_id:
+            return
+
+        async def _refresh():
+            await self.refresh_recruiter_jobs(await get_db(), str(recruiter_id))
+        self._spawn(_refresh(), "recruiter")
+
+    def _spawn(self, coro, kind: str):
+        async def _run():
+            outcome = "ok"
+            try:
+                await coro
+            except Exception as e:
+                outcome = "error"
+                logger.warning(f"Pipeline counter {kind} refresh failed (reconciliation will repair): {e}")
+            if PROMETHEUS_AVAILABLE:
+                pipeline_counter_refreshes.labels(kind=kind, outcome=outcome).inc()
+        task = asyncio.create_task(_run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # ---- reconciliation -------------------------------------------------
+
+    @staticmethod
+    async def _grouped_counts(db, collection: str, fields: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+        group: Dict[str, Any] = {"_id": "$job_id"}
+        for field, condition in fields.items():
+            group[field] = {"$sum": 1 if condition is None else {"$cond": [condition, 1, 0]}}
+        result = {}
+        async for doc in db[collection].aggregate([{"$group": group}]):
+            if doc.get("_id") is not None:
+                result[str(doc["_id"])] = {field: int(doc.get(field, 0)) for field in fields}
+        return result
+
+    async def reconcile(self, db) -> Dict[str, Any]:
+        """Rebuild every per-job and per-owner counter document from source collections"""
+        started = time.perf_counter()
+        run_id = uuid.uuid4().hex
+        now = datetime.now(timezone.utc)
+
+        applications, interviews, offers, feedback, recruiter_clients = await asyncio.gather(
+            self._grouped_counts(db, "job_applications", {
+                "applications": None,
+                "shortlisted": {"$eq": ["$status", "shortlisted"]},
+            }),
+            self._grouped_counts(db, "interviews", {
+                "interviews": None,
+                "interviews_scheduled": {"$in": ["$status", INTERVIEW_SCHEDULED_STATUSES]},
+            }),
+            self._grouped_counts(db, "offers", {
+                "offers": None,
+                "offers_accepted": {"$eq": ["$status", "accepted"]},
+                "offers_hired": {"$eq": ["$status", "hired"]},
+            }),
+            self._grouped_counts(db, "feedback", {"assessments": None}),
+            self._recruiter_clients(db),
+        )
+
+        job_ops = []
+        owners: Dict[str, Dict[str, Dict[str, int]]] = {}
+        async for job in db.jobs.find({}, {"status": 1, "client_id": 1, "recruiter_id": 1}):
+            job_id = str(job["_id"])
+            counts = empty_counts()
+            counts["jobs"] = 1
+            for source in (applications, interviews, offers, feedback):
+                counts.update(source.get(job_id, {}))
+            doc = {"owners": job_owners(job, recruiter_clients), "active": job.get("status") == "active",
+                   "counts": counts}
+            job_ops.append(UpdateOne(
+                {"_id": job_id}, {"$set": {**doc, "updated_at": now, "reconcile_id": run_id}}, upsert=True))
+            for owner in doc["owners"]:
+                totals = owners.setdefault(owner, {"all": empty_counts(), "active": empty_counts()})
+                for scope in (("all", "active") if doc["active"] else ("all",)):
+                    for field, value in counts.items():
+                        totals[scope][field] += value
+
+        owner_ops = []
+        for owner, totals in owners.items():
+            kind, _, owner_id = owner.partition(":")
+            owner_ops.append(UpdateOne(
+                {"_id": owner},
+                {"$set": {**totals, "kind": kind, "owner_id": owner_id, "updated_at": now, "reconcile_id": run_id}},
+                upsert=True,
+            ))
+        owner_ops.append(UpdateOne(
+            {"_id": META_ID}, {"$set": {"reconciled_at": now, "reconcile_id": run_id}}, upsert=True))
+
+        for collection, operations in ((JOB_COUNTERS_COLLECTION, job_ops), (OWNER_COUNTERS_COLLECTION, owner_ops)):
+            for i in range(0, len(operations), 1000):
+                await db[collection].bulk_write(operations[i:i + 1000], ordered=False)
+            await db[collection].delete_many({"reconcile_id": {"$ne": run_id}})
+
+        self.last_reconciled_at = now
+        elapsed = time.perf_counter() - started
+        if PROMETHEUS_AVAILABLE:
+            pipeline_counter_reconcile_seconds.observe(elapsed)
+        logger.info(f"Pipeline counters reconciled: {len(job_ops)} jobs, {len(owners)} owners in {elapsed:.2f}s")
+        return {"jobs": len(job_ops), "owners": len(owners), "seconds": round(elapsed, 3)}
+
+    async def _reconcile_loop(self, get_db: Callable[[], Awaitable[Any]], interval: float):
+        while True:
+            try:
+                await self.reconcile(await get_db())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Pipeline counter reconciliation failed: {e}")
+            await asyncio.sleep(interval)
+
+    def start_reconciliation(self, get_db: Callable[[], Awaitable[Any]],
+                             interval: float = PIPELINE_COUNTERS_RECONCILE_SECONDS):
+        if not PIPELINE_COUNTERS_ENABLED or self._reconcile_task is not None:
+            return
+        self._reconcile_task = asyncio.create_task(self._reconcile_loop(get_db, interval))
+
+    async def stop(self):
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+    # ---- reads ----------------------------------------------------------
+
+    async def get_owner_counters(self, db, kind: str, owner_id: Any) -> Optional[Dict[str, Dict[str, int]]]:
+        """
+        Counters for one client or recruiter
+
+        Args:
+            db: Motor database
+            kind: "client" or "recruiter"
+            owner_id: Client or recruiter id
+
+        Returns:
+            {"all": {...}, "active": {...}}, zeros for owners without jobs, or None
+            before the first reconciliation (callers fall back to live counts)
+        """
+        if not PIPELINE_COUNTERS_ENABLED:
+            return None
+        docs = await db[OWNER_COUNTERS_COLLECTION].find(
+            {"_id": {"$in": [owner_key(kind, owner_id), META_ID]}}).to_list(length=2)
+        by_id = {doc["_id"]: doc for doc in docs}
+        doc = by_id.get(owner_key(kind, owner_id))
+        if doc is None:
+            if META_ID not in by_id:
+                return None
+            doc = {}
+        return {scope: {**empty_counts(), **doc.get(scope, {})} for scope in ("all", "active")}
+
+
+pipeline_counters = PipelineCounters()
@@ -0,0 +1,287 @@
+"""
+Rate Limiting for Gateway Service
+Token-bucket limiter with background CPU sampling and an optional Redis backend
+
+Every ip:path key owns a bucket of `limit` tokens that refills at limit/60
+tokens per second, so a check is O(1) regardless of traffic. Buckets live in an
+insertion-ordered dict touched on every hit, which lets eviction pop idle keys
+from the front without scanning the whole table.
+
+System load is sampled by a daemon thread (psutil) instead of on the request
+path. With RATE_LIMIT_BACKEND=redis and REDIS_URL set, buckets are kept in
+Redis and updated atomically by a Lua script so limits hold across gateway
+workers; if Redis is unreachable the local buckets take over, and Redis is
+skipped for RATE_LIMIT_REDIS_RETRY_SECONDS before it is tried again.
+"""
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+try:
+    from prometheus_client import Counter, Gauge
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "local").lower()
+RATE_LIMIT_WINDOW_SECONDS = float(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_CPU_SAMPLE_SECONDS = float(os.getenv("RATE_LIMIT_CPU_SAMPLE_SECONDS", "2"))
+RATE_LIMIT_REDIS_RETRY_SECONDS = float(os.getenv("RATE_LIMIT_REDIS_RETRY_SECONDS", "10"))
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+if PROMETHEUS_AVAILABLE:
+    rate_limit_decisions = Counter(
+        'gateway_rate_limit_decisions_total', 'Rate limit decisions', ['backend', 'result'])
+    rate_limit_keys = Gauge('gateway_rate_limit_keys', 'Token buckets held by the local rate limiter')
+    rate_limit_load_factor = Gauge('gateway_rate_limit_load_factor', 'Load multiplier applied to rate limits')
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of one rate limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+
+
+class CpuLoadSampler:
+    """Samples CPU usage on a daemon thread and exposes a rate limit multiplier"""
+
+    def __init__(self, interval: float = RATE_LIMIT_CPU_SAMPLE_SECONDS):
+        self.interval = interval
+        self.cpu_percent: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if not PSUTIL_AVAILABLE or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        psutil.cpu_percent(interval=None)  # prime the counter; first reading is meaningless
+        self._thread = threading.Thread(target=self._run, name="rate-limit-cpu-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.cpu_percent = psutil.cpu_percent(interval=None)
+            except Exception as e:
+                logger.warning(f"CPU sampling failed: {e}")
+                continue
+            if PROMETHEUS_AVAILABLE:
+                rate_limit_load_factor.set(self.load_factor())
+
+    def load_factor(self) -> float:
+        """0.5 under high load, 1.5 when idle, 1.0 otherwise (or before the first sample)"""
+        cpu = self.cpu_percent
+        if cpu is None:
+            return 1.0
+        if cpu > 80:
+            return 0.5
+        if cpu < 30:
+            return 1.5
+        return 1.0
+
+
+class LocalRateLimitBackend:
+    """In-process token buckets with idle-key eviction"""
+
+    name = "local"
+
+    def __init__(self, window_seconds: float = RATE_LIMIT_WINDOW_SECONDS, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        # key -> (tokens, last_refill); ordered by last touch
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, now: Optional[float] = None) -> RateLimitDecision:
+        now = time.monotonic() if now is None else now
+        rate = limit / self.window_seconds
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (float(limit), now))
+            tokens = min(float(limit), tokens + (now - last) * rate)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            self._buckets[key] = (tokens, now)
+            self._evict(now)
+            size = len(self._buckets)
+        if PROMETHEUS_AVAILABLE:
+            rate_limit_keys.set(size)
+        retry_after = 0.0 if allowed else (1.0 - tokens) / rate
+        return RateLimitDecision(allowed, limit, int(tokens), retry_after)
+
+    def _evict(self, now: float):
+        # A bucket untouched for a full window has refilled completely, so
+        # dropping it is indistinguishable from keeping it.
+        buckets = self._buckets
+        while buckets:
+            key, (_, last) = next(iter(buckets.items()))
+            if now - last < self.window_seconds and len(buckets) <= self.max_keys:
+                break
+            del buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# KEYS[1] bucket key; ARGV: limit, refill rate (tokens/s), now (s), ttl (s)
+_TOKEN_BUCKET_LUA = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local limit = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+  tokens = limit
+  ts = now
+end
+tokens = math.min(limit, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend:
+    """Token buckets shared across gateway workers through Redis"""
+
+    name = "redis"
+
+    def __init__(self, url: str, window_seconds: float = RATE_LIMIT_WINDOW_SECONDS, prefix: str = "ratelimit:"):
+        self.window_seconds = window_seconds
+        self.prefix = prefix
+        self._client = aioredis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._script = self._client.register_script(_TOKEN_BUCKET_LUA)
+
+    async def hit(self, key: str, limit: int) -> RateLimitDecision:
+        rate = limit / self.window_seconds
+        allowed, tokens = await self._script(
+            keys=[self.prefix + key],
+            args=[limit, rate, time.time(), int(self.window_seconds) + 1],
+        )
+        tokens = float(tokens)
+        allowed = bool(int(allowed))
+        retry_after = 0.0 if allowed else (1.0 - tokens) / rate
+        return RateLimitDecision(allowed, limit, int(tokens), retry_after)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class RateLimiter:
+    """Front end used by the middleware; prefers the shared backend when configured"""
+
+    def __init__(self, shared: Optional[RedisRateLimitBackend] = None,
+                 local: Optional[LocalRateLimitBackend] = None,
+                 sampler: Optional[CpuLoadSampler] = None,
+                 shared_retry_seconds: float = RATE_LIMIT_REDIS_RETRY_SECONDS):
+        self.shared = shared
+        self.local = local or LocalRateLimitBackend()
+        self.sampler = sampler or CpuLoadSampler()
+        self.shared_retry_seconds = shared_retry_seconds
+        self.shared_failures = 0
+        self._shared_down_until: Optional[float] = None
+
+    def effective_limit(self, base_limit: int) -> int:
+        return max(1, int(base_limit * self.sampler.load_factor()))
+
+    async def check(self, key: str, base_limit: int) -> RateLimitDecision:
+        """
+        Consume one token for `key`
+
+        Args:
+            key: Bucket key (client ip + path)
+            base_limit: Requests per window before load adjustment
+
+        Returns:
+            RateLimitDecision with the load-adjusted limit and remaining tokens
+        """
+        limit = self.effective_limit(base_limit)
+        backend = self.local.name
+        if self._use_shared():
+            try:
+                decision = await self.shared.hit(key, limit)
+                backend = self.shared.name
+                if self._shared_down_until is not None:
+                    self._shared_down_until = None
+                    logger.info("Shared rate limit backend recovered")
+            except Exception as e:
+                self.shared_failures += 1
+                if self._shared_down_until is None:
+                    logger.warning(f"Shared rate limit backend unavailable, using local buckets: {e}")
+                self._shared_down_until = time.monotonic() + self.shared_retry_seconds
+                decision = self.local.hit(key, limit)
+        else:
+            decision = self.local.hit(key, limit)
+        if PROMETHEUS_AVAILABLE:
+            rate_limit_decisions.labels(backend=backend, result="allowed" if decision.allowed else "limited").inc()
+        return decision
+
+    def _use_shared(self) -> bool:
+        # During an outage skip Redis (no per-request timeout) until the retry time
+        if self.shared is None:
+            return False
+        return self._shared_down_until is None or time.monotonic() >= self._shared_down_until
+
+    def start(self):
+        self.sampler.start()
+
+    async def aclose(self):
+        self.sampler.stop()
+        if self.shared is not None:
+            await self.shared.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.shared.name if self.shared is not None else self.local.name,
+            "local_keys": len(self.local),
+            "cpu_percent": self.sampler.cpu_percent,
+            "load_factor": self.sampler.load_factor(),
+            "shared_failures": self.shared_failures,
+            "shared_available": self.shared is not None and self._shared_down_until is None,
+        }
+
+
+def create_rate_limiter() -> RateLimiter:
+    """Build the rate limiter from RATE_LIMIT_BACKEND / REDIS_URL"""
+    shared = None
+    if RATE_LIMIT_BACKEND == "redis":
+        if REDIS_AVAILABLE and REDIS_URL:
+            shared = RedisRateLimitBackend(REDIS_URL)
+        else:
+            logger.warning("RATE_LIMIT_BACKEND=redis but redis package or REDIS_URL missing; using local buckets")
+    return RateLimiter(shared=shared)
+
+
+rate_limiter = create_rate_limiter()
@@ -0,0 +1,171 @@
+"""
+Report Export Engine for Gateway Service
+Streaming CSV / NDJSON job reports built from Mongo cursors
+
+A job report has one row per application to the job, joined with the
+candidate profile and that candidate's interviews, values feedback and offers
+for the job. Applications are read from a cursor in batches of
+EXPORT_BATCH_SIZE; each batch resolves its candidates, interviews, feedback
+and offers with one $in query per collection, run concurrently, and is
+encoded and yielded before the next batch is read. Memory therefore depends
+on the batch size, not on the number of applicants. Output can be gzip
+compressed on the fly.
+"""
+import io
+import os
+import csv
+import json
+import zlib
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+
+from bson import ObjectId
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+JOB_REPORT_COLUMNS = [
+    "application_id", "candidate_id", "name", "email", "phone", "location", "experience_years",
+    "technical_skills", "seniority_level", "education_level", "application_status", "applied_date",
+    "interview_count", "latest_interview_date", "latest_interview_status", "interviewer",
+    "feedback_count", "average_values_score", "offer_status", "offer_salary", "offer_start_date",
+]
+
+
+def _iso(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _latest(docs: List[Dict[str, Any]], field: str) -> Dict[str, Any]:
+    return max(docs, key=lambda d: str(d.get(field) or ""), default={})
+
+
+def _group(docs: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for doc in docs:
+        grouped.setdefault(str(doc.get("candidate_id")), []).append(doc)
+    return grouped
+
+
+async def _lookup_batch(db, job_id: str, candidate_ids: List[str]):
+    object_ids = [ObjectId(cid) for cid in candidate_ids if ObjectId.is_valid(cid)]
+    related = {"job_id": job_id, "candidate_id": {"$in": candidate_ids}}
+    candidates, interviews, feedback, offers = await asyncio.gather(
+        db.candidates.find({"_id": {"$in": object_ids}}, {"password_hash": 0}).to_list(length=None),
+        db.interviews.find(related).to_list(length=None),
+        db.feedback.find(related).to_list(length=None),
+        db.offers.find(related).to_list(length=None),
+    )
+    return {str(c["_id"]): c for c in candidates}, _group(interviews), _group(feedback), _group(offers)
+
+
+def _report_row(application: Dict[str, Any], candidate: Dict[str, Any], interviews: List[Dict[str, Any]],
+                feedback: List[Dict[str, Any]], offers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    interview = _latest(interviews, "interview_date")
+    offer = _latest(offers, "created_at")
+    scores = [f["average_score"] for f in feedback if isinstance(f.get("average_score"), (int, float))]
+    return {
+        "application_id": str(application["_id"]),
+        "candidate_id": str(application.get("candidate_id") or ""),
+        "name": candidate.get("name", ""),
+        "email": candidate.get("email", ""),
+        "phone": candidate.get("phone", ""),
+        "location": candidate.get("location", ""),
+        "experience_years": candidate.get("experience_years", ""),
+        "technical_skills": candidate.get("technical_skills", ""),
+        "seniority_level": candidate.get("seniority_level", ""),
+        "education_level": candidate.get("education_level", ""),
+        "application_status": application.get("status", ""),
+        "applied_date": _iso(application.get("applied_date") or application.get("created_at")),
+        "interview_count": len(interviews),
+        "latest_interview_date": _iso(interview.get("interview_date")),
+        "latest_interview_status": interview.get("status", ""),
+        "interviewer": interview.get("interviewer", ""),
+        "feedback_count": len(feedback),
+        "average_values_score": round(sum(scores) / len(scores), 2) if scores else None,
+        "offer_status": offer.get("status", ""),
+        "offer_salary": offer.get("salary"),
+        "offer_start_date": _iso(offer.get("start_date")),
+    }
+
+
+async def job_report_rows(db, job_id: str, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Report rows for every application to a job, in application order
+
+    Args:
+        db: Motor database
+        job_id: Job id as stored on job_applications
+        batch_size: Applications joined per round of lookups
+
+    Yields:
+        One dict per application (keys are JOB_REPORT_COLUMNS)
+    """
+    cursor = db.job_applications.find({"job_id": job_id}).sort("_id", 1).batch_size(batch_size)
+    batch: List[Dict[str, Any]] = []
+    async for application in cursor:
+        batch.append(application)
+        if len(batch) >= batch_size:
+            for row in await _join(db, job_id, batch):
+                yield row
+            batch = []
+    if batch:
+        for row in await _join(db, job_id, batch):
+            yield row
+
+
+async def _join(db, job_id: str, applications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    candidate_ids = list(dict.fromkeys(str(a.get("candidate_id")) for a in applications if a.get("candidate_id")))
+    candidates, interviews, feedback, offers = await _lookup_batch(db, job_id, candidate_ids)
+    rows = []
+    for application in applications:
+        cid = str(application.get("candidate_id"))
+        rows.append(_report_row(application, candidates.get(cid, {}), interviews.get(cid, []),
+                                feedback.get(cid, []), offers.get(cid, [])))
+    return rows
+
+
+async def csv_chunks(rows: AsyncIterator[Dict[str, Any]], columns: List[str],
+                     rows_per_chunk: int = 200) -> AsyncIterator[str]:
+    """Encode rows as CSV (header first), a few hundred rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    pending = 0
+    async for row in rows:
+        writer.writerow({k: ("" if v is None else v) for k, v in row.items()})
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+async def ndjson_chunks(rows: AsyncIterator[Dict[str, Any]], rows_per_chunk: int = 200) -> AsyncIterator[str]:
+    """Encode rows as newline-delimited JSON"""
+    lines: List[str] = []
+    async for row in rows:
+        lines.append(json.dumps(row, default=str))
+        if len(lines) >= rows_per_chunk:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def encode_stream(chunks: AsyncIterator[str], gzip: bool = False) -> AsyncIterator[bytes]:
+    """UTF-8 encode text chunks, optionally through a streaming gzip compressor"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    async for chunk in chunks:
+        data = chunk.encode("utf-8")
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    if compressor is not None:
+        yield compressor.flush()
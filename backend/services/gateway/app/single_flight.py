@@ -0,0 +1,178 @@
+"""
+Single-Flight Layer for Gateway Service
+Request coalescing and short-lived result caching for hot public GET routes
+
+During traffic spikes /v1/jobs, /v1/jobs/autocomplete and /v1/jobs/{job_id}
+receive many identical requests at once, and each used to run its own Mongo
+query. With @single_flight.route(...) the first request for a key runs the
+handler. Concurrent identical requests await that same computation, and the
+result can be kept for SINGLE_FLIGHT_TTL_SECONDS.
+
+Keys are built from the route name, the handler's path/query arguments
+(normalized: sorted, strings stripped) and the caller's auth scope, so a
+client's own view of a job is never served to another caller. Exceptions
+(HTTPException included) are shared by all coalesced waiters but never cached.
+The computation runs as its own task, so a leader that disconnects does not
+cancel it for the others.
+"""
+import os
+import time
+import asyncio
+import functools
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+try:
+    from prometheus_client import Counter
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+SINGLE_FLIGHT_TTL_SECONDS = float(os.getenv("SINGLE_FLIGHT_TTL_SECONDS", "2"))
+SINGLE_FLIGHT_MAX_ENTRIES = int(os.getenv("SINGLE_FLIGHT_MAX_ENTRIES", "2048"))
+
+if PROMETHEUS_AVAILABLE:
+    single_flight_requests = Counter(
+        'gateway_single_flight_requests_total', 'Coalesced route calls by outcome', ['route', 'outcome'])
+
+FlightKey = Tuple[Any, ...]
+
+OUTCOMES = ("computed", "coalesced", "cache_hit")
+
+
+def auth_scope(auth: Optional[Dict[str, Any]]) -> Tuple[str, ...]:
+    """Part of the key that separates callers who may see different results"""
+    if not auth:
+        return ("anonymous",)
+    if auth.get("type") == "api_key":
+        return ("api_key",)
+    return (str(auth.get("type")), str(auth.get("role")), str(auth.get("user_id")))
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_normalize(v) for v in value)
+    return value
+
+
+def request_key(kwargs: Dict[str, Any], scope_param: str = "auth") -> FlightKey:
+    """Normalized key for a handler call: sorted arguments, auth reduced to its scope"""
+    return tuple(
+        (param, auth_scope(value) if param == scope_param else _normalize(value))
+        for param, value in sorted(kwargs.items())
+    )
+
+
+def cacheable(result: Any) -> bool:
+    # Handlers report soft failures as {"...": [], "error": "..."}; don't pin those
+    return not (isinstance(result, dict) and "error" in result)
+
+
+class SingleFlight:
+    """Per-key in-flight deduplication plus a small TTL/LRU result cache"""
+
+    def __init__(self, ttl_seconds: float = SINGLE_FLIGHT_TTL_SECONDS, max_entries: int = SINGLE_FLIGHT_MAX_ENTRIES,
+                 enabled: bool = SINGLE_FLIGHT_ENABLED):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._inflight: Dict[FlightKey, asyncio.Future] = {}
+        self._results: "OrderedDict[FlightKey, Tuple[float, Any]]" = OrderedDict()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        # Bumped by invalidate(); results of flights started before are not cached
+        self._generation = 0
+
+    def _count(self, route: str, outcome: str):
+        counters = self._counters.setdefault(route, dict.fromkeys(OUTCOMES, 0))
+        counters[outcome] += 1
+        if PROMETHEUS_AVAILABLE:
+            single_flight_requests.labels(route=route, outcome=outcome).inc()
+
+    async def do(self, route: str, key: FlightKey, compute: Callable[[], Awaitable[Any]],
+                 ttl_seconds: Optional[float] = None) -> Any:
+        """
+        Run compute() once per key among concurrent callers
+
+        Args:
+            route: Route name (metrics label and key prefix)
+            key: Normalized request key within the route
+            compute: Coroutine factory producing the response
+            ttl_seconds: How long to reuse a successful result (0 = coalesce only)
+
+        Returns:
+            The shared result
+        """
+        if not self.enabled:
+            return await compute()
+        full_key = (route,) + key
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        cached = self._results.get(full_key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._results.move_to_end(full_key)
+                self._count(route, "cache_hit")
+                return cached[1]
+            del self._results[full_key]
+
+        flight = self._inflight.get(full_key)
+        if flight is not None:
+            self._count(route, "coalesced")
+            return await asyncio.shield(flight)
+
+        self._count(route, "computed")
+        flight = asyncio.ensure_future(compute())
+        self._inflight[full_key] = flight
+        flight.add_done_callback(functools.partial(self._landed, full_key, ttl, self._generation))
+        return await asyncio.shield(flight)
+
+    def _landed(self, full_key: FlightKey, ttl: float, generation: int, flight: asyncio.Future):
+        if self._inflight.get(full_key) is flight:
+            del self._inflight[full_key]
+        if flight.cancelled() or flight.exception() is not None:
+            return
+        result = flight.result()
+        if ttl > 0 and generation == self._generation and cacheable(result):
+            self._results[full_key] = (time.monotonic() + ttl, result)
+            self._results.move_to_end(full_key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def route(self, name: str, ttl_seconds: Optional[float] = None, scope_param: str = "auth"):
+        """
+        Decorator for FastAPI handlers: coalesce calls with identical arguments
+
+        The wrapper keeps the handler's signature, so path/query/dependency
+        injection is unchanged. The `scope_param` argument (the auth
+        dependency, if the handler has one) is reduced to auth_scope().
+        """
+        def decorator(handler: Callable[..., Awaitable[Any]]):
+            @functools.wraps(handler)
+            async def wrapper(**kwargs):
+                key = request_key(kwargs, scope_param)
+                return await self.do(name, key, lambda: handler(**kwargs), ttl_seconds)
+            return wrapper
+        return decorator
+
+    def invalidate(self, route_prefix: str = ""):
+        """Drop cached results for routes whose name starts with route_prefix"""
+        self._generation += 1
+        for full_key in [k for k in self._results if str(k[0]).startswith(route_prefix)]:
+            del self._results[full_key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "in_flight": len(self._inflight),
+            "cached": len(self._results),
+            "routes": {route: dict(counters) for route, counters in self._counters.items()},
+        }
+
+
+single_flight = SingleFlight()
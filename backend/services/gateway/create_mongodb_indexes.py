@@ -3,6 +3,7 @@ MongoDB Index Creation Script
 Creates recommended indexes for optimal query performance.
 """
 import asyncio
+import json
 import os
 import sys
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -35,7 +36,20 @@ except ImportError:
 except Exception as e:
     print(f"[WARN] Could not load .env file: {e}")
 
-async def create_indexes():
+def load_profile_suggestions(path):
+    """
+    Index suggestions exported from the gateway's Mongo profiler
+
+    Accepts a saved GET /v1/diagnostics/mongo response (its "index_suggestions")
+    or a bare list of {"collection", "keys": [[field, direction], ...], "name"}.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    suggestions = data.get("index_suggestions", []) if isinstance(data, dict) else data
+    return [s for s in suggestions if s.get("collection") and s.get("keys")]
+
+
+async def create_indexes(profile_path=None):
     """Create recommended indexes for MongoDB collections"""
     
     # Get MongoDB connection
@@ -106,9 +120,50 @@ async def create_indexes():
                 else:
                     indexes_failed.append(f"candidates.created_at: {str(e)}")
                     print(f"[ERROR] Failed to create index on 'created_at': {str(e)}")
+
+            # Text index (relevance-ranked /v1/candidates/search, see app/candidate_search.py)
+            try:
+                result = await db.candidates.create_index(
+                    [("name", "text"), ("email", "text"), ("technical_skills", "text")],
+                    weights={"name": 10, "email": 5, "technical_skills": 3},
+                    name="candidate_search_text"
+                )
+                indexes_created.append("candidates.name/email/technical_skills (text)")
+                print("[OK] Created text index on 'name', 'email', 'technical_skills' fields")
+            except Exception as e:
+                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
+                    indexes_existing.append("candidates.candidate_search_text")
+                    print("[INFO] Text index on candidates already exists")
+                else:
+                    indexes_failed.append(f"candidates.candidate_search_text: {str(e)}")
+                    print(f"[ERROR] Failed to create candidate text index: {str(e)}")
         else:
                 print("[WARN] 'candidates' collection does not exist (will be created on first insert)")
         
+        # ===== JOB_APPLICATIONS COLLECTION INDEXES =====
+        print("\n" + "="*60)
+        print("[INFO] Creating indexes for 'job_applications' collection...")
+        print("="*60)
+        
+        if "job_applications" in await db.list_collection_names():
+            # One application per (job, candidate); bulk upload upserts rely on it (app/bulk_ingest.py)
+            try:
+                result = await db.job_applications.create_index(
+                    [("job_id", 1), ("candidate_id", 1)], unique=True, name="job_candidate_unique"
+                )
+                indexes_created.append("job_applications.job_id+candidate_id (unique)")
+                print("[OK] Created unique index on 'job_id', 'candidate_id' fields")
+            except Exception as e:
+                if "already exists" in str(e).lower():
+                    indexes_existing.append("job_applications.job_candidate_unique")
+                    print("[INFO] Unique index on 'job_id', 'candidate_id' already exists")
+                else:
+                    indexes_failed.append(f"job_applications.job_candidate_unique: {str(e)}")
+                    print(f"[ERROR] Failed to create unique index on 'job_id', 'candidate_id' "
+                          f"(remove duplicate applications first): {str(e)}")
+        else:
+            print("[WARN] 'job_applications' collection does not exist (will be created on first insert)")
+        
         # ===== CLIENTS COLLECTION INDEXES =====
         print("\n" + "="*60)
         print("[INFO] Creating indexes for 'clients' collection...")
@@ -156,6 +211,28 @@ async def create_indexes():
         else:
             print("[WARN] 'clients' collection does not exist (will be created on first insert)")
         
+        # ===== PROFILER SUGGESTIONS (--from-profile, see app/mongo_profiler.py) =====
+        if profile_path:
+            print("\n" + "="*60)
+            print(f"[INFO] Creating indexes suggested by the Mongo profiler ({profile_path})...")
+            print("="*60)
+            
+            for suggestion in load_profile_suggestions(profile_path):
+                collection = suggestion["collection"]
+                keys = [(field, int(direction)) for field, direction in suggestion["keys"]]
+                label = f"{collection}." + "+".join(field for field, _ in keys)
+                try:
+                    result = await db[collection].create_index(keys, name=suggestion.get("name"))
+                    indexes_created.append(f"{label} (profiler)")
+                    print(f"[OK] Created index {result} on {label}")
+                except Exception as e:
+                    if "already exists" in str(e).lower():
+                        indexes_existing.append(label)
+                        print(f"[INFO] Index on {label} already exists")
+                    else:
+                        indexes_failed.append(f"{label}: {str(e)}")
+                        print(f"[ERROR] Failed to create index on {label}: {str(e)}")
+        
         # ===== SUMMARY =====
         print("\n" + "="*60)
         print("[SUMMARY] INDEX CREATION SUMMARY")
@@ -194,7 +271,12 @@ if __name__ == "__main__":
     print("="*60)
     print(f"Timestamp: {datetime.now(timezone.utc).isoformat()}\n")
     
-    success = asyncio.run(create_indexes())
+    # Optional: --from-profile <file> applies the gateway profiler's index suggestions
+    profile_path = None
+    if "--from-profile" in sys.argv:
+        profile_path = sys.argv[sys.argv.index("--from-profile") + 1]
+    
+    success = asyncio.run(create_indexes(profile_path))
     
     sys.exit(0 if success else 1)
 
@@ -5,13 +5,23 @@ Validates JWT tokens from frontend
 
 import os
 import jwt
+import time
+import hashlib
+import threading
 import httpx
+from collections import OrderedDict
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple
 from functools import lru_cache
 import logging
 
+try:
+    from prometheus_client import Counter, Gauge
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer(auto_error=False)
@@ -23,6 +33,17 @@ CANDIDATE_JWT_SECRET_KEY = os.getenv("CANDIDATE_JWT_SECRET_KEY", "")
 # API Key for service-to-service communication
 API_KEY_SECRET = os.getenv("API_KEY_SECRET", "")
 
+# Verified-token cache: a token is decoded once, then served from memory
+# until its exp (or JWT_CACHE_MAX_TTL_SECONDS, whichever comes first)
+JWT_CACHE_ENABLED = os.getenv("JWT_CACHE_ENABLED", "true").lower() == "true"
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
+JWT_CACHE_MAX_TTL_SECONDS = float(os.getenv("JWT_CACHE_MAX_TTL_SECONDS", "900"))
+
+if PROMETHEUS_AVAILABLE:
+    jwt_cache_lookups = Counter('gateway_jwt_cache_lookups_total', 'Verified-token cache lookups', ['result'])
+    jwt_cache_hit_ratio = Gauge('gateway_jwt_cache_hit_ratio', 'Verified-token cache hits / lookups')
+    jwt_cache_entries = Gauge('gateway_jwt_cache_entries', 'Tokens held in the verified-token cache')
+
 
 def validate_api_key(api_key: str) -> bool:
     """Validate API key for service-to-service communication"""
@@ -31,11 +52,106 @@ def validate_api_key(api_key: str) -> bool:
     return api_key == API_KEY_SECRET
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified JWT claims keyed by a SHA-256 digest of the token.
+
+    Only successfully verified tokens are stored (a flood of bad tokens cannot
+    evict good ones), each until its own exp claim. get_auth is a sync
+    dependency and runs in FastAPI's threadpool, hence the lock.
+    """
+
+    def __init__(self, max_entries: int = JWT_CACHE_MAX_ENTRIES, max_ttl_seconds: float = JWT_CACHE_MAX_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Return (claims, auth context) for a still-valid cached token"""
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        self._record("hit" if entry is not None else "miss")
+        return (entry[1], entry[2]) if entry is not None else None
+
+    def put(self, token: str, claims: Dict[str, Any], context: Dict[str, Any]):
+        now = time.time()
+        expires_at = now + self.max_ttl_seconds
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._entries[self._key(token)] = (expires_at, claims, context)
+            self._entries.move_to_end(self._key(token))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str):
+        with self._lock:
+            self._entries.pop(self._key(token), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _record(self, result: str):
+        if PROMETHEUS_AVAILABLE:
+            jwt_cache_lookups.labels(result=result).inc()
+            jwt_cache_hit_ratio.set(self.hit_ratio)
+            jwt_cache_entries.set(len(self._entries))
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": JWT_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+verified_tokens = VerifiedTokenCache()
+
+# Optional revocation hook: called with the verified claims on every JWT
+# request (cached or not); returning True rejects the token with 401.
+_revocation_check: Optional[Callable[[Dict[str, Any]], bool]] = None
+
+
+def set_revocation_check(check: Optional[Callable[[Dict[str, Any]], bool]]):
+    """Install (or clear with None) the token revocation hook, e.g. a jti denylist lookup"""
+    global _revocation_check
+    _revocation_check = check
+
+
 def verify_jwt_token(token: str, secret: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Verify a JWT token and return the payload.
     Uses HS256 with the JWT secret from environment settings.
-    Supports tokens with or without audience claim.
+    Supports tokens with or without audience claim (audience is not enforced).
     """
     # Use explicit secret if provided, otherwise use JWT_SECRET_KEY
     jwt_secret = secret or JWT_SECRET_KEY
@@ -45,74 +161,26 @@ def verify_jwt_token(token: str, secret: Optional[str] = None) -> Optional[Dict[
         return None
     
     if not token:
-        logger.error("Empty token provided to verify_jwt_token")
+        logger.debug("Empty token provided to verify_jwt_token")
         return None
     
+    # A single decode: audience is never verified, so retrying with other
+    # audience options cannot turn a bad signature or malformed token into a
+    # valid one. Failures are routine (get_auth tries one secret per token
+    # type), so they are logged at debug level.
     try:
-        # First try without audience validation (for custom tokens without aud claim)
-        # This is more efficient and handles tokens created by our login endpoints
-        payload = jwt.decode(
+        return jwt.decode(
             token,
             jwt_secret,
             algorithms=["HS256"],
             options={"verify_aud": False}
         )
-        logger.debug("JWT token verified successfully without audience validation")
-        return payload
     except jwt.ExpiredSignatureError:
-        logger.warning("JWT token expired")
-        return None
-    except jwt.InvalidSignatureError as e:
-        logger.error(f"[ERROR] JWT token signature invalid: {e}. Secret mismatch or wrong secret used.")
-        logger.error(f"Secret provided: {bool(jwt_secret)}, Secret length: {len(jwt_secret) if jwt_secret else 0}")
-        logger.error(f"Token (first 50 chars): {token[:50] if token else 'None'}...")
-        # Try with audience validation as fallback
-        try:
-            logger.debug("Attempting verification with audience validation as fallback")
-            payload = jwt.decode(
-                token,
-                jwt_secret,
-                algorithms=["HS256"],
-                audience="authenticated"
-            )
-            logger.debug("JWT token verified successfully with audience validation")
-            return payload
-        except Exception as e2:
-            logger.debug(f"Fallback verification with audience also failed: {e2}")
-            return None
-    except jwt.InvalidAudienceError:
-        # Token has aud claim but it doesn't match - try without audience validation
-        logger.debug("JWT token audience mismatch, trying without audience validation")
-        try:
-            payload = jwt.decode(
-                token,
-                jwt_secret,
-                algorithms=["HS256"],
-                options={"verify_aud": False}
-            )
-            logger.debug("JWT token verified successfully without audience validation")
-            return payload
-        except Exception as e2:
-            logger.debug(f"Verification without audience also failed: {e2}")
-            return None
-    except jwt.DecodeError as e:
-        logger.warning(f"JWT token decode error: {e}")
+        logger.debug("JWT token expired")
         return None
     except jwt.InvalidTokenError as e:
-        # Token might be missing aud claim - try without audience validation
-        logger.debug(f"JWT token validation error (possibly missing aud claim): {e}, trying without audience")
-        try:
-            payload = jwt.decode(
-                token,
-                jwt_secret,
-                algorithms=["HS256"],
-                options={"verify_aud": False}
-            )
-            logger.debug("JWT token verified successfully without audience validation")
-            return payload
-        except Exception as e2:
-            logger.warning(f"Invalid JWT token even without audience validation: {e2}")
-            return None
+        logger.debug(f"JWT token rejected: {e}")
+        return None
     except Exception as e:
         logger.error(f"Unexpected error verifying JWT token: {e}")
         return None
@@ -150,6 +218,8 @@ def get_auth(credentials: HTTPAuthorizationCredentials = Security(security)):
     - API keys: For service-to-service communication
     - JWT: For authenticated users from frontend
     Supports both client JWT tokens (JWT_SECRET_KEY) and candidate JWT tokens (CANDIDATE_JWT_SECRET_KEY)
+    Verified JWTs are served from verified_tokens until they expire; the
+    revocation hook (set_revocation_check) still runs on every request.
     See ENVIRONMENT_VARIABLES.md for standardized variable names.
     """
     if not credentials:
@@ -162,8 +232,6 @@ def get_auth(credentials: HTTPAuthorizationCredentials = Security(security)):
         logger.warning("Empty token in credentials")
         raise HTTPException(status_code=401, detail="Authentication token is empty")
     
-    logger.info(f"[AUTH] Attempting authentication with token (first 30 chars): {token[:30]}...")
-    
     # Try API key first (for service-to-service)
     if validate_api_key(token):
         logger.debug("Authentication successful: API key")
@@ -174,10 +242,30 @@ def get_auth(credentials: HTTPAuthorizationCredentials = Security(security)):
             "role": "admin"
         }
     
+    cached = verified_tokens.get(token) if JWT_CACHE_ENABLED else None
+    if cached is not None:
+        claims, context = cached
+    else:
+        claims, context = _verify_jwt_context(token)
+        if claims is None:
+            logger.warning("All authentication methods failed for bearer token")
+            raise HTTPException(status_code=401, detail="Invalid authentication token")
+        if JWT_CACHE_ENABLED:
+            verified_tokens.put(token, claims, context)
+    
+    if _revocation_check is not None and _revocation_check(claims):
+        verified_tokens.invalidate(token)
+        logger.info(f"Rejected revoked token for user {context.get('user_id')}")
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    
+    return dict(context)
+
+
+def _verify_jwt_context(token: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Decode a bearer JWT against the candidate then client secret; returns (claims, auth context)"""
     # Try candidate JWT token first (CANDIDATE_JWT_SECRET_KEY)
     # This includes both candidates and recruiters (recruiters use candidate login endpoint)
     if CANDIDATE_JWT_SECRET_KEY:
-        logger.info(f"Attempting candidate JWT validation with secret (exists: {bool(CANDIDATE_JWT_SECRET_KEY)}, length: {len(CANDIDATE_JWT_SECRET_KEY) if CANDIDATE_JWT_SECRET_KEY else 0})")
         payload = verify_jwt_token(token, secret=CANDIDATE_JWT_SECRET_KEY)
         if payload:
             user_info = get_user_from_token(payload)
@@ -185,42 +273,34 @@ def get_auth(credentials: HTTPAuthorizationCredentials = Security(security)):
             token_role = payload.get("role", "candidate")
             if token_role not in ["candidate", "recruiter"]:
                 token_role = "candidate"  # Default to candidate if invalid role
-            logger.info(f"[OK] Authentication successful: Candidate JWT token for user {user_info.get('user_id')} with role {token_role}")
-            return {
+            logger.debug(f"Authentication successful: Candidate JWT token for user {user_info.get('user_id')} with role {token_role}")
+            return payload, {
                 "type": "jwt_token",
                 "user_id": user_info["user_id"],
                 "email": user_info["email"],
                 "role": token_role,  # Use role from token payload (supports recruiter)
                 "name": user_info["name"],
             }
-        else:
-            logger.error(f"[ERROR] Candidate JWT token validation failed. Token (first 50 chars): {token[:50] if token else 'None'}...")
-            logger.error(f"Secret configured: {bool(CANDIDATE_JWT_SECRET_KEY)}, Secret length: {len(CANDIDATE_JWT_SECRET_KEY) if CANDIDATE_JWT_SECRET_KEY else 0}")
     else:
         logger.error("[ERROR] CANDIDATE_JWT_SECRET_KEY not configured")
     
     # Try client JWT token (JWT_SECRET_KEY)
-    jwt_secret = JWT_SECRET_KEY
-    if jwt_secret:
-        logger.debug(f"Attempting client JWT validation with secret (exists: {bool(jwt_secret)})")
-        payload = verify_jwt_token(token, secret=jwt_secret)
+    if JWT_SECRET_KEY:
+        payload = verify_jwt_token(token, secret=JWT_SECRET_KEY)
         if payload:
             user_info = get_user_from_token(payload)
             logger.debug(f"Authentication successful: Client JWT token for user {user_info.get('user_id')}")
-            return {
+            return payload, {
                 "type": "jwt_token",
                 "user_id": user_info["user_id"],
                 "email": user_info["email"],
                 "role": user_info["role"],
                 "name": user_info["name"],
             }
-        else:
-            logger.warning("Client JWT token validation failed")
     else:
         logger.warning("JWT_SECRET_KEY not configured")
     
-    logger.error(f"All authentication methods failed for token (first 20 chars): {token[:20]}...")
-    raise HTTPException(status_code=401, detail="Invalid authentication token")
+    return None, None
 
 
 def auth_dependency(credentials: HTTPAuthorizationCredentials = Security(security)):
@@ -6,11 +6,12 @@ Provides workflow endpoints and integration with LangGraph service
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
-import httpx
 import os
 import asyncio
 from datetime import datetime, timezone
 
+from app.http_clients import upstream_clients
+
 router = APIRouter()
 
 class WorkflowTrigger(BaseModel):
@@ -42,18 +43,16 @@ async def call_langgraph_service(endpoint: str, method: str = "GET", data: Dict[
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = f"{get_langgraph_service_url()}{endpoint}"
-            
-            if method == "POST":
-                response = await client.post(url, json=data, headers=headers)
-            else:
-                response = await client.get(url, headers=headers)
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"error": f"LangGraph service error: {response.status_code} - {response.text}"}
+        # Pooled, circuit-broken client shared across requests
+        if method == "POST":
+            response = await upstream_clients.request("langgraph", "POST", endpoint, json=data, headers=headers)
+        else:
+            response = await upstream_clients.request("langgraph", "GET", endpoint, headers=headers)
+        
+        if response.status_code == 200:
+            return response.json()
+        else:
+            return {"error": f"LangGraph service error: {response.status_code} - {response.text}"}
     except Exception as e:
         return {"error": f"LangGraph connection failed: {str(e)}"}
 
@@ -1,6 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict, Any
-import httpx
 import sys
 import os
 
@@ -9,6 +8,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(
 
 # Now dependencies can be imported safely (using local jwt_auth from dependencies)
 from dependencies import get_api_key
+from app.http_clients import upstream_clients
 
 router = APIRouter(prefix="/rl", tags=["RL + Feedback Agent"])
 
@@ -19,20 +19,18 @@ async def rl_predict_match(
 ):
     """Proxy RL prediction to LangGraph service"""
     try:
-        langgraph_url = os.getenv("LANGGRAPH_SERVICE_URL", "http://localhost:9001")
+        response = await upstream_clients.request(
+            "langgraph", "POST", "/rl/predict",
+            json=request_data,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=120.0
+        )
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{langgraph_url}/rl/predict",
-                json=request_data,
-                headers={"Authorization": f"Bearer {api_key}"}
-            )
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise HTTPException(status_code=response.status_code, detail=response.text)
             
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(status_code=response.status_code, detail=response.text)
-                
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -43,20 +41,18 @@ async def submit_rl_feedback(
 ):
     """Proxy RL feedback to LangGraph service"""
     try:
-        langgraph_url = os.getenv("LANGGRAPH_SERVICE_URL", "http://localhost:9001")
+        response = await upstream_clients.request(
+            "langgraph", "POST", "/rl/feedback",
+            json=feedback_data,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=120.0
+        )
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{langgraph_url}/rl/feedback",
-                json=feedback_data,
-                headers={"Authorization": f"Bearer {api_key}"}
-            )
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise HTTPException(status_code=response.status_code, detail=response.text)
             
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(status_code=response.status_code, detail=response.text)
-                
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -64,19 +60,17 @@ async def submit_rl_feedback(
 async def get_rl_analytics(api_key: str = Depends(get_api_key)):
     """Proxy RL analytics to LangGraph service"""
     try:
-        langgraph_url = os.getenv("LANGGRAPH_SERVICE_URL", "http://localhost:9001")
+        response = await upstream_clients.request(
+            "langgraph", "GET", "/rl/analytics",
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=120.0
+        )
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.get(
-                f"{langgraph_url}/rl/analytics",
-                headers={"Authorization": f"Bearer {api_key}"}
-            )
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise HTTPException(status_code=response.status_code, detail=response.text)
             
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(status_code=response.status_code, detail=response.text)
-                
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -84,18 +78,16 @@ async def get_rl_analytics(api_key: str = Depends(get_api_key)):
 async def get_rl_performance(api_key: str = Depends(get_api_key)):
     """Proxy RL performance to LangGraph service"""
     try:
-        langgraph_url = os.getenv("LANGGRAPH_SERVICE_URL", "http://localhost:9001")
+        response = await upstream_clients.request(
+            "langgraph", "GET", "/rl/performance",
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=120.0
+        )
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.get(
-                f"{langgraph_url}/rl/performance",
-                headers={"Authorization": f"Bearer {api_key}"}
-            )
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise HTTPException(status_code=response.status_code, detail=response.text)
             
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(status_code=response.status_code, detail=response.text)
-                
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Unit tests for the ANN candidate index (NumPy IVF backend)
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'agent', 'semantic_engine'))
+
+from ann_index import CandidateANNIndex, IVFIndex  # noqa: E402
+from embedding_store import normalize_rows  # noqa: E402
+
+
+def _vectors(count, dimension=32, seed=0):
+    return normalize_rows(np.random.default_rng(seed).normal(size=(count, dimension)))
+
+
+def test_exact_search_below_threshold():
+    vectors = _vectors(200)
+    index = CandidateANNIndex(32, backend='ivf')
+    index.upsert([str(i) for i in range(200)], vectors)
+
+    expected = [str(i) for i in np.argsort(-(vectors @ vectors[7]))[:5]]
+    assert index.search(vectors[7], 5) == expected
+
+
+def test_ivf_recall_after_training():
+    vectors = _vectors(3000)
+    index = IVFIndex(32, exact_threshold=1000, nprobe=12)
+    index.upsert([str(i) for i in range(3000)], vectors)
+    assert index._centroids is not None
+
+    queries = _vectors(20, seed=1)
+    recall = []
+    for query in queries:
+        truth = set(str(i) for i in np.argsort(-(vectors @ query))[:50])
+        recall.append(len(truth & set(index.search(query, 50))) / 50)
+    assert np.mean(recall) > 0.6
+
+
+def test_upsert_replaces_and_remove_drops():
+    vectors = _vectors(10)
+    index = CandidateANNIndex(32, backend='ivf')
+    index.upsert([str(i) for i in range(10)], vectors)
+    index.upsert(['3'], vectors[9:10])
+    index.remove(['9'])
+
+    assert len(index) == 9
+    assert index.search(vectors[9], 1) == ['3']
+
+
+def test_chunked_build_grows_buffer_geometrically():
+    vectors = _vectors(5000)
+    index = IVFIndex(32, exact_threshold=100000)
+    buffers = set()
+    for start in range(0, 5000, 500):
+        index.upsert([str(i) for i in range(start, start + 500)], vectors[start:start + 500])
+        buffers.add(id(index._buffer))
+    assert len(buffers) <= 4  # 1024, 2048, 4096, 8192 rows
+    assert len(index) == 5000 and index._vectors.shape == (5000, 32)
+    assert np.array_equal(index._vectors, vectors.astype(np.float32))
+
+    index.remove([str(i) for i in range(4000, 5000)])
+    index.upsert(['x'], vectors[4999:5000])
+    assert len(index) == 4001 and index.search(vectors[4999], 1) == ['x']
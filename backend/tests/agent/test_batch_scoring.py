@@ -0,0 +1,107 @@
+"""
+Parity tests: vectorized Phase3SemanticEngine.score_batch vs per-candidate scoring.
+Uses a deterministic bag-of-words encoder so no model download is needed.
+"""
+import os
+import sys
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'agent'))
+
+from semantic_engine.phase3_engine import Phase3SemanticEngine  # noqa: E402
+from semantic_engine.embedding_store import CandidateEmbeddingStore  # noqa: E402
+
+
+class HashingEncoder:
+    """Stand-in for SentenceTransformer: hashed token counts"""
+    dimension = 64
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in str(text).lower().split():
+                vectors[row, zlib.crc32(token.encode()) % self.dimension] += 1.0
+            vectors[row, 0] += 0.01
+        return vectors
+
+
+@pytest.fixture
+def engine():
+    instance = object.__new__(Phase3SemanticEngine)
+    instance.model = HashingEncoder()
+    instance.encoder = None
+    instance.embedding_store = CandidateEmbeddingStore(backend=None)
+    instance.company_preferences = defaultdict(dict)
+    instance.cache = {}
+    instance._location_lock = threading.Lock()
+    return instance
+
+
+JOB = {
+    'id': 'job-1',
+    'title': 'Senior Python Engineer',
+    'description': 'Build data pipelines',
+    'requirements': 'Python, SQL, AWS',
+    'location': 'Mumbai',
+    'experience_level': 'Senior',
+}
+
+CANDIDATES = [
+    {'id': 'c1', 'location': 'Mumbai', 'experience_years': 5, 'technical_skills': 'Python, SQL',
+     'seniority_level': 'Senior', 'education_level': 'BTech'},
+    {'id': 'c2', 'location': 'Pune', 'experience_years': 1, 'technical_skills': 'Java',
+     'seniority_level': 'Junior', 'education_level': 'BSc'},
+    {'id': 'c3', 'location': '', 'experience_years': 12, 'technical_skills': '',
+     'seniority_level': 'Lead', 'education_level': 'MTech'},
+    {'id': 'c4', 'location': 'mumbai', 'experience_years': '3', 'technical_skills': 'AWS python',
+     'seniority_level': 'Mid', 'education_level': ''},
+]
+
+
+def test_score_batch_matches_per_candidate_scores(engine):
+    batch = engine.score_batch(JOB, CANDIDATES)
+    for candidate, batched in zip(CANDIDATES, batch):
+        single = engine.calculate_adaptive_score(JOB, {**candidate, 'experience_years': int(candidate['experience_years'])})
+        assert batched['total_score'] == pytest.approx(single['total_score'], abs=1e-5)
+        for key, value in single['breakdown'].items():
+            assert batched['breakdown'][key] == pytest.approx(value, abs=1e-5)
+
+
+def test_remote_job_scores_every_located_candidate_as_match(engine):
+    batch = engine.score_batch({**JOB, 'location': 'Remote (India)'}, CANDIDATES)
+    assert [round(b['breakdown']['location_match'], 2) for b in batch] == [1.0, 1.0, 0.5, 1.0]
+
+
+def test_match_reuses_cached_candidate_vectors(engine):
+    engine.match_candidates(JOB, CANDIDATES)
+    calls = engine.model.calls
+    engine.match_candidates(JOB, CANDIDATES)
+    # Second run only encodes the job text and requirements
+    assert engine.model.calls - calls == 2
+
+
+def test_location_vectors_survive_concurrent_cache_resets(engine):
+    def lookup(worker):
+        for chunk in range(6):
+            locations = [f"city-{worker}-{chunk}-{i}" for i in range(500)] + ["mumbai"]
+            vectors = engine._location_vectors(locations)
+            assert set(vectors) == set(locations)
+        return True
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(lookup, range(8)))
+    assert len(engine.cache['location_vectors']) <= 10000
@@ -0,0 +1,53 @@
+"""
+Unit tests for the candidate embedding store (no model or database required)
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'agent', 'semantic_engine'))
+
+from embedding_store import (  # noqa: E402
+    CandidateEmbeddingStore,
+    NpyEmbeddingBackend,
+    candidate_content_hash,
+    normalize_rows,
+)
+
+
+def _entry(candidate, seed):
+    rng = np.random.default_rng(seed)
+    return {
+        'content_hash': candidate_content_hash(candidate),
+        'profile': normalize_rows(rng.normal(size=8))[0],
+        'skills': normalize_rows(rng.normal(size=8))[0],
+    }
+
+
+def test_content_hash_tracks_embedded_fields_only():
+    candidate = {'id': '1', 'technical_skills': 'python', 'seniority_level': 'senior', 'education_level': 'BSc'}
+    assert candidate_content_hash(candidate) == candidate_content_hash({**candidate, 'name': 'Renamed'})
+    assert candidate_content_hash(candidate) != candidate_content_hash({**candidate, 'technical_skills': 'java'})
+
+
+def test_lookup_skips_stale_entries():
+    store = CandidateEmbeddingStore(backend=None)
+    candidate = {'id': 'a', 'technical_skills': 'python'}
+    store.store({'a': _entry(candidate, 1)})
+
+    assert 'a' in store.lookup([candidate])
+    assert store.lookup([{**candidate, 'technical_skills': 'go'}]) == {}
+
+
+def test_npy_backend_persists_and_grows(tmp_path):
+    path = str(tmp_path / 'embeddings')
+    backend = NpyEmbeddingBackend(path, dimension=8, model_name='test-model')
+    candidates = [{'id': str(i), 'technical_skills': f'skill-{i}'} for i in range(1500)]
+    entries = {c['id']: _entry(c, i) for i, c in enumerate(candidates)}
+    backend.save(entries)
+
+    reopened = CandidateEmbeddingStore(NpyEmbeddingBackend(path, dimension=8, model_name='test-model'))
+    found = reopened.lookup(candidates)
+    assert len(found) == 1500
+    np.testing.assert_allclose(found['1499']['profile'], entries['1499']['profile'], rtol=1e-6)
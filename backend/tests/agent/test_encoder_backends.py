@@ -0,0 +1,83 @@
+"""
+Unit tests for the ONNX (int8) sentence encoder backend and its PyTorch fallback
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'agent'))
+
+from semantic_engine import encoder_backends  # noqa: E402
+from semantic_engine.encoder_backends import (  # noqa: E402
+    PARITY_TEXTS,
+    OnnxSentenceEncoder,
+    cosine_drift,
+    export_onnx,
+    load_sentence_encoder,
+)
+
+WORDS = ("senior backend engineer python fastapi mongodb aws data analyst sql power bi excel mumbai "
+         "remote india machine learning pytorch nlp react typescript hr payroll java spring kafka "
+         "devops terraform linux bengaluru customer support english hindi years experience").split()
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    """A small random BERT sentence encoder built offline (mean pooling + normalize, like MiniLM)"""
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    path = tmp_path_factory.mktemp("tiny-bert")
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(set(WORDS)) + list("abcdefghijklmnopqrstuvwxyz0123456789,.-:;()+")
+    (path / "vocab.txt").write_text("\n".join(vocab), encoding="utf-8")
+    BertTokenizerFast(vocab_file=str(path / "vocab.txt")).save_pretrained(str(path))
+    config = BertConfig(vocab_size=len(vocab), hidden_size=64, num_hidden_layers=2, num_attention_heads=4,
+                        intermediate_size=128, max_position_embeddings=128)
+    BertModel(config).save_pretrained(str(path))
+
+    transformer = models.Transformer(str(path), max_seq_length=64)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension(), pooling_mode="mean")
+    return SentenceTransformer(modules=[transformer, pooling, models.Normalize()], device="cpu")
+
+
+@pytest.mark.parametrize("quantize,floor", [(False, 0.9999), (True, encoder_backends.ONNX_MIN_COSINE)])
+def test_onnx_export_matches_fp32_reference(tiny_model, tmp_path, quantize, floor):
+    encoder = OnnxSentenceEncoder(export_onnx(tiny_model, str(tmp_path / "export"), quantize=quantize))
+    texts = PARITY_TEXTS + ["", "python " * 200]  # empty and truncated inputs
+
+    expected = tiny_model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    actual = encoder.encode(texts, batch_size=5)
+    assert actual.shape == expected.shape == (len(texts), encoder.get_sentence_embedding_dimension())
+    assert np.allclose(np.linalg.norm(actual, axis=1), 1.0, atol=1e-5)
+    assert cosine_drift(expected, actual).min() >= floor
+    assert encoder.backend == ("onnx-int8" if quantize else "onnx")
+    assert encoder.config["min_cosine"] >= floor  # parity recorded in the staged config before the rename
+    assert encoder.encode(texts[0]).shape == (encoder.get_sentence_embedding_dimension(),)
+
+
+def test_loader_exports_once_and_falls_back_below_the_parity_floor(tiny_model, tmp_path, monkeypatch):
+    loads = []
+
+    def fake_torch_loader(model_name):
+        loads.append(model_name)
+        tiny_model.backend = "torch"
+        return tiny_model
+
+    monkeypatch.setattr(encoder_backends, "load_torch_encoder", fake_torch_loader)
+    export_dir = str(tmp_path / "cache")
+
+    encoder = load_sentence_encoder("tiny", backend="onnx", export_dir=export_dir)
+    assert encoder.backend == "onnx-int8" and encoder.config["min_cosine"] >= encoder_backends.ONNX_MIN_COSINE
+    # Cached export: no PyTorch model load on the next start
+    assert load_sentence_encoder("tiny", backend="auto", export_dir=export_dir).backend == "onnx-int8"
+    assert loads == ["tiny"]
+
+    monkeypatch.setattr(encoder_backends, "ONNX_MIN_COSINE", 1.01)
+    assert load_sentence_encoder("tiny", backend="onnx", export_dir=export_dir) is tiny_model
+    assert load_sentence_encoder("tiny", backend="torch", export_dir=export_dir) is tiny_model
+    assert loads == ["tiny"] * 3
@@ -0,0 +1,55 @@
+"""
+Unit tests for the agent inference executor admission control
+"""
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'agent'))
+
+from inference_executor import InferenceExecutor, InferenceOverloaded  # noqa: E402
+
+
+def test_rejects_when_workers_and_queue_are_full():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run("match", release.wait))
+        queued = asyncio.ensure_future(executor.run("match", lambda: "queued"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferenceOverloaded):
+            await executor.run("match", lambda: "rejected")
+        assert executor.stats()["queued"] == 1
+        release.set()
+        return await running, await queued
+
+    assert asyncio.run(scenario()) == (True, "queued")
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["queued"] == stats["running"] == 0
+    executor.shutdown()
+
+
+def test_cancelled_queued_task_releases_its_slot():
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run("match", release.wait))
+        queued = asyncio.ensure_future(executor.run("match", lambda: "never"))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        await asyncio.sleep(0.01)
+        assert executor.stats()["queued"] == 0
+        admitted = asyncio.ensure_future(executor.run("match", lambda: "admitted"))
+        release.set()
+        return await running, await admitted
+
+    assert asyncio.run(scenario()) == (True, "admitted")
+    assert executor.stats()["queued"] == executor.stats()["running"] == 0
+    executor.shutdown()
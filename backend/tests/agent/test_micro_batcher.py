@@ -0,0 +1,55 @@
+"""
+Unit tests for the micro-batching encoder
+"""
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'agent'))
+
+from semantic_engine.micro_batcher import MicroBatchEncoder  # noqa: E402
+
+
+class RecordingModel:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts, **kwargs):
+        self.batch_sizes.append(len(texts))
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+def test_concurrent_requests_share_one_batch_and_get_their_own_rows():
+    model = RecordingModel()
+    encoder = MicroBatchEncoder(model, max_batch_size=64, max_wait_ms=200)
+    results = {}
+
+    def call(name, texts):
+        results[name] = encoder.encode(texts)
+
+    threads = [threading.Thread(target=call, args=(f"r{i}", ["x" * (i + 1)] * 2)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(model.batch_sizes) == 8
+    assert len(model.batch_sizes) < 4
+    for i in range(4):
+        assert results[f"r{i}"].shape == (2, 2)
+        assert list(results[f"r{i}"][:, 0]) == [i + 1, i + 1]
+
+
+def test_full_batches_bypass_the_queue():
+    model = RecordingModel()
+    encoder = MicroBatchEncoder(model, max_batch_size=4, max_wait_ms=200)
+    assert encoder.encode(["a"] * 10).shape == (10, 2)
+    assert model.batch_sizes == [10]
+    assert encoder.batches == 0
@@ -0,0 +1,13 @@
+"""
+Shared fixtures for the gateway unit tests
+"""
+import pytest
+
+
+@pytest.fixture
+def mongomock_bulk_sort_compat(monkeypatch):
+    """Let mongomock accept the `sort` argument newer pymongo passes for bulk updates"""
+    from mongomock.collection import BulkOperationBuilder
+    add_update = BulkOperationBuilder.add_update
+    monkeypatch.setattr(BulkOperationBuilder, "add_update",
+                        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs))
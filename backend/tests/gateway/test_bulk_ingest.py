@@ -0,0 +1,107 @@
+"""
+Unit tests for the bulk candidate ingestion path
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.bulk_ingest import ingest_candidates  # noqa: E402
+
+
+pytestmark = pytest.mark.usefixtures("mongomock_bulk_sort_compat")
+
+
+class CountingCollection:
+    """Wraps a collection and counts the calls that reach the database"""
+
+    def __init__(self, collection, calls):
+        self._collection, self._calls = collection, calls
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if callable(attr):
+            def counted(*args, **kwargs):
+                self._calls.append(f"{self._collection.name}.{name}")
+                return attr(*args, **kwargs)
+            return counted
+        return attr
+
+
+class CountingDb:
+    def __init__(self, db):
+        self.calls = []
+        self.candidates = CountingCollection(db.candidates, self.calls)
+        self.job_applications = CountingCollection(db.job_applications, self.calls)
+
+
+async def _db():
+    db = mongomock_motor.AsyncMongoMockClient()["test_bulk_ingest"]
+    await db.candidates.create_index("email", unique=True)
+    await db.job_applications.create_index([("job_id", 1), ("candidate_id", 1)], unique=True)
+    return db
+
+
+def test_batch_uses_constant_round_trips_and_reports_each_row():
+    async def scenario():
+        db = await _db()
+        existing = await db.candidates.insert_one({"email": "old@x.io", "name": "Old"})
+        counting = CountingDb(db)
+        rows = [{"email": f"c{i}@x.io", "name": f"C{i}", "experience_years": "3"} for i in range(50)]
+        rows += [{"email": "old@x.io"}, {"name": "no email"}, {"email": "c1@x.io"}]
+        result = await ingest_candidates(counting, rows, job_id="job1")
+        return db, existing.inserted_id, counting.calls, result
+
+    db, existing_id, calls, result = asyncio.run(scenario())
+    assert calls == ["candidates.find", "candidates.insert_many", "job_applications.bulk_write"]
+    assert len(result.inserted) == 50 and result.applications_linked == 51
+    assert [r["status"] for r in result.rows[50:]] == ["exists", "invalid", "duplicate"]
+    assert result.rows[50]["candidate_id"] == str(existing_id)
+    assert result.errors[0] == "Candidate 51: Email old@x.io already exists"
+    assert result.inserted[3]["experience_years"] == 3
+    assert asyncio.run(db.job_applications.count_documents({"job_id": "job1"})) == 51
+
+
+def test_reupload_is_idempotent_and_races_resolve_through_unique_indexes(monkeypatch):
+    import app.bulk_ingest as bulk_ingest
+    prefetch = bulk_ingest._existing_ids
+
+    async def scenario():
+        db = await _db()
+        rows = [{"email": "a@x.io"}, {"email": "b@x.io"}]
+        await ingest_candidates(db, rows, job_id="job1")
+        again = await ingest_candidates(db, rows, job_id="job1")
+
+        # Another writer inserts late@x.io after the prefetch ran: the unique index rejects our copy
+        late = await db.candidates.insert_one({"email": "late@x.io"})
+
+        async def stale_prefetch(db_, emails):
+            monkeypatch.setattr(bulk_ingest, "_existing_ids", prefetch)
+            return {}
+        monkeypatch.setattr(bulk_ingest, "_existing_ids", stale_prefetch)
+        raced = await ingest_candidates(db, [{"email": "late@x.io"}, {"email": "new@x.io"}], job_id="job2")
+        return db, again, raced, late.inserted_id
+
+    db, again, raced, late_id = asyncio.run(scenario())
+    assert [r["status"] for r in again.rows] == ["exists", "exists"]
+    assert again.applications_linked == 0 and not again.inserted
+    assert [r["status"] for r in raced.rows] == ["exists", "inserted"]
+    assert raced.rows[0]["candidate_id"] == str(late_id)
+    assert raced.applications_linked == 2
+    assert asyncio.run(db.job_applications.count_documents({})) == 4
+    assert asyncio.run(db.candidates.count_documents({"email": "late@x.io"})) == 1
+
+
+def test_non_string_emails_are_rejected_per_row():
+    async def scenario():
+        db = await _db()
+        rows = [{"email": 12345}, {"email": ["a@x.io"]}, {"email": "ok@x.io"}]
+        return await ingest_candidates(db, rows)
+
+    result = asyncio.run(scenario())
+    assert [r["status"] for r in result.rows] == ["invalid", "invalid", "inserted"]
+    assert result.errors == ["Candidate 1: Email must be a string", "Candidate 2: Email must be a string"]
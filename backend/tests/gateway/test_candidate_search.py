@@ -0,0 +1,116 @@
+"""
+Unit tests for the gateway candidate search strategies
+"""
+import asyncio
+import os
+import sys
+
+from pymongo.errors import OperationFailure
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.candidate_search import CandidateSearch  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, collection, query):
+        self.collection, self.query = collection, query
+        self._skip, self._limit = 0, None
+
+    def sort(self, *args):
+        return self
+
+    def skip(self, n):
+        self._skip = n
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    async def to_list(self, length=None):
+        if "$text" in self.query and not self.collection.text_index:
+            raise OperationFailure("text index required for $text query")
+        rows = self.collection.results_for(self.query)
+        return rows[self._skip:self._skip + self._limit]
+
+
+class FakeCandidates:
+    def __init__(self, text_index=True, text_hits=3, regex_hits=5):
+        self.text_index, self.text_hits, self.regex_hits = text_index, text_hits, regex_hits
+        self.queries = []
+
+    def results_for(self, query):
+        hits = self.text_hits if "$text" in query else self.regex_hits
+        return [{"_id": i, "name": f"c{i}"} for i in range(hits)]
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        return FakeCursor(self, query)
+
+    async def count_documents(self, query, limit=0):
+        if "$text" in query and not self.text_index:
+            raise OperationFailure("text index required for $text query")
+        return len(self.results_for(query))
+
+    async def estimated_document_count(self):
+        return 1000
+
+
+class FakeDb:
+    def __init__(self, **kwargs):
+        self.candidates = FakeCandidates(**kwargs)
+
+
+def test_text_index_is_used_and_ranked():
+    db = FakeDb()
+    docs, total, meta = asyncio.run(CandidateSearch().search(db, {}, "python", ["name"], 10, 0))
+    assert meta == {"strategy": "text", "total_is_estimate": False, "next_cursor": None}
+    assert total == 3 and len(docs) == 3
+    assert db.candidates.queries[0]["$text"] == {"$search": "python"}
+
+
+def test_missing_index_and_empty_text_hits_fall_back_to_substring_match():
+    search = CandidateSearch()
+    db = FakeDb(text_index=False)
+    _, total, meta = asyncio.run(search.search(db, {}, "pyth", ["name", "email"], 10, 0))
+    assert meta["strategy"] == "regex" and total == 5
+    assert "$or" in db.candidates.queries[-1]
+
+    db = FakeDb(text_hits=0)
+    _, total, meta = asyncio.run(CandidateSearch().search(db, {}, "pyth", ["name"], 10, 0))
+    assert meta["strategy"] == "regex" and total == 5
+
+
+def test_estimate_mode_uses_lookahead_instead_of_counting():
+    db = FakeDb(regex_hits=30)
+    docs, total, meta = asyncio.run(CandidateSearch().search(
+        db, {"status": "applied"}, "", ["name"], 10, 10, count_mode="estimate"))
+    assert len(docs) == 10 and total == 21 and meta["total_is_estimate"] is True
+
+    docs, total, meta = asyncio.run(CandidateSearch().search(db, {}, "", ["name"], 10, 0, count_mode="estimate"))
+    assert total == 1000
+
+
+def test_unranked_pages_return_a_cursor_and_cursor_skips_text_index():
+    db = FakeDb(regex_hits=30)
+    docs, _, meta = asyncio.run(CandidateSearch().search(db, {}, "", ["name"], 10, 0))
+    assert len(docs) == 10 and meta["next_cursor"]
+
+    asyncio.run(CandidateSearch().search(db, {}, "python", ["name"], 10, 0, cursor=meta["next_cursor"]))
+    assert "$text" not in str(db.candidates.queries[-1])
+
+
+def test_offset_pages_keep_the_regex_fallback_when_text_finds_nothing():
+    search = CandidateSearch()
+    db = FakeDb(text_hits=0, regex_hits=30)
+    first, total, meta = asyncio.run(search.search(db, {}, "pyth", ["name"], 10, 0))
+    assert meta["strategy"] == "regex" and total == 30 and len(first) == 10
+
+    second, total, meta = asyncio.run(search.search(db, {}, "pyth", ["name"], 10, 10))
+    assert meta["strategy"] == "regex" and total == 30
+    assert [d["_id"] for d in second] == list(range(10, 20))
+
+    db = FakeDb(text_hits=12, regex_hits=30)
+    docs, total, meta = asyncio.run(search.search(db, {}, "python", ["name"], 10, 20))
+    assert meta["strategy"] == "text" and total == 12 and docs == []
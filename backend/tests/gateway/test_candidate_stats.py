@@ -0,0 +1,70 @@
+"""
+Unit tests for the cached HR dashboard candidate statistics
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.candidate_stats import CandidateStatsService  # noqa: E402
+
+
+class SlowCollection:
+    def __init__(self, db, name, count=3, fail=False):
+        self.db, self.name, self.count, self.fail = db, name, count, fail
+
+    async def _answer(self, kind):
+        self.db.calls.append((self.name, kind))
+        await asyncio.sleep(0.05)
+        if self.fail:
+            raise RuntimeError(f"{self.name} unavailable")
+        return self.count
+
+    async def count_documents(self, query):
+        return await self._answer("count")
+
+    async def estimated_document_count(self):
+        return await self._answer("estimated")
+
+
+class FakeDb:
+    def __init__(self):
+        self.calls = []
+        self.candidates = SlowCollection(self, "candidates", 40)
+        self.jobs = SlowCollection(self, "jobs", 5)
+        self.matching_cache = SlowCollection(self, "matching_cache", fail=True)
+        self.interviews = SlowCollection(self, "interviews", 2)
+        self.feedback = SlowCollection(self, "feedback", 7)
+
+
+def test_counts_run_concurrently_and_use_estimates_for_totals():
+    db = FakeDb()
+    service = CandidateStatsService(ttl_seconds=60)
+    started = time.perf_counter()
+    stats = asyncio.run(service.get(db))
+    assert time.perf_counter() - started < 0.2
+    assert stats["total_candidates"] == 40 and stats["total_feedback_submissions"] == 7
+    assert stats["recent_matches"] == 20  # fallback estimate when matching_cache fails
+    assert ("candidates", "estimated") in db.calls and ("feedback", "estimated") in db.calls
+    assert stats["cache_hit"] is False
+
+
+def test_snapshot_is_cached_shared_and_invalidated():
+    db = FakeDb()
+    service = CandidateStatsService(ttl_seconds=60)
+
+    async def scenario():
+        first, second = await asyncio.gather(service.get(db), service.get(db))
+        calls_after_first = len(db.calls)
+        cached = await service.get(db)
+        service.invalidate("candidate")
+        fresh = await service.get(db)
+        return first, second, calls_after_first, cached, fresh
+
+    first, second, calls_after_first, cached, fresh = asyncio.run(scenario())
+    assert calls_after_first == 6
+    assert cached["cache_hit"] is True
+    assert fresh["cache_hit"] is False
+    assert len(db.calls) == 12
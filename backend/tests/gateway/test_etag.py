@@ -0,0 +1,111 @@
+"""
+Unit tests for ETag / If-None-Match conditional reads
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.testclient import TestClient
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.etag import CollectionVersions, ConditionalResponses, etag_matches  # noqa: E402
+from app.single_flight import SingleFlight  # noqa: E402
+
+
+@pytest.fixture
+def setup():
+    db = mongomock_motor.AsyncMongoMockClient()["test_etag"]
+    job_id = str(asyncio.run(db.jobs.insert_one({"title": "SRE", "created_at": datetime(2026, 1, 1)})).inserted_id)
+
+    async def get_db():
+        return db
+
+    versions = CollectionVersions(cache_seconds=0)
+    conditional = ConditionalResponses(get_db, versions=versions, max_staleness_seconds=0)
+    flight = SingleFlight(ttl_seconds=0)
+    calls = []
+    allowed = {"c1", "c2", "anon"}
+    app = FastAPI()
+
+    def get_auth(x_user: str = Header("anon")):
+        return {"type": "jwt_token", "role": "client", "user_id": x_user}
+
+    @app.get("/jobs")
+    @conditional.route("jobs.list", "jobs")
+    @flight.route("jobs.list")
+    async def list_jobs(search: str = ""):
+        calls.append("list")
+        docs = await db.jobs.find({}, {"_id": 0, "title": 1}).to_list(length=100)
+        return {"jobs": docs, "count": len(docs)}
+
+    async def authorize(job_id: str, auth=None):
+        if auth["user_id"] not in allowed:
+            raise HTTPException(status_code=403, detail="You can only view your own jobs")
+
+    @app.get("/jobs/{job_id}")
+    @conditional.route("jobs.detail", "jobs", doc_param="job_id", authorize=authorize)
+    async def get_job(job_id: str, auth=Depends(get_auth)):
+        await authorize(job_id, auth)
+        calls.append("detail")
+        return {"id": job_id}
+
+    client = TestClient(app)
+    client.allowed = allowed
+    return client, db, versions, conditional, calls, job_id
+
+
+def test_list_revalidates_until_the_collection_version_moves(setup):
+    client, db, versions, conditional, calls, _ = setup
+    first = client.get("/jobs", params={"search": "sre"})
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    again = client.get("/jobs", params={"search": " sre "}, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b"" and again.headers["etag"] == etag
+    assert client.get("/jobs", params={"search": "go"}, headers={"If-None-Match": etag}).status_code == 200
+
+    asyncio.run(versions.bump(db, "jobs"))
+    changed = client.get("/jobs", params={"search": "sre"}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert calls == ["list", "list", "list"]
+    assert conditional.stats()["routes"]["jobs.list"] == {"not_modified": 1, "full": 3}
+
+
+def test_document_validator_follows_updated_at_and_auth_scope(setup):
+    client, db, _, _, calls, job_id = setup
+    etag = client.get(f"/jobs/{job_id}", headers={"X-User": "c1"}).headers["etag"]
+    assert client.get(f"/jobs/{job_id}", headers={"X-User": "c1", "If-None-Match": etag}).status_code == 304
+    assert client.get(f"/jobs/{job_id}", headers={"X-User": "c2", "If-None-Match": etag}).status_code == 200
+
+    asyncio.run(db.jobs.update_one({"_id": ObjectId(job_id)}, {"$set": {"updated_at": datetime(2026, 2, 1)}}))
+    assert client.get(f"/jobs/{job_id}", headers={"X-User": "c1", "If-None-Match": etag}).status_code == 200
+
+    missing = client.get("/jobs/665f00000000000000000009")
+    assert missing.status_code == 200 and "etag" not in missing.headers
+    assert calls.count("detail") == 4
+
+
+def test_authorization_runs_before_304_and_wildcard_is_ignored_per_document(setup):
+    client, _, _, _, calls, job_id = setup
+    etag = client.get(f"/jobs/{job_id}", headers={"X-User": "c1"}).headers["etag"]
+    assert client.get(f"/jobs/{job_id}", headers={"X-User": "c3", "If-None-Match": "*"}).status_code == 403
+    assert client.get(f"/jobs/{job_id}", headers={"X-User": "c1", "If-None-Match": "*"}).status_code == 200
+
+    client.allowed.discard("c1")  # e.g. the client disconnected from the job's recruiter
+    assert client.get(f"/jobs/{job_id}", headers={"X-User": "c1", "If-None-Match": etag}).status_code == 403
+    assert calls.count("detail") == 2
+
+
+def test_if_none_match_parsing():
+    assert etag_matches('"abc", W/"def"', 'W/"def"')
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"x"')
+    assert not etag_matches("*", 'W/"x"', allow_wildcard=False)
+    assert not etag_matches(None, 'W/"x"') and not etag_matches('W/"y"', 'W/"x"')
@@ -0,0 +1,97 @@
+"""
+Unit tests for the connection-event bus
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.event_bus import EventBus  # noqa: E402
+
+
+class LocalBroker:
+    """Stand-in for Redis/Mongo: every listening worker receives every publish"""
+
+    def __init__(self):
+        self.listeners = []
+        self.fail_publish = False
+
+    def transport(self):
+        broker = self
+
+        class Transport:
+            name = "broker"
+
+            async def publish(self, channel, event):
+                if broker.fail_publish:
+                    raise ConnectionError("broker down")
+                for q in broker.listeners:
+                    q.put_nowait((channel, event))
+
+            async def listen(self, deliver):
+                q = asyncio.Queue()
+                broker.listeners.append(q)
+                try:
+                    while True:
+                        deliver(*await q.get())
+                finally:
+                    broker.listeners.remove(q)
+
+            async def aclose(self):
+                pass
+
+        return Transport()
+
+
+def test_in_process_bus_fans_out_per_channel():
+    async def scenario():
+        bus = EventBus()
+        a, b = bus.subscribe("client:1"), bus.subscribe("client:1")
+        other = bus.subscribe("recruiter:9")
+        await bus.publish("client:1", {"event": "connected", "connected_count": 1})
+        bus.unsubscribe(b)
+        await bus.publish("client:1", {"event": "disconnected"})
+        return bus, [a.queue.qsize(), b.queue.qsize(), other.queue.qsize()]
+
+    bus, sizes = asyncio.run(scenario())
+    assert sizes == [2, 1, 0]
+    assert bus.stats()["subscribers"] == 2 and bus.stats()["delivered"] == 3
+
+
+def test_slow_consumer_drops_oldest_without_blocking_publishers():
+    async def scenario():
+        bus = EventBus(queue_size=2)
+        slow = bus.subscribe("recruiter:1")
+        for i in range(5):
+            await bus.publish("recruiter:1", {"n": i})
+        return bus, slow, [await slow.get(), await slow.get()]
+
+    bus, slow, received = asyncio.run(scenario())
+    assert received == [{"n": 3}, {"n": 4}]
+    assert slow.dropped == 3 and bus.stats()["dropped"] == 3
+
+
+def test_shared_transport_reaches_subscribers_on_other_workers():
+    async def scenario():
+        broker = LocalBroker()
+        worker_a, worker_b = EventBus(broker.transport()), EventBus(broker.transport())
+        worker_a.start()
+        worker_b.start()
+        await asyncio.sleep(0)
+        on_a, on_b = worker_a.subscribe("client:7"), worker_b.subscribe("client:7")
+
+        await worker_a.publish("client:7", {"event": "connected"})
+        got = await asyncio.wait_for(asyncio.gather(on_a.get(), on_b.get()), timeout=1)
+
+        broker.fail_publish = True
+        await worker_b.publish("client:7", {"event": "disconnected"})
+        local_only = (on_a.queue.qsize(), on_b.queue.qsize())
+        await worker_a.aclose()
+        await worker_b.aclose()
+        return got, local_only, worker_b.stats()
+
+    got, local_only, stats = asyncio.run(scenario())
+    assert got == [{"event": "connected"}, {"event": "connected"}]
+    assert local_only == (0, 1)
+    assert stats["backend"] == "broker" and stats["transport_errors"] == 1
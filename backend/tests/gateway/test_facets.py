@@ -0,0 +1,139 @@
+"""
+Unit tests for the incrementally maintained facet dictionaries
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.facets import FacetService, compact_key, extract_skills_from_requirements  # noqa: E402
+
+JOBS = [
+    {"_id": "j1", "status": "active", "requirements": "Python, C/C++, Docker", "location": "Mumbai"},
+    {"_id": "j2", "status": "active", "requirements": "Python, AWS\nDocker", "location": "New Delhi"},
+    {"_id": "j3", "status": "active", "requirements": "java; spring-boot", "location": "Navi Mumbai"},
+    {"_id": "j4", "status": "closed", "requirements": "Rust", "location": "Pune"},
+]
+
+
+def _service():
+    service = FacetService()
+    for job in JOBS:
+        service.update_job(job)
+    return service
+
+
+def _labels(values):
+    return [label for label, _ in values]
+
+
+def test_search_matches_legacy_substring_rule():
+    service = _service()
+    skills = set()
+    for job in JOBS:
+        if job["status"] == "active":
+            skills |= extract_skills_from_requirements(job["requirements"])
+    for query in ["py", "c++", "C", "ock", "spring boot", "java", "x"]:
+        expected = {s for s in skills if compact_key(query) in compact_key(s)}
+        assert set(_labels(service.job_skills.search(query, limit=25))) == expected, query
+
+
+def test_prefix_matches_rank_first_then_by_frequency():
+    service = _service()
+    assert service.job_skills.search("p") == [("Python", 2), ("spring-boot", 1)]
+    assert _labels(service.job_locations.search("mumbai")) == ["Mumbai", "Navi Mumbai"]
+    assert service.job_skills.top(2) == [("Docker", 2), ("Python", 2)]
+
+
+def test_job_create_edit_and_close_adjust_frequencies():
+    service = _service()
+    service.update_job({"_id": "j5", "status": "active", "requirements": "python, kafka", "location": "Pune"})
+    assert service.job_skills.search("python") == [("Python", 3)]
+    assert _labels(service.job_locations.search("pune")) == ["Pune"]
+
+    service.update_job({"_id": "j1", "status": "active", "requirements": "Go", "location": "Mumbai"})
+    assert "C/C++" not in _labels(service.job_skills.search("c"))
+    assert service.job_skills.search("python") == [("Python", 2)]
+
+    service.update_job({"_id": "j5", "status": "closed", "requirements": "python, kafka", "location": "Pune"})
+    assert service.job_skills.search("kafka") == []
+    assert service.job_locations.search("pune") == []
+    assert service.job_skills.stats()["documents"] == 3
+
+
+def test_candidate_skills_from_comma_separated_profiles():
+    service = FacetService()
+    service.update_candidate({"_id": "c1", "technical_skills": "Python, Machine Learning, SQL"})
+    service.update_candidate({"_id": "c2", "technical_skills": "python,sql"})
+    assert service.candidate_skills.search("machine lea") == [("Machine Learning", 1)]
+    assert service.candidate_skills.top(2) == [("Python", 2), ("SQL", 2)]
+
+    service.candidate_skills.set_document("c2", {"technical_skills": "Rust"})
+    assert service.candidate_skills.top(1) == [("Machine Learning", 1)]
+    scoped = service.scoped_candidate_skills([{"_id": "c2", "technical_skills": "Rust"}])
+    assert scoped.top() == [("Rust", 1)]
+
+
+def test_case_variants_in_one_document_count_once():
+    service = FacetService()
+    service.update_job({"_id": "j1", "status": "active", "requirements": "Python, python, PYTHON", "location": ""})
+    assert service.job_skills.search("python") == [("PYTHON", 1)]
+    service.update_job({"_id": "j1", "status": "closed", "requirements": "Python, python", "location": ""})
+    assert service.job_skills.search("python") == []
+    assert len(service.job_skills) == 0
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(0)
+        return list(self.docs)
+
+
+class _Collection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.scans = 0
+
+    def find(self, query, projection=None):
+        self.scans += 1
+        return _Cursor(self.docs)
+
+
+class _DB:
+    def __init__(self):
+        self.jobs = _Collection([job for job in JOBS if job["status"] == "active"])
+        self.candidates = _Collection([{"_id": "c1", "technical_skills": "Python"}])
+
+
+def test_concurrent_lazy_loads_share_one_scan():
+    service = FacetService()
+    db = _DB()
+
+    async def scenario():
+        await asyncio.gather(*(service.ensure_loaded(db) for _ in range(5)))
+
+    asyncio.run(scenario())
+    assert service.loaded
+    assert db.jobs.scans == 1 and db.candidates.scans == 1
+    assert service.candidate_skills.top() == [("Python", 1)]
+
+
+def test_writes_during_a_load_survive_the_replace():
+    service = FacetService()
+    db = _DB()
+
+    async def scenario():
+        load = asyncio.ensure_future(service.load(db))
+        await asyncio.sleep(0)
+        service.update_job({"_id": "j5", "status": "active", "requirements": "Kafka", "location": "Pune"})
+        service.update_job({"_id": "j2", "status": "closed", "requirements": "Python, AWS", "location": ""})
+        await load
+
+    asyncio.run(scenario())
+    assert service.job_skills.search("kafka") == [("Kafka", 1)]
+    assert service.job_skills.search("aws") == []
+    assert service.job_skills.search("python") == [("Python", 1)]
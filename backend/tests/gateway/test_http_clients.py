@@ -0,0 +1,124 @@
+"""
+Unit tests for the gateway upstream client registry and circuit breaker
+"""
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.http_clients import CircuitBreaker, CircuitOpenError, UpstreamClientRegistry  # noqa: E402
+
+
+def _registry(handler, failure_threshold=2, reset_timeout=60.0):
+    registry = UpstreamClientRegistry()
+    registry.register("agent", "http://agent", failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+    registry.upstream("agent").client = httpx.AsyncClient(
+        base_url="http://agent", transport=httpx.MockTransport(handler))
+    return registry
+
+
+def test_breaker_opens_after_consecutive_failures_and_fails_fast():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(502)
+
+    registry = _registry(handler)
+
+    async def scenario():
+        for _ in range(2):
+            response = await registry.request("agent", "POST", "/match", json={})
+            assert response.status_code == 502
+        with pytest.raises(CircuitOpenError):
+            await registry.request("agent", "POST", "/match", json={})
+        await registry.aclose()
+
+    asyncio.run(scenario())
+    assert calls == ["/match", "/match"]
+    assert registry.stats()["agent"]["circuit"] == "open"
+
+
+def test_half_open_probe_closes_breaker_on_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_transport_errors_count_as_failures():
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    registry = _registry(handler, failure_threshold=1)
+
+    async def scenario():
+        with pytest.raises(httpx.ConnectError):
+            await registry.request("agent", "GET", "/health")
+        with pytest.raises(CircuitOpenError):
+            await registry.request("agent", "GET", "/health")
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_half_open_probe_reopens_breaker():
+    async def handler(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    registry = _registry(handler, failure_threshold=1, reset_timeout=0.0)
+    breaker = registry.upstream("agent").breaker
+    breaker.record_failure()
+
+    async def scenario():
+        probe = asyncio.create_task(registry.request("agent", "GET", "/health"))
+        await asyncio.sleep(0.01)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        await registry.aclose()
+
+    asyncio.run(scenario())
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is True
+
+
+def test_cancelled_calls_outside_a_probe_do_not_open_the_breaker():
+    async def handler(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    registry = _registry(handler, failure_threshold=2)
+
+    async def scenario():
+        for _ in range(3):
+            call = asyncio.create_task(registry.request("agent", "GET", "/match"))
+            await asyncio.sleep(0.01)
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+        await registry.aclose()
+
+    asyncio.run(scenario())
+    assert registry.upstream("agent").breaker.state == CircuitBreaker.CLOSED
+
+
+def test_only_the_probe_holder_releases_the_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    allowed, early = breaker.admit()  # admitted while closed
+    assert allowed and early == 0
+    breaker.record_failure()
+    allowed, probe = breaker.admit()
+    assert allowed and probe
+    breaker.release_probe(early)  # the earlier call finishing must not free the probe slot
+    assert breaker.allow_request() is False
+    breaker.release_probe(probe)
+    assert breaker.allow_request() is True
@@ -0,0 +1,101 @@
+"""
+Unit tests for the in-process job autocomplete index
+"""
+import asyncio
+import os
+import re
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.job_autocomplete import JobAutocompleteIndex, fuzzy_regex_from_query  # noqa: E402
+
+JOBS = [
+    {"_id": "j1", "title": "AR/VR Engineer", "department": "Immersive", "status": "active",
+     "created_at": datetime(2026, 1, 1)},
+    {"_id": "j2", "title": "Senior Python Developer", "department": "Engineering", "status": "active",
+     "created_at": datetime(2026, 2, 1)},
+    {"_id": "j3", "title": "Data Engineer", "department": "Analytics", "status": "active",
+     "created_at": datetime(2026, 3, 1)},
+    {"_id": "j4", "title": "Python Intern", "department": "Engineering", "status": "closed",
+     "created_at": datetime(2026, 4, 1)},
+]
+
+
+def _index():
+    index = JobAutocompleteIndex()
+    index.replace_all(JOBS)
+    return index
+
+
+def _ids(suggestions):
+    return [s["id"] for s in suggestions]
+
+
+def test_unloaded_index_defers_to_mongo():
+    assert JobAutocompleteIndex().search("python") is None
+
+
+def test_prefix_matches_rank_before_infix_and_newest_first():
+    index = _index()
+    assert _ids(index.search("eng")) == ["j3", "j2", "j1"]
+    assert _ids(index.search("veloper")) == ["j2"]
+    index.upsert({"_id": "j6", "title": "Reengineering Lead", "department": "Ops", "status": "active",
+                  "created_at": datetime(2026, 12, 1)})
+    assert _ids(index.search("engineer")) == ["j3", "j2", "j1", "j6"]
+    assert _ids(index.search("ar vr")) == ["j1"]
+    assert _ids(index.search("AR-VR eng", limit=1)) == ["j1"]
+    assert index.search("python") == [
+        {"id": "j2", "title": "Senior Python Developer", "department": "Engineering", "location": ""}]
+
+
+def test_matches_agree_with_legacy_fuzzy_regex():
+    index = _index()
+    active = [job for job in JOBS if job["status"] == "active"]
+    for query in ["eng", "python dev", "data", "vr", "senior py", "ineer", "xyz", "r e"]:
+        pattern = re.compile(fuzzy_regex_from_query(query), re.I)
+        expected = {job["_id"] for job in active if pattern.search(job["title"]) or pattern.search(job["department"])}
+        assert set(_ids(index.search(query, limit=20))) == expected, query
+
+
+def test_create_and_status_change_keep_index_in_sync():
+    index = _index()
+    index.upsert({"_id": "j5", "title": "Platform Engineer", "department": "Infra", "status": "active"})
+    assert "j5" in _ids(index.search("platf"))
+    index.upsert({"_id": "j2", "title": "Senior Python Developer", "department": "Engineering", "status": "closed"})
+    assert index.search("python") == []
+    assert index.stats()["jobs"] == 3
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(0)
+        return list(self.docs)
+
+
+class _DB:
+    class jobs:
+        @staticmethod
+        def find(query, projection=None):
+            return _Cursor([job for job in JOBS if job["status"] == "active"])
+
+
+def test_upserts_during_a_load_survive_the_replace():
+    index = JobAutocompleteIndex()
+
+    async def scenario():
+        load = asyncio.ensure_future(index.load(_DB()))
+        await asyncio.sleep(0)
+        index.upsert({"_id": "j5", "title": "Platform Engineer", "department": "Infra", "status": "active"})
+        index.remove("j3")
+        await load
+
+    asyncio.run(scenario())
+    assert index.loaded
+    assert "j5" in _ids(index.search("platf"))
+    assert index.search("data") == []
+    assert index.stats()["jobs"] == 3
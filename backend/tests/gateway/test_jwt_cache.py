@@ -0,0 +1,85 @@
+"""
+Unit tests for the gateway verified-token cache
+"""
+import os
+import sys
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+import jwt_auth  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def secrets(monkeypatch):
+    monkeypatch.setattr(jwt_auth, "CANDIDATE_JWT_SECRET_KEY", "candidate-secret")
+    monkeypatch.setattr(jwt_auth, "JWT_SECRET_KEY", "client-secret")
+    monkeypatch.setattr(jwt_auth, "API_KEY_SECRET", "service-key")
+    monkeypatch.setattr(jwt_auth, "JWT_CACHE_ENABLED", True)
+    monkeypatch.setattr(jwt_auth, "verified_tokens", jwt_auth.VerifiedTokenCache(max_entries=2))
+    jwt_auth.set_revocation_check(None)
+    yield
+    jwt_auth.set_revocation_check(None)
+
+
+def _bearer(token):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def _token(secret, exp_in=3600, **claims):
+    return jwt.encode({"exp": int(time.time()) + exp_in, **claims}, secret, algorithm="HS256")
+
+
+def test_repeat_requests_skip_decoding(monkeypatch):
+    token = _token("client-secret", sub="client-1", role="client")
+    first = jwt_auth.get_auth(_bearer(token))
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError("cached token was decoded again")
+
+    monkeypatch.setattr(jwt_auth.jwt, "decode", no_decode)
+    for _ in range(3):
+        assert jwt_auth.get_auth(_bearer(token)) == first
+    assert first["user_id"] == "client-1" and first["role"] == "client"
+    stats = jwt_auth.verified_tokens.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (3, 1, 0.75)
+
+
+def test_entries_expire_with_the_token_and_cache_is_bounded():
+    cache = jwt_auth.verified_tokens
+    cache.put("stale", {"exp": time.time() - 1}, {"user_id": "x"})
+    cache.put("short", {"exp": time.time() + 0.05}, {"user_id": "y"})
+    assert cache.get("stale") is None
+    time.sleep(0.06)
+    assert cache.get("short") is None
+
+    for name in ("a", "b", "c"):
+        cache.put(name, {}, {"user_id": name})
+    assert cache.get("a") is None and cache.get("c")[1]["user_id"] == "c"
+    assert cache.stats()["entries"] == 2
+
+
+def test_invalid_tokens_are_rejected_and_not_cached():
+    with pytest.raises(HTTPException) as exc:
+        jwt_auth.get_auth(_bearer(_token("wrong-secret", sub="x")))
+    assert exc.value.status_code == 401
+    with pytest.raises(HTTPException):
+        jwt_auth.get_auth(_bearer(_token("client-secret", exp_in=-10, sub="x")))
+    assert jwt_auth.verified_tokens.stats()["entries"] == 0
+
+
+def test_revocation_hook_runs_on_cached_tokens():
+    token = _token("candidate-secret", candidate_id="c-1", role="recruiter", jti="abc")
+    assert jwt_auth.get_auth(_bearer(token))["role"] == "recruiter"
+
+    revoked = {"abc"}
+    jwt_auth.set_revocation_check(lambda claims: claims.get("jti") in revoked)
+    with pytest.raises(HTTPException) as exc:
+        jwt_auth.get_auth(_bearer(token))
+    assert exc.value.detail == "Token has been revoked"
+    assert jwt_auth.verified_tokens.stats()["entries"] == 0
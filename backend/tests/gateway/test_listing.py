@@ -0,0 +1,95 @@
+"""
+Unit tests for the paginate-then-join listing layer
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.listing import ListingSpec, NameResolver, joined_page_pipeline, list_page  # noqa: E402
+
+
+def _spec():
+    return ListingSpec("feedback", "created_at", names={
+        "candidate_name": ("candidate_id", NameResolver("candidates", "name")),
+        "job_title": ("job_id", NameResolver("jobs", "title")),
+    })
+
+
+async def _seed():
+    db = mongomock_motor.AsyncMongoMockClient()["test_listing"]
+    candidates = await db.candidates.insert_many([{"name": "Asha", "resume": "x" * 1000}, {"name": "Ravi"}])
+    job = await db.jobs.insert_one({"title": "Data Engineer", "description": "long"})
+    cids = [str(_id) for _id in candidates.inserted_ids]
+    base = datetime(2026, 1, 1)
+    await db.feedback.insert_many([
+        {"candidate_id": cids[i % 2], "job_id": str(job.inserted_id), "average_score": i,
+         "created_at": base + timedelta(hours=i)}
+        for i in range(7)
+    ] + [{"candidate_id": "legacy-id", "job_id": None, "average_score": 0, "created_at": base - timedelta(days=1)}])
+    return db, cids
+
+
+def test_pages_are_walked_newest_first_with_names_attached():
+    async def scenario():
+        db, cids = await _seed()
+        spec = _spec()
+        pages, cursor = [], None
+        while True:
+            docs, cursor = await list_page(db, spec, {}, 3, cursor=cursor, strategy="resolver")
+            pages.append(docs)
+            if cursor is None:
+                return cids, spec, pages
+
+    cids, spec, pages = asyncio.run(scenario())
+    rows = [doc for page in pages for doc in page]
+    assert [len(page) for page in pages] == [3, 3, 2]
+    assert [doc["average_score"] for doc in rows] == [6, 5, 4, 3, 2, 1, 0, 0]
+    assert rows[0]["candidate_name"] == "Asha" and rows[1]["candidate_name"] == "Ravi"
+    assert rows[0]["job_title"] == "Data Engineer"
+    assert rows[-1]["candidate_name"] is None and rows[-1]["job_title"] is None
+
+    resolver = spec.names["candidate_name"][1]
+    assert resolver.stats()["misses"] == 3  # two candidates + the legacy id, each fetched once
+    assert resolver.stats()["hits"] == 3
+
+
+def test_filters_apply_before_paging_and_resolver_cache_invalidates():
+    async def scenario():
+        db, cids = await _seed()
+        spec = _spec()
+        docs, cursor = await list_page(db, spec, {"candidate_id": cids[0]}, 10, strategy="resolver")
+        await db.candidates.update_one({"name": "Asha"}, {"$set": {"name": "Asha R"}})
+        spec.names["candidate_name"][1].invalidate(cids[0])
+        renamed, _ = await list_page(db, spec, {"candidate_id": cids[0]}, 1, strategy="resolver")
+        return docs, cursor, renamed
+
+    docs, cursor, renamed = asyncio.run(scenario())
+    assert len(docs) == 4 and cursor is None
+    assert {doc["candidate_name"] for doc in docs} == {"Asha"}
+    assert renamed[0]["candidate_name"] == "Asha R"
+
+
+def test_lookup_pipeline_pages_before_projected_joins():
+    pipeline = joined_page_pipeline(_spec(), {"job_id": "j1"}, 11, offset=20)
+    stages = [next(iter(stage)) for stage in pipeline]
+    assert stages[:4] == ["$match", "$sort", "$skip", "$limit"]
+    assert stages.count("$lookup") == 2
+    lookup = pipeline[4]["$lookup"]
+    assert lookup["from"] == "candidates" and lookup["let"] == {"candidate_id": "$candidate_id"}
+    assert lookup["pipeline"][-1] == {"$project": {"_id": 0, "name": 1}}
+
+
+def test_unbounded_listing_returns_every_row_without_cursor():
+    async def scenario():
+        db, _ = await _seed()
+        return await list_page(db, _spec(), {}, None, strategy="resolver")
+
+    docs, cursor = asyncio.run(scenario())
+    assert len(docs) == 8 and cursor is None
+    assert "$limit" not in [next(iter(stage)) for stage in joined_page_pipeline(_spec(), {}, None)]
@@ -0,0 +1,47 @@
+"""
+Unit tests for the gateway match-result cache
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.match_cache import MatchResultCache  # noqa: E402
+
+
+def test_scope_order_does_not_change_key_but_scope_contents_do():
+    key = MatchResultCache.make_key("job1", ["b", "a"], "v3")
+    assert key == MatchResultCache.make_key("job1", ["a", "b"], "v3")
+    assert key != MatchResultCache.make_key("job1", ["a"], "v3")
+    assert key != MatchResultCache.make_key("job1", ["a", "b"], "v4")
+    assert MatchResultCache.make_key("job1", None, "v3")[1] == "all"
+
+
+def test_ttl_and_lru_eviction():
+    cache = MatchResultCache(max_entries=2, ttl_seconds=0.05)
+    first, second, third = (MatchResultCache.make_key(f"job{i}", None, "v3") for i in range(3))
+    cache.set(first, {"n": 1})
+    cache.set(second, {"n": 2})
+    assert cache.get(first) == {"n": 1}
+    cache.set(third, {"n": 3})
+    assert cache.get(second) is None
+    assert cache.get(first) == {"n": 1}
+    time.sleep(0.06)
+    assert cache.get(third) is None
+
+
+def test_invalidation():
+    cache = MatchResultCache()
+    scoped = MatchResultCache.make_key("job1", ["c1"], "v3")
+    unscoped = MatchResultCache.make_key("job1", None, "v3")
+    other = MatchResultCache.make_key("job2", None, "v3")
+    for key in (scoped, unscoped, other):
+        cache.set(key, {"ok": True})
+
+    cache.invalidate_job("job1")
+    assert cache.get(scoped) is None and cache.get(unscoped) is None
+    assert cache.get(other) == {"ok": True}
+
+    cache.invalidate_all()
+    assert cache.get(other) is None
@@ -0,0 +1,101 @@
+"""
+Unit tests for the per-route Mongo command profiler
+"""
+import contextvars
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.mongo_profiler import MongoProfiler, query_shape, suggest_index, summarize_plan  # noqa: E402
+
+_request_ids = iter(range(1, 10_000))
+
+
+def _run_command(profiler, name, command, duration_ms, reply):
+    """Feed started/succeeded events the way pymongo does, in the calling context"""
+    event = SimpleNamespace(command_name=name, command={name: command.pop("_coll"), **command},
+                            connection_id=("db", 27017), request_id=next(_request_ids),
+                            duration_micros=int(duration_ms * 1000), reply=reply)
+    profiler.listener.started(event)
+    profiler.listener.succeeded(event)
+
+
+def _find(profiler, status, since, docs, duration_ms=2.0):
+    command = {"_coll": "jobs", "filter": {"status": status, "created_at": {"$lt": since}},
+               "sort": {"created_at": -1}, "limit": 101}
+    _run_command(profiler, "find", command, duration_ms, {"cursor": {"firstBatch": [{}] * docs}, "ok": 1})
+
+
+def test_commands_are_charged_to_the_route_template():
+    profiler = MongoProfiler(slow_ms=50)
+    scope = {}
+    with profiler.track_request(scope) as usage:
+        scope["route"] = SimpleNamespace(path="/v1/jobs")  # filled in by the router after the middleware
+        _find(profiler, "active", "2026-05-01", docs=3)
+        # Motor runs pymongo in executor threads with a copy of the request context
+        ctx = contextvars.copy_context()
+        worker = threading.Thread(target=ctx.run, args=(_find, profiler, "draft", "2026-06-01", 2, 80.0))
+        worker.start()
+        worker.join()
+    _run_command(profiler, "ping", {"_coll": 1}, 1, {"ok": 1})
+    _find(profiler, "active", "2026-01-01", docs=1)
+
+    assert (usage.commands, usage.documents) == (2, 5)
+    routes = profiler.route_stats()
+    assert routes["/v1/jobs"]["requests"] == 1 and routes["/v1/jobs"]["commands"] == 2
+    assert routes["background"]["commands"] == 1
+
+    [shape] = profiler.top_shapes()
+    assert shape["count"] == 3 and shape["documents"] == 6
+    assert shape["shape"] == {"filter": {"status": "?", "created_at": {"$lt": "?"}}, "sort": {"created_at": -1}}
+    [slow] = profiler.slow_queries()
+    assert slow["duration_ms"] == 80.0 and slow["route"] == "/v1/jobs"
+    assert "draft" not in repr(profiler.slow_queries()) + repr(profiler.top_shapes())
+
+
+def test_shapes_redact_nested_values_and_pipelines():
+    shape = query_shape("aggregate", {"aggregate": "feedback", "pipeline": [
+        {"$match": {"candidate_id": {"$in": ["a", "b"]}, "$or": [{"score": 5}, {"score": {"$gte": 4}}]}},
+        {"$sort": {"created_at": -1}},
+        {"$project": {"name": 1, "secret": "literal"}},
+    ]})
+    assert shape == {"pipeline": [
+        {"$match": {"candidate_id": {"$in": "?"}, "$or": [{"score": "?"}, {"score": {"$gte": "?"}}]}},
+        {"$sort": {"created_at": -1}},
+        {"$project": {"name": 1, "secret": "?"}},
+    ]}
+    assert suggest_index(shape) == [("candidate_id", 1), ("created_at", -1)]
+
+
+def test_collscan_plans_become_esr_index_suggestions():
+    profiler = MongoProfiler(slow_ms=1000)
+    _find(profiler, "active", "2026-05-01", docs=1)
+    [(key, entry)] = profiler.shapes.items()
+    entry["plan"] = summarize_plan({"queryPlanner": {"winningPlan": {
+        "stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}})
+
+    [suggestion] = profiler.index_suggestions()
+    assert suggestion["collection"] == "jobs" and suggestion["collscan"] is True
+    assert suggestion["keys"] == [["status", 1], ["created_at", -1]]
+
+    entry["plan"] = summarize_plan({"stages": [{"$cursor": {"queryPlanner": {"winningPlan": {
+        "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "status_1_created_at_-1"}}}}}]})
+    assert entry["plan"]["indexes"] == ["status_1_created_at_-1"]
+    assert profiler.index_suggestions() == []
+
+
+def test_only_trimmed_reads_are_retained_for_explain():
+    profiler = MongoProfiler(slow_ms=50)
+    _run_command(profiler, "insert", {"_coll": "candidates", "documents": [{"email": "a@x.io"}], "ordered": False},
+                 3, {"n": 1, "ok": 1})
+    _run_command(profiler, "update", {"_coll": "candidates", "updates": [
+        {"q": {"_id": 1}, "u": {"$set": {"password_hash": "$2b$12$secret"}}}]}, 3, {"n": 1, "ok": 1})
+    _find(profiler, "active", "2026-05-01", docs=1)
+
+    retained = {key[1]: entry.get("_command") for key, entry in profiler.shapes.items()}
+    assert retained["insert"] is None and retained["update"] is None
+    assert set(retained["find"]) == {"find", "filter", "sort", "limit"}
+    assert "secret" not in repr(profiler.shapes) and "a@x.io" not in repr(profiler.shapes)
@@ -0,0 +1,79 @@
+"""
+Unit tests for keyset (cursor) pagination
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.pagination import (  # noqa: E402
+    ASCENDING, DESCENDING, InvalidCursor, decode_cursor, encode_cursor, fetch_page,
+)
+
+BASE = datetime(2026, 1, 1)
+
+
+async def _collection():
+    collection = mongomock_motor.AsyncMongoMockClient()["test_pagination"]["candidates"]
+    docs = []
+    for i in range(23):
+        doc = {"name": f"c{i}"}
+        if i % 5:  # every fifth candidate has no created_at
+            doc["created_at"] = BASE + timedelta(minutes=i // 3)  # duplicate timestamps
+        docs.append(doc)
+    await collection.insert_many(docs)
+    return collection
+
+
+async def _walk(collection, direction, limit, between_pages=None):
+    seen, cursor = [], None
+    while True:
+        docs, cursor = await fetch_page(collection, {}, "created_at", direction, limit, cursor=cursor)
+        seen.extend(doc["name"] for doc in docs)
+        if cursor is None:
+            return seen
+        if between_pages:
+            await between_pages()
+
+
+@pytest.mark.parametrize("direction", [ASCENDING, DESCENDING])
+def test_cursor_walk_matches_full_sort_including_nulls_and_ties(direction):
+    async def scenario():
+        collection = await _collection()
+        expected = [doc["name"] async for doc in collection.find({}).sort(
+            [("created_at", direction), ("_id", direction)])]
+        return expected, await _walk(collection, direction, limit=4)
+
+    expected, seen = asyncio.run(scenario())
+    assert seen == expected
+    assert len(seen) == 23
+
+
+def test_inserts_during_paging_do_not_shift_or_duplicate_rows():
+    async def scenario():
+        collection = await _collection()
+        inserted = 0
+
+        async def insert_newer():
+            nonlocal inserted
+            inserted += 1
+            await collection.insert_one({"name": f"new{inserted}", "created_at": BASE + timedelta(days=1)})
+
+        return await _walk(collection, DESCENDING, limit=5, between_pages=insert_newer)
+
+    seen = asyncio.run(scenario())
+    assert len(seen) == len(set(seen)) == 23
+
+
+def test_cursor_is_bound_to_its_ordering():
+    token = encode_cursor({"_id": 1, "created_at": BASE}, "created_at", DESCENDING)
+    assert decode_cursor(token, "created_at", DESCENDING) == (BASE, 1)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, "created_at", ASCENDING)
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor", "created_at", DESCENDING)
@@ -0,0 +1,104 @@
+"""
+Unit tests for resume parse jobs and the worker-side resume parser
+"""
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app import parse_jobs as parse_jobs_module  # noqa: E402
+from app.parse_jobs import ParseJobQueue, ParseQueueFull  # noqa: E402
+from app.resume_parser import _rows_from_lines  # noqa: E402
+
+
+def fake_parse(content: bytes):
+    if content == b"broken":
+        raise ValueError("EOF marker not found")
+    time.sleep(0.01)
+    return {"rows": [{"email": content.decode()}], "count": 1, "pages": 3}
+
+
+def _queue(**kwargs):
+    return ParseJobQueue(parse_fn=fake_parse, executor=ThreadPoolExecutor(max_workers=2), **kwargs)
+
+
+def _db():
+    return mongomock_motor.AsyncMongoMockClient()["test_parse_jobs"]
+
+
+def test_rows_from_lines_detects_tables_and_single_resumes():
+    table = ["Name, Email, Phone", "Asha, asha@x.io, 999", "Ravi, ravi@x.io, 888"]
+    assert [r["email"] for r in _rows_from_lines(table)] == ["asha@x.io", "ravi@x.io"]
+    resume = ["Asha Rao", "asha@x.io", "Skills: Python, SQL", "5 years experience"]
+    [row] = _rows_from_lines(resume)
+    assert (row["name"], row["email"], row["experience_years"]) == ("Asha Rao", "asha@x.io", "5")
+    assert _rows_from_lines(["", "  "]) == []
+
+
+def test_multi_file_job_persists_results_and_streams_each_file():
+    async def scenario():
+        db, queue = _db(), _queue()
+        job = await queue.submit(db, [("a.pdf", b"a@x.io"), ("bad.pdf", b"broken"), ("b.pdf", b"b@x.io")], "recruiter:1")
+        events = [event async for event in queue.events(job.job_id, "recruiter:1", heartbeat=1)]
+        persisted = await ParseJobQueue().get(db, job.job_id, "recruiter:1")  # e.g. another gateway worker
+        hidden = await queue.get(db, job.job_id, "recruiter:2")
+        return queue, events, persisted, hidden
+
+    queue, events, persisted, hidden = asyncio.run(scenario())
+    assert [e["event"] for e in events] == ["file", "file", "file", "job"]
+    assert events[-1]["job"]["status"] == "completed"
+    assert persisted["status"] == "completed" and persisted["completed_files"] == 3
+    by_name = {f["filename"]: f for f in persisted["files"]}
+    assert by_name["a.pdf"]["rows"] == [{"email": "a@x.io"}]
+    assert by_name["bad.pdf"]["status"] == "failed" and "EOF marker" in by_name["bad.pdf"]["error"]
+    assert hidden is None
+    stats = queue.stats()
+    assert stats["files_parsed"] == 2 and stats["files_failed"] == 1
+    assert stats["pages_parsed"] == 6 and stats["pages_per_second"] > 0 and stats["queue_depth"] == 0
+
+
+def test_submissions_beyond_the_queue_bound_are_rejected():
+    async def scenario():
+        db, queue = _db(), _queue(max_pending=2)
+        await queue.submit(db, [("a.pdf", b"a@x.io"), ("b.pdf", b"b@x.io")], "api_key")
+        with pytest.raises(ParseQueueFull):
+            await queue.submit(db, [("c.pdf", b"c@x.io")], "api_key")
+        with pytest.raises(ParseQueueFull):
+            await queue.parse(b"c@x.io")
+        await asyncio.gather(*queue._tasks)
+        return await queue.parse(b"c@x.io")
+
+    assert asyncio.run(scenario())["count"] == 1
+
+
+class _BrokenPool(Executor):
+    def submit(self, fn, *args, **kwargs):
+        raise BrokenProcessPool("A child process terminated abruptly")
+
+
+def test_broken_pool_is_replaced_and_only_running_files_count_as_running(monkeypatch):
+    monkeypatch.setattr(parse_jobs_module, "ProcessPoolExecutor",
+                        lambda max_workers: ThreadPoolExecutor(max_workers=max_workers))
+
+    async def scenario():
+        db = _db()
+        queue = ParseJobQueue(parse_fn=fake_parse, max_workers=1, executor=_BrokenPool())
+        job = await queue.submit(db, [("a.pdf", b"a@x.io"), ("b.pdf", b"b@x.io"), ("c.pdf", b"c@x.io")], "api_key")
+        await asyncio.sleep(0)
+        statuses = sorted(f["status"] for f in job.files)
+        running = queue.running
+        await asyncio.gather(*queue._tasks)
+        return queue, job, statuses, running
+
+    queue, job, statuses, running = asyncio.run(scenario())
+    assert statuses == ["queued", "queued", "running"] and running == 1
+    assert [f["status"] for f in job.files] == ["done", "done", "done"]
+    assert isinstance(queue._executor, ThreadPoolExecutor)
+    assert queue.running == 0 and queue.stats()["files_failed"] == 0
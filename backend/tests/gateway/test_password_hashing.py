@@ -0,0 +1,63 @@
+"""
+Unit tests for the off-loop bcrypt password hasher
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.password_hashing import PasswordHashBusy, PasswordHasher, hash_cost  # noqa: E402
+
+
+def test_hash_and_verify_run_without_blocking_the_loop():
+    async def scenario():
+        hasher = PasswordHasher(rounds=10, workers=2)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        stored = await hasher.hash("s3cret!")
+        results = await asyncio.gather(hasher.verify("s3cret!", stored), hasher.verify("wrong", stored))
+        task.cancel()
+        await hasher.aclose()
+        return hasher, stored, results, ticks
+
+    hasher, stored, results, ticks = asyncio.run(scenario())
+    assert results == [True, False]
+    assert hash_cost(stored) == 10
+    assert ticks > 3  # the event loop kept running while bcrypt worked
+    stats = hasher.stats()
+    assert (stats["hashed"], stats["verified"], stats["pending"]) == (1, 2, 0)
+
+
+def test_saturated_pool_sheds_load():
+    async def scenario():
+        hasher = PasswordHasher(rounds=10, workers=1, max_pending=1)
+        results = await asyncio.gather(hasher.hash("a"), hasher.hash("b"), return_exceptions=True)
+        await hasher.aclose()
+        return hasher, results
+
+    hasher, results = asyncio.run(scenario())
+    assert isinstance(results[0], str) and isinstance(results[1], PasswordHashBusy)
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_rehash_on_cost_change_and_malformed_hashes():
+    async def scenario():
+        old = await PasswordHasher(rounds=4).hash("pw")
+        hasher = PasswordHasher(rounds=5)
+        upgraded = await hasher.rehash_if_needed("pw", old)
+        unchanged = await hasher.rehash_if_needed("pw", upgraded)
+        return old, upgraded, unchanged, await hasher.verify("pw", upgraded), await hasher.verify("pw", "not-a-hash")
+
+    old, upgraded, unchanged, ok, malformed = asyncio.run(scenario())
+    assert hash_cost(old) == 4 and hash_cost(upgraded) == 5
+    assert unchanged is None and ok is True and malformed is False
+    assert hash_cost("plaintext") is None
+
@@ -0,0 +1,100 @@
+"""
+Unit tests for the materialized dashboard pipeline counters
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from bson import ObjectId  # noqa: E402
+
+from app.pipeline_counters import PipelineCounters, owner_deltas  # noqa: E402
+
+
+pytestmark = pytest.mark.usefixtures("mongomock_bulk_sort_compat")
+
+
+ACTIVE_JOB = ObjectId()
+CLOSED_JOB = ObjectId()
+CLIENT_JOB = ObjectId()
+
+
+async def _seed():
+    db = mongomock_motor.AsyncMongoMockClient()["test_pipeline_counters"]
+    await db.jobs.insert_many([
+        {"_id": ACTIVE_JOB, "status": "active", "recruiter_id": "r1"},
+        {"_id": CLOSED_JOB, "status": "closed", "recruiter_id": "r1"},
+        {"_id": CLIENT_JOB, "status": "active", "client_id": "c1"},
+    ])
+    await db.client_connected_recruiter.insert_one({"client_id": "c1", "recruiter_id": "r1"})
+    await db.job_applications.insert_many([
+        {"job_id": str(ACTIVE_JOB), "status": "applied"},
+        {"job_id": str(ACTIVE_JOB), "status": "shortlisted"},
+        {"job_id": str(CLOSED_JOB), "status": "applied"},
+        {"job_id": str(CLIENT_JOB), "status": "applied"},
+    ])
+    await db.offers.insert_many([
+        {"job_id": str(ACTIVE_JOB), "status": "accepted"},
+        {"job_id": str(CLIENT_JOB), "status": "hired"},
+    ])
+    await db.interviews.insert_one({"job_id": str(CLOSED_JOB), "status": "completed"})
+    return db
+
+
+def test_reconcile_builds_recruiter_and_client_rollups():
+    async def scenario():
+        db = await _seed()
+        counters = PipelineCounters()
+        assert await counters.get_owner_counters(db, "recruiter", "r1") is None
+
+        await counters.reconcile(db)
+        recruiter = await counters.get_owner_counters(db, "recruiter", "r1")
+        client = await counters.get_owner_counters(db, "client", "c1")
+        stranger = await counters.get_owner_counters(db, "client", "nobody")
+        return recruiter, client, stranger
+
+    recruiter, client, stranger = asyncio.run(scenario())
+    assert recruiter["active"]["jobs"] == 1
+    assert recruiter["active"]["applications"] == 2
+    assert recruiter["active"]["shortlisted"] == 1
+    assert recruiter["active"]["offers_accepted"] == 1
+    assert client["active"]["jobs"] == 2
+    assert client["all"]["applications"] == 4
+    assert client["all"]["interviews"] == 1
+    assert client["all"]["offers_accepted"] + client["all"]["offers_hired"] == 2
+    assert stranger["all"]["applications"] == 0
+
+
+def test_refresh_job_applies_deltas_and_follows_connection_changes():
+    async def scenario():
+        db = await _seed()
+        counters = PipelineCounters()
+        await counters.reconcile(db)
+
+        await db.job_applications.insert_one({"job_id": str(ACTIVE_JOB), "status": "applied"})
+        await counters.refresh_job(db, str(ACTIVE_JOB))
+        after_apply = await counters.get_owner_counters(db, "client", "c1")
+
+        await db.client_connected_recruiter.delete_many({"recruiter_id": "r1"})
+        await counters.refresh_recruiter_jobs(db, "r1")
+        after_disconnect = await counters.get_owner_counters(db, "client", "c1")
+        recruiter = await counters.get_owner_counters(db, "recruiter", "r1")
+        return after_apply, after_disconnect, recruiter
+
+    after_apply, after_disconnect, recruiter = asyncio.run(scenario())
+    assert after_apply["all"]["applications"] == 5
+    assert after_disconnect["all"]["applications"] == 1
+    assert after_disconnect["active"]["jobs"] == 1
+    assert recruiter["active"]["applications"] == 3
+
+
+def test_owner_deltas_move_counts_when_job_closes():
+    counts = {"jobs": 1, "applications": 3}
+    old = {"owners": ["recruiter:r1"], "active": True, "counts": counts}
+    new = {"owners": ["recruiter:r1"], "active": False, "counts": counts}
+    assert owner_deltas(old, new) == {"recruiter:r1": {"active.jobs": -1, "active.applications": -3}}
+    assert owner_deltas(new, new) == {}
@@ -0,0 +1,81 @@
+"""
+Unit tests for the gateway token-bucket rate limiter
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.rate_limiter import CpuLoadSampler, LocalRateLimitBackend, RateLimiter  # noqa: E402
+
+
+def test_bucket_allows_burst_then_refills_over_the_window():
+    backend = LocalRateLimitBackend(window_seconds=60)
+    decisions = [backend.hit("1.2.3.4:/v1/jobs", 3, now=0.0) for _ in range(4)]
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert decisions[2].remaining == 0
+    assert 19 < decisions[3].retry_after <= 20
+
+    assert backend.hit("1.2.3.4:/v1/jobs", 3, now=20.0).allowed
+    assert not backend.hit("1.2.3.4:/v1/jobs", 3, now=20.0).allowed
+
+
+def test_idle_keys_are_evicted_and_table_is_capped():
+    backend = LocalRateLimitBackend(window_seconds=60, max_keys=100)
+    for i in range(10):
+        backend.hit(f"ip{i}:/x", 5, now=float(i))
+    assert len(backend) == 10
+    backend.hit("fresh:/x", 5, now=65.0)
+    assert len(backend) == 5  # ip0..ip5 idle for a full window
+
+    capped = LocalRateLimitBackend(window_seconds=60, max_keys=3)
+    for i in range(10):
+        capped.hit(f"ip{i}:/x", 5, now=0.0)
+    assert len(capped) == 3
+
+
+def test_load_factor_scales_limit_and_shared_failure_falls_back_to_local():
+    class FailingShared:
+        name = "redis"
+
+        async def hit(self, key, limit):
+            raise ConnectionError("down")
+
+    sampler = CpuLoadSampler()
+    sampler.cpu_percent = 95.0
+    limiter = RateLimiter(shared=FailingShared(), sampler=sampler)
+    assert limiter.effective_limit(20) == 10
+
+    decision = asyncio.run(limiter.check("ip:/v1/match", 20))
+    assert decision.allowed and decision.limit == 10
+    assert limiter.shared_failures == 1
+    assert len(limiter.local) == 1
+
+
+def test_shared_backend_is_skipped_during_an_outage_then_retried():
+    class FlakyShared:
+        name = "redis"
+        calls = 0
+        down = True
+
+        async def hit(self, key, limit):
+            FlakyShared.calls += 1
+            if FlakyShared.down:
+                raise ConnectionError("down")
+            return LocalRateLimitBackend().hit(key, limit)
+
+    limiter = RateLimiter(shared=FlakyShared(), shared_retry_seconds=0.05)
+
+    async def scenario():
+        for _ in range(5):
+            assert (await limiter.check("ip:/v1/jobs", 60)).allowed
+        calls_during_outage = FlakyShared.calls
+        FlakyShared.down = False
+        await asyncio.sleep(0.06)
+        await limiter.check("ip:/v1/jobs", 60)
+        return calls_during_outage
+
+    assert asyncio.run(scenario()) == 1
+    assert FlakyShared.calls == 2
+    assert limiter.stats()["shared_available"] is True
@@ -0,0 +1,91 @@
+"""
+Unit tests for the streaming job report export
+"""
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.report_export import (  # noqa: E402
+    JOB_REPORT_COLUMNS, csv_chunks, encode_stream, job_report_rows, ndjson_chunks,
+)
+
+JOB = "665f00000000000000000001"
+
+
+async def _seed(applicants=7):
+    db = mongomock_motor.AsyncMongoMockClient()["test_report_export"]
+    result = await db.candidates.insert_many([
+        {"name": f"Cand, {i}", "email": f"c{i}@x.io", "password_hash": "secret", "technical_skills": "Python, SQL"}
+        for i in range(applicants)
+    ])
+    ids = [str(_id) for _id in result.inserted_ids]
+    await db.job_applications.insert_many(
+        [{"job_id": JOB, "candidate_id": cid, "status": "applied", "applied_date": datetime(2026, 5, 1)} for cid in ids]
+        + [{"job_id": "other", "candidate_id": ids[0], "status": "applied"}]
+    )
+    await db.interviews.insert_many([
+        {"job_id": JOB, "candidate_id": ids[0], "interview_date": "2026-06-01", "status": "scheduled", "interviewer": "A"},
+        {"job_id": JOB, "candidate_id": ids[0], "interview_date": "2026-06-09", "status": "completed", "interviewer": "B"},
+        {"job_id": "other", "candidate_id": ids[1], "interview_date": "2026-06-02", "status": "scheduled"},
+    ])
+    await db.feedback.insert_many([
+        {"job_id": JOB, "candidate_id": ids[0], "average_score": 4.0},
+        {"job_id": JOB, "candidate_id": ids[0], "average_score": 5.0},
+    ])
+    await db.offers.insert_one({"job_id": JOB, "candidate_id": ids[1], "status": "pending", "salary": 90000})
+    return db, ids
+
+
+async def _collect(stream):
+    return b"".join([chunk async for chunk in stream])
+
+
+def test_rows_are_joined_in_batches():
+    async def scenario():
+        db, ids = await _seed()
+        return ids, [row async for row in job_report_rows(db, JOB, batch_size=3)]
+
+    ids, rows = asyncio.run(scenario())
+    assert [row["candidate_id"] for row in rows] == ids
+    first, second = rows[0], rows[1]
+    assert (first["interview_count"], first["latest_interview_status"], first["interviewer"]) == (2, "completed", "B")
+    assert (first["feedback_count"], first["average_values_score"]) == (2, 4.5)
+    assert second["interview_count"] == 0 and (second["offer_status"], second["offer_salary"]) == ("pending", 90000)
+    assert first["applied_date"] == "2026-05-01T00:00:00"
+    assert set(first) == set(JOB_REPORT_COLUMNS)
+
+
+def test_csv_stream_is_chunked_quoted_and_optionally_gzipped():
+    async def scenario():
+        db, _ = await _seed(applicants=25)
+        outputs = []
+        for compress in (False, True):
+            chunks = csv_chunks(job_report_rows(db, JOB, batch_size=4), JOB_REPORT_COLUMNS, rows_per_chunk=10)
+            outputs.append(await _collect(encode_stream(chunks, gzip=compress)))
+        return outputs
+
+    plain, packed = asyncio.run(scenario())
+    assert gzip.decompress(packed) == plain
+    records = list(csv.DictReader(io.StringIO(plain.decode())))
+    assert len(records) == 25
+    assert records[0]["name"] == "Cand, 0" and records[0]["technical_skills"] == "Python, SQL"
+    assert "secret" not in plain.decode()
+
+
+def test_ndjson_stream():
+    async def scenario():
+        db, _ = await _seed(applicants=3)
+        return await _collect(encode_stream(ndjson_chunks(job_report_rows(db, JOB), rows_per_chunk=2)))
+
+    lines = asyncio.run(scenario()).decode().splitlines()
+    assert [json.loads(line)["email"] for line in lines] == ["c0@x.io", "c1@x.io", "c2@x.io"]
@@ -0,0 +1,93 @@
+"""
+Unit tests for the single-flight request coalescing layer
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'gateway'))
+
+from app.single_flight import SingleFlight  # noqa: E402
+
+
+def _handler(flight, calls, ttl=None, delay=0.02):
+    @flight.route("jobs.list", ttl_seconds=ttl)
+    async def list_jobs(search=None, limit: int = 100, auth=None):
+        calls.append((search, limit))
+        await asyncio.sleep(delay)
+        if search == "missing":
+            raise HTTPException(status_code=404, detail="Job not found")
+        return {"jobs": [search], "count": 1}
+    return list_jobs
+
+
+def test_concurrent_identical_requests_share_one_query():
+    calls = []
+
+    async def scenario():
+        flight = SingleFlight(ttl_seconds=0)
+        list_jobs = _handler(flight, calls)
+        results = await asyncio.gather(*(list_jobs(search=" python ", limit=10) for _ in range(20)),
+                                       list_jobs(search="python", limit=10, auth={"type": "api_key"}))
+        again = await list_jobs(search="python", limit=10)
+        return flight, results, again
+
+    flight, results, again = asyncio.run(scenario())
+    # " python " and "python" share a key; the api-key caller gets its own flight
+    assert calls == [(" python ", 10), ("python", 10), ("python", 10)]
+    assert all(r is results[0] for r in results[:20])
+    assert again is not results[0]  # ttl 0: coalesce only, nothing kept
+    assert flight.stats()["routes"]["jobs.list"] == {"computed": 3, "coalesced": 19, "cache_hit": 0}
+
+
+def test_ttl_cache_serves_repeats_until_invalidated():
+    calls = []
+
+    async def scenario():
+        flight = SingleFlight(ttl_seconds=60)
+        list_jobs = _handler(flight, calls, delay=0)
+        await list_jobs(search="go")
+        await list_jobs(search="go ")
+        flight.invalidate("jobs.")
+        await list_jobs(search="go")
+        return flight
+
+    flight = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert flight.stats()["routes"]["jobs.list"]["cache_hit"] == 1
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    calls = []
+
+    async def scenario():
+        flight = SingleFlight(ttl_seconds=60)
+        list_jobs = _handler(flight, calls)
+        results = await asyncio.gather(*(list_jobs(search="missing") for _ in range(3)), return_exceptions=True)
+        with pytest.raises(HTTPException):
+            await list_jobs(search="missing")
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, HTTPException) and r.status_code == 404 for r in results)
+    assert len(calls) == 2
+
+
+def test_leader_cancellation_does_not_cancel_shared_work():
+    calls = []
+
+    async def scenario():
+        flight = SingleFlight(ttl_seconds=0)
+        list_jobs = _handler(flight, calls, delay=0.05)
+        leader = asyncio.ensure_future(list_jobs(search="rust"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(list_jobs(search="rust"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == {"jobs": ["rust"], "count": 1}
+    assert len(calls) == 1